@@ -0,0 +1,167 @@
+"""
+Piezas compartidas por los viewsets de la API REST.
+
+- ``CursorFechaPagination``: paginación por cursor sobre (fecha, id); nunca
+  ejecuta ``COUNT(*)`` y el costo de cada página no depende de su posición.
+- ``PropietarioViewSetMixin``: filtrado por dueño consistente en todos los
+  recursos (los superusuarios ven todo, como en ``GastoViewSet``).
+- ``PropietarioPrimaryKeyField``: FK escribible que sólo acepta objetos del
+  usuario autenticado (evita asociar una cuenta o compra ajena).
+- ``CamposDinamicosMixin``: fieldsets parciales con ``?fields=id,monto``.
+- ``ListadoValoresMixin``: listados servidos desde ``.values()`` sin
+  instanciar modelos ni serializers por fila.
+"""
+from django.utils import timezone
+from rest_framework import ISO_8601, permissions, serializers
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from gastos.permissions import IsAdminOrReadOwnOnly, IsOwnerOrReadOnly
+from usuarios.authentication import JWTLigeroAuthentication
+
+
+class CursorFechaPagination(CursorPagination):
+    ordering = ('-fecha', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def get_ordering(self, request, queryset, view):
+        # Los recursos sin fecha (p.ej. cuentas) declaran su propio orden
+        return tuple(getattr(view, 'cursor_ordering', self.ordering))
+
+
+class PropietarioViewSetMixin:
+    """
+    Restringe el queryset a los objetos del usuario autenticado.
+
+    ``campo_usuario`` es el lookup hacia el dueño (``'deuda__usuario'`` para
+    los pagos de deuda, por ejemplo).
+    """
+    campo_usuario = 'usuario'
+    authentication_classes = [JWTLigeroAuthentication]
+    pagination_class = CursorFechaPagination
+    permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOwnOnly, IsOwnerOrReadOnly]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.is_superuser:
+            return queryset
+        return queryset.filter(**{self.campo_usuario: self.request.user})
+
+
+class PropietarioPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField limitado a los objetos del usuario del request."""
+
+    def __init__(self, **kwargs):
+        self.campo_usuario = kwargs.pop('campo_usuario', 'usuario')
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = self.context.get('request')
+        if request is None or request.user.is_superuser:
+            return queryset
+        return queryset.filter(**{self.campo_usuario: request.user})
+
+
+def campos_solicitados(request):
+    """Campos pedidos con ``?fields=a,b`` (sólo en lecturas), o ``None``."""
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return None
+    valor = getattr(request, 'query_params', request.GET).get('fields')
+    if not valor:
+        return None
+    return {campo.strip() for campo in valor.split(',') if campo.strip()}
+
+
+class CamposDinamicosMixin:
+    """Serializer que descarta los campos no pedidos en ``?fields=``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        campos = campos_solicitados(self.context.get('request'))
+        if campos:
+            for nombre in set(self.fields) - campos:
+                self.fields.pop(nombre)
+
+
+# Tipos de campo cuyo valor crudo de la base no coincide con su representación
+_CONVERTIBLES = (serializers.DecimalField, serializers.DateTimeField, serializers.DateField)
+
+
+def _conversor(campo):
+    """Función que lleva el valor crudo de la base a la representación del campo."""
+    if isinstance(campo, serializers.DateTimeField):
+        formato = getattr(campo, 'format', api_settings.DATETIME_FORMAT)
+        if formato is not None and formato.lower() == ISO_8601:
+            # Igual que DateTimeField.to_representation, pero resolviendo la zona
+            # horaria una sola vez en lugar de una por fila
+            zona = campo.timezone if hasattr(campo, 'timezone') else campo.default_timezone()
+
+            def fecha_iso(valor):
+                if zona is not None:
+                    valor = valor.astimezone(zona) if timezone.is_aware(valor) else timezone.make_aware(valor, zona)
+                texto = valor.isoformat()
+                return texto[:-6] + 'Z' if texto.endswith('+00:00') else texto
+            return fecha_iso
+    if isinstance(campo, _CONVERTIBLES):
+        return campo.to_representation
+    return None
+
+
+def plan_valores(serializer):
+    """
+    Traduce los campos de ``serializer`` a lookups de ``.values()``.
+
+    Devuelve ``[(nombre, lookup, conversor)]`` o ``None`` si algún campo no
+    puede leerse directo de la base (métodos, serializers anidados, etc.).
+    """
+    plan = []
+    for nombre, campo in serializer.fields.items():
+        if campo.write_only:
+            continue
+        if isinstance(campo, (serializers.SerializerMethodField, serializers.BaseSerializer)) or campo.source == '*':
+            return None
+        plan.append((nombre, campo.source.replace('.', '__'), _conversor(campo)))
+    return plan
+
+
+def serializar_filas(plan, filas):
+    """Aplica un plan de :func:`plan_valores` a filas de ``.values()``."""
+    return [
+        {
+            nombre: (conversor(fila[lookup]) if conversor and fila[lookup] is not None else fila[lookup])
+            for nombre, lookup, conversor in plan
+        }
+        for fila in filas
+    ]
+
+
+class ListadoValoresMixin:
+    """
+    ``list`` servido desde ``.values()`` cuando el serializer lo permite.
+
+    Produce el mismo JSON que el serializer (las conversiones de decimales y
+    fechas usan el propio campo), pero sin crear una instancia de modelo ni
+    recorrer el serializer por cada fila. Si el serializer tiene campos
+    calculados se usa el camino normal.
+    """
+
+    def list(self, request, *args, **kwargs):
+        plan = plan_valores(self.get_serializer())
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        # La paginación por cursor necesita leer los campos de orden de cada fila
+        orden = [campo.lstrip('-') for campo in getattr(self, 'cursor_ordering', CursorFechaPagination.ordering)]
+        lookups = {lookup for _, lookup, _ in plan} | set(orden)
+        filas = queryset.values(*lookups)
+
+        pagina = self.paginate_queryset(filas)
+        datos = serializar_filas(plan, pagina if pagina is not None else filas)
+        if pagina is not None:
+            return self.get_paginated_response(datos)
+        return Response(datos)
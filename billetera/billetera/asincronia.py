@@ -0,0 +1,57 @@
+"""
+Apoyo para vistas async (``async def``) en Django 4.2.
+
+Las vistas que esperan servicios externos (Mercado Pago, R2) son async: con
+``GUNICORN_MODO=asgi`` corren en el event loop de un worker de uvicorn y un
+request que espera a la red no ocupa el proceso. Bajo WSGI siguen
+funcionando (Django las ejecuta en un loop propio por request).
+
+- El ORM se usa con ``sync_to_async`` (``thread_sensitive``, el hilo del
+  request).
+- Los SDK que sólo son bloqueantes (``mercadopago`` sobre ``requests``,
+  ``boto3``) van a ``en_hilo_externo``: un pool propio de
+  ``HILOS_IO_EXTERNO`` hilos, separado del que usa Django para el código
+  sincrónico, para que una API lenta no frene al resto.
+- ``login_requerido`` y ``exento_csrf`` reemplazan a los decoradores de
+  Django, que en 4.2 envuelven la vista en una función sincrónica.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+
+_pool = None
+_lock_pool = threading.Lock()
+
+
+def _pool_externo():
+    # Se crea con el primer uso: con preload_app no debe existir antes del fork
+    global _pool
+    with _lock_pool:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=settings.HILOS_IO_EXTERNO, thread_name_prefix='io-externo')
+        return _pool
+
+
+async def en_hilo_externo(funcion, *args, **kwargs):
+    """Ejecuta ``funcion`` (E/S de red bloqueante) sin bloquear el event loop."""
+    return await sync_to_async(funcion, thread_sensitive=False, executor=_pool_externo())(*args, **kwargs)
+
+
+def login_requerido(vista):
+    """``login_required`` para vistas async: el usuario se carga fuera del loop."""
+    @wraps(vista)
+    async def envoltura(request, *args, **kwargs):
+        if await sync_to_async(lambda: request.user.is_authenticated)():
+            return await vista(request, *args, **kwargs)
+        return redirect_to_login(request.get_full_path())
+    return envoltura
+
+
+def exento_csrf(vista):
+    """``csrf_exempt`` sin envolver la vista (así sigue siendo async)."""
+    vista.csrf_exempt = True
+    return vista
@@ -0,0 +1,153 @@
+"""
+Conexiones a la base de datos de producción.
+
+``configuracion`` arma ``DATABASES['default']`` a partir de ``DATABASE_URL``
+y de las variables ``DB_*`` (ver ``settings.py``):
+
+- Conexiones persistentes (``DB_CONN_MAX_AGE``) con verificación antes de
+  reusarlas (``CONN_HEALTH_CHECKS``): tras un deploy o un reinicio de la base
+  una conexión caída se descarta en lugar de fallar en el primer request.
+  Bajo ASGI se desactivan por defecto: cada request corre en un hilo nuevo y
+  las conexiones persistentes de esos hilos no se reusan ni se cierran.
+- ``DB_PGBOUNCER``: modo compatible con pgbouncer (o Supavisor) en
+  *transaction pooling*. Sin cursores del lado del servidor (``.iterator()``
+  trae los datos por lotes desde el cliente), sin sentencias preparadas
+  (psycopg 3) y sin parámetros de arranque, que pgbouncer rechaza. En este
+  modo los timeouts se configuran en el rol
+  (``ALTER ROLE ... SET statement_timeout = ...``).
+- Timeouts de PostgreSQL por conexión: ``statement_timeout``,
+  ``lock_timeout`` e ``idle_in_transaction_session_timeout``, para que una
+  consulta o una transacción colgada no retenga la conexión ni los locks.
+- ``DB_POOL_MAX``: pool de conexiones de psycopg 3 dentro de cada proceso.
+  Lo implementa Django a partir de 5.1; con versiones anteriores o sin
+  ``psycopg_pool`` la configuración falla al arrancar en lugar de ignorarse.
+
+``configuracion_sqlite`` es el perfil de desarrollo y de instalaciones de un
+solo nodo: cada conexión nueva aplica los ``PRAGMAS`` de su alias
+(``aplicar_pragmas``). WAL deja leer mientras otro proceso escribe y, con
+``synchronous=NORMAL``, cada commit deja de esperar un fsync del archivo
+principal. Con ``solo_lectura`` arma un alias que abre el mismo archivo en
+``mode=ro``, para reportes (``alias_lectura``). El receptor de
+``connection_created`` se conecta en ``UsuariosConfig.ready()``.
+
+``settings.py`` importa este módulo: no importa Django al cargarse (los
+imports de Django van dentro de las funciones que los usan).
+"""
+import dj_database_url
+
+ALIAS_LECTURA = 'lectura'
+# django.db.DEFAULT_DB_ALIAS, sin importar django.db al cargar los settings
+ALIAS_PRINCIPAL = 'default'
+
+
+def _psycopg3():
+    try:
+        import psycopg  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _opciones_pool(minimo, maximo, espera):
+    import django
+    from django.core.exceptions import ImproperlyConfigured
+
+    if django.VERSION < (5, 1):
+        raise ImproperlyConfigured(
+            'DB_POOL_MAX requiere Django 5.1 o posterior; con esta versión usá conexiones '
+            'persistentes (DB_CONN_MAX_AGE) o pgbouncer (DB_PGBOUNCER=1).'
+        )
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured('DB_POOL_MAX requiere el paquete "psycopg[pool]".')
+    return {'min_size': minimo, 'max_size': maximo, 'timeout': espera}
+
+
+def configuracion(url, conn_max_age=600, health_checks=True, pgbouncer=False, connect_timeout=10,
+                  statement_timeout=0, lock_timeout=0, idle_in_transaction_timeout=0,
+                  pool_min=0, pool_max=0, pool_timeout=10):
+    """
+    Entrada de ``DATABASES`` para ``url``. Los timeouts van en milisegundos
+    (``0`` no los fija); ``connect_timeout`` en segundos.
+    """
+    if not url:
+        return {}
+    base = dj_database_url.parse(
+        url,
+        conn_max_age=0 if pool_max else conn_max_age,
+        conn_health_checks=health_checks,
+        disable_server_side_cursors=pgbouncer,
+    )
+    if 'postgresql' not in base['ENGINE']:
+        return base
+
+    opciones = base.setdefault('OPTIONS', {})
+    if connect_timeout:
+        opciones['connect_timeout'] = connect_timeout
+
+    if pgbouncer:
+        if _psycopg3():
+            # pgbouncer en modo transacción no conserva las sentencias preparadas
+            opciones['prepare_threshold'] = None
+    else:
+        parametros = {
+            'statement_timeout': statement_timeout,
+            'lock_timeout': lock_timeout,
+            'idle_in_transaction_session_timeout': idle_in_transaction_timeout,
+        }
+        arranque = ' '.join(f'-c {nombre}={valor}' for nombre, valor in parametros.items() if valor)
+        if arranque:
+            opciones['options'] = arranque
+
+    if pool_max:
+        opciones['pool'] = _opciones_pool(pool_min, pool_max, pool_timeout)
+    return base
+
+
+def pragmas_sqlite(mmap_mb=256, cache_mb=64, busy_timeout=5000):
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': mmap_mb * 1024 * 1024,
+        # Negativo: en KiB en lugar de páginas
+        'cache_size': -cache_mb * 1024,
+        'busy_timeout': busy_timeout,
+        'temp_store': 'MEMORY',
+    }
+
+
+def configuracion_sqlite(ruta, solo_lectura=False, pragmas=None):
+    """
+    Entrada de ``DATABASES`` para el archivo SQLite ``ruta``. Con
+    ``solo_lectura`` el alias abre el archivo en ``mode=ro`` y en los tests
+    usa la misma base que ``default``.
+    """
+    pragmas = dict(pragmas if pragmas is not None else pragmas_sqlite())
+    config = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ruta,
+        'PRAGMAS': pragmas,
+    }
+    if solo_lectura:
+        # Django abre SQLite con uri=True. journal_mode es persistente: lo fija la conexión de escritura
+        pragmas.pop('journal_mode', None)
+        config['NAME'] = f'file:{ruta}?mode=ro'
+        config['TEST'] = {'MIRROR': ALIAS_PRINCIPAL}
+    return config
+
+
+def aplicar_pragmas(sender, connection, **kwargs):
+    """Receptor de ``connection_created``: aplica los ``PRAGMAS`` del alias."""
+    if connection.vendor != 'sqlite':
+        return
+    # Sobre la conexión de sqlite3: no cuentan como consultas de Django
+    for nombre, valor in (connection.settings_dict.get('PRAGMAS') or {}).items():
+        connection.connection.execute(f'PRAGMA {nombre} = {valor}')
+
+
+def alias_lectura():
+    """Alias para consultas de sólo lectura (reportes): ``lectura`` si está configurado."""
+    from django.conf import settings
+
+    return ALIAS_LECTURA if ALIAS_LECTURA in settings.DATABASES else ALIAS_PRINCIPAL
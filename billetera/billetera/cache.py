@@ -0,0 +1,146 @@
+"""
+Cache compartida de la aplicación.
+
+``CACHE_URL`` elige el backend de ``CACHES['default']`` (ver
+``billetera/configuracion_cache.py``).
+
+Las claves llevan un espacio de nombres (``clave``) y, si se piden
+versionadas, la versión global del espacio y la del usuario: ``invalidar``
+incrementa una de las dos y las entradas anteriores quedan inalcanzables sin
+tener que borrarlas una por una (vencen por TTL).
+
+``obtener_o_calcular`` lleva la cuenta de aciertos y fallos por espacio en
+el proceso (``metricas``).
+"""
+import hashlib
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+
+from billetera import instrumentacion
+
+# Las claves de memcached/redis no admiten espacios y conviene que sean cortas
+LARGO_MAXIMO_PARTE = 64
+
+_AUSENTE = object()
+
+
+# --- Claves ---
+
+def _parte(valor):
+    texto = str(valor)
+    if len(texto) > LARGO_MAXIMO_PARTE or any(c.isspace() for c in texto):
+        return hashlib.sha1(texto.encode()).hexdigest()
+    return texto
+
+
+def clave(espacio, *partes):
+    """``espacio:parte1:parte2``; las partes largas o con espacios se reemplazan por su SHA-1."""
+    return ':'.join([espacio, *(_parte(p) for p in partes)])
+
+
+def _clave_version(espacio, usuario_id=None):
+    return clave('version', espacio, 'global' if usuario_id is None else usuario_id)
+
+
+def _nueva_version():
+    # Arranca en un valor distinto en cada alta: si las versiones se pierden
+    # (reinicio, desalojo) no vuelven a coincidir con entradas viejas
+    return int(time.time() * 1000)
+
+
+def version(espacio, usuario_id=None):
+    """
+    Versión vigente de ``espacio``: la global y, si se indica ``usuario_id``,
+    la de ese usuario (``'global.usuario'``). Una sola lectura a la cache.
+    """
+    llaves = [_clave_version(espacio)]
+    if usuario_id is not None:
+        llaves.append(_clave_version(espacio, usuario_id))
+    actuales = cache.get_many(llaves)
+    for llave in llaves:
+        if llave not in actuales:
+            cache.add(llave, _nueva_version(), timeout=None)
+            actuales[llave] = cache.get(llave)
+    return '.'.join(str(actuales[llave]) for llave in llaves)
+
+
+def _incrementar(llave):
+    try:
+        cache.incr(llave)
+    except ValueError:
+        cache.set(llave, _nueva_version(), timeout=None)
+
+
+def invalidar(espacio, usuario_id=None):
+    """
+    Descarta las entradas de ``espacio`` de ``usuario_id`` o, sin usuario, las
+    de todos. Dentro de una transacción se repite al confirmarla, por si otro
+    request cacheó los datos viejos mientras tanto.
+    """
+    llave = _clave_version(espacio, usuario_id)
+    _incrementar(llave)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _incrementar(llave))
+
+
+# --- Lectura con métricas ---
+
+_metricas = defaultdict(lambda: {'aciertos': 0, 'fallos': 0, 'segundos_calculo': 0.0})
+_lock_metricas = threading.Lock()
+
+
+def obtener_o_calcular(espacio, partes, calcular, timeout=None, usuario_id=None, versionado=False):
+    """
+    Valor cacheado para ``clave(espacio, *partes)`` o el resultado de
+    ``calcular()``, que se guarda con ``timeout`` (el de ``CACHES`` si es
+    ``None``).
+
+    Con ``versionado=True`` la clave incluye ``version(espacio, usuario_id)``:
+    ``invalidar`` la descarta.
+    """
+    if versionado:
+        partes = [version(espacio, usuario_id), *partes]
+    if usuario_id is not None:
+        partes = [f'u{usuario_id}', *partes]
+    llave = clave(espacio, *partes)
+
+    valor = cache.get(llave, _AUSENTE)
+    if valor is not _AUSENTE:
+        _registrar(espacio, acierto=True)
+        return valor
+
+    inicio = time.perf_counter()
+    valor = calcular()
+    _registrar(espacio, acierto=False, segundos=time.perf_counter() - inicio)
+    if timeout is None:
+        cache.set(llave, valor)
+    else:
+        cache.set(llave, valor, timeout=timeout)
+    return valor
+
+
+def _registrar(espacio, acierto, segundos=0.0):
+    instrumentacion.contar_cache(acierto)
+    with _lock_metricas:
+        fila = _metricas[espacio]
+        fila['aciertos' if acierto else 'fallos'] += 1
+        fila['segundos_calculo'] += segundos
+
+
+def metricas():
+    """``{espacio: {aciertos, fallos, segundos_calculo, tasa_aciertos}}`` de este proceso."""
+    with _lock_metricas:
+        resultado = {espacio: dict(fila) for espacio, fila in _metricas.items()}
+    for fila in resultado.values():
+        total = fila['aciertos'] + fila['fallos']
+        fila['tasa_aciertos'] = round(fila['aciertos'] / total, 3) if total else None
+    return resultado
+
+
+def reiniciar_metricas():
+    with _lock_metricas:
+        _metricas.clear()
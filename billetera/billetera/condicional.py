@@ -0,0 +1,122 @@
+"""
+GET condicional (ETag / Last-Modified) a partir de la versión del libro.
+
+La versión del libro de un usuario es la secuencia de su último ``Cambio``
+(ver ``sincronizacion``): una única consulta indexada que cambia con cualquier
+alta, edición o baja. Si el cliente ya tiene esa versión se responde ``304``
+sin ejecutar las consultas pesadas de la vista.
+
+Además de la versión, el ETag incluye la ruta completa, el secreto CSRF (las
+páginas embeben el token en sus formularios) y un intervalo de tiempo
+``ventana`` que acota cuánto puede quedar desactualizado un contenido que
+depende del reloj (rangos "últimas 24 h") o de tablas no versionadas
+(categorías, monedas).
+"""
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from django.contrib import messages
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+from django.views.decorators.http import condition
+
+from sincronizacion.models import Cambio
+
+VENTANA_POR_DEFECTO = 3600
+
+
+def version_libro(request):
+    """(secuencia, fecha) del último cambio visible para el usuario; se calcula una vez por request."""
+    if not hasattr(request, '_version_libro'):
+        cambios = Cambio.objects.order_by('-id')
+        # Los superusuarios ven los datos de todos los usuarios
+        if not request.user.is_superuser:
+            cambios = cambios.filter(usuario=request.user)
+        request._version_libro = cambios.values_list('id', 'fecha').first() or (0, None)
+    return request._version_libro
+
+
+def _admite_condicional(request):
+    if not request.user.is_authenticated:
+        return False
+    # Un 304 dejaría sin mostrar los mensajes pendientes (p.ej. "Gasto creado")
+    return not len(messages.get_messages(request))
+
+
+def _intervalo(ventana):
+    return int(datetime.now(dt_timezone.utc).timestamp() // ventana)
+
+
+def etag_libro(request, ventana=VENTANA_POR_DEFECTO, *extra):
+    if not _admite_condicional(request):
+        return None
+    secuencia, _ = version_libro(request)
+    partes = [
+        request.user.pk, secuencia, request.get_full_path(),
+        request.META.get('CSRF_COOKIE', ''), _intervalo(ventana), *extra,
+    ]
+    return hashlib.sha1('|'.join(str(p) for p in partes).encode()).hexdigest()
+
+
+def ultima_modificacion(request, ventana=VENTANA_POR_DEFECTO):
+    """Último cambio del libro, nunca anterior al inicio del intervalo actual."""
+    if not _admite_condicional(request):
+        return None
+    _, fecha = version_libro(request)
+    inicio_intervalo = datetime.fromtimestamp(_intervalo(ventana) * ventana, dt_timezone.utc)
+    return max(fecha, inicio_intervalo) if fecha else inicio_intervalo
+
+
+def condicional_libro(ventana=VENTANA_POR_DEFECTO):
+    """
+    Decorador para vistas HTML que dependen sólo del libro del usuario.
+
+    Debe ir debajo de ``@login_required``. Marca la respuesta como
+    ``private, no-cache`` para que el navegador revalide siempre.
+    """
+    def decorador(vista):
+        @condition(
+            etag_func=lambda request, *args, **kwargs: etag_libro(request, ventana),
+            last_modified_func=lambda request, *args, **kwargs: ultima_modificacion(request, ventana),
+        )
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            response = vista(request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return envoltura
+    return decorador
+
+
+class CondicionalViewSetMixin:
+    """
+    GET condicional para ``list`` y ``retrieve`` de los viewsets de la API.
+
+    La verificación ocurre después de autenticar (JWT) y antes de armar el
+    queryset, así un cliente que hace polling sin cambios no cuesta más que
+    la consulta de versión.
+    """
+    ventana_condicional = VENTANA_POR_DEFECTO
+
+    def _condicional(self, request, accion, *args, **kwargs):
+        etag = etag_libro(request, self.ventana_condicional, request.accepted_media_type)
+        last_modified = ultima_modificacion(request, self.ventana_condicional)
+        if etag is not None:
+            no_modificado = get_conditional_response(
+                request, etag=quote_etag(etag), last_modified=int(last_modified.timestamp()),
+            )
+            if no_modificado is not None:
+                return no_modificado
+        response = accion(request, *args, **kwargs)
+        if etag is not None and response.status_code == 200:
+            response['ETag'] = quote_etag(etag)
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._condicional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._condicional(request, super().retrieve, *args, **kwargs)
@@ -0,0 +1,66 @@
+"""
+Entrada de ``CACHES`` a partir de ``CACHE_URL``.
+
+- ``locmem://`` (por defecto): memoria del proceso; cada worker tiene la suya.
+- ``file:///ruta/al/directorio``: archivos, compartida entre los workers de
+  una misma máquina.
+- ``db://nombre_tabla``: tabla de la base (``manage.py createcachetable``),
+  compartida por todas las instancias.
+- ``redis://host:6379/0`` o ``rediss://``: Redis o compatible (Valkey,
+  KeyDB), con el paquete ``redis`` de requirements.txt.
+- ``dummy://``: no guarda nada.
+
+``settings.py`` importa este módulo, así que no importa Django: el uso de la
+cache está en ``billetera/cache.py``.
+"""
+from urllib.parse import parse_qsl, urlsplit
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'rediss': 'django.core.cache.backends.redis.RedisCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def _mal_configurada(mensaje):
+    from django.core.exceptions import ImproperlyConfigured
+
+    return ImproperlyConfigured(mensaje)
+
+
+def configuracion(url, timeout=300, prefijo=''):
+    """Entrada de ``CACHES`` para ``url``; los parámetros de la query string van a ``OPTIONS``."""
+    partes = urlsplit(url)
+    esquema = partes.scheme.lower()
+    if esquema not in BACKENDS:
+        raise _mal_configurada(f'CACHE_URL: esquema desconocido "{esquema}".')
+
+    if esquema in ('redis', 'rediss'):
+        try:
+            import redis  # noqa: F401
+        except ImportError:
+            raise _mal_configurada('CACHE_URL apunta a Redis pero el paquete "redis" no está instalado.')
+        ubicacion = url.split('?', 1)[0]
+    elif esquema == 'file':
+        ubicacion = partes.path
+    elif esquema == 'db':
+        ubicacion = partes.netloc or partes.path.lstrip('/') or 'billetera_cache'
+    else:
+        ubicacion = partes.netloc or partes.path.lstrip('/') or 'billetera'
+
+    # MAX_ENTRIES, CULL_FREQUENCY...; las de Redis (db, socket_timeout...) van al pool tal cual
+    opciones = {}
+    for nombre, valor in parse_qsl(partes.query):
+        nombre = nombre if esquema in ('redis', 'rediss') else nombre.upper()
+        opciones[nombre] = int(valor) if valor.isdigit() else valor
+
+    return {
+        'BACKEND': BACKENDS[esquema],
+        'LOCATION': ubicacion,
+        'TIMEOUT': timeout,
+        'KEY_PREFIX': prefijo,
+        'OPTIONS': opciones,
+    }
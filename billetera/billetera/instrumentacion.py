@@ -0,0 +1,182 @@
+"""
+Medición de rendimiento por request.
+
+``MedicionMiddleware`` mide cada request: tiempo total, cantidad y tiempo de
+las consultas SQL (``execute_wrapper``, funciona sin ``DEBUG``), tiempo de
+render de plantillas (backend ``DjangoTemplatesMedidos``) y aciertos/fallos
+de ``billetera.cache.obtener_o_calcular``. El resultado sale:
+
+- en la cabecera ``Server-Timing`` (``MEDICION_SERVER_TIMING``), que las
+  herramientas de desarrollo del navegador muestran junto al request;
+- en una línea JSON del logger ``billetera.rendimiento``. Los requests que
+  superan ``MEDICION_UMBRAL_LENTO_MS`` se registran como ``WARNING`` con las
+  ``MEDICION_TOP_SQL`` consultas que más tiempo sumaron, agrupadas por
+  sentencia sin parámetros (un N+1 aparece como una sentencia con muchas
+  ejecuciones).
+
+En respuestas en streaming sólo se mide hasta que la vista devuelve la
+respuesta, no la generación del cuerpo. Bajo ASGI el middleware corre en el
+event loop (``async_capable``), sin sumar un salto a un hilo por request.
+"""
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger('billetera.rendimiento')
+
+_medicion = ContextVar('medicion', default=None)
+
+
+class Medicion:
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.segundos_sql = 0.0
+        self.segundos_plantillas = 0.0
+        self.aciertos_cache = 0
+        self.fallos_cache = 0
+        self.sentencias = {}
+
+    def registrar_consulta(self, sql, segundos):
+        self.consultas += 1
+        self.segundos_sql += segundos
+        fila = self.sentencias.setdefault(sql, [0, 0.0])
+        fila[0] += 1
+        fila[1] += segundos
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.registrar_consulta(sql, time.perf_counter() - inicio)
+
+    def top_sql(self, cantidad):
+        filas = sorted(self.sentencias.items(), key=lambda item: item[1][1], reverse=True)[:cantidad]
+        return [
+            {'sql': sql[:500], 'veces': veces, 'ms': round(segundos * 1000, 1)}
+            for sql, (veces, segundos) in filas
+        ]
+
+
+def medicion_actual():
+    """La ``Medicion`` del request en curso, o ``None`` fuera de un request."""
+    return _medicion.get()
+
+
+def contar_cache(acierto):
+    medicion = _medicion.get()
+    if medicion is None:
+        return
+    if acierto:
+        medicion.aciertos_cache += 1
+    else:
+        medicion.fallos_cache += 1
+
+
+class PlantillaMedida(Template):
+    def render(self, context=None, request=None):
+        medicion = _medicion.get()
+        if medicion is None:
+            return super().render(context, request)
+        inicio = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            medicion.segundos_plantillas += time.perf_counter() - inicio
+
+
+class DjangoTemplatesMedidos(DjangoTemplates):
+    """``DjangoTemplates`` que suma el tiempo de render al request en curso."""
+
+    def from_string(self, template_code):
+        return PlantillaMedida(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        plantilla = super().get_template(template_name)
+        return PlantillaMedida(plantilla.template, self)
+
+
+def _server_timing(medicion, total):
+    return ', '.join([
+        f'total;dur={total * 1000:.1f}',
+        f'sql;dur={medicion.segundos_sql * 1000:.1f};desc="{medicion.consultas} consultas"',
+        f'plantillas;dur={medicion.segundos_plantillas * 1000:.1f}',
+        f'cache;desc="{medicion.aciertos_cache} aciertos / {medicion.fallos_cache} fallos"',
+    ])
+
+
+@contextmanager
+def _medir_consultas(medicion):
+    with ExitStack() as pila:
+        for conexion in connections.all():
+            pila.enter_context(conexion.execute_wrapper(medicion))
+        yield
+
+
+class MedicionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        medicion = Medicion()
+        token = _medicion.set(medicion)
+        try:
+            with _medir_consultas(medicion):
+                response = self.get_response(request)
+        finally:
+            _medicion.reset(token)
+        return self._terminar(request, response, medicion)
+
+    async def __acall__(self, request):
+        medicion = Medicion()
+        token = _medicion.set(medicion)
+        try:
+            with _medir_consultas(medicion):
+                response = await self.get_response(request)
+        finally:
+            _medicion.reset(token)
+        return self._terminar(request, response, medicion)
+
+    def _terminar(self, request, response, medicion):
+        total = time.perf_counter() - medicion.inicio
+        if settings.MEDICION_SERVER_TIMING:
+            response['Server-Timing'] = _server_timing(medicion, total)
+        self._registrar(request, response, medicion, total)
+        return response
+
+    def _registrar(self, request, response, medicion, total):
+        lento = total * 1000 >= settings.MEDICION_UMBRAL_LENTO_MS
+        nivel = logging.WARNING if lento else logging.INFO
+        if not logger.isEnabledFor(nivel):
+            return
+        coincidencia = getattr(request, 'resolver_match', None)
+        datos = {
+            'metodo': request.method,
+            'ruta': request.path,
+            'vista': coincidencia.view_name if coincidencia else None,
+            'estado': response.status_code,
+            'ms': round(total * 1000, 1),
+            'consultas': medicion.consultas,
+            'sql_ms': round(medicion.segundos_sql * 1000, 1),
+            'plantillas_ms': round(medicion.segundos_plantillas * 1000, 1),
+            'cache_aciertos': medicion.aciertos_cache,
+            'cache_fallos': medicion.fallos_cache,
+        }
+        if lento:
+            datos['top_sql'] = medicion.top_sql(settings.MEDICION_TOP_SQL)
+        logger.log(nivel, json.dumps(datos, ensure_ascii=False))
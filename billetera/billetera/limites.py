@@ -0,0 +1,208 @@
+"""
+Límites de tasa y de concurrencia para los endpoints costosos.
+
+- Ventana deslizante con dos contadores en la cache de Django, por clase de
+  endpoint, identidad (usuario autenticado o IP) y ventana. ``LIMITES_TASA``
+  fija cuántos requests entran por período (``'10/min'`` = 10 por minuto).
+  Cada request se estima como los de la ventana actual más los de la
+  anterior ponderados por la parte que todavía cae dentro del último
+  período, así que en el borde entre dos ventanas no entra el doble. El
+  contador se crea con ``cache.add`` y se incrementa con ``cache.incr``,
+  atómicos en Redis, Memcached y locmem: los requests simultáneos no leen
+  el mismo valor. Los rechazados se descuentan y no alargan la espera.
+- Tope de requests pesados simultáneos por identidad
+  (``LIMITE_CONCURRENTES_POR_USUARIO``), para que un cliente que reintenta en
+  bucle no ocupe todos los workers.
+
+Ambos responden ``429`` con ``Retry-After``. ``LimiteThrottle`` integra los
+contadores con DRF (``throttle_scope`` en la vista) y ``limitar`` los aplica a
+vistas de función. Con una cache local (``LocMemCache``) los límites son por
+proceso; con Redis/Memcached se comparten entre workers.
+
+Detrás de un proxy (Koyeb, Railway) ``REMOTE_ADDR`` es el del proxy: con
+``PROXIES_CONFIABLES`` la IP del cliente sale de ``X-Forwarded-For``.
+"""
+import math
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+UNIDADES = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+# Margen del contador de concurrencia: si un worker muere sin liberar su
+# turno, el contador se descarta solo pasado este tiempo
+TTL_CONCURRENCIA = 300
+
+
+class LimiteExcedido(Throttled):
+    """429 con ``Retry-After``; DRF lo renderiza solo y ``limitar`` lo traduce."""
+
+
+def parsear_tasa(tasa):
+    """``'10/min'`` -> ``(10, 60)``: requests por ventana y duración de la ventana en segundos."""
+    cantidad, periodo = tasa.split('/')
+    return int(cantidad), UNIDADES[periodo.strip().lower()]
+
+
+def ip_cliente(request):
+    """
+    IP del cliente. Con ``PROXIES_CONFIABLES = n`` es la n-ésima entrada de
+    ``X-Forwarded-For`` contando desde el final (la que agregó el primer
+    proxy propio); las anteriores las escribe el cliente y no se usan.
+    """
+    proxies = settings.PROXIES_CONFIABLES
+    if proxies:
+        saltos = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+        if len(saltos) >= proxies:
+            return saltos[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def identidad(request):
+    """Usuario autenticado o, si no hay, la IP del cliente."""
+    usuario = getattr(request, 'user', None)
+    if usuario is not None and usuario.is_authenticated:
+        return f'u{usuario.pk}'
+    return 'ip' + ip_cliente(request)
+
+
+def _espera(cantidad, periodo, transcurrido, anterior, actual):
+    """Segundos hasta que la estimación deje lugar para un request más."""
+    if actual >= cantidad:
+        # Recién entra en la ventana siguiente, cuando la actual ya pesa menos
+        return periodo - transcurrido + periodo * (1 - (cantidad - 1) / actual)
+    return periodo * (1 - (cantidad - actual - 1) / anterior) - transcurrido
+
+
+def consumir(clase, clave, ahora=None):
+    """
+    Cuenta un request de ``clave`` para la clase ``clase``.
+
+    Devuelve ``0`` si se permite el request o los segundos que faltan para
+    que entre uno más. Las clases sin tasa configurada no se limitan.
+    """
+    tasa = settings.LIMITES_TASA.get(clase)
+    if not tasa:
+        return 0
+    cantidad, periodo = parsear_tasa(tasa)
+    ahora = time.time() if ahora is None else ahora
+    ventana = int(ahora // periodo)
+    transcurrido = ahora - ventana * periodo
+    llave = f'limite:{clase}:{clave}:{ventana}'
+
+    # Cada contador se sigue leyendo como "anterior" durante la ventana siguiente
+    cache.add(llave, 0, timeout=2 * periodo + 1)
+    try:
+        actual = cache.incr(llave)
+    except ValueError:
+        # La entrada venció entre add() e incr()
+        cache.set(llave, 1, timeout=2 * periodo + 1)
+        actual = 1
+    anterior = cache.get(f'limite:{clase}:{clave}:{ventana - 1}', 0)
+    if anterior * (1 - transcurrido / periodo) + actual <= cantidad:
+        return 0
+
+    try:
+        cache.decr(llave)
+    except ValueError:
+        pass
+    return _espera(cantidad, periodo, transcurrido, anterior, actual - 1)
+
+
+def verificar_tasa(request, clase):
+    espera = consumir(clase, identidad(request))
+    if espera:
+        raise LimiteExcedido(wait=espera)
+
+
+@contextmanager
+def turno_pesado(request):
+    """Ocupa uno de los turnos concurrentes de la identidad del request."""
+    maximo = settings.LIMITE_CONCURRENTES_POR_USUARIO
+    if not maximo:
+        yield
+        return
+    llave = f'concurrentes:{identidad(request)}'
+    cache.add(llave, 0, timeout=TTL_CONCURRENCIA)
+    try:
+        en_curso = cache.incr(llave)
+    except ValueError:
+        # La entrada venció entre add() e incr()
+        cache.set(llave, 1, timeout=TTL_CONCURRENCIA)
+        en_curso = 1
+    try:
+        if en_curso > maximo:
+            raise LimiteExcedido(wait=1, detail='Hay demasiadas operaciones pesadas en curso.')
+        yield
+    finally:
+        try:
+            cache.decr(llave)
+        except ValueError:
+            pass
+
+
+def respuesta_limite(excepcion):
+    respuesta = HttpResponse(str(excepcion.detail), status=excepcion.status_code, content_type='text/plain; charset=utf-8')
+    respuesta['Retry-After'] = str(math.ceil(excepcion.wait or 1))
+    return respuesta
+
+
+def limitar(clase, pesado=False):
+    """
+    Decorador para vistas de función: límite de tasa ``clase`` y, si ``pesado``,
+    tope de concurrencia por usuario. Acepta vistas async; la cache y el
+    usuario se consultan fuera del event loop.
+    """
+    def decorador(vista):
+        if iscoroutinefunction(vista):
+            return _limitar_async(vista, clase, pesado)
+
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            try:
+                verificar_tasa(request, clase)
+                if not pesado:
+                    return vista(request, *args, **kwargs)
+                with turno_pesado(request):
+                    return vista(request, *args, **kwargs)
+            except LimiteExcedido as excepcion:
+                return respuesta_limite(excepcion)
+        return envoltura
+    return decorador
+
+
+def _limitar_async(vista, clase, pesado):
+    @wraps(vista)
+    async def envoltura(request, *args, **kwargs):
+        try:
+            await sync_to_async(verificar_tasa)(request, clase)
+            if not pesado:
+                return await vista(request, *args, **kwargs)
+            turno = turno_pesado(request)
+            await sync_to_async(turno.__enter__)()
+            try:
+                return await vista(request, *args, **kwargs)
+            finally:
+                await sync_to_async(turno.__exit__)(None, None, None)
+        except LimiteExcedido as excepcion:
+            return respuesta_limite(excepcion)
+    return envoltura
+
+
+class LimiteThrottle(BaseThrottle):
+    """Throttle de DRF sobre los mismos contadores; la clase sale de ``view.throttle_scope``."""
+
+    def allow_request(self, request, view):
+        clase = getattr(view, 'throttle_scope', None)
+        self.espera = consumir(clase, identidad(request)) if clase else 0
+        return not self.espera
+
+    def wait(self):
+        return self.espera
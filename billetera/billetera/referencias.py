@@ -0,0 +1,213 @@
+"""
+Registro en memoria de las tablas de referencia (monedas, categorías, tipos
+de cuenta y última cotización de cada moneda).
+
+Son tablas chicas que casi nunca cambian pero que se consultan en cada render
+de formulario (opciones de los ``<select>``, moneda por defecto) y en cada
+escritura que necesita una categoría fija ("Transferencia Saliente",
+"Deudas"...). ``TablaReferencia`` las carga una vez por proceso y las sirve
+desde memoria.
+
+Invalidación:
+
+- ``post_save``/``post_delete`` descartan la copia del proceso y vuelven a
+  descartarla al confirmar la transacción.
+- Un hilo con cambios sin confirmar en estas tablas no guarda lo que lee
+  (podría revertirse); la marca se limpia en la primera lectura fuera de un
+  bloque atómico.
+- ``REFERENCIAS_TTL`` acota cuánto tarda otro proceso en ver un cambio.
+
+Las instancias se comparten entre requests: no deben modificarse.
+"""
+import threading
+import time
+
+from django import forms
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.db.models.signals import post_delete, post_save
+from django.forms.models import ModelChoiceIterator
+
+_pendientes = threading.local()
+
+
+class TablaReferencia:
+    def __init__(self, etiqueta_modelo, clave):
+        self.etiqueta_modelo = etiqueta_modelo
+        self.clave = clave
+        self._lock = threading.Lock()
+        self._datos = None
+        self._cargado_en = 0.0
+        for senal, nombre in ((post_save, 'save'), (post_delete, 'delete')):
+            senal.connect(
+                self._al_cambiar, sender=etiqueta_modelo, weak=False,
+                dispatch_uid=f'referencias-{nombre}-{etiqueta_modelo}',
+            )
+
+    @property
+    def modelo(self):
+        return apps.get_model(self.etiqueta_modelo)
+
+    def _al_cambiar(self, **kwargs):
+        self.invalidar()
+        if transaction.get_connection().in_atomic_block:
+            _marcar_pendiente(self)
+            transaction.on_commit(self.invalidar)
+
+    def invalidar(self):
+        with self._lock:
+            self._datos = None
+
+    def _cargar(self):
+        with self._lock:
+            datos = self._datos
+            if datos is not None and time.monotonic() - self._cargado_en < settings.REFERENCIAS_TTL:
+                return datos
+
+        filas = list(self.consultar(self.modelo))
+        por_clave = {}
+        for fila in sorted(filas, key=lambda f: f.pk):
+            # Si hay nombres repetidos gana el más antiguo, como get_or_create
+            por_clave.setdefault(getattr(fila, self.clave), fila)
+        datos = (filas, {fila.pk: fila for fila in filas}, por_clave)
+
+        if not _hay_cambios_pendientes(self):
+            with self._lock:
+                self._datos, self._cargado_en = datos, time.monotonic()
+        return datos
+
+    def consultar(self, modelo):
+        """Queryset con las filas que se guardan en memoria."""
+        return modelo._default_manager.order_by(*(modelo._meta.ordering or ['pk']))
+
+    def todos(self):
+        """Filas en el orden del modelo (o por ``pk``)."""
+        return self._cargar()[0]
+
+    def obtener(self, pk):
+        """Fila con ese ``pk`` o ``None``."""
+        try:
+            return self._cargar()[1].get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+    def por_clave(self, valor):
+        """Fila cuyo campo clave (``codigo``/``nombre``) es ``valor``, o ``None``."""
+        return self._cargar()[2].get(valor)
+
+    def obtener_o_crear(self, valor, defaults=None):
+        """Como ``get_or_create`` sobre el campo clave, sin consultar si ya existe."""
+        fila = self.por_clave(valor)
+        if fila is None:
+            fila, _ = self.modelo._default_manager.get_or_create(**{self.clave: valor}, defaults=defaults)
+        return fila
+
+
+class UltimosTiposCambio(TablaReferencia):
+    """Sólo la cotización más reciente de cada moneda, por ``moneda_id``."""
+
+    def consultar(self, modelo):
+        ultima = modelo._default_manager.filter(moneda=OuterRef('moneda')).order_by('-fecha').values('pk')[:1]
+        return modelo._default_manager.select_related('moneda').filter(pk=Subquery(ultima)).order_by('moneda_id')
+
+
+def _marcar_pendiente(tabla):
+    if not hasattr(_pendientes, 'tablas'):
+        _pendientes.tablas = set()
+    _pendientes.tablas.add(tabla)
+
+
+def _hay_cambios_pendientes(tabla):
+    tablas = getattr(_pendientes, 'tablas', None)
+    if not tablas or tabla not in tablas:
+        return False
+    if transaction.get_connection().in_atomic_block:
+        return True
+    # La transacción terminó (confirmada o revertida): ya se puede guardar
+    tablas.discard(tabla)
+    return False
+
+
+MONEDAS = TablaReferencia('gastos.Moneda', 'codigo')
+CATEGORIAS = TablaReferencia('gastos.Categoria', 'nombre')
+CATEGORIAS_INGRESO = TablaReferencia('ingresos.CategoriaIngreso', 'nombre')
+TIPOS_CUENTA = TablaReferencia('cuentas.TipoCuenta', 'nombre')
+TIPOS_CAMBIO = UltimosTiposCambio('gastos.TipoCambio', 'moneda_id')
+
+TABLAS = {
+    tabla.etiqueta_modelo.lower(): tabla
+    for tabla in (MONEDAS, CATEGORIAS, CATEGORIAS_INGRESO, TIPOS_CUENTA, TIPOS_CAMBIO)
+}
+
+
+def tabla_de(modelo):
+    return TABLAS[modelo._meta.label_lower]
+
+
+def reiniciar():
+    """Descarta todas las copias y marcas pendientes del hilo (para tests)."""
+    for tabla in TABLAS.values():
+        tabla.invalidar()
+    _pendientes.tablas = set()
+
+
+def moneda_por_defecto():
+    """Moneda con la que se precargan los formularios (ARS)."""
+    return MONEDAS.por_clave('ARS')
+
+
+def moneda_base():
+    """Moneda en la que se expresan los tipos de cambio (``settings.MONEDA_BASE``)."""
+    return MONEDAS.por_clave(settings.MONEDA_BASE)
+
+
+class ReferenciaChoiceIterator(ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for fila in self.field.tabla.todos():
+            yield self.choice(fila)
+
+    def __len__(self):
+        return len(self.field.tabla.todos()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.tabla.todos())
+
+
+class ReferenciaChoiceField(forms.ModelChoiceField):
+    """``ModelChoiceField`` que arma opciones y valida desde el registro, sin consultas."""
+    iterator = ReferenciaChoiceIterator
+
+    @property
+    def tabla(self):
+        return tabla_de(self.queryset.model)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, self.queryset.model):
+            value = value.pk
+        fila = self.tabla.obtener(value)
+        if fila is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value},
+            )
+        return fila
+
+
+class ReferenciasFormMixin:
+    """
+    ModelForm con campos ``ReferenciaChoiceField``: como ya se validaron contra
+    el registro, se omite el ``SELECT`` que repetiría ``ForeignKey.validate``.
+    """
+
+    def _get_validation_exclusions(self):
+        exclusiones = super()._get_validation_exclusions()
+        exclusiones.update(
+            nombre for nombre, campo in self.fields.items() if isinstance(campo, ReferenciaChoiceField)
+        )
+        return exclusiones
@@ -0,0 +1,42 @@
+"""
+Renderer JSON rápido para la API basado en ``orjson``.
+
+Es opcional: se activa con ``API_JSON_RAPIDO=true`` y, si ``orjson`` no está
+instalado, delega en el ``JSONRenderer`` de DRF. La salida es equivalente a la
+de DRF: decimales como texto (``COERCE_DECIMAL_TO_STRING``) y fechas ISO 8601
+con ``Z`` para UTC.
+"""
+from decimal import Decimal
+
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    return _encoder.default(obj)
+
+
+class JSONRapidoRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        opciones = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            opciones |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=opciones)
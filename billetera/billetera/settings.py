@@ -1,6 +1,7 @@
 from pathlib import Path
 import os
-import dj_database_url
+from billetera.basedatos import configuracion as configuracion_basedatos, configuracion_sqlite, pragmas_sqlite
+from billetera.configuracion_cache import configuracion as configuracion_cache
 from dotenv import load_dotenv
 
 # Cargar variables de entorno desde .env en desarrollo
@@ -63,6 +64,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'django.contrib.humanize',
     'rest_framework',
+    'django_filters',
     'whitenoise.runserver_nostatic',  # WhiteNoise para servir archivos estáticos en producción
     'storages',  # django-storages for Cloudflare R2
     'gastos.apps.GastosConfig',
@@ -70,6 +72,8 @@ INSTALLED_APPS = [
     'ingresos',
     'cuentas',
     'deudas',
+    'sincronizacion',
+    'recurrencias',
 ]
 
 # Note: we reuse the existing `usuarios` app for auth/social functionality.
@@ -98,6 +102,8 @@ MIDDLEWARE = [
     *((['corsheaders.middleware.CorsMiddleware'] if os.getenv('ENABLE_CORS', 'False').lower() in ['true', '1', 'yes'] else [])),
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Middleware de WhiteNoise para archivos estáticos
+    # Después de WhiteNoise: los estáticos no se miden
+    'billetera.instrumentacion.MedicionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -127,10 +133,102 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': ('rest_framework.permissions.IsAuthenticated',),
 }
 
+# Renderer JSON basado en orjson (opt-in); sin orjson instalado usa el de DRF
+if os.getenv('API_JSON_RAPIDO', 'False').lower() in ['true', '1', 'yes']:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = (
+        'billetera.renderers.JSONRapidoRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    )
+
+# Máximo de ítems aceptados por /gastos/api/bulk/ en una sola petición
+GASTOS_LOTE_MAXIMO = int(os.getenv('GASTOS_LOTE_MAXIMO', 500))
+
+# /api/sync/ sólo entrega cambios registrados hace más de estos segundos: los
+# IDs se asignan al insertar y no al confirmar, así que un cambio de una
+# transacción todavía abierta podría quedar detrás del token. Tiene que superar
+# la transacción de escritura más larga (ver DB_STATEMENT_TIMEOUT_MS).
+SINCRONIZACION_MARGEN_SEGUNDOS = int(os.getenv('SINCRONIZACION_MARGEN_SEGUNDOS', 10))
+
+# Requests por ventana y por usuario (o IP) para endpoints costosos (billetera/limites.py).
+# Formato "cantidad/periodo" con periodo s, min, hour o day; vacío desactiva el límite.
+LIMITES_TASA = {
+    'pdf': os.getenv('LIMITE_TASA_PDF', '10/min'),
+    'backup': os.getenv('LIMITE_TASA_BACKUP', '6/hour'),
+    'webhook': os.getenv('LIMITE_TASA_WEBHOOK', '120/min'),
+    'bulk': os.getenv('LIMITE_TASA_BULK', '30/min'),
+}
+# Requests pesados (PDF, backup, bulk) simultáneos por usuario; 0 desactiva el tope
+LIMITE_CONCURRENTES_POR_USUARIO = int(os.getenv('LIMITE_CONCURRENTES_POR_USUARIO', 2))
+# Proxies propios delante de la aplicación (Koyeb/Railway ponen uno): la IP del
+# cliente para los límites es la entrada de X-Forwarded-For que agregó el primero.
+# 0 usa REMOTE_ADDR.
+PROXIES_CONFIABLES = int(os.getenv('PROXIES_CONFIABLES', 1 if IS_PRODUCTION else 0))
+
+# Hilos por proceso para las llamadas bloqueantes a servicios externos desde
+# vistas async (Mercado Pago, R2); ver billetera/asincronia.py
+HILOS_IO_EXTERNO = int(os.getenv('HILOS_IO_EXTERNO', 32))
+
+# Cache compartida (ver billetera/configuracion_cache.py): locmem:// es por worker;
+# con varios workers o instancias conviene file://, db:// o redis:// para compartirla
+CACHES = {
+    'default': configuracion_cache(
+        os.getenv('CACHE_URL', 'locmem://'),
+        timeout=int(os.getenv('CACHE_TIMEOUT', 300)),
+        prefijo=os.getenv('CACHE_KEY_PREFIX', 'billetera'),
+    ),
+}
+
+# Medición por request (billetera/instrumentacion.py): cabecera Server-Timing y
+# una línea JSON por request en el logger billetera.rendimiento. Los requests
+# más lentos que el umbral se registran como WARNING con sus consultas más costosas.
+# La cabecera expone tiempos y cantidad de consultas a cualquier cliente: por
+# defecto sólo con DEBUG
+MEDICION_SERVER_TIMING = os.getenv('MEDICION_SERVER_TIMING', str(DEBUG)).lower() in ['true', '1', 'yes']
+MEDICION_UMBRAL_LENTO_MS = int(os.getenv('MEDICION_UMBRAL_LENTO_MS', 500))
+MEDICION_TOP_SQL = int(os.getenv('MEDICION_TOP_SQL', 5))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'mensaje': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'rendimiento': {'class': 'logging.StreamHandler', 'formatter': 'mensaje'},
+    },
+    'loggers': {
+        'billetera.rendimiento': {
+            'handlers': ['rendimiento'],
+            # WARNING registra sólo los requests lentos; INFO, todos
+            'level': os.getenv('MEDICION_LOG_NIVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+# Segundos que se conserva el resumen del dashboard (la clave ya incluye la versión del libro)
+INICIO_CACHE_TTL = int(os.getenv('INICIO_CACHE_TTL', 300))
+
+# Segundos que un proceso conserva las tablas de referencia (monedas, categorías,
+# tipos de cuenta) sin recargarlas; los cambios locales invalidan al instante
+REFERENCIAS_TTL = int(os.getenv('REFERENCIAS_TTL', 300))
+
+# Moneda en la que se cargan los tipos de cambio y se consolida el patrimonio
+MONEDA_BASE = os.getenv('MONEDA_BASE', 'ARS')
+
+# Segundos que se conserva cada agregación de /api/stats/ (la clave ya incluye la versión del libro)
+ESTADISTICAS_CACHE_TTL = int(os.getenv('ESTADISTICAS_CACHE_TTL', 3600))
+
 DJ_REST_AUTH = {
     'USE_JWT': True,
+    # Los tokens del login social también llevan los claims de usuario
+    'JWT_TOKEN_CLAIMS_SERIALIZER': 'usuarios.jwt_serializers.WalletTokenObtainPairSerializer',
 }
 
+# Caches en memoria de usuarios.authentication (segundos)
+JWT_CACHE_USUARIOS_TTL = int(os.getenv('JWT_CACHE_USUARIOS_TTL', 60))
+JWT_CACHE_TOKENS_TTL = int(os.getenv('JWT_CACHE_TOKENS_TTL', 30))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.getenv('ACCESS_TOKEN_MINUTES', 30))),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=int(os.getenv('REFRESH_TOKEN_DAYS', 7))),
@@ -187,7 +285,8 @@ ROOT_URLCONF = 'billetera.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates que suma el tiempo de render a la medición del request
+        'BACKEND': 'billetera.instrumentacion.DjangoTemplatesMedidos',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],  # Agrega la ruta a la carpeta templates
         'APP_DIRS': True,
         'OPTIONS': {
@@ -208,20 +307,42 @@ AUTHENTICATION_BACKENDS = [
 ]
 
 WSGI_APPLICATION = 'billetera.wsgi.application'
+ASGI_APPLICATION = 'billetera.asgi.application'
 
 # Database Configuration
 if IS_PRODUCTION:
-    # Use a connection pool timeout to avoid opening/closing too many DB connections
+    # Conexiones persistentes verificadas antes de reusarse; pgbouncer, timeouts y
+    # pool se configuran por entorno (ver billetera/basedatos.py). Bajo ASGI las
+    # conexiones persistentes no se reusan: por defecto se cierran en cada request
     DATABASES = {
-        'default': dj_database_url.config(default=os.getenv('DATABASE_URL'), conn_max_age=600)
+        'default': configuracion_basedatos(
+            os.getenv('DATABASE_URL'),
+            conn_max_age=int(os.getenv('DB_CONN_MAX_AGE', 0 if os.getenv('GUNICORN_MODO') == 'asgi' else 600)),
+            health_checks=os.getenv('DB_HEALTH_CHECKS', '1') == '1',
+            pgbouncer=os.getenv('DB_PGBOUNCER', '0') == '1',
+            connect_timeout=int(os.getenv('DB_CONNECT_TIMEOUT', 10)),
+            statement_timeout=int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000)),
+            lock_timeout=int(os.getenv('DB_LOCK_TIMEOUT_MS', 10000)),
+            idle_in_transaction_timeout=int(os.getenv('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', 60000)),
+            pool_min=int(os.getenv('DB_POOL_MIN', 0)),
+            pool_max=int(os.getenv('DB_POOL_MAX', 0)),
+            pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        )
     }
 else:
+    # SQLite con WAL y pragmas de rendimiento (ver billetera/basedatos.py)
+    _pragmas_sqlite = pragmas_sqlite(
+        mmap_mb=int(os.getenv('SQLITE_MMAP_MB', 256)),
+        cache_mb=int(os.getenv('SQLITE_CACHE_MB', 64)),
+        busy_timeout=int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    )
+    _ruta_sqlite = os.getenv('SQLITE_PATH') or str(BASE_DIR / "db.sqlite3")
     DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / "db.sqlite3",
-        }
+        'default': configuracion_sqlite(_ruta_sqlite, pragmas=_pragmas_sqlite),
     }
+    # Alias de sólo lectura sobre el mismo archivo para los reportes
+    if os.getenv('SQLITE_ALIAS_LECTURA', '0') == '1':
+        DATABASES['lectura'] = configuracion_sqlite(_ruta_sqlite, solo_lectura=True, pragmas=_pragmas_sqlite)
 
 # Validadores de contraseña
 AUTH_PASSWORD_VALIDATORS = [
@@ -24,8 +24,10 @@ from django.contrib.auth import views as auth_views
 from usuarios import views as usuarios_views
 from django.urls import include, path as dj_path
 from usuarios.views import ProfileMe
+from usuarios.api_views import EstadisticasView, PatrimonioView
 from usuarios.social import GoogleLogin
 from usuarios.jwt_views import WalletTokenObtainPairView
+from sincronizacion.views import SincronizacionView
 from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView
 
 urlpatterns = [
@@ -55,8 +57,12 @@ urlpatterns = [
     path('ingresos/', include('ingresos.urls')),
     path('cuentas/', include('cuentas.urls')),
     path('deudas/', include('deudas.urls')),
+    path('recurrencias/', include('recurrencias.urls')),
     path('', usuarios_views.inicio, name='inicio_usuarios'),  # Esta es la nueva línea para la página de inicio
     path('api/me/', ProfileMe.as_view(), name='me'),
+    path('api/sync/', SincronizacionView.as_view(), name='sync'),
+    path('api/stats/<str:recurso>/', EstadisticasView.as_view(), name='estadisticas'),
+    path('api/patrimonio/', PatrimonioView.as_view(), name='patrimonio'),
     # JWT token endpoints (SimpleJWT custom view)
     dj_path('api/token/', WalletTokenObtainPairView.as_view(), name='token_obtain_pair'),
     dj_path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+"""
+Pruebas de carga locales de Gunicorn.
+
+Escenario ``rutas`` (por defecto): Gunicorn con sus valores por defecto (un
+worker ``sync``) contra ``gunicorn.conf.py``. Manda ``--solicitudes``
+requests con ``--concurrencia`` clientes a ``--ruta`` y muestra requests por
+segundo y latencias. Con ``--lenta`` un cliente extra pide esa ruta sin parar
+durante la medición, para ver cuánto frena al resto un request pesado.
+
+Escenario ``webhook``: ``gunicorn.conf.py`` en modo ``wsgi`` contra modo
+``asgi`` con notificaciones firmadas de Mercado Pago. La API de pagos es un
+doble local que tarda ``--demora`` segundos en responder
+(``MERCADOPAGO_API_URL``).
+
+Uso (desde este directorio, con la base migrada):
+
+    python carga_gunicorn.py --usuario demo --password demo-123
+    python carga_gunicorn.py --ruta /api/stats/gastos/ --lenta /api/patrimonio/ --usuario demo --password demo-123
+    python carga_gunicorn.py --escenario webhook --demora 0.3
+
+Sin usuario se piden rutas anónimas (``/usuarios/login/``).
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+SECRETO_WEBHOOK = 'carga-local'
+
+
+def _pedir(url, token=None, datos=None, espera=30, cabeceras=None):
+    cabeceras = {'Accept': 'application/json', **(cabeceras or {})}
+    if token:
+        cabeceras['Authorization'] = f'Bearer {token}'
+    if datos is not None:
+        cabeceras['Content-Type'] = 'application/json'
+        datos = json.dumps(datos).encode()
+    solicitud = urllib.request.Request(url, data=datos, headers=cabeceras)
+    with urllib.request.urlopen(solicitud, timeout=espera) as respuesta:
+        return respuesta.status, respuesta.read()
+
+
+def _esperar(base, segundos=30):
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        try:
+            _pedir(f'{base}/usuarios/login/', espera=2)
+            return
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.3)
+    raise RuntimeError(f'Gunicorn no respondió en {base}')
+
+
+def _token(base, usuario, password):
+    _, cuerpo = _pedir(f'{base}/api/token/', datos={'username': usuario, 'password': password})
+    return json.loads(cuerpo)['access']
+
+
+def _medir(pedir, solicitudes, concurrencia, fondo=None):
+    """Corre ``pedir(numero)`` ``solicitudes`` veces; ``fondo()`` se repite en paralelo mientras tanto."""
+    latencias, errores = [], 0
+    detener = threading.Event()
+
+    def uno(numero):
+        inicio = time.perf_counter()
+        try:
+            pedir(numero)
+            return time.perf_counter() - inicio
+        except (urllib.error.URLError, OSError):
+            return None
+
+    def repetir():
+        while not detener.is_set():
+            try:
+                fondo()
+            except (urllib.error.URLError, OSError):
+                time.sleep(0.1)
+
+    if fondo:
+        threading.Thread(target=repetir, daemon=True).start()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+        for resultado in pool.map(uno, range(solicitudes)):
+            if resultado is None:
+                errores += 1
+            else:
+                latencias.append(resultado)
+    total = time.perf_counter() - inicio
+    detener.set()
+
+    latencias.sort()
+
+    def percentil(p):
+        return latencias[min(len(latencias) - 1, int(len(latencias) * p))] * 1000 if latencias else 0
+
+    return {
+        'rps': len(latencias) / total,
+        'p50': percentil(0.50),
+        'p95': percentil(0.95),
+        'p99': percentil(0.99),
+        'media': statistics.fmean(latencias) * 1000 if latencias else 0,
+        'errores': errores,
+    }
+
+
+def _levantar(argumentos, puerto, entorno=None):
+    entorno = dict(os.environ, PORT=str(puerto), GUNICORN_ACCESSLOG='', **(entorno or {}))
+    return subprocess.Popen(
+        ['gunicorn', '--bind', f'127.0.0.1:{puerto}', *argumentos],
+        cwd=DIRECTORIO, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def _api_pagos(puerto, demora):
+    """Doble de la API de Mercado Pago: ``GET /v1/payments/<id>`` responde tras ``demora`` segundos."""
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(demora)
+            cuerpo = json.dumps({'id': self.path.rsplit('/', 1)[-1], 'status': 'pending'}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', puerto), Manejador)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def _notificar(base, numero):
+    pago, pedido, ts = str(900000 + numero), f'carga-{numero}', str(int(time.time()))
+    manifiesto = f'id:{pago};request-id:{pedido};ts:{ts};'
+    firma = hmac.new(SECRETO_WEBHOOK.encode(), manifiesto.encode(), hashlib.sha256).hexdigest()
+    _pedir(
+        f'{base}/usuarios/webhook/mercadopago/?topic=payment&data.id={pago}',
+        datos={'type': 'payment', 'data': {'id': pago}},
+        cabeceras={'X-Signature': f'ts={ts},v1={firma}', 'X-Request-Id': pedido},
+    )
+
+
+def _correr(nombre, argumentos, entorno, opciones, medir):
+    proceso = _levantar(argumentos, opciones.puerto, entorno)
+    base = f'http://127.0.0.1:{opciones.puerto}'
+    try:
+        _esperar(base)
+        return nombre, medir(base)
+    finally:
+        proceso.terminate()
+        proceso.wait(timeout=30)
+
+
+def escenario_rutas(opciones):
+    rutas = opciones.rutas or (['/api/me/', '/api/patrimonio/'] if opciones.usuario else ['/usuarios/login/'])
+
+    def medir(base):
+        token = _token(base, opciones.usuario, opciones.password) if opciones.usuario else None
+        pedir = lambda numero: _pedir(base + rutas[numero % len(rutas)], token)
+        fondo = (lambda: _pedir(base + opciones.lenta, token, espera=120)) if opciones.lenta else None
+        # Calentar: importaciones perezosas y registros en memoria de cada worker
+        _medir(pedir, opciones.concurrencia * 2, opciones.concurrencia)
+        return _medir(pedir, opciones.solicitudes, opciones.concurrencia, fondo)
+
+    # Un archivo vacío evita que Gunicorn cargue gunicorn.conf.py solo
+    with tempfile.NamedTemporaryFile('w', suffix='.py') as vacio:
+        resultados = [
+            _correr('por defecto', ['--config', vacio.name, 'billetera.wsgi'], None, opciones, medir),
+            _correr('gunicorn.conf.py', [], None, opciones, medir),
+        ]
+    descripcion = f"rutas: {', '.join(rutas)}"
+    if opciones.lenta:
+        descripcion += f', pesada en paralelo: {opciones.lenta}'
+    return descripcion, resultados
+
+
+def escenario_webhook(opciones):
+    api = _api_pagos(opciones.puerto + 1, opciones.demora)
+    entorno = {
+        'MERCADOPAGO_API_URL': f'http://127.0.0.1:{opciones.puerto + 1}',
+        'MERCADOPAGO_ACCESS_TOKEN': 'carga-local',
+        'MERCADOPAGO_WEBHOOK_SECRET': SECRETO_WEBHOOK,
+        'LIMITE_TASA_WEBHOOK': '',
+    }
+
+    def medir(base):
+        pedir = lambda numero: _notificar(base, numero)
+        _medir(pedir, opciones.concurrencia, opciones.concurrencia)
+        return _medir(pedir, opciones.solicitudes, opciones.concurrencia)
+
+    try:
+        resultados = [
+            _correr('wsgi (gthread)', [], {**entorno, 'GUNICORN_MODO': 'wsgi'}, opciones, medir),
+            _correr('asgi (uvicorn)', [], {**entorno, 'GUNICORN_MODO': 'asgi'}, opciones, medir),
+        ]
+    finally:
+        api.shutdown()
+    return f'webhook de Mercado Pago, API de pagos con {opciones.demora * 1000:.0f} ms de demora', resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--escenario', choices=['rutas', 'webhook'], default='rutas')
+    parser.add_argument('--solicitudes', type=int, default=400)
+    parser.add_argument('--concurrencia', type=int, default=16)
+    parser.add_argument('--ruta', action='append', dest='rutas', help='Ruta a medir (repetible)')
+    parser.add_argument('--lenta', help='Ruta pesada que se pide en paralelo durante la medición')
+    parser.add_argument('--usuario')
+    parser.add_argument('--password')
+    parser.add_argument('--demora', type=float, default=0.3, help='Segundos que tarda la API de pagos simulada')
+    parser.add_argument('--puerto', type=int, default=8765)
+    opciones = parser.parse_args()
+
+    escenario = escenario_webhook if opciones.escenario == 'webhook' else escenario_rutas
+    descripcion, resultados = escenario(opciones)
+
+    print(f'{opciones.solicitudes} requests, {opciones.concurrencia} clientes, {descripcion}')
+    print(f"{'configuración':<18}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errores':>9}")
+    for nombre, r in resultados:
+        print(f"{nombre:<18}{r['rps']:>9.1f}{r['p50']:>9.1f}{r['p95']:>9.1f}{r['p99']:>9.1f}{r['errores']:>9}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
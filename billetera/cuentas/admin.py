@@ -1,3 +1,8 @@
 from django.contrib import admin
+from .models import ReglaCategoria
 
-# Register your models here.
+
+@admin.register(ReglaCategoria)
+class ReglaCategoriaAdmin(admin.ModelAdmin):
+    list_display = ('texto', 'usuario', 'categoria', 'categoria_ingreso')
+    search_fields = ('texto', 'usuario__username')
@@ -0,0 +1,55 @@
+from django.db.models import ProtectedError
+from rest_framework import mixins, status, viewsets
+from rest_framework.response import Response
+
+from billetera.api import PropietarioViewSetMixin
+from billetera.condicional import CondicionalViewSetMixin
+from .models import Cuenta, ReglaCategoria, TransferenciaCuenta
+from .serializers import CuentaSerializer, ReglaCategoriaSerializer, TransferenciaCuentaSerializer
+
+
+# API REST para cuentas, con el saldo calculado en la misma consulta
+class CuentaViewSet(CondicionalViewSetMixin, PropietarioViewSetMixin, viewsets.ModelViewSet):
+    queryset = Cuenta.objects.select_related('moneda', 'tipo').con_saldo()
+    serializer_class = CuentaSerializer
+    cursor_ordering = ('nombre', 'id')
+
+    def perform_create(self, serializer):
+        serializer.save(usuario=self.request.user)
+
+    def perform_update(self, serializer):
+        cuenta = serializer.save()
+        # El saldo anotado quedó desactualizado si cambió el saldo inicial
+        cuenta.saldo = None
+
+    def destroy(self, request, *args, **kwargs):
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except ProtectedError:
+            return Response(
+                {'detail': 'La cuenta tiene transferencias asociadas y no puede eliminarse.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+
+# Las transferencias generan un gasto y un ingreso: sólo se crean y consultan
+class TransferenciaCuentaViewSet(CondicionalViewSetMixin, PropietarioViewSetMixin,
+                                 mixins.CreateModelMixin,
+                                 mixins.RetrieveModelMixin,
+                                 mixins.ListModelMixin,
+                                 viewsets.GenericViewSet):
+    queryset = TransferenciaCuenta.objects.all()
+    serializer_class = TransferenciaCuentaSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(usuario=self.request.user)
+
+
+# Reglas de categorización para la importación de extractos
+class ReglaCategoriaViewSet(PropietarioViewSetMixin, viewsets.ModelViewSet):
+    queryset = ReglaCategoria.objects.all()
+    serializer_class = ReglaCategoriaSerializer
+    cursor_ordering = ('texto', 'id')
+
+    def perform_create(self, serializer):
+        serializer.save(usuario=self.request.user)
@@ -2,12 +2,14 @@ from decimal import Decimal, ROUND_HALF_UP
 
 from django import forms
 
+from billetera.referencias import ReferenciaChoiceField, ReferenciasFormMixin
 from .models import Cuenta
 
-class CuentaForm(forms.ModelForm):
+class CuentaForm(ReferenciasFormMixin, forms.ModelForm):
     class Meta:
         model = Cuenta
         fields = ['nombre', 'tipo', 'moneda', 'saldo_inicial']
+        field_classes = {'tipo': ReferenciaChoiceField, 'moneda': ReferenciaChoiceField}
         widgets = {
             'nombre': forms.TextInput(attrs={
                 'class': 'form-control form-control-lg',
@@ -132,3 +134,46 @@ class TransferenciaForm(forms.Form):
             cleaned['monto_destino'] = (monto_origen * tasa).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
         return cleaned
+
+
+class ImportarExtractoForm(forms.Form):
+    FORMATO_CHOICES = [
+        ('', 'Detectar por la extensión'),
+        ('csv', 'CSV'),
+        ('ofx', 'OFX / QFX'),
+    ]
+    SEPARADOR_CHOICES = [
+        ('', 'Detectar'),
+        (',', 'Coma (1.234,56)'),
+        ('.', 'Punto (1,234.56)'),
+    ]
+
+    cuenta = forms.ModelChoiceField(
+        queryset=Cuenta.objects.none(),
+        label='Cuenta',
+        widget=forms.Select(attrs={'class': 'form-select form-select-lg'})
+    )
+    archivo = forms.FileField(
+        label='Extracto',
+        help_text='CSV con columnas de fecha, descripción y monto (o débito/crédito), u OFX exportado del home banking.',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control form-control-lg', 'accept': '.csv,.ofx,.qfx,.txt'})
+    )
+    formato = forms.ChoiceField(
+        choices=FORMATO_CHOICES,
+        required=False,
+        label='Formato',
+        widget=forms.Select(attrs={'class': 'form-select form-select-lg'})
+    )
+    separador_decimal = forms.ChoiceField(
+        choices=SEPARADOR_CHOICES,
+        required=False,
+        label='Separador decimal',
+        help_text='Sin indicarlo, un punto seguido de tres dígitos (1.000) se toma como separador de miles.',
+        widget=forms.Select(attrs={'class': 'form-select form-select-lg'})
+    )
+
+    def __init__(self, *args, **kwargs):
+        usuario = kwargs.pop('usuario', None)
+        super().__init__(*args, **kwargs)
+        if usuario:
+            self.fields['cuenta'].queryset = Cuenta.objects.filter(usuario=usuario).select_related('moneda')
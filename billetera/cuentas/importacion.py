@@ -0,0 +1,343 @@
+"""
+Importación de extractos bancarios (CSV u OFX) a una cuenta.
+
+El archivo se procesa como una cadena de generadores, fila por fila, sin
+cargarlo entero en memoria:
+
+``leer_csv``/``leer_ofx`` -> ``normalizar`` -> ``categorizar`` -> ``con_hash``
+
+y se inserta en lotes de ``TAMANO_LOTE`` con un ``bulk_create`` por tabla
+(los débitos son gastos y los créditos ingresos), cada lote en su transacción.
+
+Deduplicación: cada movimiento lleva en ``hash_importacion`` un SHA-256 de la
+cuenta y de su contenido (fecha, monto, descripción) o, en OFX, del
+identificador del banco (``FITID``). Los movimientos idénticos dentro de un
+mismo extracto (dos cafés iguales el mismo día) se distinguen por su número de
+aparición, así que reimportar un extracto que se superpone con uno anterior no
+duplica nada. Un ``FITID`` repetido dentro del mismo archivo se importa una
+sola vez y cuenta como duplicado. El par (cuenta, hash) tiene un índice único.
+
+Cada lote bloquea la fila de la cuenta (``select_for_update``) y recién
+entonces busca los hashes existentes: dos importaciones simultáneas de
+extractos superpuestos en la misma cuenta se esperan en lugar de chocar con
+el índice único.
+
+El archivo se decodifica como UTF-8 y, si no lo es, como Windows-1252 (el de
+los extractos de los bancos locales); los montos aceptan separadores de miles
+con punto o coma (ver ``parsear_monto``).
+
+Si una fila no se puede interpretar la importación se detiene con
+``ErrorExtracto``; los lotes anteriores quedan importados y volver a subir el
+archivo corregido no los duplica.
+"""
+import codecs
+import csv
+import hashlib
+import io
+import re
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from gastos.models import Gasto, normalizar_nombre
+from ingresos.models import Ingreso
+from sincronizacion.registro import registrar_cambios_por_recurso
+
+from .models import Cuenta, ReglaCategoria
+
+TAMANO_LOTE = 500
+
+Movimiento = namedtuple(
+    'Movimiento', 'fecha descripcion monto referencia categoria_id categoria_ingreso_id hash',
+    defaults=(None, None, None),
+)
+
+# Encabezados aceptados (normalizados) -> campo
+COLUMNAS = {
+    'fecha': 'fecha', 'date': 'fecha', 'fecha operacion': 'fecha', 'fecha de operacion': 'fecha',
+    'descripcion': 'descripcion', 'description': 'descripcion', 'concepto': 'descripcion',
+    'detalle': 'descripcion', 'referencia': 'descripcion', 'memo': 'descripcion',
+    'monto': 'monto', 'importe': 'monto', 'amount': 'monto',
+    'debito': 'debito', 'debe': 'debito', 'debit': 'debito',
+    'credito': 'credito', 'haber': 'credito', 'credit': 'credito',
+}
+
+FORMATOS_FECHA = ('%Y-%m-%d', '%d/%m/%Y', '%d/%m/%y', '%d-%m-%Y', '%Y%m%d')
+
+# Se prueban en orden; Windows-1252 es el de Excel y de los home banking locales
+ENCODINGS = ('utf-8-sig', 'cp1252')
+
+# 1.000 / 1.234.567 (o con comas): grupos de tres dígitos tras un primer grupo sin cero inicial
+_MILES = {separador: re.compile(rf'-?[1-9]\d{{0,2}}(\{separador}\d{{3}})+') for separador in '.,'}
+
+
+class ErrorExtracto(ValueError):
+    """El archivo no tiene el formato esperado."""
+
+
+# --- Lectura ---
+
+def detectar_encoding(archivo, tamano_bloque=64 * 1024):
+    """
+    Primer encoding de ``ENCODINGS`` que decodifica el archivo completo. Lo
+    recorre por bloques con un decodificador incremental y lo deja al
+    principio.
+    """
+    for encoding in ENCODINGS:
+        archivo.seek(0)
+        decodificador = codecs.getincrementaldecoder(encoding)()
+        try:
+            for bloque in iter(lambda: archivo.read(tamano_bloque), b''):
+                decodificador.decode(bloque)
+            decodificador.decode(b'', final=True)
+        except UnicodeDecodeError:
+            continue
+        archivo.seek(0)
+        return encoding
+    raise ErrorExtracto('El archivo no está en UTF-8 ni en Windows-1252.')
+
+
+def _texto(archivo, encoding):
+    return io.TextIOWrapper(archivo, encoding=encoding or detectar_encoding(archivo), newline='')
+
+
+def leer_csv(archivo, encoding=None):
+    """
+    Filas del CSV como dicts ``{campo: valor}`` con los campos de ``COLUMNAS``.
+    Sin ``encoding`` se usa ``detectar_encoding``.
+    """
+    texto = _texto(archivo, encoding)
+    muestra = texto.read(4096)
+    texto.seek(0)
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+    lector = csv.reader(texto, dialecto)
+    encabezado = next(lector, None)
+    if not encabezado:
+        raise ErrorExtracto('El CSV está vacío.')
+    campos = [COLUMNAS.get(normalizar_nombre(nombre)) for nombre in encabezado]
+    if 'fecha' not in campos or not ({'monto', 'debito', 'credito'} & set(campos)):
+        raise ErrorExtracto('El CSV debe tener columnas de fecha y de monto (o débito/crédito).')
+    for numero, fila in enumerate(lector, start=2):
+        if not any(valor.strip() for valor in fila):
+            continue
+        registro = {campo: valor.strip() for campo, valor in zip(campos, fila) if campo}
+        registro['linea'] = numero
+        yield registro
+
+
+_TAG_OFX = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+
+def leer_ofx(archivo, encoding=None):
+    """
+    Transacciones (``<STMTTRN>``) de un OFX, en SGML (v1) o XML (v2). Sin
+    ``encoding`` se usa ``detectar_encoding``.
+
+    Se recorre el archivo por tags con una expresión regular: alcanza para los
+    campos planos que se usan y no necesita armar el árbol completo.
+    """
+    actual = None
+    for linea in _texto(archivo, encoding):
+        for cierre, tag, valor in _TAG_OFX.findall(linea):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if cierre and actual is not None:
+                    yield actual
+                    actual = None
+                elif not cierre:
+                    actual = {}
+            elif actual is not None and not cierre and valor.strip():
+                actual[tag] = valor.strip()
+    if actual:
+        yield actual
+
+
+# --- Normalización ---
+
+def _separador_decimal(texto):
+    """
+    Separador decimal de ``texto`` cuando no se indicó uno: si aparecen los
+    dos es el último; un separador repetido, o un punto seguido de
+    exactamente tres dígitos (``1.000``), es de miles; una coma sola es
+    decimal.
+    """
+    if ',' in texto and '.' in texto:
+        return ',' if texto.rfind(',') > texto.rfind('.') else '.'
+    for separador in '.,':
+        if separador in texto:
+            if texto.count(separador) > 1 or (separador == '.' and _MILES['.'].fullmatch(texto)):
+                if not _MILES[separador].fullmatch(texto):
+                    raise ErrorExtracto(f'Monto inválido: {texto}.')
+                return ',' if separador == '.' else '.'
+            return separador
+    return '.'
+
+
+def parsear_monto(valor, separador_decimal=None):
+    """
+    ``'1.234,56'``, ``'1.000'``, ``'-1,234.56'``, ``'(12.50)'`` o ``'$ 10'`` ->
+    ``Decimal``. ``separador_decimal`` (``','`` o ``'.'``) evita deducirlo
+    del texto: con él ``'1.050'`` en un archivo con punto decimal es 1,05.
+    """
+    texto = (valor or '').strip().replace('$', '').replace(' ', '')
+    if not texto:
+        return None
+    negativo = texto.startswith('(') and texto.endswith(')')
+    texto = texto.strip('()')
+    separador = separador_decimal or _separador_decimal(texto)
+    texto = texto.replace(',' if separador == '.' else '.', '').replace(separador, '.')
+    try:
+        monto = Decimal(texto)
+    except InvalidOperation:
+        raise ErrorExtracto(f'Monto inválido: {valor}.')
+    return -monto if negativo else monto
+
+
+def parsear_fecha(valor):
+    texto = (valor or '').strip()
+    # OFX: 20260105120000[-3:ART]
+    if len(texto) >= 8 and texto[:8].isdigit():
+        texto = texto[:8]
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ErrorExtracto(f'Fecha inválida: {valor}.')
+
+
+def _desde_csv(registro, separador_decimal):
+    if 'monto' in registro and registro['monto']:
+        monto = parsear_monto(registro['monto'], separador_decimal)
+    else:
+        monto = (
+            (parsear_monto(registro.get('credito'), separador_decimal) or 0)
+            - (parsear_monto(registro.get('debito'), separador_decimal) or 0)
+        )
+    return registro['fecha'], registro.get('descripcion', ''), monto, ''
+
+
+def _desde_ofx(registro, separador_decimal):
+    # TRNAMT usa siempre punto decimal (especificación OFX), salvo que se indique otro
+    descripcion = registro.get('NAME') or registro.get('MEMO') or ''
+    monto = parsear_monto(registro.get('TRNAMT'), separador_decimal or '.')
+    return registro.get('DTPOSTED'), descripcion, monto, registro.get('FITID', '')
+
+
+def normalizar(registros, formato, separador_decimal=None):
+    """``Movimiento`` por fila con monto distinto de cero; los negativos son débitos."""
+    convertir = _desde_ofx if formato == 'ofx' else _desde_csv
+    for registro in registros:
+        try:
+            fecha, descripcion, monto, referencia = convertir(registro, separador_decimal)
+            if monto is None:
+                raise ErrorExtracto('Falta el monto.')
+            fecha = parsear_fecha(fecha)
+        except ErrorExtracto as exc:
+            linea = registro.get('linea')
+            raise ErrorExtracto(f'Línea {linea}: {exc}' if linea else str(exc))
+        if monto:
+            yield Movimiento(fecha, ' '.join(descripcion.split())[:255] or 'Movimiento importado', monto, referencia)
+
+
+# --- Categorías y deduplicación ---
+
+def categorizar(movimientos, reglas):
+    """Asigna la categoría de la primera regla cuyo texto aparece en la descripción."""
+    for movimiento in movimientos:
+        descripcion = normalizar_nombre(movimiento.descripcion)
+        regla = next((r for r in reglas if r.texto in descripcion), None)
+        if regla is not None:
+            movimiento = movimiento._replace(categoria_id=regla.categoria_id, categoria_ingreso_id=regla.categoria_ingreso_id)
+        yield movimiento
+
+
+def con_hash(movimientos, cuenta):
+    """Agrega ``hash``; los movimientos repetidos dentro del extracto llevan su número de aparición."""
+    apariciones = {}
+    for movimiento in movimientos:
+        if movimiento.referencia:
+            clave = f'{cuenta.pk}|fitid|{movimiento.referencia}'
+        else:
+            contenido = f'{cuenta.pk}|{movimiento.fecha.isoformat()}|{movimiento.monto:.2f}|{normalizar_nombre(movimiento.descripcion)}'
+            apariciones[contenido] = apariciones.get(contenido, 0) + 1
+            clave = f'{contenido}|{apariciones[contenido]}'
+        yield movimiento._replace(hash=hashlib.sha256(clave.encode()).hexdigest())
+
+
+# --- Inserción ---
+
+def _lotes(iterable, tamano):
+    iterable = iter(iterable)
+    while True:
+        lote = list(islice(iterable, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+def _existentes(cuenta, hashes):
+    existentes = set()
+    for modelo in (Gasto, Ingreso):
+        existentes.update(modelo.objects.filter(cuenta=cuenta, hash_importacion__in=hashes).values_list('hash_importacion', flat=True))
+    return existentes
+
+
+def _bloquear_cuenta(cuenta):
+    # Serializa los lotes de importaciones simultáneas en la misma cuenta
+    Cuenta.objects.select_for_update().filter(pk=cuenta.pk).exists()
+
+
+def _insertar_lote(cuenta, lote):
+    with transaction.atomic():
+        _bloquear_cuenta(cuenta)
+        existentes = _existentes(cuenta, [m.hash for m in lote])
+        gastos, ingresos = [], []
+        for m in lote:
+            if m.hash in existentes:
+                continue
+            # Un FITID repetido en el mismo extracto chocaría con el índice único
+            existentes.add(m.hash)
+            fecha = timezone.make_aware(datetime.combine(m.fecha, datetime.min.time()))
+            comunes = dict(usuario_id=cuenta.usuario_id, cuenta=cuenta, descripcion=m.descripcion, monto=abs(m.monto),
+                           moneda_id=cuenta.moneda_id, fecha=fecha, hash_importacion=m.hash)
+            if m.monto < 0:
+                gastos.append(Gasto(categoria_id=m.categoria_id, **comunes))
+            else:
+                ingresos.append(Ingreso(categoria_id=m.categoria_ingreso_id, **comunes))
+        Gasto.objects.bulk_create(gastos)
+        Ingreso.objects.bulk_create(ingresos)
+        registrar_cambios_por_recurso(cuenta.usuario_id, {
+            'gastos': [g.pk for g in gastos],
+            'ingresos': [i.pk for i in ingresos],
+        })
+    return len(gastos), len(ingresos)
+
+
+def importar_extracto(archivo, cuenta, formato=None, nombre='', tamano_lote=TAMANO_LOTE, separador_decimal=None):
+    """
+    Importa un extracto (objeto archivo binario, con ``seek``) en ``cuenta``.
+
+    ``formato`` es ``'csv'`` u ``'ofx'``; si no se indica se deduce de la
+    extensión de ``nombre``. ``separador_decimal`` se pasa a
+    ``parsear_monto``. Retorna ``{'gastos', 'ingresos', 'duplicados'}``.
+    """
+    formato = formato or ('ofx' if nombre.lower().endswith(('.ofx', '.qfx')) else 'csv')
+    registros = leer_ofx(archivo) if formato == 'ofx' else leer_csv(archivo)
+    reglas = sorted(ReglaCategoria.objects.filter(usuario_id=cuenta.usuario_id), key=lambda r: -len(r.texto))
+
+    movimientos = con_hash(categorizar(normalizar(registros, formato, separador_decimal), reglas), cuenta)
+    resultado = {'gastos': 0, 'ingresos': 0, 'duplicados': 0}
+    for lote in _lotes(movimientos, tamano_lote):
+        gastos, ingresos = _insertar_lote(cuenta, lote)
+        resultado['gastos'] += gastos
+        resultado['ingresos'] += ingresos
+        resultado['duplicados'] += len(lote) - gastos - ingresos
+    return resultado
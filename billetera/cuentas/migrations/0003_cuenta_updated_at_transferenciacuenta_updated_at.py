@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-19 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cuentas', '0002_transferenciacuenta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cuenta',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='transferenciacuenta',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
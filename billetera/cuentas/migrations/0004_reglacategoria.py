@@ -0,0 +1,36 @@
+# Generated by Django 4.2.9 on 2026-10-19 12:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ingresos', '0007_ingreso_hash_importacion'),
+        ('gastos', '0016_gasto_hash_importacion'),
+        ('cuentas', '0003_cuenta_updated_at_transferenciacuenta_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReglaCategoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('texto', models.CharField(max_length=100)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('categoria', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='gastos.categoria')),
+                ('categoria_ingreso', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='ingresos.categoriaingreso')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reglas_categoria', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['texto'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reglacategoria',
+            constraint=models.UniqueConstraint(fields=('usuario', 'texto'), name='regla_categoria_usuario_texto_uniq'),
+        ),
+    ]
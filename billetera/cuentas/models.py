@@ -2,7 +2,9 @@ from decimal import Decimal
 
 from django.contrib.auth.models import User
 from django.db import models
-from django.db.models.signals import post_migrate
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_migrate, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 
@@ -12,17 +14,53 @@ class TipoCuenta(models.Model):
     def __str__(self):
         return self.nombre
 
+def _total_por_cuenta(modelo):
+    """Subquery con la suma de montos de ``modelo`` para la cuenta exterior."""
+    total = (
+        modelo.objects.filter(cuenta=OuterRef('pk'))
+        .order_by()
+        .values('cuenta')
+        .annotate(total=Sum('monto'))
+        .values('total')
+    )
+    return Coalesce(Subquery(total), Value(Decimal('0.00')), output_field=DecimalField(max_digits=15, decimal_places=2))
+
+
+class CuentaQuerySet(models.QuerySet):
+    def con_saldo(self):
+        """Anota ``saldo`` (saldo inicial + ingresos - gastos) en la misma consulta."""
+        from gastos.models import Gasto
+        from ingresos.models import Ingreso
+
+        return self.annotate(
+            saldo=ExpressionWrapper(
+                F('saldo_inicial') + _total_por_cuenta(Ingreso) - _total_por_cuenta(Gasto),
+                output_field=DecimalField(max_digits=15, decimal_places=2),
+            )
+        )
+
+
 class Cuenta(models.Model):
     usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cuentas')
     nombre = models.CharField(max_length=100)
     tipo = models.ForeignKey(TipoCuenta, on_delete=models.SET_NULL, null=True)
     saldo_inicial = models.DecimalField(max_digits=15, decimal_places=2, default=0)
     moneda = models.ForeignKey('gastos.Moneda', on_delete=models.PROTECT)
-    
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = CuentaQuerySet.as_manager()
+
     def __str__(self):
         # Use a safe access to moneda.codigo in case it's not loaded yet or something
         return f"{self.nombre}"
 
+    def saldo_actual(self):
+        """Saldo de la cuenta; usa la anotación de ``con_saldo()`` si está disponible."""
+        saldo = getattr(self, 'saldo', None)
+        if saldo is None:
+            saldo = Cuenta.objects.con_saldo().values_list('saldo', flat=True).get(pk=self.pk)
+        return saldo
+
 
 class TransferenciaCuenta(models.Model):
     usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='transferencias_cuentas')
@@ -35,6 +73,7 @@ class TransferenciaCuenta(models.Model):
     fecha = models.DateTimeField(default=timezone.now)
     gasto = models.ForeignKey('gastos.Gasto', on_delete=models.SET_NULL, null=True, blank=True, related_name='transferencias_generadas')
     ingreso = models.ForeignKey('ingresos.Ingreso', on_delete=models.SET_NULL, null=True, blank=True, related_name='transferencias_generadas')
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-fecha']
@@ -42,6 +81,81 @@ class TransferenciaCuenta(models.Model):
     def __str__(self):
         return f"Transferencia {self.cuenta_origen} → {self.cuenta_destino} ({self.fecha:%Y-%m-%d})"
 
+class ReglaCategoria(models.Model):
+    """
+    Regla para categorizar movimientos importados de extractos: si la
+    descripción contiene ``texto`` (sin acentos ni mayúsculas) se usa su
+    categoría de gasto o de ingreso. Gana el texto más largo.
+    """
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reglas_categoria')
+    texto = models.CharField(max_length=100)
+    categoria = models.ForeignKey('gastos.Categoria', on_delete=models.CASCADE, null=True, blank=True)
+    categoria_ingreso = models.ForeignKey('ingresos.CategoriaIngreso', on_delete=models.CASCADE, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['texto']
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'texto'], name='regla_categoria_usuario_texto_uniq'),
+        ]
+
+    def __str__(self):
+        return self.texto
+
+    def save(self, *args, **kwargs):
+        from gastos.models import normalizar_nombre
+
+        self.texto = normalizar_nombre(self.texto)
+        super().save(*args, **kwargs)
+
+
+def _registrar_marcados(transferencia, ids_por_recurso):
+    # QuerySet.update no dispara las señales del registro de cambios
+    if ids_por_recurso:
+        from sincronizacion.registro import registrar_cambios_por_recurso
+
+        registrar_cambios_por_recurso(transferencia.usuario_id, ids_por_recurso)
+
+
+@receiver(post_save, sender=TransferenciaCuenta)
+def marcar_movimientos_transferencia(sender, instance, raw=False, **kwargs):
+    """
+    Mantiene ``es_transferencia`` en el gasto y el ingreso vinculados cuando la
+    transferencia se guarda por el ORM (admin, tests); ``registrar_transferencia``
+    ya los crea marcados.
+    """
+    if raw:
+        return
+    from gastos.models import Gasto
+    from ingresos.models import Ingreso
+
+    marcados = {}
+    if instance.gasto_id:
+        if Gasto.objects.filter(pk=instance.gasto_id, es_transferencia=False).update(es_transferencia=True):
+            marcados['gastos'] = [instance.gasto_id]
+    if instance.ingreso_id:
+        if Ingreso.objects.filter(pk=instance.ingreso_id, es_transferencia=False).update(es_transferencia=True):
+            marcados['ingresos'] = [instance.ingreso_id]
+    _registrar_marcados(instance, marcados)
+
+
+@receiver(post_delete, sender=TransferenciaCuenta)
+def desmarcar_movimientos_transferencia(sender, instance, **kwargs):
+    """Si se borra la transferencia, sus movimientos vuelven a contar en los totales."""
+    from gastos.models import Gasto
+    from ingresos.models import Ingreso
+
+    desmarcados = {}
+    if instance.gasto_id:
+        gastos = Gasto.objects.filter(pk=instance.gasto_id).exclude(transferencias_generadas__isnull=False)
+        if gastos.update(es_transferencia=False):
+            desmarcados['gastos'] = [instance.gasto_id]
+    if instance.ingreso_id:
+        ingresos = Ingreso.objects.filter(pk=instance.ingreso_id).exclude(transferencias_generadas__isnull=False)
+        if ingresos.update(es_transferencia=False):
+            desmarcados['ingresos'] = [instance.ingreso_id]
+    _registrar_marcados(instance, desmarcados)
+
 @receiver(post_migrate)
 def create_initial_data(sender, **kwargs):
     if sender.name == 'cuentas':
@@ -0,0 +1,96 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from rest_framework import serializers
+
+from billetera.api import CamposDinamicosMixin, PropietarioPrimaryKeyField
+from gastos.models import normalizar_nombre
+from .models import Cuenta, ReglaCategoria, TransferenciaCuenta
+from .services import registrar_transferencia
+
+
+class CuentaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    saldo = serializers.SerializerMethodField()
+    moneda_codigo = serializers.CharField(source='moneda.codigo', read_only=True)
+    tipo_nombre = serializers.CharField(source='tipo.nombre', read_only=True, default=None)
+
+    class Meta:
+        model = Cuenta
+        fields = ['id', 'nombre', 'tipo', 'tipo_nombre', 'moneda', 'moneda_codigo', 'saldo_inicial', 'saldo', 'usuario', 'updated_at']
+        read_only_fields = ['usuario', 'updated_at']
+
+    def get_saldo(self, obj):
+        return str(obj.saldo_actual())
+
+
+class TransferenciaCuentaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    cuenta_origen = PropietarioPrimaryKeyField(queryset=Cuenta.objects.all())
+    cuenta_destino = PropietarioPrimaryKeyField(queryset=Cuenta.objects.all())
+    monto_destino = serializers.DecimalField(max_digits=15, decimal_places=2, required=False)
+
+    class Meta:
+        model = TransferenciaCuenta
+        fields = [
+            'id', 'cuenta_origen', 'cuenta_destino', 'monto_origen', 'monto_destino', 'tasa_manual',
+            'nota', 'fecha', 'gasto', 'ingreso', 'usuario', 'updated_at',
+        ]
+        read_only_fields = ['gasto', 'ingreso', 'usuario', 'updated_at']
+
+    def validate(self, attrs):
+        # Mismas reglas que TransferenciaForm
+        errores = {}
+        if attrs['cuenta_origen'] == attrs['cuenta_destino']:
+            errores['cuenta_destino'] = 'Selecciona una cuenta diferente a la de origen.'
+        if attrs['monto_origen'] <= 0:
+            errores['monto_origen'] = 'El monto debe ser mayor a cero.'
+        tasa = attrs.get('tasa_manual') or Decimal('1.0')
+        if tasa <= 0:
+            errores['tasa_manual'] = 'La tasa debe ser mayor a cero.'
+        monto_destino = attrs.get('monto_destino')
+        if monto_destino is not None and monto_destino <= 0:
+            errores['monto_destino'] = 'El monto recibido debe ser mayor a cero.'
+        if errores:
+            raise serializers.ValidationError(errores)
+
+        attrs['tasa_manual'] = tasa
+        if monto_destino is None:
+            attrs['monto_destino'] = (attrs['monto_origen'] * tasa).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        return attrs
+
+    def create(self, validated_data):
+        return registrar_transferencia(
+            validated_data['usuario'],
+            validated_data['cuenta_origen'],
+            validated_data['cuenta_destino'],
+            validated_data['monto_origen'],
+            validated_data['monto_destino'],
+            tasa=validated_data['tasa_manual'],
+            nota=validated_data.get('nota', ''),
+            fecha=validated_data.get('fecha'),
+        )
+
+
+class ReglaCategoriaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    class Meta:
+        model = ReglaCategoria
+        fields = ['id', 'texto', 'categoria', 'categoria_ingreso', 'usuario', 'updated_at']
+        read_only_fields = ['usuario', 'updated_at']
+        # El usuario no viene en el payload: la unicidad (usuario, texto) se valida en validate_texto
+        validators = []
+
+    def validate_texto(self, valor):
+        texto = normalizar_nombre(valor)
+        if not texto:
+            raise serializers.ValidationError('El texto no puede estar vacío.')
+        reglas = ReglaCategoria.objects.filter(usuario=self.context['request'].user, texto=texto)
+        if self.instance is not None:
+            reglas = reglas.exclude(pk=self.instance.pk)
+        if reglas.exists():
+            raise serializers.ValidationError('Ya existe una regla con ese texto.')
+        return texto
+
+    def validate(self, attrs):
+        categoria = attrs.get('categoria', getattr(self.instance, 'categoria', None))
+        categoria_ingreso = attrs.get('categoria_ingreso', getattr(self.instance, 'categoria_ingreso', None))
+        if categoria is None and categoria_ingreso is None:
+            raise serializers.ValidationError('Indicá una categoría de gasto o de ingreso.')
+        return attrs
@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from billetera.referencias import CATEGORIAS, CATEGORIAS_INGRESO
+from gastos.models import Gasto
+from ingresos.models import Ingreso
+from sincronizacion.registro import registrar_cambios_por_recurso
+
+from .models import TransferenciaCuenta
+
+
+def registrar_transferencia(usuario, cuenta_origen, cuenta_destino, monto_origen, monto_destino,
+                            tasa=Decimal('1.000000'), nota='', fecha=None):
+    """
+    Registra una transferencia entre cuentas propias.
+
+    Genera el gasto en la cuenta de origen, el ingreso en la de destino y el
+    registro ``TransferenciaCuenta`` que los vincula, todo en una transacción.
+
+    Las categorías salen del registro de referencias y cada fila se inserta con ``bulk_create`` (sin señales), así que la
+    escritura completa son cuatro ``INSERT``: gasto, ingreso, transferencia y
+    un único alta en el registro de cambios para los tres.
+    """
+    fecha_mov = fecha or timezone.now()
+    categoria_gasto = CATEGORIAS.obtener_o_crear('Transferencia Saliente')
+    categoria_ingreso = CATEGORIAS_INGRESO.obtener_o_crear('Transferencia Entrante')
+
+    gasto = Gasto(
+        usuario=usuario,
+        descripcion=f'Transferencia a {cuenta_destino.nombre}',
+        monto=monto_origen,
+        categoria=categoria_gasto,
+        moneda=cuenta_origen.moneda,
+        cuenta=cuenta_origen,
+        fecha=fecha_mov,
+        es_transferencia=True,
+    )
+    ingreso = Ingreso(
+        usuario=usuario,
+        descripcion=f'Transferencia desde {cuenta_origen.nombre}',
+        monto=monto_destino,
+        categoria=categoria_ingreso,
+        moneda_id=cuenta_destino.moneda_id,
+        cuenta=cuenta_destino,
+        fecha=fecha_mov,
+        es_transferencia=True,
+    )
+
+    with transaction.atomic():
+        Gasto.objects.bulk_create([gasto])
+        Ingreso.objects.bulk_create([ingreso])
+        transferencia, = TransferenciaCuenta.objects.bulk_create([
+            TransferenciaCuenta(
+                usuario=usuario,
+                cuenta_origen=cuenta_origen,
+                cuenta_destino=cuenta_destino,
+                monto_origen=monto_origen,
+                monto_destino=monto_destino,
+                tasa_manual=tasa,
+                nota=nota,
+                fecha=fecha_mov,
+                gasto=gasto,
+                ingreso=ingreso,
+            )
+        ])
+        registrar_cambios_por_recurso(usuario.pk, {
+            'gastos': [gasto.pk],
+            'ingresos': [ingreso.pk],
+            'transferencias': [transferencia.pk],
+        })
+    return transferencia
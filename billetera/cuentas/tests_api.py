@@ -0,0 +1,51 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from gastos.models import Gasto, Moneda
+from ingresos.models import Ingreso, Moneda as MonedaIngreso
+from .models import Cuenta, TransferenciaCuenta
+
+
+class CuentaApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='api-cuentas', password='pass-123')
+        self.otro = User.objects.create_user(username='api-otro', password='pass-123')
+        self.ars = Moneda.objects.get(codigo='ARS')
+        self.banco = Cuenta.objects.create(usuario=self.user, nombre='Banco', moneda=self.ars, saldo_inicial=Decimal('1000'))
+        self.efectivo = Cuenta.objects.create(usuario=self.user, nombre='Efectivo', moneda=self.ars)
+        self.ajena = Cuenta.objects.create(usuario=self.otro, nombre='Ajena', moneda=self.ars)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_lista_incluye_saldo_calculado(self):
+        Ingreso.objects.create(usuario=self.user, descripcion='Sueldo', monto=Decimal('500'),
+                               moneda=MonedaIngreso.objects.get(codigo='ARS'), cuenta=self.banco)
+        Gasto.objects.create(usuario=self.user, descripcion='Super', monto=Decimal('200'), moneda=self.ars, cuenta=self.banco)
+
+        results = self.client.get('/cuentas/api/').json()['results']
+
+        saldos = {r['nombre']: Decimal(r['saldo']) for r in results}
+        self.assertEqual(saldos, {'Banco': Decimal('1300.00'), 'Efectivo': Decimal('0.00')})
+
+    def test_transferencia_genera_movimientos(self):
+        response = self.client.post('/cuentas/api/transferencias/', {
+            'cuenta_origen': self.banco.id, 'cuenta_destino': self.efectivo.id,
+            'monto_origen': '100.00', 'tasa_manual': '1.5',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        transferencia = TransferenciaCuenta.objects.get()
+        self.assertEqual(transferencia.monto_destino, Decimal('150.00'))
+        self.assertEqual(transferencia.gasto.cuenta, self.banco)
+        self.assertEqual(transferencia.ingreso.cuenta, self.efectivo)
+
+    def test_transferencia_rechaza_cuenta_ajena(self):
+        response = self.client.post('/cuentas/api/transferencias/', {
+            'cuenta_origen': self.banco.id, 'cuenta_destino': self.ajena.id, 'monto_origen': '100.00',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(TransferenciaCuenta.objects.exists())
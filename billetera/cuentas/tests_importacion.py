@@ -0,0 +1,233 @@
+import io
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from billetera import referencias
+from gastos.models import Categoria, Gasto, Moneda
+from ingresos.models import CategoriaIngreso, Ingreso
+from sincronizacion.models import Cambio
+from . import importacion
+from .importacion import ErrorExtracto, importar_extracto, parsear_monto
+from .models import Cuenta, ReglaCategoria
+
+CSV = (
+    'Fecha;Concepto;Débito;Crédito\n'
+    '01/03/2026;Café Martínez;1.250,50;\n'
+    '01/03/2026;Café Martínez;1.250,50;\n'
+    '02/03/2026;Sueldo ACME;;500.000,00\n'
+    '\n'
+    '03/03/2026;Netflix.com;4.999,00;\n'
+)
+
+OFX = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20260305120000[-3:ART]
+<TRNAMT>-10.50
+<FITID>A-1
+<NAME>Kiosco
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260306<TRNAMT>99.00<FITID>A-2<MEMO>Reintegro</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+class ImportacionExtractoTests(TestCase):
+    def setUp(self):
+        referencias.reiniciar()
+        self.addCleanup(referencias.reiniciar)
+        self.user = User.objects.create_user(username='importa', password='pass-123')
+        self.ars = Moneda.objects.get(codigo='ARS')
+        self.cuenta = Cuenta.objects.create(usuario=self.user, nombre='Banco', moneda=self.ars)
+
+    def _importar(self, contenido, **kwargs):
+        return importar_extracto(io.BytesIO(contenido.encode()), self.cuenta, **kwargs)
+
+    def test_csv_con_debito_credito_y_reglas(self):
+        cafe = Categoria.objects.create(nombre='Cafetería')
+        sueldo = CategoriaIngreso.objects.create(nombre='Sueldo')
+        ReglaCategoria.objects.create(usuario=self.user, texto='CAFE', categoria=cafe)
+        ReglaCategoria.objects.create(usuario=self.user, texto='sueldo', categoria_ingreso=sueldo)
+
+        resultado = self._importar(CSV)
+
+        self.assertEqual(resultado, {'gastos': 3, 'ingresos': 1, 'duplicados': 0})
+        cafes = Gasto.objects.filter(descripcion='Café Martínez')
+        self.assertEqual(cafes.count(), 2)
+        self.assertEqual({g.monto for g in cafes}, {Decimal('1250.50')})
+        self.assertEqual({g.categoria for g in cafes}, {cafe})
+        self.assertIsNone(Gasto.objects.get(descripcion='Netflix.com').categoria)
+        ingreso = Ingreso.objects.get()
+        self.assertEqual((ingreso.monto, ingreso.categoria, ingreso.moneda.codigo), (Decimal('500000.00'), sueldo, 'ARS'))
+        self.assertEqual(Cambio.objects.filter(usuario=self.user, recurso='gastos').count(), 3)
+
+    def test_reimportar_un_extracto_superpuesto_no_duplica(self):
+        self._importar(CSV)
+        superpuesto = CSV + '04/03/2026;Farmacia;800,00;\n'
+
+        resultado = self._importar(superpuesto)
+
+        self.assertEqual(resultado, {'gastos': 1, 'ingresos': 0, 'duplicados': 4})
+        self.assertEqual(Gasto.objects.count(), 4)
+
+    def test_ofx_deduplica_por_fitid(self):
+        self.assertEqual(self._importar(OFX, nombre='extracto.ofx'), {'gastos': 1, 'ingresos': 1, 'duplicados': 0})
+        # El banco corrigió la descripción: el FITID sigue identificando el movimiento
+        self.assertEqual(
+            self._importar(OFX.replace('Kiosco', 'KIOSCO 24H'), formato='ofx'),
+            {'gastos': 0, 'ingresos': 0, 'duplicados': 2},
+        )
+        gasto = Gasto.objects.get()
+        self.assertEqual((gasto.descripcion, gasto.monto, gasto.fecha.date().isoformat()), ('Kiosco', Decimal('10.50'), '2026-03-05'))
+        self.assertEqual(Ingreso.objects.get().descripcion, 'Reintegro')
+
+    def test_ofx_con_fitid_repetido_en_el_archivo(self):
+        repetido = OFX.replace('</BANKTRANLIST>', '<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260306<TRNAMT>99.00<FITID>A-2<MEMO>Reintegro</STMTTRN>\n</BANKTRANLIST>')
+
+        resultado = self._importar(repetido, formato='ofx')
+
+        self.assertEqual(resultado, {'gastos': 1, 'ingresos': 1, 'duplicados': 1})
+        self.assertEqual(Ingreso.objects.count(), 1)
+
+    def test_consultas_por_lote(self):
+        filas = ''.join(f'2026-01-{dia % 28 + 1:02d},Compra {n},-{n}.00\n' for n, dia in enumerate(range(1200), start=1))
+
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = self._importar('date,description,amount\n' + filas, tamano_lote=500)
+
+        self.assertEqual(resultado['gastos'], 1200)
+        # Reglas + bloqueo de la cuenta y 2 SELECT de hashes por lote; los
+        # INSERT dependen del límite de parámetros del motor, pero nunca son uno por fila
+        lecturas = [q for q in consultas.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(len(lecturas), 1 + 3 * 3)
+        self.assertLess(len(consultas), 60)
+
+    def test_errores_de_formato(self):
+        with self.assertRaisesMessage(ErrorExtracto, 'columnas de fecha'):
+            self._importar('a,b\n1,2\n')
+        with self.assertRaisesMessage(ErrorExtracto, 'Línea 2'):
+            self._importar('fecha,monto\nayer,10\n')
+
+    def test_parsear_monto(self):
+        self.assertEqual(parsear_monto('1.234,56'), Decimal('1234.56'))
+        self.assertEqual(parsear_monto('-1,234.56'), Decimal('-1234.56'))
+        self.assertEqual(parsear_monto('(12.50)'), Decimal('-12.50'))
+        self.assertEqual(parsear_monto('$ 10'), Decimal('10'))
+        self.assertEqual(parsear_monto('800,00'), Decimal('800.00'))
+        self.assertEqual(parsear_monto('0.001'), Decimal('0.001'))
+
+    def test_parsear_monto_con_separador_de_miles(self):
+        self.assertEqual(parsear_monto('$ 1.000'), Decimal('1000'))
+        self.assertEqual(parsear_monto('1.234.567'), Decimal('1234567'))
+        self.assertEqual(parsear_monto('-1.234.567,89'), Decimal('-1234567.89'))
+        self.assertEqual(parsear_monto('1,234,567'), Decimal('1234567'))
+        with self.assertRaisesMessage(ErrorExtracto, 'Monto inválido'):
+            parsear_monto('1.23.4')
+
+    def test_parsear_monto_con_separador_indicado(self):
+        self.assertEqual(parsear_monto('1.000', separador_decimal='.'), Decimal('1.000'))
+        self.assertEqual(parsear_monto('1,234', separador_decimal='.'), Decimal('1234'))
+        self.assertEqual(parsear_monto('1.234,5', separador_decimal=','), Decimal('1234.5'))
+
+    def test_csv_con_miles_y_separador_indicado(self):
+        csv = 'fecha,descripcion,monto\n2026-03-01,Alquiler,-350.000\n2026-03-02,Cafe,-1.500\n'
+
+        self._importar(csv)
+        self.assertEqual(sorted(Gasto.objects.values_list('monto', flat=True)), [Decimal('1500'), Decimal('350000')])
+
+        Gasto.objects.all().delete()
+        self._importar(csv, separador_decimal='.')
+        self.assertEqual(sorted(Gasto.objects.values_list('monto', flat=True)), [Decimal('1.50'), Decimal('350.00')])
+
+    def test_csv_en_windows_1252(self):
+        contenido = 'Fecha;Concepto;Monto\n01/03/2026;Panadería Ñandú;-1.200,00\n'.encode('cp1252')
+
+        importar_extracto(io.BytesIO(contenido), self.cuenta)
+
+        self.assertEqual(Gasto.objects.get().descripcion, 'Panadería Ñandú')
+
+    def test_encoding_desconocido(self):
+        # 0x81 no existe en Windows-1252 y no es UTF-8 válido
+        with self.assertRaisesMessage(ErrorExtracto, 'UTF-8 ni en Windows-1252'):
+            importar_extracto(io.BytesIO(b'fecha,monto\n2026-03-01,\x81\n'), self.cuenta)
+
+    def test_importacion_simultanea_no_choca_con_el_indice(self):
+        # Otra importación del mismo extracto confirma sus filas mientras esta
+        # espera el bloqueo de la cuenta: los hashes se leen después del bloqueo
+        bloquear = importacion._bloquear_cuenta
+        otra = {}
+
+        def esperar_a_la_otra(cuenta):
+            if 'resultado' not in otra:
+                otra['resultado'] = None
+                otra['resultado'] = importar_extracto(io.BytesIO(CSV.encode()), cuenta)
+            bloquear(cuenta)
+
+        with mock.patch.object(importacion, '_bloquear_cuenta', side_effect=esperar_a_la_otra):
+            resultado = self._importar(CSV)
+
+        self.assertEqual(otra['resultado'], {'gastos': 3, 'ingresos': 1, 'duplicados': 0})
+        self.assertEqual(resultado, {'gastos': 0, 'ingresos': 0, 'duplicados': 4})
+        self.assertEqual(Gasto.objects.count(), 3)
+
+
+class ImportarMovimientosViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='importa-vista', password='pass-123')
+        self.otro = User.objects.create_user(username='importa-otro', password='pass-123')
+        ars = Moneda.objects.get(codigo='ARS')
+        self.cuenta = Cuenta.objects.create(usuario=self.user, nombre='Banco', moneda=ars)
+        self.ajena = Cuenta.objects.create(usuario=self.otro, nombre='Ajena', moneda=ars)
+        self.client.login(username='importa-vista', password='pass-123')
+        self.url = reverse('cuentas:importar_movimientos')
+
+    def test_importa_y_redirige(self):
+        archivo = SimpleUploadedFile('marzo.csv', CSV.encode(), content_type='text/csv')
+
+        response = self.client.post(self.url, {'cuenta': self.cuenta.pk, 'archivo': archivo}, follow=True)
+
+        self.assertRedirects(response, reverse('cuentas:lista_cuentas'))
+        self.assertIn('3 gastos y 1 ingresos nuevos', str(list(response.context['messages'])[0]))
+        self.assertEqual(Gasto.objects.filter(cuenta=self.cuenta).count(), 3)
+
+    def test_no_permite_cuentas_ajenas_y_muestra_errores(self):
+        archivo = SimpleUploadedFile('marzo.csv', CSV.encode())
+        response = self.client.post(self.url, {'cuenta': self.ajena.pk, 'archivo': archivo})
+        self.assertIn('cuenta', response.context['form'].errors)
+
+        archivo = SimpleUploadedFile('roto.csv', b'x;y\n1;2\n')
+        response = self.client.post(self.url, {'cuenta': self.cuenta.pk, 'archivo': archivo})
+        self.assertIn('archivo', response.context['form'].errors)
+        self.assertFalse(Gasto.objects.exists())
+
+
+class ReglaCategoriaApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reglas', password='pass-123')
+        self.categoria = Categoria.objects.create(nombre='Streaming')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_normaliza_el_texto_y_rechaza_repetidos(self):
+        response = self.client.post('/cuentas/api/reglas/', {'texto': '  NETFLIX ', 'categoria': self.categoria.pk}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['texto'], 'netflix')
+
+        response = self.client.post('/cuentas/api/reglas/', {'texto': 'Netflix', 'categoria': self.categoria.pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('texto', response.json())
+
+    def test_requiere_alguna_categoria(self):
+        response = self.client.post('/cuentas/api/reglas/', {'texto': 'spotify'}, format='json')
+        self.assertEqual(response.status_code, 400)
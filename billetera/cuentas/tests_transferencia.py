@@ -4,8 +4,12 @@ from django.contrib.auth.models import User
 from django.test import Client, TestCase
 from django.urls import reverse
 
+from billetera import referencias
 from cuentas.models import Cuenta, TipoCuenta, TransferenciaCuenta
-from gastos.models import Moneda as GastoMoneda
+from cuentas.services import registrar_transferencia
+from gastos.models import Gasto, Moneda as GastoMoneda
+from ingresos.models import Ingreso
+from sincronizacion.models import Cambio
 
 
 class TransferenciaCuentaViewTests(TestCase):
@@ -63,6 +67,8 @@ class TransferenciaCuentaViewTests(TestCase):
         self.assertIsNotNone(transferencia.ingreso)
         self.assertEqual(transferencia.gasto.monto, Decimal('100.00'))
         self.assertEqual(transferencia.ingreso.monto, Decimal('50.00'))
+        self.assertTrue(transferencia.gasto.es_transferencia)
+        self.assertTrue(transferencia.ingreso.es_transferencia)
 
     def test_transfer_same_account_is_invalid(self):
         response = self.client.post(self.url, {
@@ -78,3 +84,54 @@ class TransferenciaCuentaViewTests(TestCase):
         self.assertIn('cuenta_destino', form.errors)
         self.assertIn('Selecciona una cuenta diferente', form.errors['cuenta_destino'][0])
         self.assertEqual(TransferenciaCuenta.objects.count(), 0)
+
+
+class RegistrarTransferenciaTests(TestCase):
+    def setUp(self):
+        referencias.reiniciar()
+        self.addCleanup(referencias.reiniciar)
+        self.user = User.objects.create_user(username='servicio', password='secret123')
+        ars, _ = GastoMoneda.objects.get_or_create(codigo='ARS', defaults={'nombre': 'Peso Argentino', 'simbolo': '$'})
+        self.origen = Cuenta.objects.create(usuario=self.user, nombre='Banco', moneda=ars)
+        self.destino = Cuenta.objects.create(usuario=self.user, nombre='Efectivo', moneda=ars)
+        # Crea las categorías de transferencia; reiniciar() equivale al commit
+        registrar_transferencia(self.user, self.origen, self.destino, Decimal('1.00'), Decimal('1.00'))
+        referencias.reiniciar()
+        for tabla in (referencias.CATEGORIAS, referencias.CATEGORIAS_INGRESO):
+            tabla.todos()
+
+    def test_una_escritura_por_tabla(self):
+        # SAVEPOINT + gasto + ingreso + transferencia + registro de cambios + RELEASE
+        with self.assertNumQueries(6):
+            transferencia = registrar_transferencia(
+                self.user, self.origen, self.destino, Decimal('10.00'), Decimal('10.00'), nota='Retiro',
+            )
+
+        self.assertEqual(transferencia.gasto.cuenta, self.origen)
+        self.assertEqual(transferencia.ingreso.cuenta, self.destino)
+        # Gasto e ingreso usan la misma fila de moneda que las cuentas
+        self.assertEqual(transferencia.ingreso.moneda_id, self.destino.moneda_id)
+        registrados = set(Cambio.objects.filter(usuario=self.user).values_list('recurso', 'objeto_id'))
+        self.assertTrue({
+            ('gastos', transferencia.gasto_id),
+            ('ingresos', transferencia.ingreso_id),
+            ('transferencias', transferencia.pk),
+        } <= registrados)
+
+    def test_movimientos_marcados_se_excluyen_de_los_totales(self):
+        Gasto.objects.create(usuario=self.user, descripcion='Almuerzo', monto=Decimal('5.00'), cuenta=self.origen)
+        registrar_transferencia(self.user, self.origen, self.destino, Decimal('10.00'), Decimal('10.00'))
+
+        self.assertEqual(Gasto.objects.filter(usuario=self.user, es_transferencia=True).count(), 2)
+        self.assertEqual(
+            list(Gasto.objects.filter(usuario=self.user, es_transferencia=False).values_list('descripcion', flat=True)),
+            ['Almuerzo'],
+        )
+        self.assertFalse(Ingreso.objects.filter(usuario=self.user, es_transferencia=False).exists())
+
+    def test_borrar_la_transferencia_desmarca_los_movimientos(self):
+        transferencia = TransferenciaCuenta.objects.get(usuario=self.user)
+        transferencia.delete()
+
+        self.assertFalse(Gasto.objects.filter(usuario=self.user, es_transferencia=True).exists())
+        self.assertFalse(Ingreso.objects.filter(usuario=self.user, es_transferencia=True).exists())
@@ -1,13 +1,26 @@
-from django.urls import path
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
 from . import views
+from .api_views import CuentaViewSet, ReglaCategoriaViewSet, TransferenciaCuentaViewSet
+
+# Router para las rutas de la API REST
+# 'transferencias' y 'reglas' se registran antes que '' para que no los capture el detalle de cuenta
+router = DefaultRouter()
+router.register(r'transferencias', TransferenciaCuentaViewSet, basename='transferencia')
+router.register(r'reglas', ReglaCategoriaViewSet, basename='regla')
+router.register(r'', CuentaViewSet, basename='cuenta')
 
 app_name = 'cuentas'
 
 urlpatterns = [
+    # Rutas de la API REST
+    path('api/', include(router.urls)),
+
     path('', views.lista_cuentas, name='lista_cuentas'),
     path('crear/', views.crear_cuenta, name='crear_cuenta'),
     path('editar/<int:pk>/', views.editar_cuenta, name='editar_cuenta'),
     path('eliminar/<int:pk>/', views.eliminar_cuenta, name='eliminar_cuenta'),
     path('ajustar/<int:pk>/', views.ajustar_saldo, name='ajustar_saldo'),
     path('transferir/', views.transferir_cuentas, name='transferir_cuentas'),
-]
\ No newline at end of file
+    path('importar/', views.importar_movimientos, name='importar_movimientos'),
+]
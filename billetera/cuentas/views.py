@@ -1,19 +1,24 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db import transaction
 from django.db.models import Sum
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
-from gastos.models import Gasto, Categoria as CategoriaGasto
-from ingresos.models import Ingreso, CategoriaIngreso, Moneda as IngresoMoneda
+from billetera.condicional import condicional_libro
+from billetera.limites import limitar
+from billetera.referencias import CATEGORIAS, CATEGORIAS_INGRESO
+from gastos.models import Gasto
+from ingresos.models import Ingreso
 
-from .forms import AjusteSaldoForm, CuentaForm, TransferenciaForm
-from .models import Cuenta, TransferenciaCuenta
+from .forms import AjusteSaldoForm, CuentaForm, ImportarExtractoForm, TransferenciaForm
+from .importacion import ErrorExtracto, importar_extracto
+from .models import Cuenta
+from .services import registrar_transferencia
 
 @login_required
+@condicional_libro()
 def lista_cuentas(request):
-    cuentas = Cuenta.objects.filter(usuario=request.user)
+    cuentas = Cuenta.objects.filter(usuario=request.user).select_related('moneda', 'tipo')
     return render(request, 'cuentas/lista_cuentas.html', {'cuentas': cuentas})
 
 @login_required
@@ -69,13 +74,7 @@ def ajustar_saldo(request, pk):
             
             if diferencia > 0:
                 # Need to add Income
-                categoria, _ = CategoriaIngreso.objects.get_or_create(nombre='Ajuste de Saldo')
-                
-                # Find matching IngresoMoneda
-                ingreso_moneda, _ = IngresoMoneda.objects.get_or_create(
-                    codigo=cuenta.moneda.codigo,
-                    defaults={'nombre': cuenta.moneda.nombre, 'simbolo': cuenta.moneda.simbolo}
-                )
+                categoria = CATEGORIAS_INGRESO.obtener_o_crear('Ajuste de Saldo')
 
                 Ingreso.objects.create(
                     usuario=request.user,
@@ -83,14 +82,14 @@ def ajustar_saldo(request, pk):
                     monto=diferencia,
                     categoria=categoria,
                     descripcion='Ajuste manual de saldo (Positivo)',
-                    moneda=ingreso_moneda,
+                    moneda_id=cuenta.moneda_id,
                     fecha=timezone.now()
                 )
                 messages.success(request, f'Se registró un ingreso de ajuste por {diferencia}')
                 
             elif diferencia < 0:
                 # Need to add Expense
-                categoria, _ = CategoriaGasto.objects.get_or_create(nombre='Ajuste de Saldo')
+                categoria = CATEGORIAS.obtener_o_crear('Ajuste de Saldo')
                 Gasto.objects.create(
                     usuario=request.user,
                     cuenta=cuenta,
@@ -129,50 +128,15 @@ def transferir_cuentas(request):
             nota = datos.get('nota', '')
 
             try:
-                with transaction.atomic():
-                    categoria_gasto, _ = CategoriaGasto.objects.get_or_create(nombre='Transferencia Saliente')
-                    categoria_ingreso, _ = CategoriaIngreso.objects.get_or_create(nombre='Transferencia Entrante')
-
-                    fecha_mov = timezone.now()
-
-                    gasto = Gasto.objects.create(
-                        usuario=request.user,
-                        descripcion=f'Transferencia a {cuenta_destino.nombre}',
-                        monto=monto_origen,
-                        categoria=categoria_gasto,
-                        moneda=cuenta_origen.moneda,
-                        cuenta=cuenta_origen,
-                        fecha=fecha_mov,
-                    )
-
-                    ingreso_moneda, _ = IngresoMoneda.objects.get_or_create(
-                        codigo=cuenta_destino.moneda.codigo,
-                        defaults={'nombre': cuenta_destino.moneda.nombre, 'simbolo': cuenta_destino.moneda.simbolo}
-                    )
-
-                    ingreso = Ingreso.objects.create(
-                        usuario=request.user,
-                        descripcion=f'Transferencia desde {cuenta_origen.nombre}',
-                        monto=monto_destino,
-                        categoria=categoria_ingreso,
-                        moneda=ingreso_moneda,
-                        cuenta=cuenta_destino,
-                        fecha=fecha_mov,
-                    )
-
-                    TransferenciaCuenta.objects.create(
-                        usuario=request.user,
-                        cuenta_origen=cuenta_origen,
-                        cuenta_destino=cuenta_destino,
-                        monto_origen=monto_origen,
-                        monto_destino=monto_destino,
-                        tasa_manual=tasa,
-                        nota=nota,
-                        fecha=fecha_mov,
-                        gasto=gasto,
-                        ingreso=ingreso,
-                    )
-
+                registrar_transferencia(
+                    request.user,
+                    cuenta_origen,
+                    cuenta_destino,
+                    monto_origen,
+                    monto_destino,
+                    tasa=tasa,
+                    nota=nota,
+                )
                 messages.success(request, 'Transferencia registrada exitosamente.')
                 return redirect('inicio_usuarios')
             except Exception as exc:
@@ -183,3 +147,33 @@ def transferir_cuentas(request):
     return render(request, 'cuentas/transferir.html', {
         'form': form,
     })
+
+
+@login_required
+@limitar('bulk', pesado=True)
+def importar_movimientos(request):
+    if request.method == 'POST':
+        form = ImportarExtractoForm(request.POST, request.FILES, usuario=request.user)
+        if form.is_valid():
+            archivo = form.cleaned_data['archivo']
+            try:
+                resultado = importar_extracto(
+                    archivo, form.cleaned_data['cuenta'],
+                    formato=form.cleaned_data['formato'] or None, nombre=archivo.name,
+                    separador_decimal=form.cleaned_data['separador_decimal'] or None,
+                )
+            except ErrorExtracto as exc:
+                form.add_error('archivo', str(exc))
+            else:
+                messages.success(
+                    request,
+                    f"Extracto importado: {resultado['gastos']} gastos y {resultado['ingresos']} ingresos nuevos, "
+                    f"{resultado['duplicados']} ya existentes.",
+                )
+                return redirect('cuentas:lista_cuentas')
+    else:
+        form = ImportarExtractoForm(usuario=request.user)
+
+    return render(request, 'cuentas/importar.html', {
+        'form': form,
+    })
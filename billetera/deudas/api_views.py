@@ -0,0 +1,27 @@
+from rest_framework import viewsets
+
+from billetera.api import PropietarioViewSetMixin
+from billetera.condicional import CondicionalViewSetMixin
+from .models import Deuda, PagoDeuda
+from .serializers import DeudaSerializer, PagoDeudaSerializer
+
+
+# API REST para deudas, con el saldo pendiente anotado en la consulta
+class DeudaViewSet(CondicionalViewSetMixin, PropietarioViewSetMixin, viewsets.ModelViewSet):
+    queryset = Deuda.objects.select_related('moneda').con_saldo()
+    serializer_class = DeudaSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(usuario=self.request.user)
+
+    def perform_update(self, serializer):
+        deuda = serializer.save()
+        # Deuda.save() recalcula el estado; el saldo anotado quedó desactualizado
+        deuda.saldo = None
+
+
+# API REST para pagos de deudas (el dueño es el de la deuda)
+class PagoDeudaViewSet(CondicionalViewSetMixin, PropietarioViewSetMixin, viewsets.ModelViewSet):
+    queryset = PagoDeuda.objects.all()
+    serializer_class = PagoDeudaSerializer
+    campo_usuario = 'deuda__usuario'
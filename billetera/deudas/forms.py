@@ -1,12 +1,13 @@
 from django import forms
 from django.utils import timezone
 from .models import Deuda, PagoDeuda
-from gastos.models import Moneda
+from billetera.referencias import ReferenciaChoiceField, ReferenciasFormMixin, moneda_por_defecto
 
-class DeudaForm(forms.ModelForm):
+class DeudaForm(ReferenciasFormMixin, forms.ModelForm):
     class Meta:
         model = Deuda
         fields = ['persona', 'tipo', 'monto', 'moneda', 'fecha', 'fecha_vencimiento', 'descripcion']
+        field_classes = {'moneda': ReferenciaChoiceField}
         widgets = {
             'fecha': forms.DateTimeInput(format='%Y-%m-%dT%H:%M', attrs={
                 'type': 'datetime-local',
@@ -28,11 +29,9 @@ class DeudaForm(forms.ModelForm):
         if not self.instance.pk:
             self.initial['fecha'] = timezone.now().strftime('%Y-%m-%dT%H:%M')
             # Set default currency to ARS
-            try:
-                ars = Moneda.objects.get(codigo='ARS')
+            ars = moneda_por_defecto()
+            if ars:
                 self.initial['moneda'] = ars.pk
-            except Moneda.DoesNotExist:
-                pass
 
 class PagoDeudaForm(forms.ModelForm):
     incluir_en_finanzas = forms.BooleanField(
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-19 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deudas', '0002_pagodeuda_gasto_relacionado_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pagodeuda',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
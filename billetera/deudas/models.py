@@ -1,10 +1,31 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.utils import timezone
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
 from gastos.models import Moneda
 
+class DeudaQuerySet(models.QuerySet):
+    def con_saldo(self):
+        """Anota ``saldo`` (monto - pagos) para evitar una consulta por deuda."""
+        pagado = models.Subquery(
+            PagoDeuda.objects.filter(deuda=models.OuterRef('pk'))
+            .order_by()
+            .values('deuda')
+            .annotate(total=models.Sum('monto'))
+            .values('total')
+        )
+        return self.annotate(
+            saldo=models.ExpressionWrapper(
+                models.F('monto') - Coalesce(pagado, models.Value(Decimal('0.00'))),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            )
+        )
+
+
 class Deuda(models.Model):
     TIPO_CHOICES = [
         ('POR_COBRAR', 'Por Cobrar'),
@@ -27,21 +48,29 @@ class Deuda(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DeudaQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.get_tipo_display()} - {self.persona} - {self.monto} {self.moneda.codigo}"
 
     def saldo_pendiente(self):
+        # Listados y API anotan el saldo con DeudaQuerySet.con_saldo()
+        if getattr(self, 'saldo', None) is not None:
+            return self.saldo
+        return self._calcular_saldo()
+
+    def _calcular_saldo(self):
         pagado = self.pagos.aggregate(total=models.Sum('monto'))['total'] or 0
         return self.monto - pagado
 
     def actualizar_estado(self):
-        saldo = self.saldo_pendiente()
+        saldo = self._calcular_saldo()
         if saldo <= 0:
             self.estado = 'PAGADA'
         else:
             self.estado = 'PENDIENTE'
         # Evitar recursión infinita si se llama desde save()
-        super(Deuda, self).save(update_fields=['estado'])
+        super(Deuda, self).save(update_fields=['estado', 'updated_at'])
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
@@ -56,6 +85,7 @@ class PagoDeuda(models.Model):
     gasto_relacionado = models.OneToOneField('gastos.Gasto', on_delete=models.SET_NULL, null=True, blank=True, related_name='pago_deuda')
     ingreso_relacionado = models.OneToOneField('ingresos.Ingreso', on_delete=models.SET_NULL, null=True, blank=True, related_name='pago_deuda')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Pago de {self.monto} a {self.deuda}"
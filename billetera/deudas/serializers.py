@@ -0,0 +1,64 @@
+from rest_framework import serializers
+
+from billetera.api import CamposDinamicosMixin, PropietarioPrimaryKeyField
+from .models import Deuda, PagoDeuda
+from .services import sincronizar_movimiento_pago
+
+
+class DeudaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    saldo_pendiente = serializers.SerializerMethodField()
+    moneda_codigo = serializers.CharField(source='moneda.codigo', read_only=True)
+
+    class Meta:
+        model = Deuda
+        fields = [
+            'id', 'persona', 'tipo', 'monto', 'moneda', 'moneda_codigo', 'fecha', 'fecha_vencimiento',
+            'estado', 'saldo_pendiente', 'descripcion', 'usuario', 'created_at', 'updated_at',
+        ]
+        read_only_fields = ['estado', 'usuario', 'created_at', 'updated_at']
+
+    def get_saldo_pendiente(self, obj):
+        return str(obj.saldo_pendiente())
+
+
+class PagoDeudaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    deuda = PropietarioPrimaryKeyField(queryset=Deuda.objects.select_related('moneda'))
+    incluir_en_finanzas = serializers.BooleanField(write_only=True, required=False, default=False)
+
+    class Meta:
+        model = PagoDeuda
+        fields = [
+            'id', 'deuda', 'monto', 'fecha', 'nota', 'gasto_relacionado', 'ingreso_relacionado',
+            'incluir_en_finanzas', 'created_at', 'updated_at',
+        ]
+        read_only_fields = ['gasto_relacionado', 'ingreso_relacionado', 'created_at', 'updated_at']
+
+    def validate(self, attrs):
+        # Mismas reglas que PagoDeudaForm.clean_monto
+        deuda = attrs.get('deuda') or self.instance.deuda
+        monto = attrs.get('monto', self.instance.monto if self.instance else None)
+        if monto is not None and monto <= 0:
+            raise serializers.ValidationError({'monto': 'El monto debe ser mayor a cero.'})
+
+        saldo_pendiente = deuda._calcular_saldo()
+        if self.instance is not None and self.instance.deuda_id == deuda.pk:
+            saldo_pendiente += self.instance.monto
+        if monto is not None and monto > saldo_pendiente:
+            raise serializers.ValidationError(
+                {'monto': f'El monto no puede superar el saldo pendiente ({deuda.moneda.simbolo}{saldo_pendiente}).'}
+            )
+        return attrs
+
+    def create(self, validated_data):
+        incluir = validated_data.pop('incluir_en_finanzas', False)
+        pago = super().create(validated_data)
+        if incluir:
+            sincronizar_movimiento_pago(pago, self.context['request'].user, incluir=True)
+        return pago
+
+    def update(self, instance, validated_data):
+        incluir = validated_data.pop('incluir_en_finanzas', None)
+        pago = super().update(instance, validated_data)
+        if incluir is not None:
+            sincronizar_movimiento_pago(pago, self.context['request'].user, incluir=incluir)
+        return pago
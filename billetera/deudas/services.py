@@ -0,0 +1,66 @@
+from billetera.referencias import CATEGORIAS, CATEGORIAS_INGRESO
+from gastos.models import Gasto
+from ingresos.models import Ingreso
+
+
+def sincronizar_movimiento_pago(pago, usuario, incluir):
+    """
+    Mantiene el Gasto/Ingreso asociado a un pago de deuda.
+
+    Si ``incluir`` es verdadero crea (o actualiza) el movimiento según el tipo
+    de deuda: un pago de deuda POR_PAGAR es un gasto y un cobro de deuda
+    POR_COBRAR es un ingreso. Si es falso, elimina los movimientos asociados.
+    """
+    deuda = pago.deuda
+
+    if not incluir:
+        # Si se desmarca, eliminar los relacionados si existen
+        if pago.gasto_relacionado:
+            pago.gasto_relacionado.delete()
+            pago.gasto_relacionado = None
+            pago.save()
+        if pago.ingreso_relacionado:
+            pago.ingreso_relacionado.delete()
+            pago.ingreso_relacionado = None
+            pago.save()
+        return
+
+    if deuda.tipo == 'POR_PAGAR':
+        if pago.gasto_relacionado:
+            # Actualizar gasto existente
+            gasto = pago.gasto_relacionado
+            gasto.monto = pago.monto
+            gasto.fecha = pago.fecha
+            gasto.save()
+        else:
+            categoria = CATEGORIAS.obtener_o_crear('Deudas')
+            gasto = Gasto.objects.create(
+                usuario=usuario,
+                descripcion=f"Pago de deuda a {deuda.persona}",
+                monto=pago.monto,
+                fecha=pago.fecha,
+                moneda=deuda.moneda,
+                categoria=categoria,
+            )
+            pago.gasto_relacionado = gasto
+            pago.save()
+
+    elif deuda.tipo == 'POR_COBRAR':
+        if pago.ingreso_relacionado:
+            # Actualizar ingreso existente
+            ingreso = pago.ingreso_relacionado
+            ingreso.monto = pago.monto
+            ingreso.fecha = pago.fecha
+            ingreso.save()
+        else:
+            categoria = CATEGORIAS_INGRESO.obtener_o_crear('Deudas')
+            ingreso = Ingreso.objects.create(
+                usuario=usuario,
+                descripcion=f"Cobro de deuda a {deuda.persona}",
+                monto=pago.monto,
+                fecha=pago.fecha,
+                moneda_id=deuda.moneda_id,
+                categoria=categoria
+            )
+            pago.ingreso_relacionado = ingreso
+            pago.save()
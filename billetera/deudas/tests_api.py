@@ -0,0 +1,47 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from gastos.models import Moneda
+from ingresos.models import Ingreso
+from .models import Deuda, PagoDeuda
+
+
+class DeudaApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='api-deudas', password='pass-123')
+        self.otro = User.objects.create_user(username='api-otro', password='pass-123')
+        self.ars = Moneda.objects.get(codigo='ARS')
+        self.deuda = Deuda.objects.create(usuario=self.user, persona='Ana', tipo='POR_COBRAR', monto=Decimal('100'), moneda=self.ars)
+        self.ajena = Deuda.objects.create(usuario=self.otro, persona='Beto', tipo='POR_PAGAR', monto=Decimal('100'), moneda=self.ars)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_lista_con_saldo_pendiente(self):
+        PagoDeuda.objects.create(deuda=self.deuda, monto=Decimal('40'))
+
+        results = self.client.get('/deudas/api/').json()['results']
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(Decimal(results[0]['saldo_pendiente']), Decimal('60.00'))
+
+    def test_pago_con_movimiento_financiero(self):
+        response = self.client.post('/deudas/api/pagos/', {
+            'deuda': self.deuda.id, 'monto': '100.00', 'incluir_en_finanzas': True,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.deuda.refresh_from_db()
+        self.assertEqual(self.deuda.estado, 'PAGADA')
+        self.assertEqual(Ingreso.objects.get(usuario=self.user).monto, Decimal('100.00'))
+
+    def test_pago_no_supera_saldo(self):
+        response = self.client.post('/deudas/api/pagos/', {'deuda': self.deuda.id, 'monto': '150.00'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_pago_sobre_deuda_ajena(self):
+        response = self.client.post('/deudas/api/pagos/', {'deuda': self.ajena.id, 'monto': '10.00'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PagoDeuda.objects.exists())
@@ -1,9 +1,20 @@
-from django.urls import path
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
 from . import views
+from .api_views import DeudaViewSet, PagoDeudaViewSet
+
+# Router para las rutas de la API REST
+# 'pagos' se registra antes que '' para que no lo capture el detalle de deuda
+router = DefaultRouter()
+router.register(r'pagos', PagoDeudaViewSet, basename='pago')
+router.register(r'', DeudaViewSet, basename='deuda')
 
 app_name = 'deudas'
 
 urlpatterns = [
+    # Rutas de la API REST
+    path('api/', include(router.urls)),
+
     path('', views.DeudaListView.as_view(), name='lista_deudas'),
     path('nueva/', views.DeudaCreateView.as_view(), name='crear_deuda'),
     path('<int:pk>/', views.DeudaDetailView.as_view(), name='detalle_deuda'),
@@ -4,8 +4,7 @@ from django.views.generic import ListView, CreateView, UpdateView, DetailView, D
 from django.contrib.auth.mixins import LoginRequiredMixin
 from .models import Deuda, PagoDeuda
 from .forms import DeudaForm, PagoDeudaForm
-from gastos.models import Gasto, Categoria
-from ingresos.models import Ingreso, CategoriaIngreso, Moneda as MonedaIngreso
+from .services import sincronizar_movimiento_pago
 
 class DeudaListView(LoginRequiredMixin, ListView):
     model = Deuda
@@ -13,7 +12,7 @@ class DeudaListView(LoginRequiredMixin, ListView):
     context_object_name = 'deudas'
 
     def get_queryset(self):
-        return Deuda.objects.filter(usuario=self.request.user).order_by('-fecha')
+        return Deuda.objects.filter(usuario=self.request.user).select_related('moneda').con_saldo().order_by('-fecha')
 
 class DeudaCreateView(LoginRequiredMixin, CreateView):
     model = Deuda
@@ -46,7 +45,7 @@ class DeudaDetailView(LoginRequiredMixin, DetailView):
     context_object_name = 'deuda'
 
     def get_queryset(self):
-        return Deuda.objects.filter(usuario=self.request.user)
+        return Deuda.objects.filter(usuario=self.request.user).select_related('moneda').con_saldo()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -69,7 +68,10 @@ class PagoDeudaCreateView(LoginRequiredMixin, CreateView):
     template_name = 'deudas/form_pago.html'
 
     def dispatch(self, request, *args, **kwargs):
-        self.deuda = get_object_or_404(Deuda, pk=kwargs['deuda_id'], usuario=request.user)
+        # El saldo anotado es el previo al pago: el que valida el formulario
+        self.deuda = get_object_or_404(
+            Deuda.objects.select_related('moneda').con_saldo(), pk=kwargs['deuda_id'], usuario=request.user,
+        )
         return super().dispatch(request, *args, **kwargs)
 
     def form_valid(self, form):
@@ -78,47 +80,8 @@ class PagoDeudaCreateView(LoginRequiredMixin, CreateView):
         
         # Verificar si se debe incluir en finanzas
         if form.cleaned_data.get('incluir_en_finanzas'):
-            pago = self.object
-            deuda = self.deuda
-            
-            if deuda.tipo == 'POR_PAGAR':
-                # Crear Gasto
-                categoria, _ = Categoria.objects.get_or_create(nombre='Deudas')
-                gasto = Gasto.objects.create(
-                    usuario=self.request.user,
-                    descripcion=f"Pago de deuda a {deuda.persona}",
-                    monto=pago.monto,
-                    fecha=pago.fecha,
-                    moneda=deuda.moneda,
-                    categoria=categoria,
-                    # Si hay nota, agregarla a la descripción o usarla
-                )
-                pago.gasto_relacionado = gasto
-                pago.save()
-                
-            elif deuda.tipo == 'POR_COBRAR':
-                # Crear Ingreso
-                categoria, _ = CategoriaIngreso.objects.get_or_create(nombre='Deudas')
-                # Buscar la moneda correspondiente en Ingresos
-                moneda_ingreso, _ = MonedaIngreso.objects.get_or_create(
-                    codigo=deuda.moneda.codigo,
-                    defaults={
-                        'nombre': deuda.moneda.nombre,
-                        'simbolo': deuda.moneda.simbolo
-                    }
-                )
-                
-                ingreso = Ingreso.objects.create(
-                    usuario=self.request.user,
-                    descripcion=f"Cobro de deuda a {deuda.persona}",
-                    monto=pago.monto,
-                    fecha=pago.fecha,
-                    moneda=moneda_ingreso,
-                    categoria=categoria
-                )
-                pago.ingreso_relacionado = ingreso
-                pago.save()
-                
+            sincronizar_movimiento_pago(self.object, self.request.user, incluir=True)
+
         return response
 
     def get_form_kwargs(self):
@@ -144,6 +107,12 @@ class PagoDeudaUpdateView(LoginRequiredMixin, UpdateView):
         # Asegurar que el pago pertenece a una deuda del usuario
         return PagoDeuda.objects.filter(deuda__usuario=self.request.user)
 
+    def get_object(self, queryset=None):
+        pago = super().get_object(queryset)
+        # Saldo de la deuda anotado: el formulario y la plantilla lo consultan varias veces
+        pago.deuda = Deuda.objects.select_related('moneda').con_saldo().get(pk=pago.deuda_id)
+        return pago
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['deuda'] = self.object.deuda
@@ -161,67 +130,7 @@ class PagoDeudaUpdateView(LoginRequiredMixin, UpdateView):
         deuda.actualizar_estado()
         
         # Manejo de integración financiera
-        incluir = form.cleaned_data.get('incluir_en_finanzas')
-        
-        if incluir:
-            if deuda.tipo == 'POR_PAGAR':
-                if pago.gasto_relacionado:
-                    # Actualizar gasto existente
-                    gasto = pago.gasto_relacionado
-                    gasto.monto = pago.monto
-                    gasto.fecha = pago.fecha
-                    gasto.save()
-                else:
-                    # Crear nuevo gasto
-                    categoria, _ = Categoria.objects.get_or_create(nombre='Deudas')
-                    gasto = Gasto.objects.create(
-                        usuario=self.request.user,
-                        descripcion=f"Pago de deuda a {deuda.persona}",
-                        monto=pago.monto,
-                        fecha=pago.fecha,
-                        moneda=deuda.moneda,
-                        categoria=categoria,
-                    )
-                    pago.gasto_relacionado = gasto
-                    pago.save()
-            
-            elif deuda.tipo == 'POR_COBRAR':
-                if pago.ingreso_relacionado:
-                    # Actualizar ingreso existente
-                    ingreso = pago.ingreso_relacionado
-                    ingreso.monto = pago.monto
-                    ingreso.fecha = pago.fecha
-                    ingreso.save()
-                else:
-                    # Crear nuevo ingreso
-                    categoria, _ = CategoriaIngreso.objects.get_or_create(nombre='Deudas')
-                    moneda_ingreso, _ = MonedaIngreso.objects.get_or_create(
-                        codigo=deuda.moneda.codigo,
-                        defaults={
-                            'nombre': deuda.moneda.nombre,
-                            'simbolo': deuda.moneda.simbolo
-                        }
-                    )
-                    ingreso = Ingreso.objects.create(
-                        usuario=self.request.user,
-                        descripcion=f"Cobro de deuda a {deuda.persona}",
-                        monto=pago.monto,
-                        fecha=pago.fecha,
-                        moneda=moneda_ingreso,
-                        categoria=categoria
-                    )
-                    pago.ingreso_relacionado = ingreso
-                    pago.save()
-        else:
-            # Si se desmarca, eliminar los relacionados si existen
-            if pago.gasto_relacionado:
-                pago.gasto_relacionado.delete()
-                pago.gasto_relacionado = None
-                pago.save()
-            if pago.ingreso_relacionado:
-                pago.ingreso_relacionado.delete()
-                pago.ingreso_relacionado = None
-                pago.save()
-                
+        sincronizar_movimiento_pago(pago, self.request.user, incluir=form.cleaned_data.get('incluir_en_finanzas'))
+
         return response
 
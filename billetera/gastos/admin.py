@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Gasto, Moneda, Categoria, Compra, Tienda
+from .models import Gasto, Moneda, Categoria, Compra, Tienda, TipoCambio
 
 
 @admin.register(Tienda)
@@ -38,6 +38,14 @@ class CompraAdmin(admin.ModelAdmin):
     items_count.short_description = 'Items'
 
 
+@admin.register(TipoCambio)
+class TipoCambioAdmin(admin.ModelAdmin):
+    """Carga manual de cotizaciones; ``importar_tipos_cambio`` las carga desde un CSV."""
+    list_display = ('moneda', 'fecha', 'tasa')
+    list_filter = ('moneda',)
+    date_hierarchy = 'fecha'
+
+
 # Registra los modelos y las clases de administración
 admin.site.register(Gasto)
 admin.site.register(Moneda)
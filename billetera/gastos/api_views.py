@@ -1,35 +1,82 @@
-from rest_framework import viewsets, permissions
-from .serializers import GastoSerializer
-from .permissions import IsAdminOrReadOwnOnly, IsOwnerOrReadOnly
-from .models import Gasto
+from django.db.models import Prefetch
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from billetera.api import ListadoValoresMixin, PropietarioViewSetMixin
+from billetera.condicional import CondicionalViewSetMixin
+from billetera.limites import LimiteThrottle, turno_pesado
+from .filters import GastoApiFilter
+from .serializers import GastoSerializer, CompraSerializer
+from .models import Gasto, Compra
+from . import services
 
 
 # API REST para gestionar los gastos
-class GastoViewSet(viewsets.ModelViewSet):
-    queryset = Gasto.objects.all()  # Define el conjunto de datos inicial para la vista
+class GastoViewSet(CondicionalViewSetMixin, PropietarioViewSetMixin, ListadoValoresMixin, viewsets.ModelViewSet):
+    queryset = Gasto.objects.select_related('moneda', 'categoria', 'cuenta')  # Define el conjunto de datos inicial para la vista
     serializer_class = GastoSerializer  # Define el serializador a utilizar
-    permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOwnOnly, IsOwnerOrReadOnly]  # Define los permisos para la vista
+    # Rango de fechas, cuenta, moneda, compra y categoría (ver GastoApiFilter)
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = GastoApiFilter
+    # Cubeta de LimiteThrottle; sólo la acción bulk declara el throttle
+    throttle_scope = 'bulk'
 
-    def get_queryset(self):
-        # Los superusuarios pueden ver todos los gastos
-        if self.request.user.is_superuser:
-            return Gasto.objects.all()
+    def perform_create(self, serializer):
+        # Asocia automáticamente el usuario autenticado al crear un nuevo gasto
+        serializer.save(usuario=self.request.user)
 
-        # Filtrar gastos por usuario para usuarios normales
-        queryset = Gasto.objects.filter(usuario=self.request.user)
+    @action(
+        detail=False, methods=['post', 'patch', 'delete'], url_path='bulk',
+        throttle_classes=[LimiteThrottle],
+    )
+    def bulk(self, request):
+        """
+        Alta, edición o baja de varios gastos en una sola petición.
 
-        # Filtrar por fecha si se proporciona en los parámetros de la solicitud
-        fecha = self.request.query_params.get('fecha', None)
-        if fecha:
-            queryset = queryset.filter(fecha=fecha)
+        POST/PATCH reciben una lista de gastos (o ``{"items": [...]}``) y DELETE
+        una lista de IDs (o ``{"ids": [...]}``). Responde con un resultado por
+        ítem: 201/200 si todos salieron bien, 207 si hubo fallos parciales y 400
+        si fallaron todos.
+        """
+        with turno_pesado(request):
+            return self._procesar_lote(request)
 
-        # Filtrar por categoría si se proporciona en los parámetros de la solicitud
-        categoria = self.request.query_params.get('categoria', None)
-        if categoria:
-            queryset = queryset.filter(categoria=categoria)
+    def _procesar_lote(self, request):
+        datos = request.data
+        try:
+            if request.method == 'DELETE':
+                ids = datos.get('ids') if isinstance(datos, dict) else datos
+                resultados = services.eliminar_gastos_en_lote(request.user, ids)
+                exito = status.HTTP_200_OK
+            else:
+                items = datos.get('items') if isinstance(datos, dict) else datos
+                if request.method == 'POST':
+                    resultados = services.crear_gastos_en_lote(request.user, items)
+                    exito = status.HTTP_201_CREATED
+                else:
+                    resultados = services.actualizar_gastos_en_lote(request.user, items)
+                    exito = status.HTTP_200_OK
+        except services.ErrorLote as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        return queryset
+        fallidos = sum(1 for r in resultados if r['estado'] >= 400)
+        if not fallidos:
+            codigo = exito
+        elif fallidos == len(resultados):
+            codigo = status.HTTP_400_BAD_REQUEST
+        else:
+            codigo = status.HTTP_207_MULTI_STATUS
+        return Response({'resultados': resultados}, status=codigo)
+
+
+# API REST para compras globales con sus ítems anidados
+class CompraViewSet(CondicionalViewSetMixin, PropietarioViewSetMixin, viewsets.ModelViewSet):
+    queryset = Compra.objects.prefetch_related(
+        Prefetch('items', queryset=Gasto.objects.order_by('id'))
+    )
+    serializer_class = CompraSerializer
 
     def perform_create(self, serializer):
-        # Asocia automáticamente el usuario autenticado al crear un nuevo gasto
         serializer.save(usuario=self.request.user)
@@ -1,5 +1,9 @@
+from datetime import datetime, time, timedelta
+
 import django_filters
 from django import forms
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from .models import Gasto
 
 class GastoFilter(django_filters.FilterSet):
@@ -11,3 +15,66 @@ class GastoFilter(django_filters.FilterSet):
     class Meta:
         model = Gasto
         fields = ['descripcion', 'categoria', 'fecha_inicio', 'fecha_fin']
+
+
+class LimiteFechaField(forms.CharField):
+    """Fecha (AAAA-MM-DD) o fecha-hora ISO 8601; devuelve ``(datetime, solo_fecha)``."""
+
+    def to_python(self, value):
+        value = super().to_python(value)
+        if not value:
+            return None
+        try:
+            fecha = parse_date(value)
+            solo_fecha = fecha is not None
+            fecha_hora = datetime.combine(fecha, time.min) if solo_fecha else parse_datetime(value)
+        except ValueError:
+            fecha_hora = None
+        if fecha_hora is None:
+            raise forms.ValidationError('Use AAAA-MM-DD o una fecha-hora ISO 8601.')
+        if timezone.is_naive(fecha_hora):
+            fecha_hora = timezone.make_aware(fecha_hora)
+        return fecha_hora, solo_fecha
+
+
+class LimiteFechaFilter(django_filters.Filter):
+    """
+    Límite de un rango sobre ``fecha`` que se resuelve con ``>=``/``<``, así
+    la consulta aprovecha los índices (usuario, fecha). Con sólo una fecha,
+    el límite superior incluye el día completo.
+    """
+    field_class = LimiteFechaField
+
+    def __init__(self, *args, hasta=False, **kwargs):
+        self.hasta = hasta
+        kwargs.setdefault('field_name', 'fecha')
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        fecha_hora, solo_fecha = value
+        if not self.hasta:
+            return qs.filter(**{f'{self.field_name}__gte': fecha_hora})
+        if solo_fecha:
+            return qs.filter(**{f'{self.field_name}__lt': fecha_hora + timedelta(days=1)})
+        return qs.filter(**{f'{self.field_name}__lte': fecha_hora})
+
+
+class GastoApiFilter(django_filters.FilterSet):
+    """Filtros de ``/gastos/api/``; todos los IDs refieren a objetos del usuario."""
+    fecha_desde = LimiteFechaFilter()
+    fecha_hasta = LimiteFechaFilter(hasta=True)
+    fecha = django_filters.DateFilter(method='filtrar_dia')
+    categoria = django_filters.NumberFilter(field_name='categoria')
+    cuenta = django_filters.NumberFilter(field_name='cuenta')
+    moneda = django_filters.NumberFilter(field_name='moneda')
+    compra = django_filters.NumberFilter(field_name='compra')
+
+    class Meta:
+        model = Gasto
+        fields = ['fecha_desde', 'fecha_hasta', 'fecha', 'categoria', 'cuenta', 'moneda', 'compra']
+
+    def filtrar_dia(self, queryset, name, value):
+        inicio = timezone.make_aware(datetime.combine(value, time.min))
+        return queryset.filter(fecha__gte=inicio, fecha__lt=inicio + timedelta(days=1))
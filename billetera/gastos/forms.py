@@ -1,11 +1,13 @@
 from django import forms
 from django.utils import timezone
 
-from .models import Gasto, Moneda, Tienda, Compra
+from billetera.referencias import ReferenciaChoiceField, ReferenciasFormMixin, moneda_por_defecto
+from .models import Gasto, Compra
+from .services import resolver_tienda
 from cuentas.models import Cuenta
 
 
-class GastoForm(forms.ModelForm):
+class GastoForm(ReferenciasFormMixin, forms.ModelForm):
     tienda_nombre = forms.CharField(
         required=False,
         label='Tienda / Comercio',
@@ -21,6 +23,7 @@ class GastoForm(forms.ModelForm):
     class Meta:
         model = Gasto
         fields = ['descripcion', 'tienda_nombre', 'categoria', 'cantidad', 'monto', 'descuento', 'moneda', 'fecha', 'cuenta']
+        field_classes = {'categoria': ReferenciaChoiceField, 'moneda': ReferenciaChoiceField}
         widgets = {
             'descripcion': forms.TextInput(attrs={
                 'class': 'form-control form-control-lg',
@@ -82,7 +85,7 @@ class GastoForm(forms.ModelForm):
         self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         if self.user:
-            self.fields['cuenta'].queryset = Cuenta.objects.filter(usuario=self.user)
+            self.fields['cuenta'].queryset = Cuenta.objects.filter(usuario=self.user).select_related('moneda')
         
         if self.instance and self.instance.pk:
             if self.instance.tienda:
@@ -99,7 +102,7 @@ class GastoForm(forms.ModelForm):
     def _prefill_moneda_default(self):
         if self.fields['moneda'].initial:
             return
-        ars = Moneda.objects.filter(codigo='ARS').first()
+        ars = moneda_por_defecto()
         if ars:
             self.fields['moneda'].initial = ars.pk
 
@@ -107,14 +110,9 @@ class GastoForm(forms.ModelForm):
         gasto = super().save(commit=False)
         
         # 1. Handle Tienda logic
-        tienda_nombre = self.cleaned_data.get('tienda_nombre')
-        
-        if tienda_nombre and self.user:
-            tienda, created = Tienda.objects.get_or_create(
-                nombre__iexact=tienda_nombre,
-                usuario=self.user,
-                defaults={'nombre': tienda_nombre}
-            )
+        tienda = resolver_tienda(self.user, self.cleaned_data.get('tienda_nombre'))
+
+        if tienda:
             gasto.tienda = tienda
             gasto.lugar = tienda.nombre  # Keep legacy field in sync
         else:
@@ -136,24 +134,25 @@ class GastoForm(forms.ModelForm):
         return gasto
 
 
-class CompraGlobalHeaderForm(forms.ModelForm):
+class CompraGlobalHeaderForm(ReferenciasFormMixin, forms.ModelForm):
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         
         if self.user:
-            self.fields['cuenta'].queryset = Cuenta.objects.filter(usuario=self.user)
+            self.fields['cuenta'].queryset = Cuenta.objects.filter(usuario=self.user).select_related('moneda')
             
         if not self.initial.get('fecha'):
             self.initial['fecha'] = timezone.localtime(timezone.now()).strftime('%Y-%m-%dT%H:%M')
         if not self.initial.get('moneda'):
-            ars = Moneda.objects.filter(codigo='ARS').first()
+            ars = moneda_por_defecto()
             if ars:
                 self.fields['moneda'].initial = ars.pk
 
     class Meta:
         model = Gasto
         fields = ['fecha', 'lugar', 'cuenta', 'moneda']
+        field_classes = {'moneda': ReferenciaChoiceField}
         widgets = {
             'fecha': forms.DateTimeInput(attrs={
                 'class': 'form-control form-control-lg',
@@ -181,14 +180,14 @@ class CompraGlobalHeaderForm(forms.ModelForm):
         }
 
 
-class CompraGlobalEditForm(forms.ModelForm):
+class CompraGlobalEditForm(ReferenciasFormMixin, forms.ModelForm):
     """Edita el encabezado de una Compra (fecha/hora + comercio + cuenta + moneda)."""
 
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         if self.user:
-            self.fields['cuenta'].queryset = Cuenta.objects.filter(usuario=self.user)
+            self.fields['cuenta'].queryset = Cuenta.objects.filter(usuario=self.user).select_related('moneda')
 
         if self.instance and self.instance.pk and self.instance.fecha:
             # Asegura el formato datetime-local en el input
@@ -197,6 +196,7 @@ class CompraGlobalEditForm(forms.ModelForm):
     class Meta:
         model = Compra
         fields = ['fecha', 'lugar', 'cuenta', 'moneda']
+        field_classes = {'moneda': ReferenciaChoiceField}
         widgets = {
             'fecha': forms.DateTimeInput(attrs={
                 'class': 'form-control form-control-lg',
@@ -224,10 +224,11 @@ class CompraGlobalEditForm(forms.ModelForm):
         }
 
 
-class CompraGlobalItemForm(forms.ModelForm):
+class CompraGlobalItemForm(ReferenciasFormMixin, forms.ModelForm):
     class Meta:
         model = Gasto
         fields = ['descripcion', 'categoria', 'cantidad', 'monto']
+        field_classes = {'categoria': ReferenciaChoiceField}
         widgets = {
             'descripcion': forms.TextInput(attrs={
                 'class': 'form-control',
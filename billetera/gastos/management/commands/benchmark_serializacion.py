@@ -0,0 +1,67 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from billetera.api import plan_valores, serializar_filas
+from billetera.renderers import JSONRapidoRenderer, orjson
+from gastos.models import Categoria, Gasto, Moneda
+from gastos.serializers import GastoSerializer
+
+
+class Command(BaseCommand):
+    help = "Compara la serialización de N gastos: ModelSerializer vs .values() y JSONRenderer vs orjson."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cantidad', type=int, default=10000, help='Gastos a serializar.')
+        parser.add_argument('--repeticiones', type=int, default=3, help='Se informa el mejor tiempo.')
+
+    def _medir(self, funcion, repeticiones):
+        mejor, resultado = None, None
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            resultado = funcion()
+            duracion = time.perf_counter() - inicio
+            mejor = duracion if mejor is None else min(mejor, duracion)
+        return mejor, resultado
+
+    def handle(self, *args, **options):
+        cantidad, repeticiones = options['cantidad'], options['repeticiones']
+
+        # Los datos de prueba se descartan al final con un rollback
+        with transaction.atomic():
+            usuario = User.objects.create(username=f'benchmark-{time.time_ns()}')
+            moneda = Moneda.objects.first()
+            categoria = Categoria.objects.first()
+            ahora = timezone.now()
+            Gasto.objects.bulk_create(
+                [
+                    Gasto(usuario=usuario, descripcion=f'Gasto {i}', monto=i % 1000 + 0.5,
+                          moneda=moneda, categoria=categoria, fecha=ahora - timezone.timedelta(minutes=i))
+                    for i in range(cantidad)
+                ],
+                batch_size=1000,
+            )
+            queryset = Gasto.objects.filter(usuario=usuario).select_related('moneda', 'categoria', 'cuenta').order_by('-fecha', '-id')
+
+            plan = plan_valores(GastoSerializer())
+            lookups = {lookup for _, lookup, _ in plan}
+            t_serializer, datos_serializer = self._medir(lambda: GastoSerializer(queryset, many=True).data, repeticiones)
+            t_valores, datos_valores = self._medir(lambda: serializar_filas(plan, queryset.values(*lookups)), repeticiones)
+
+            t_json, salida_json = self._medir(lambda: JSONRenderer().render(datos_serializer), repeticiones)
+            t_rapido, salida_rapida = self._medir(lambda: JSONRapidoRenderer().render(datos_serializer), repeticiones)
+
+            equivalentes = [dict(d) for d in datos_serializer] == datos_valores
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{cantidad} gastos (mejor de {repeticiones}):")
+        self.stdout.write(f"  ModelSerializer  {t_serializer * 1000:8.1f} ms")
+        self.stdout.write(f"  .values()        {t_valores * 1000:8.1f} ms  ({t_serializer / t_valores:.1f}x)")
+        self.stdout.write(f"  JSONRenderer     {t_json * 1000:8.1f} ms  {len(salida_json)} bytes")
+        nombre = 'orjson' if orjson is not None else 'orjson (no instalado, usa DRF)'
+        self.stdout.write(f"  {nombre:<16} {t_rapido * 1000:8.1f} ms  {len(salida_rapida)} bytes  ({t_json / t_rapido:.1f}x)")
+        self.stdout.write(f"  Misma salida serializer/.values(): {'sí' if equivalentes else 'NO'}")
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-19 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gastos', '0009_migrate_lugar_to_tienda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='compra',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='gasto',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
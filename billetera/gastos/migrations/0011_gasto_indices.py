@@ -0,0 +1,25 @@
+# Generated by Django 4.2.9 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gastos', '0010_compra_updated_at_gasto_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gasto',
+            index=models.Index(fields=['usuario', 'fecha', 'id'], name='gasto_usuario_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gasto',
+            index=models.Index(fields=['cuenta', 'fecha'], name='gasto_cuenta_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gasto',
+            index=models.Index(fields=['usuario', 'moneda', 'fecha'], name='gasto_usuario_moneda_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.9 on 2026-10-19 11:54
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+def unificar_tiendas_repetidas(apps, schema_editor):
+    """
+    Fusiona las tiendas de un mismo usuario que sólo difieren en mayúsculas
+    (``get_or_create(nombre__iexact=...)`` no lo impedía ante requests
+    concurrentes). Se conserva la más antigua y se reapuntan gastos y compras.
+    """
+    Tienda = apps.get_model('gastos', 'Tienda')
+    Gasto = apps.get_model('gastos', 'Gasto')
+    Compra = apps.get_model('gastos', 'Compra')
+    Cambio = apps.get_model('sincronizacion', 'Cambio')
+
+    conservadas = {}
+    reemplazos = {}
+    for pk, usuario_id, nombre in Tienda.objects.exclude(usuario__isnull=True).order_by('id').values_list('id', 'usuario_id', 'nombre'):
+        clave = (usuario_id, nombre.lower())
+        if clave in conservadas:
+            reemplazos[pk] = conservadas[clave]
+        else:
+            conservadas[clave] = pk
+
+    for repetida, conservada in reemplazos.items():
+        for modelo, recurso in ((Gasto, 'gastos'), (Compra, 'compras')):
+            afectados = list(modelo.objects.filter(tienda_id=repetida).values_list('id', 'usuario_id'))
+            modelo.objects.filter(tienda_id=repetida).update(tienda_id=conservada)
+            # Los clientes sincronizados deben ver la nueva tienda
+            Cambio.objects.bulk_create([
+                Cambio(usuario_id=usuario_id, recurso=recurso, objeto_id=pk, operacion='upsert')
+                for pk, usuario_id in afectados if usuario_id is not None
+            ])
+    Tienda.objects.filter(pk__in=list(reemplazos)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gastos', '0011_gasto_indices'),
+        ('sincronizacion', '0002_backfill_cambios'),
+    ]
+
+    operations = [
+        migrations.RunPython(unificar_tiendas_repetidas, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='tienda',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='tienda',
+            constraint=models.UniqueConstraint(models.F('usuario'), django.db.models.functions.text.Lower('nombre'), name='tienda_usuario_nombre_uniq'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.9 on 2026-10-19 12:00
+
+import unicodedata
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def _normalizar(nombre):
+    # Copia de gastos.models.normalizar_nombre al momento de la migración
+    descompuesto = unicodedata.normalize('NFKD', nombre or '')
+    sin_acentos = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(sin_acentos.lower().split())
+
+
+def completar_tiendas(apps, schema_editor):
+    """Nombre normalizado y contadores de uso a partir de las compras y gastos sueltos."""
+    Tienda = apps.get_model('gastos', 'Tienda')
+    Gasto = apps.get_model('gastos', 'Gasto')
+    Compra = apps.get_model('gastos', 'Compra')
+
+    usos = {}
+    # Una compra cuenta como un uso, no uno por ítem
+    for filas in (
+        Compra.objects.exclude(tienda__isnull=True).values('tienda_id').annotate(n=Count('id'), ultimo=Max('fecha')),
+        Gasto.objects.filter(compra__isnull=True).exclude(tienda__isnull=True)
+        .values('tienda_id').annotate(n=Count('id'), ultimo=Max('fecha')),
+    ):
+        for fila in filas:
+            n, ultimo = usos.get(fila['tienda_id'], (0, None))
+            usos[fila['tienda_id']] = (n + fila['n'], max(filter(None, (ultimo, fila['ultimo']))))
+
+    tiendas = list(Tienda.objects.all())
+    for tienda in tiendas:
+        tienda.nombre_normalizado = _normalizar(tienda.nombre)
+        tienda.usos, tienda.ultimo_uso = usos.get(tienda.pk, (0, None))
+    Tienda.objects.bulk_update(tiendas, ['nombre_normalizado', 'usos', 'ultimo_uso'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gastos', '0012_tienda_nombre_unico'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tienda',
+            name='nombre_normalizado',
+            field=models.CharField(default='', editable=False, max_length=120),
+        ),
+        migrations.AddField(
+            model_name='tienda',
+            name='ultimo_uso',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='tienda',
+            name='usos',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(completar_tiendas, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tienda',
+            index=models.Index(fields=['usuario', 'nombre_normalizado'], name='tienda_usuario_prefijo_idx', opclasses=['int4_ops', 'varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.9 on 2026-10-19 12:11
+
+from django.db import migrations, models
+
+
+def marcar_transferencias(apps, schema_editor):
+    """Marca los movimientos que ya estaban vinculados a una ``TransferenciaCuenta``."""
+    Gasto = apps.get_model('gastos', 'Gasto')
+    TransferenciaCuenta = apps.get_model('cuentas', 'TransferenciaCuenta')
+    vinculados = TransferenciaCuenta.objects.exclude(gasto_id__isnull=True).values('gasto_id')
+    Gasto.objects.filter(pk__in=vinculados).update(es_transferencia=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gastos', '0013_tienda_autocompletado'),
+        ('cuentas', '0003_cuenta_updated_at_transferenciacuenta_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gasto',
+            name='es_transferencia',
+            field=models.BooleanField(default=False, help_text='Generado por una transferencia entre cuentas propias'),
+        ),
+        migrations.AddIndex(
+            model_name='gasto',
+            index=models.Index(fields=['usuario', 'es_transferencia', 'fecha'], name='gasto_usuario_transf_idx'),
+        ),
+        migrations.RunPython(marcar_transferencias, migrations.RunPython.noop),
+    ]
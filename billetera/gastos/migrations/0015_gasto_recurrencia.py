@@ -0,0 +1,29 @@
+# Generated by Django 4.2.9 on 2026-10-19 12:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recurrencias', '0001_initial'),
+        ('gastos', '0014_es_transferencia'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gasto',
+            name='fecha_recurrencia',
+            field=models.DateField(blank=True, help_text='Ocurrencia de la recurrencia que generó este gasto', null=True),
+        ),
+        migrations.AddField(
+            model_name='gasto',
+            name='recurrencia',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='gastos', to='recurrencias.recurrencia'),
+        ),
+        migrations.AddConstraint(
+            model_name='gasto',
+            constraint=models.UniqueConstraint(fields=('recurrencia', 'fecha_recurrencia'), name='gasto_recurrencia_fecha_uniq'),
+        ),
+    ]
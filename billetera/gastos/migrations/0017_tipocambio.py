@@ -0,0 +1,38 @@
+# Generated by Django 4.2.9 on 2026-10-19 12:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gastos', '0016_gasto_hash_importacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TipoCambio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(default=django.utils.timezone.localdate)),
+                ('tasa', models.DecimalField(decimal_places=6, max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('moneda', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tipos_cambio', to='gastos.moneda')),
+            ],
+            options={
+                'verbose_name': 'tipo de cambio',
+                'verbose_name_plural': 'tipos de cambio',
+                'ordering': ['moneda', '-fecha'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='tipocambio',
+            constraint=models.UniqueConstraint(fields=('moneda', 'fecha'), name='tipo_cambio_moneda_fecha_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='tipocambio',
+            constraint=models.CheckConstraint(check=models.Q(('tasa__gt', 0)), name='tipo_cambio_tasa_positiva'),
+        ),
+    ]
@@ -1,5 +1,8 @@
+import unicodedata
+
 from django.db import models
 from django.db.models import Sum
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User  # Importar el modelo de usuario
 from django.utils import timezone  # Importar timezone
 
@@ -16,6 +19,31 @@ class Moneda(models.Model):
 # Initial data logic moved to gastos/signals.py to ensure it runs after migrations
 
 
+class TipoCambio(models.Model):
+    """
+    Cotización de una moneda en ``settings.MONEDA_BASE`` a partir de ``fecha``:
+    1 unidad de ``moneda`` vale ``tasa`` unidades de la moneda base. Rige hasta
+    la siguiente cotización de la misma moneda.
+    """
+    moneda = models.ForeignKey(Moneda, on_delete=models.CASCADE, related_name='tipos_cambio')
+    fecha = models.DateField(default=timezone.localdate)
+    tasa = models.DecimalField(max_digits=18, decimal_places=6)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['moneda', '-fecha']
+        constraints = [
+            # Una cotización por día; el índice resuelve "la vigente a tal fecha"
+            models.UniqueConstraint(fields=['moneda', 'fecha'], name='tipo_cambio_moneda_fecha_uniq'),
+            models.CheckConstraint(check=models.Q(tasa__gt=0), name='tipo_cambio_tasa_positiva'),
+        ]
+        verbose_name = 'tipo de cambio'
+        verbose_name_plural = 'tipos de cambio'
+
+    def __str__(self):
+        return f"{self.moneda.codigo} {self.fecha:%Y-%m-%d}: {self.tasa}"
+
+
 class Categoria(models.Model):
     nombre = models.CharField(max_length=50)
 
@@ -23,17 +51,46 @@ class Categoria(models.Model):
         return self.nombre
 
 
+def normalizar_nombre(nombre):
+    """Minúsculas, sin acentos y con espacios simples: clave de búsqueda por prefijo."""
+    descompuesto = unicodedata.normalize('NFKD', nombre or '')
+    sin_acentos = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(sin_acentos.lower().split())
+
+
 class Tienda(models.Model):
     nombre = models.CharField(max_length=120)
+    nombre_normalizado = models.CharField(max_length=120, default='', editable=False)
     usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tiendas', null=True, blank=True)
+    # Ranking del autocompletado: cuántas veces y cuándo se eligió por última vez
+    usos = models.PositiveIntegerField(default=0, editable=False)
+    ultimo_uso = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ('nombre', 'usuario')
+        # Una tienda por nombre y usuario sin distinguir mayúsculas; respalda el
+        # upsert de gastos.services.resolver_tienda
+        constraints = [
+            models.UniqueConstraint('usuario', Lower('nombre'), name='tienda_usuario_nombre_uniq'),
+        ]
+        # Búsqueda por prefijo (LIKE 'abc%'); en PostgreSQL requiere varchar_pattern_ops
+        indexes = [
+            models.Index(
+                fields=['usuario', 'nombre_normalizado'], name='tienda_usuario_prefijo_idx',
+                opclasses=['int4_ops', 'varchar_pattern_ops'],
+            ),
+        ]
 
     def __str__(self):
         return self.nombre
 
+    def save(self, *args, **kwargs):
+        self.nombre_normalizado = normalizar_nombre(self.nombre)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'nombre' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'nombre_normalizado'}
+        super().save(*args, **kwargs)
+
 
 class Compra(models.Model):
     """
@@ -47,6 +104,7 @@ class Compra(models.Model):
     cuenta = models.ForeignKey('cuentas.Cuenta', on_delete=models.SET_NULL, null=True, blank=True, related_name='compras')
     moneda = models.ForeignKey(Moneda, on_delete=models.CASCADE, related_name='compras')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-fecha']
@@ -55,15 +113,25 @@ class Compra(models.Model):
         items_count = self.items.count()
         return f"Compra en {self.lugar or 'Sin lugar'} - {items_count} items ({self.fecha.strftime('%d/%m/%Y')})"
 
+    def _items_precargados(self):
+        # Con prefetch_related('items') total e items_count no consultan de nuevo
+        return getattr(self, '_prefetched_objects_cache', {}).get('items')
+
     @property
     def total(self):
         """Retorna la suma de todos los gastos asociados a esta compra."""
+        items = self._items_precargados()
+        if items is not None:
+            return sum((item.monto for item in items), 0)
         result = self.items.aggregate(total=Sum('monto'))
         return result['total'] or 0
 
     @property
     def items_count(self):
         """Retorna la cantidad de ítems en esta compra."""
+        items = self._items_precargados()
+        if items is not None:
+            return len(items)
         return self.items.count()
 
 
@@ -85,6 +153,28 @@ class Gasto(models.Model):
     cuenta = models.ForeignKey('cuentas.Cuenta', on_delete=models.SET_NULL, null=True, blank=True, related_name='gastos')
     compra = models.ForeignKey(Compra, on_delete=models.CASCADE, null=True, blank=True, related_name='items',
                                help_text='Compra global a la que pertenece este gasto')
+    es_transferencia = models.BooleanField(default=False, help_text='Generado por una transferencia entre cuentas propias')
+    recurrencia = models.ForeignKey('recurrencias.Recurrencia', on_delete=models.SET_NULL, null=True, blank=True, related_name='gastos')
+    fecha_recurrencia = models.DateField(null=True, blank=True, help_text='Ocurrencia de la recurrencia que generó este gasto')
+    hash_importacion = models.CharField(max_length=64, null=True, blank=True, editable=False,
+                                        help_text='Huella del movimiento importado de un extracto bancario')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Listados por usuario ordenados por (fecha, id) y filtros por cuenta/moneda en un rango;
+        # los totales excluyen las transferencias filtrando por columna
+        indexes = [
+            models.Index(fields=['usuario', 'fecha', 'id'], name='gasto_usuario_fecha_idx'),
+            models.Index(fields=['cuenta', 'fecha'], name='gasto_cuenta_fecha_idx'),
+            models.Index(fields=['usuario', 'moneda', 'fecha'], name='gasto_usuario_moneda_fecha_idx'),
+            models.Index(fields=['usuario', 'es_transferencia', 'fecha'], name='gasto_usuario_transf_idx'),
+        ]
+        constraints = [
+            # Una sola materialización por ocurrencia aunque el scheduler corra dos veces
+            models.UniqueConstraint(fields=['recurrencia', 'fecha_recurrencia'], name='gasto_recurrencia_fecha_uniq'),
+            # Deduplicación de extractos importados; también es el índice de la búsqueda
+            models.UniqueConstraint(fields=['cuenta', 'hash_importacion'], name='gasto_cuenta_hash_uniq'),
+        ]
 
     def __str__(self):
         if self.moneda:
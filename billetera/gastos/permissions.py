@@ -1,6 +1,13 @@
 from rest_framework import permissions
 
 
+def _propietario(view, obj):
+    """Resuelve el dueño del objeto siguiendo ``view.campo_usuario`` (por defecto ``usuario``)."""
+    for parte in getattr(view, 'campo_usuario', 'usuario').split('__'):
+        obj = getattr(obj, parte, None)
+    return obj
+
+
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """
     Custom permission to only allow owners of an object to edit it.
@@ -12,7 +19,7 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
             return True
 
         # Los permisos de escritura solo se permiten al dueño del objeto.
-        return obj.usuario == request.user
+        return _propietario(view, obj) == request.user
 
 
 class IsAdminOrReadOwnOnly(permissions.BasePermission):
@@ -27,5 +34,4 @@ class IsAdminOrReadOwnOnly(permissions.BasePermission):
             return True
 
         # Permitir solo a los dueños del objeto leer y modificar sus propios datos
-        return obj.usuario == request.user
-
+        return _propietario(view, obj) == request.user
@@ -1,8 +1,111 @@
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Gasto
 
+from billetera.api import CamposDinamicosMixin, PropietarioPrimaryKeyField
+from cuentas.models import Cuenta
+from sincronizacion.registro import registrar_cambios
+from .models import Gasto, Compra, Tienda
+
+
+class GastoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    tienda = PropietarioPrimaryKeyField(queryset=Tienda.objects.all(), required=False, allow_null=True)
+    cuenta = PropietarioPrimaryKeyField(queryset=Cuenta.objects.all(), required=False, allow_null=True)
+    compra = PropietarioPrimaryKeyField(queryset=Compra.objects.all(), required=False, allow_null=True)
+    moneda_codigo = serializers.CharField(source='moneda.codigo', read_only=True, default=None)
+    categoria_nombre = serializers.CharField(source='categoria.nombre', read_only=True, default=None)
+    cuenta_nombre = serializers.CharField(source='cuenta.nombre', read_only=True, default=None)
+
+    class Meta:
+        model = Gasto
+        fields = [
+            'id', 'descripcion', 'lugar', 'tienda', 'cantidad', 'monto', 'descuento', 'fecha',
+            'moneda', 'moneda_codigo', 'categoria', 'categoria_nombre', 'cuenta', 'cuenta_nombre',
+            'compra', 'usuario', 'updated_at',
+        ]
+        read_only_fields = ['usuario', 'updated_at']
+
+
+class GastoLoteSerializer(serializers.ModelSerializer):
+    """
+    Ítem de una operación en lote sobre gastos.
+
+    Las referencias llegan como IDs planos: se resuelven todas juntas con una
+    consulta por tabla en ``gastos.services`` en lugar de una por ítem.
+    """
+    id = serializers.IntegerField(required=False)
+    tienda = serializers.IntegerField(required=False, allow_null=True)
+    cuenta = serializers.IntegerField(required=False, allow_null=True)
+    compra = serializers.IntegerField(required=False, allow_null=True)
+    moneda = serializers.IntegerField(required=False, allow_null=True)
+    categoria = serializers.IntegerField(required=False, allow_null=True)
 
-class GastoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Gasto
-    fields = ['id', 'descripcion', 'lugar', 'monto', 'fecha', 'moneda', 'categoria', 'usuario']
+        fields = [
+            'id', 'descripcion', 'lugar', 'tienda', 'cantidad', 'monto', 'descuento', 'fecha',
+            'moneda', 'categoria', 'cuenta', 'compra',
+        ]
+
+
+class CompraItemSerializer(serializers.ModelSerializer):
+    """Ítem de una compra: los datos de encabezado se heredan de la Compra."""
+
+    class Meta:
+        model = Gasto
+        fields = ['id', 'descripcion', 'categoria', 'cantidad', 'monto', 'descuento']
+
+
+class CompraSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    tienda = PropietarioPrimaryKeyField(queryset=Tienda.objects.all(), required=False, allow_null=True)
+    cuenta = PropietarioPrimaryKeyField(queryset=Cuenta.objects.all(), required=False, allow_null=True)
+    items = CompraItemSerializer(many=True)
+    total = serializers.SerializerMethodField()
+    items_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Compra
+        fields = ['id', 'fecha', 'lugar', 'tienda', 'cuenta', 'moneda', 'items', 'total', 'items_count', 'usuario', 'created_at', 'updated_at']
+        read_only_fields = ['usuario', 'created_at', 'updated_at']
+
+    # total / items_count se calculan sobre los ítems precargados con prefetch_related
+    def get_total(self, obj):
+        return str(sum((item.monto for item in obj.items.all()), 0))
+
+    def get_items_count(self, obj):
+        return len(obj.items.all())
+
+    def validate_items(self, items):
+        if self.instance is None and not items:
+            raise serializers.ValidationError('La compra debe tener al menos un ítem.')
+        return items
+
+    def _campos_encabezado(self, compra):
+        return {
+            'usuario': compra.usuario,
+            'fecha': compra.fecha,
+            'lugar': compra.lugar,
+            'tienda': compra.tienda,
+            'cuenta': compra.cuenta,
+            'moneda': compra.moneda,
+        }
+
+    def create(self, validated_data):
+        items = validated_data.pop('items')
+        with transaction.atomic():
+            compra = Compra.objects.create(**validated_data)
+            encabezado = self._campos_encabezado(compra)
+            creados = Gasto.objects.bulk_create([Gasto(compra=compra, **encabezado, **item) for item in items])
+            registrar_cambios(compra.usuario_id, 'gastos', [gasto.pk for gasto in creados])
+        return compra
+
+    def update(self, instance, validated_data):
+        # Los ítems se editan individualmente vía /gastos/api/; aquí sólo el encabezado
+        validated_data.pop('items', None)
+        with transaction.atomic():
+            compra = super().update(instance, validated_data)
+            encabezado = self._campos_encabezado(compra)
+            encabezado.pop('usuario')
+            compra.items.all().update(**encabezado, updated_at=timezone.now())
+            registrar_cambios(compra.usuario_id, 'gastos', compra.items.values_list('id', flat=True))
+        return compra
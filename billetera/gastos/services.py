@@ -0,0 +1,272 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import SET_NULL, F, Value
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from cuentas.models import Cuenta
+from sincronizacion.models import Cambio
+from sincronizacion.registro import filas_set_null, registrar_cambios, registrar_filas
+from .models import Gasto, Categoria, Compra, Moneda, Tienda, normalizar_nombre
+from .serializers import GastoLoteSerializer
+
+
+class ErrorLote(Exception):
+    """El lote completo es inválido (formato o tamaño), no un ítem en particular."""
+
+
+# Referencias de un gasto y el queryset desde el que se resuelven. Tiendas,
+# cuentas y compras se limitan al usuario para no asociar objetos ajenos.
+REFERENCIAS = {
+    'tienda': lambda usuario: Tienda.objects.filter(usuario=usuario),
+    'cuenta': lambda usuario: Cuenta.objects.filter(usuario=usuario),
+    'compra': lambda usuario: Compra.objects.filter(usuario=usuario),
+    'categoria': lambda usuario: Categoria.objects.all(),
+    'moneda': lambda usuario: Moneda.objects.all(),
+}
+
+
+def _validar_tamano(items):
+    if not isinstance(items, list) or not items:
+        raise ErrorLote('Se espera una lista no vacía de ítems.')
+    limite = settings.GASTOS_LOTE_MAXIMO
+    if len(items) > limite:
+        raise ErrorLote(f'El lote supera el máximo de {limite} ítems.')
+
+
+def _resolver_referencias(datos, usuario):
+    """Una consulta ``in_bulk`` por tabla referenciada, para todo el lote."""
+    resueltas = {}
+    for campo, queryset in REFERENCIAS.items():
+        ids = {d[campo] for d in datos if d.get(campo) is not None}
+        resueltas[campo] = queryset(usuario).in_bulk(ids) if ids else {}
+    return resueltas
+
+
+def _asignar_referencias(datos, resueltas):
+    """Reemplaza los IDs por instancias; devuelve los errores de los que no existen."""
+    errores = {}
+    for campo in REFERENCIAS:
+        pk = datos.get(campo)
+        if pk is None:
+            continue
+        objeto = resueltas[campo].get(pk)
+        if objeto is None:
+            errores[campo] = [f'Referencia inválida "{pk}".']
+        else:
+            datos[campo] = objeto
+    return errores
+
+
+def _validar_items(items, partial=False):
+    """Valida cada ítem con ``GastoLoteSerializer``; devuelve (validos, resultados)."""
+    validos, resultados = [], [None] * len(items)
+    for indice, item in enumerate(items):
+        serializer = GastoLoteSerializer(data=item, partial=partial)
+        if serializer.is_valid():
+            validos.append((indice, dict(serializer.validated_data)))
+        else:
+            resultados[indice] = {'indice': indice, 'estado': 400, 'errores': serializer.errors}
+    return validos, resultados
+
+
+def crear_gastos_en_lote(usuario, items):
+    """
+    Crea varios gastos con un único ``bulk_create`` dentro de una transacción.
+
+    Los ítems inválidos no bloquean al resto: cada uno recibe su propio
+    resultado (``estado`` 201 con ``id`` o 400 con ``errores``).
+    """
+    _validar_tamano(items)
+    validos, resultados = _validar_items(items)
+    resueltas = _resolver_referencias([datos for _, datos in validos], usuario)
+
+    nuevos = []
+    for indice, datos in validos:
+        datos.pop('id', None)
+        errores = _asignar_referencias(datos, resueltas)
+        if errores:
+            resultados[indice] = {'indice': indice, 'estado': 400, 'errores': errores}
+        else:
+            nuevos.append((indice, Gasto(usuario=usuario, **datos)))
+
+    if nuevos:
+        with transaction.atomic():
+            Gasto.objects.bulk_create([gasto for _, gasto in nuevos])
+            registrar_cambios(usuario.pk, 'gastos', [gasto.pk for _, gasto in nuevos])
+            _contar_usos([gasto.tienda_id for _, gasto in nuevos])
+    for indice, gasto in nuevos:
+        resultados[indice] = {'indice': indice, 'estado': 201, 'id': gasto.pk}
+    return resultados
+
+
+def actualizar_gastos_en_lote(usuario, items):
+    """Actualización parcial de varios gastos propios con un único ``bulk_update``."""
+    _validar_tamano(items)
+    validos, resultados = _validar_items(items, partial=True)
+
+    ids = [datos.get('id') for _, datos in validos]
+    existentes = Gasto.objects.filter(usuario=usuario).in_bulk([pk for pk in ids if pk is not None])
+    resueltas = _resolver_referencias([datos for _, datos in validos], usuario)
+
+    modificados, campos, vistos = [], set(), set()
+    for indice, datos in validos:
+        pk = datos.pop('id', None)
+        if pk is None:
+            resultados[indice] = {'indice': indice, 'estado': 400, 'errores': {'id': ['Este campo es requerido.']}}
+            continue
+        if pk in vistos:
+            resultados[indice] = {'indice': indice, 'estado': 400, 'errores': {'id': ['ID repetido en el lote.']}}
+            continue
+        gasto = existentes.get(pk)
+        if gasto is None:
+            resultados[indice] = {'indice': indice, 'estado': 404, 'id': pk}
+            continue
+        errores = _asignar_referencias(datos, resueltas)
+        if errores:
+            resultados[indice] = {'indice': indice, 'estado': 400, 'errores': errores}
+            continue
+        for campo, valor in datos.items():
+            setattr(gasto, campo, valor)
+        vistos.add(pk)
+        campos.update(datos)
+        modificados.append((indice, gasto))
+
+    if modificados and campos:
+        # bulk_update no aplica auto_now
+        ahora = timezone.now()
+        for _, gasto in modificados:
+            gasto.updated_at = ahora
+        with transaction.atomic():
+            Gasto.objects.bulk_update([gasto for _, gasto in modificados], sorted(campos | {'updated_at'}))
+            registrar_cambios(usuario.pk, 'gastos', [gasto.pk for _, gasto in modificados])
+    for indice, gasto in modificados:
+        resultados[indice] = {'indice': indice, 'estado': 200, 'id': gasto.pk}
+    return resultados
+
+
+def _eliminar_sin_senales(usuario_id, ids):
+    """
+    Borra los gastos ``ids`` con un único DELETE y registra las bajas en un
+    solo INSERT: ``QuerySet.delete()`` enviaría ``pre_delete``/``post_delete``
+    por fila y el registro de cambios haría un INSERT por gasto.
+    """
+    relaciones = Gasto._meta.related_objects
+    if any(relacion.on_delete is not SET_NULL for relacion in relaciones):
+        # Una cascada necesita el Collector: se borra por el camino normal
+        Gasto.objects.filter(pk__in=ids).delete()
+        return
+    # Las filas que quedan en NULL se leen antes del UPDATE (como en la señal)
+    filas = filas_set_null(Gasto, ids)
+    for relacion in relaciones:
+        nombre = relacion.field.name
+        relacion.related_model._base_manager.filter(**{f'{nombre}__in': ids}).update(**{nombre: None})
+    Gasto.objects.filter(pk__in=ids)._raw_delete(Gasto.objects.db)
+    registrar_filas(filas)
+    registrar_cambios(usuario_id, 'gastos', ids, Cambio.ELIMINADO)
+
+
+def eliminar_gastos_en_lote(usuario, ids):
+    """Elimina varios gastos propios con un único DELETE."""
+    _validar_tamano(ids)
+    if not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids):
+        raise ErrorLote('Los IDs deben ser enteros.')
+
+    with transaction.atomic():
+        existentes = set(Gasto.objects.filter(usuario=usuario, id__in=ids).values_list('id', flat=True))
+        if existentes:
+            _eliminar_sin_senales(usuario.pk, sorted(existentes))
+    return [
+        {'indice': indice, 'estado': 204 if pk in existentes else 404, 'id': pk}
+        for indice, pk in enumerate(ids)
+    ]
+
+
+def _buscar_tienda(usuario, nombre):
+    # Lower() de ambos lados para que la comparación la haga la base y use el
+    # índice único (usuario, lower(nombre)); iexact no lo aprovecha
+    return (
+        Tienda.objects.alias(nombre_minusculas=Lower('nombre'))
+        .filter(usuario=usuario, nombre_minusculas=Lower(Value(nombre)))
+        .first()
+    )
+
+
+def resolver_tienda(usuario, nombre):
+    """
+    Tienda del usuario con ``nombre`` (sin distinguir mayúsculas), creándola
+    si no existe. Devuelve ``None`` si el nombre está vacío.
+
+    El alta es un upsert (``ON CONFLICT DO NOTHING``) contra el índice único,
+    así que dos requests concurrentes con el mismo comercio no duplican la
+    tienda ni fallan. Cada resolución cuenta como un uso para el ranking del
+    autocompletado.
+    """
+    nombre = (nombre or '').strip()
+    if not nombre or usuario is None:
+        return None
+    tienda = _buscar_tienda(usuario, nombre)
+    if tienda is None:
+        nueva = Tienda(usuario=usuario, nombre=nombre, nombre_normalizado=normalizar_nombre(nombre))
+        Tienda.objects.bulk_create([nueva], ignore_conflicts=True)
+        tienda = _buscar_tienda(usuario, nombre)
+    tienda.ultimo_uso = timezone.now()
+    Tienda.objects.filter(pk=tienda.pk).update(usos=F('usos') + 1, ultimo_uso=tienda.ultimo_uso)
+    return tienda
+
+
+def _contar_usos(tienda_ids):
+    """Suma un uso por gasto a cada tienda, como ``resolver_tienda`` en el alta individual."""
+    usos = {}
+    for tienda_id in tienda_ids:
+        if tienda_id is not None:
+            usos[tienda_id] = usos.get(tienda_id, 0) + 1
+    ahora = timezone.now()
+    for tienda_id, cantidad in usos.items():
+        Tienda.objects.filter(pk=tienda_id).update(usos=F('usos') + cantidad, ultimo_uso=ahora)
+
+
+def autocompletar_tiendas(usuario, texto, limite):
+    """
+    Hasta ``limite`` tiendas del usuario cuyo nombre normalizado empieza con
+    ``texto``, las más usadas y recientes primero. Sin texto devuelve las
+    favoritas.
+    """
+    tiendas = Tienda.objects.filter(usuario=usuario)
+    prefijo = normalizar_nombre(texto)
+    if prefijo:
+        tiendas = tiendas.filter(nombre_normalizado__startswith=prefijo)
+    return list(
+        tiendas.order_by('-usos', F('ultimo_uso').desc(nulls_last=True), 'nombre')
+        .values('id', 'nombre')[:limite]
+    )
+
+
+def crear_compra(usuario, fecha, lugar, cuenta, moneda, items):
+    """
+    Crea una compra global con sus ítems en una cantidad fija de consultas.
+
+    ``items`` son instancias de ``Gasto`` sin guardar (p.ej. de
+    ``form.save(commit=False)``) con ``monto`` ya calculado; los datos de
+    encabezado se les asignan acá. Si no hay ítems no se crea nada y se
+    devuelve ``None``.
+    """
+    if not items:
+        return None
+    with transaction.atomic():
+        tienda = resolver_tienda(usuario, lugar)
+        lugar = tienda.nombre if tienda else ''
+        compra = Compra.objects.create(
+            usuario=usuario, fecha=fecha, lugar=lugar, tienda=tienda, cuenta=cuenta, moneda=moneda,
+        )
+        for gasto in items:
+            gasto.usuario = usuario
+            gasto.fecha = fecha
+            gasto.lugar = lugar
+            gasto.tienda = tienda
+            gasto.cuenta = cuenta
+            gasto.moneda = moneda
+            gasto.compra = compra
+        creados = Gasto.objects.bulk_create(items)
+        registrar_cambios(usuario.pk, 'gastos', [gasto.pk for gasto in creados])
+    return compra
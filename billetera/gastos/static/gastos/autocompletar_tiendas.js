@@ -0,0 +1,58 @@
+// Completa el <datalist data-autocompletar="url"> con sugerencias del servidor
+// a medida que se escribe, en lugar de embeber todas las tiendas en la página.
+(function () {
+    'use strict';
+
+    var ESPERA_MS = 150;
+
+    function conectar(lista) {
+        var url = lista.dataset.autocompletar;
+        var campos = document.querySelectorAll('input[list="' + lista.id + '"]');
+        var temporizador = null;
+        var ultimoTexto = null;
+        var controlador = null;
+
+        function cargar(texto) {
+            if (texto === ultimoTexto) {
+                return;
+            }
+            ultimoTexto = texto;
+            if (controlador) {
+                controlador.abort();
+            }
+            controlador = new AbortController();
+            fetch(url + '?q=' + encodeURIComponent(texto), {
+                credentials: 'same-origin',
+                headers: {'Accept': 'application/json'},
+                signal: controlador.signal
+            })
+                .then(function (respuesta) { return respuesta.ok ? respuesta.json() : {resultados: []}; })
+                .then(function (datos) {
+                    lista.replaceChildren.apply(lista, datos.resultados.map(function (tienda) {
+                        var opcion = document.createElement('option');
+                        opcion.value = tienda.nombre;
+                        return opcion;
+                    }));
+                })
+                .catch(function () { /* búsqueda reemplazada o sin conexión */ });
+        }
+
+        campos.forEach(function (campo) {
+            campo.addEventListener('focus', function () { cargar(campo.value.trim()); });
+            campo.addEventListener('input', function () {
+                clearTimeout(temporizador);
+                temporizador = setTimeout(function () { cargar(campo.value.trim()); }, ESPERA_MS);
+            });
+        });
+    }
+
+    function iniciar() {
+        document.querySelectorAll('datalist[data-autocompletar]').forEach(conectar);
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', iniciar);
+    } else {
+        iniciar();
+    }
+})();
@@ -0,0 +1,273 @@
+import io
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cuentas.models import Cuenta, TransferenciaCuenta
+from sincronizacion.models import Cambio
+from .models import Gasto, Categoria, Moneda, Compra, Tienda
+
+
+class GastoApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='api-gastos', password='pass-123')
+        self.otro = User.objects.create_user(username='api-otro', password='pass-123')
+        self.moneda = Moneda.objects.get(codigo='ARS')
+        self.categoria = Categoria.objects.create(nombre='Comida')
+        self.cuenta = Cuenta.objects.create(usuario=self.user, nombre='Banco', moneda=self.moneda)
+        self.cuenta_ajena = Cuenta.objects.create(usuario=self.otro, nombre='Ajena', moneda=self.moneda)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_lista_paginada_por_cursor_y_solo_propios(self):
+        for i in range(3):
+            Gasto.objects.create(usuario=self.user, descripcion=f'G{i}', monto=Decimal('10'), moneda=self.moneda)
+        Gasto.objects.create(usuario=self.otro, descripcion='Ajeno', monto=Decimal('10'), moneda=self.moneda)
+
+        response = self.client.get('/gastos/api/', {'page_size': 2})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNotNone(data['next'])
+        self.assertNotIn('count', data)
+        siguiente = self.client.get(data['next']).json()
+        descripciones = {g['descripcion'] for g in data['results'] + siguiente['results']}
+        self.assertEqual(descripciones, {'G0', 'G1', 'G2'})
+
+    def test_filtros_por_rango_de_fechas(self):
+        ahora = timezone.now()
+        for dias, descripcion in ((0, 'Hoy'), (3, 'Hace 3'), (10, 'Hace 10')):
+            Gasto.objects.create(usuario=self.user, descripcion=descripcion, monto=Decimal('1'),
+                                 moneda=self.moneda, fecha=ahora - timedelta(days=dias))
+
+        def descripciones(**params):
+            return {g['descripcion'] for g in self.client.get('/gastos/api/', params).json()['results']}
+
+        desde = timezone.localdate(ahora - timedelta(days=5)).isoformat()
+        hasta = timezone.localdate(ahora - timedelta(days=3)).isoformat()
+        self.assertEqual(descripciones(fecha_desde=desde), {'Hoy', 'Hace 3'})
+        # Con sólo fecha, 'hasta' incluye el día completo
+        self.assertEqual(descripciones(fecha_hasta=hasta), {'Hace 3', 'Hace 10'})
+        self.assertEqual(descripciones(fecha=hasta), {'Hace 3'})
+
+        response = self.client.get('/gastos/api/', {'fecha_desde': 'ayer'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_filtros_por_cuenta_moneda_y_compra(self):
+        usd = Moneda.objects.get(codigo='USD')
+        compra = Compra.objects.create(usuario=self.user, moneda=self.moneda)
+        Gasto.objects.create(usuario=self.user, descripcion='Cuenta', monto=Decimal('1'), moneda=self.moneda, cuenta=self.cuenta)
+        Gasto.objects.create(usuario=self.user, descripcion='Dólares', monto=Decimal('1'), moneda=usd)
+        Gasto.objects.create(usuario=self.user, descripcion='Ítem', monto=Decimal('1'), moneda=self.moneda, compra=compra)
+
+        def descripciones(**params):
+            return [g['descripcion'] for g in self.client.get('/gastos/api/', params).json()['results']]
+
+        self.assertEqual(descripciones(cuenta=self.cuenta.id), ['Cuenta'])
+        self.assertEqual(descripciones(moneda=usd.id), ['Dólares'])
+        self.assertEqual(descripciones(compra=compra.id), ['Ítem'])
+
+    def test_superusuario_tambien_paginado(self):
+        admin = User.objects.create_superuser(username='api-admin', password='pass-123')
+        for i in range(3):
+            Gasto.objects.create(usuario=self.otro, descripcion=f'G{i}', monto=Decimal('1'), moneda=self.moneda)
+        self.client.force_authenticate(admin)
+
+        data = self.client.get('/gastos/api/', {'page_size': 2}).json()
+
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNotNone(data['next'])
+
+    def test_crear_gasto_asigna_usuario(self):
+        response = self.client.post('/gastos/api/', {
+            'descripcion': 'Taxi', 'monto': '500.00', 'moneda': self.moneda.id,
+            'categoria': self.categoria.id, 'cuenta': self.cuenta.id,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['moneda_codigo'], 'ARS')
+        self.assertEqual(Gasto.objects.get(descripcion='Taxi').usuario, self.user)
+
+    def test_no_permite_cuenta_ajena(self):
+        response = self.client.post('/gastos/api/', {
+            'descripcion': 'Taxi', 'monto': '500.00', 'cuenta': self.cuenta_ajena.id,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('cuenta', response.json())
+
+    def test_crear_compra_con_items_anidados(self):
+        response = self.client.post('/gastos/api/compras/', {
+            'lugar': 'Super', 'cuenta': self.cuenta.id, 'moneda': self.moneda.id,
+            'items': [
+                {'descripcion': 'Leche', 'categoria': self.categoria.id, 'cantidad': 2, 'monto': '300.00'},
+                {'descripcion': 'Pan', 'monto': '150.00'},
+            ],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        compra = Compra.objects.get(usuario=self.user)
+        self.assertEqual(compra.items.count(), 2)
+        self.assertTrue(all(item.cuenta_id == self.cuenta.id for item in compra.items.all()))
+
+        detalle = self.client.get(f'/gastos/api/compras/{compra.id}/').json()
+        self.assertEqual(Decimal(detalle['total']), Decimal('450.00'))
+        self.assertEqual(detalle['items_count'], 2)
+
+    def test_compra_ajena_no_visible(self):
+        compra = Compra.objects.create(usuario=self.otro, moneda=self.moneda)
+        response = self.client.get(f'/gastos/api/compras/{compra.id}/')
+        self.assertEqual(response.status_code, 404)
+
+
+class GastoBulkApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='api-bulk', password='pass-123')
+        self.otro = User.objects.create_user(username='api-bulk-otro', password='pass-123')
+        self.moneda = Moneda.objects.get(codigo='ARS')
+        self.categoria = Categoria.objects.create(nombre='Comida')
+        self.cuenta = Cuenta.objects.create(usuario=self.user, nombre='Banco', moneda=self.moneda)
+        self.cuenta_ajena = Cuenta.objects.create(usuario=self.otro, nombre='Ajena', moneda=self.moneda)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_alta_en_lote_con_consultas_acotadas(self):
+        items = [
+            {'descripcion': f'Offline {i}', 'monto': '10.00', 'moneda': self.moneda.id,
+             'categoria': self.categoria.id, 'cuenta': self.cuenta.id}
+            for i in range(20)
+        ]
+        # Consultas constantes sin importar el tamaño del lote
+        with self.assertNumQueries(7):
+            response = self.client.post('/gastos/api/bulk/', items, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Gasto.objects.filter(usuario=self.user, cuenta=self.cuenta).count(), 20)
+        self.assertTrue(all(r['estado'] == 201 and r['id'] for r in response.json()['resultados']))
+
+    def test_resultados_parciales(self):
+        response = self.client.post('/gastos/api/bulk/', {'items': [
+            {'descripcion': 'Bien', 'monto': '5.00'},
+            {'descripcion': 'Sin monto'},
+            {'descripcion': 'Cuenta ajena', 'monto': '5.00', 'cuenta': self.cuenta_ajena.id},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 207)
+        estados = [r['estado'] for r in response.json()['resultados']]
+        self.assertEqual(estados, [201, 400, 400])
+        self.assertEqual(list(Gasto.objects.values_list('descripcion', flat=True)), ['Bien'])
+
+    def test_edicion_y_baja_en_lote(self):
+        propio = Gasto.objects.create(usuario=self.user, descripcion='A', monto=Decimal('1'), moneda=self.moneda)
+        ajeno = Gasto.objects.create(usuario=self.otro, descripcion='B', monto=Decimal('1'), moneda=self.moneda)
+
+        response = self.client.patch('/gastos/api/bulk/', [
+            {'id': propio.id, 'monto': '7.50', 'categoria': self.categoria.id},
+            {'id': ajeno.id, 'monto': '99.00'},
+        ], format='json')
+        self.assertEqual(response.status_code, 207)
+        propio.refresh_from_db()
+        ajeno.refresh_from_db()
+        self.assertEqual((propio.monto, propio.categoria), (Decimal('7.50'), self.categoria))
+        self.assertEqual(ajeno.monto, Decimal('1'))
+
+        response = self.client.delete('/gastos/api/bulk/', {'ids': [propio.id, ajeno.id]}, format='json')
+        self.assertEqual([r['estado'] for r in response.json()['resultados']], [204, 404])
+        self.assertFalse(Gasto.objects.filter(id=propio.id).exists())
+        self.assertTrue(Gasto.objects.filter(id=ajeno.id).exists())
+
+    def test_alta_en_lote_cuenta_usos_de_tiendas(self):
+        tienda = Tienda.objects.create(usuario=self.user, nombre='Coto')
+        items = [{'descripcion': f'Item {i}', 'monto': '1.00', 'tienda': tienda.id} for i in range(3)]
+
+        self.client.post('/gastos/api/bulk/', items, format='json')
+
+        tienda.refresh_from_db()
+        self.assertEqual(tienda.usos, 3)
+        self.assertIsNotNone(tienda.ultimo_uso)
+
+    def test_baja_en_lote_registra_bajas_en_un_insert(self):
+        gastos = [
+            Gasto.objects.create(usuario=self.user, descripcion=f'G{i}', monto=Decimal('1'), moneda=self.moneda)
+            for i in range(10)
+        ]
+        otra = Cuenta.objects.create(usuario=self.user, nombre='Efectivo', moneda=self.moneda)
+        transferencia = TransferenciaCuenta.objects.create(
+            usuario=self.user, cuenta_origen=self.cuenta, cuenta_destino=otra,
+            monto_origen=Decimal('1'), monto_destino=Decimal('1'), gasto=gastos[0],
+        )
+        Cambio.objects.all().delete()
+
+        # SAVEPOINT, ids, 2 x (filas SET_NULL, UPDATE), DELETE, INSERT SET_NULL, INSERT bajas, RELEASE:
+        # no depende de la cantidad de gastos
+        with self.assertNumQueries(10):
+            response = self.client.delete('/gastos/api/bulk/', {'ids': [g.id for g in gastos]}, format='json')
+
+        self.assertEqual({r['estado'] for r in response.json()['resultados']}, {204})
+        self.assertFalse(Gasto.objects.filter(usuario=self.user).exists())
+        transferencia.refresh_from_db()
+        self.assertIsNone(transferencia.gasto_id)
+        self.assertEqual(
+            set(Cambio.objects.filter(recurso='gastos', operacion=Cambio.ELIMINADO).values_list('objeto_id', flat=True)),
+            {g.id for g in gastos},
+        )
+        self.assertTrue(Cambio.objects.filter(recurso='transferencias', objeto_id=transferencia.id).exists())
+
+    def test_rechaza_lote_que_supera_el_maximo(self):
+        with self.settings(GASTOS_LOTE_MAXIMO=2):
+            response = self.client.post('/gastos/api/bulk/', [{'descripcion': 'x', 'monto': '1'}] * 3, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Gasto.objects.exists())
+
+
+class SerializacionRapidaTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='api-rapida', password='pass-123')
+        self.moneda = Moneda.objects.get(codigo='ARS')
+        self.categoria = Categoria.objects.create(nombre='Comida')
+        self.cuenta = Cuenta.objects.create(usuario=self.user, nombre='Banco', moneda=self.moneda)
+        for i in range(3):
+            Gasto.objects.create(usuario=self.user, descripcion=f'G{i}', monto=Decimal('10.5'), moneda=self.moneda,
+                                 categoria=self.categoria, cuenta=self.cuenta if i else None)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_listado_desde_values_igual_al_serializer(self):
+        from rest_framework.test import APIRequestFactory
+        from .serializers import GastoSerializer
+
+        results = self.client.get('/gastos/api/').json()['results']
+
+        request = APIRequestFactory().get('/gastos/api/')
+        esperado = GastoSerializer(Gasto.objects.order_by('-fecha', '-id'), many=True, context={'request': request}).data
+        self.assertEqual(results, [dict(d) for d in esperado])
+
+    def test_fieldset_parcial(self):
+        results = self.client.get('/gastos/api/', {'fields': 'id,monto,moneda_codigo'}).json()['results']
+        self.assertEqual(set(results[0]), {'id', 'monto', 'moneda_codigo'})
+
+        detalle = self.client.get(f"/gastos/api/{results[0]['id']}/", {'fields': 'descripcion'}).json()
+        self.assertEqual(list(detalle), ['descripcion'])
+
+    def test_renderer_rapido_equivalente(self):
+        from rest_framework.renderers import JSONRenderer
+        from billetera.renderers import JSONRapidoRenderer
+        import json
+
+        datos = {'monto': Decimal('10.50'), 'fecha': timezone.now(), 'lista': [1, 'dos', None]}
+        self.assertEqual(
+            json.loads(JSONRapidoRenderer().render(datos)),
+            json.loads(JSONRenderer().render({**datos, 'monto': '10.50'})),
+        )
+
+    def test_benchmark(self):
+        salida = io.StringIO()
+        call_command('benchmark_serializacion', cantidad=50, repeticiones=1, stdout=salida)
+        self.assertIn('Misma salida serializer/.values(): sí', salida.getvalue())
+        self.assertEqual(Gasto.objects.count(), 3)
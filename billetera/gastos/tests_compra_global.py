@@ -1,7 +1,10 @@
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
-from .models import Gasto, Categoria, Moneda, Compra
+from .models import Gasto, Categoria, Moneda, Compra, Tienda
+from . import services
+from .services import resolver_tienda
+from sincronizacion.models import Cambio
 from cuentas.models import Cuenta, TipoCuenta
 from decimal import Decimal
 from django.utils import timezone
@@ -210,3 +213,63 @@ class CompraGlobalTestCase(TestCase):
         # Verificar que ambos pertenecen a la misma compra
         self.assertEqual(zapatos.compra, medias.compra)
         self.assertIsNotNone(zapatos.compra)
+
+    def _datos_compra(self, lugar, cantidad_items):
+        data = {
+            'fecha': timezone.now().strftime('%Y-%m-%dT%H:%M'),
+            'lugar': lugar,
+            'cuenta': self.cuenta.id,
+            'moneda': self.moneda.id,
+            'form-TOTAL_FORMS': str(cantidad_items),
+            'form-INITIAL_FORMS': '0',
+            'form-MIN_NUM_FORMS': '0',
+            'form-MAX_NUM_FORMS': '1000',
+        }
+        for i in range(cantidad_items):
+            data.update({
+                f'form-{i}-descripcion': f'Item {i}',
+                f'form-{i}-categoria': self.categoria.id,
+                f'form-{i}-cantidad': '1',
+                f'form-{i}-monto': '10.00',
+            })
+        return data
+
+    def test_crear_compra_consultas_constantes(self):
+        """Guardar un ticket de 40 ítems usa las mismas consultas que uno de 3"""
+        def items(cantidad):
+            return [Gasto(descripcion=f'Item {i}', categoria=self.categoria, monto=Decimal('10')) for i in range(cantidad)]
+
+        # Savepoint, tienda nueva (búsqueda, upsert, búsqueda, uso), compra + cambio, ítems + cambios
+        with self.assertNumQueries(10):
+            services.crear_compra(self.usuario, timezone.now(), 'Kiosco', self.cuenta, self.moneda, items(3))
+        with self.assertNumQueries(10):
+            services.crear_compra(self.usuario, timezone.now(), 'Mayorista', self.cuenta, self.moneda, items(40))
+
+        self.assertEqual(Gasto.objects.count(), 43)
+        # Los ítems creados en lote también quedan en el registro de cambios
+        self.assertEqual(Cambio.objects.filter(usuario=self.usuario, recurso='gastos').count(), 43)
+
+    def test_compra_global_reutiliza_tienda_sin_distinguir_mayusculas(self):
+        tienda = Tienda.objects.create(usuario=self.usuario, nombre='Carrefour')
+
+        self.client.post(reverse('gastos:compra_global'), self._datos_compra('  CARREFOUR ', 1))
+
+        compra = Compra.objects.get()
+        self.assertEqual(compra.tienda, tienda)
+        self.assertEqual(compra.lugar, 'Carrefour')
+        self.assertEqual(Tienda.objects.filter(usuario=self.usuario).count(), 1)
+
+    def test_compra_global_sin_items_no_crea_compra(self):
+        response = self.client.post(reverse('gastos:compra_global'), self._datos_compra('Vacía', 0))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Compra.objects.exists())
+
+    def test_resolver_tienda(self):
+        primera = resolver_tienda(self.usuario, 'Día')
+        self.assertEqual(resolver_tienda(self.usuario, 'día'), primera)
+        self.assertIsNone(resolver_tienda(self.usuario, '   '))
+
+        # Otro usuario tiene sus propias tiendas
+        otro = User.objects.create_user(username='otro', password='password')
+        self.assertNotEqual(resolver_tienda(otro, 'Día'), primera)
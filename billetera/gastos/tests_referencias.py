@@ -0,0 +1,85 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from billetera import referencias
+from cuentas.models import Cuenta
+from .forms import GastoForm
+from .models import Categoria, Moneda
+
+
+class RegistroReferenciasTests(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user(username='refs', password='password')
+        self.categoria = Categoria.objects.create(nombre='Almacén')
+        self.ars = Moneda.objects.get(codigo='ARS')
+        self.cuenta = Cuenta.objects.create(usuario=self.usuario, nombre='Efectivo', moneda=self.ars)
+        # Los datos de setUp quedan dentro de la transacción del test: se
+        # descarta la marca para poder medir la cache y se limpia al terminar
+        referencias.reiniciar()
+        self.addCleanup(referencias.reiniciar)
+
+    def test_formulario_sin_consultas_de_referencia(self):
+        str(GastoForm(user=self.usuario))
+
+        # Sólo queda la consulta de cuentas del usuario
+        with self.assertNumQueries(1):
+            html = str(GastoForm(user=self.usuario))
+        self.assertIn('Almacén', html)
+        self.assertIn(f'value="{self.ars.pk}" selected', html)
+
+    def test_cambios_invalidan_y_no_se_guardan_sin_confirmar(self):
+        referencias.CATEGORIAS.todos()
+        nueva = Categoria.objects.create(nombre='Farmacia')
+
+        self.assertIn(nueva, referencias.CATEGORIAS.todos())
+        # El alta sigue sin confirmar (transacción del test): no se cachea
+        with self.assertNumQueries(1):
+            referencias.CATEGORIAS.todos()
+
+        nueva.delete()
+        self.assertNotIn(nueva, referencias.CATEGORIAS.todos())
+
+    def test_obtener_o_crear(self):
+        referencias.CATEGORIAS.todos()
+        with self.assertNumQueries(0):
+            self.assertEqual(referencias.CATEGORIAS.obtener_o_crear('Almacén'), self.categoria)
+
+        creada = referencias.CATEGORIAS.obtener_o_crear('Deudas')
+        self.assertEqual(referencias.CATEGORIAS.por_clave('Deudas'), creada)
+
+    def test_campo_rechaza_opciones_inexistentes(self):
+        datos = {
+            'descripcion': 'Pan', 'cantidad': 1, 'monto': '10', 'descuento': '0',
+            'moneda': 999999, 'categoria': self.categoria.pk,
+            'fecha': timezone.now().strftime('%Y-%m-%dT%H:%M'), 'cuenta': self.cuenta.pk,
+        }
+        form = GastoForm(datos, user=self.usuario)
+
+        self.assertFalse(form.is_valid())
+        self.assertIn('moneda', form.errors)
+
+    def test_formset_de_compra_global_en_consultas_constantes(self):
+        def publicar(lugar, cantidad):
+            datos = {
+                'fecha': timezone.now().strftime('%Y-%m-%dT%H:%M'), 'lugar': lugar,
+                'cuenta': self.cuenta.pk, 'moneda': self.ars.pk,
+                'form-TOTAL_FORMS': str(cantidad), 'form-INITIAL_FORMS': '0',
+                'form-MIN_NUM_FORMS': '0', 'form-MAX_NUM_FORMS': '1000',
+            }
+            for i in range(cantidad):
+                datos.update({
+                    f'form-{i}-descripcion': f'Item {i}', f'form-{i}-categoria': self.categoria.pk,
+                    f'form-{i}-cantidad': '1', f'form-{i}-monto': '10.00',
+                })
+            with CaptureQueriesContext(connection) as consultas:
+                self.client.post(reverse('gastos:compra_global'), datos)
+            return len(consultas)
+
+        self.client.login(username='refs', password='password')
+        publicar('Calentamiento', 1)
+
+        self.assertEqual(publicar('Kiosco', 3), publicar('Mayorista', 40))
@@ -0,0 +1,64 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Tienda, normalizar_nombre
+from .services import resolver_tienda
+
+
+class AutocompletarTiendasTests(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user(username='tiendas', password='password')
+        self.client.login(username='tiendas', password='password')
+        self.url = reverse('gastos:autocompletar_tiendas')
+
+    def _nombres(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [t['nombre'] for t in response.json()['resultados']]
+
+    def test_normalizar_nombre(self):
+        self.assertEqual(normalizar_nombre('  Almacén   DON José '), 'almacen don jose')
+
+    def test_busqueda_por_prefijo_sin_acentos_ni_mayusculas(self):
+        Tienda.objects.create(usuario=self.usuario, nombre='Almacén Central')
+        Tienda.objects.create(usuario=self.usuario, nombre='Farmacia')
+        otro = User.objects.create_user(username='otro', password='password')
+        Tienda.objects.create(usuario=otro, nombre='Almacén Ajeno')
+
+        self.assertEqual(self._nombres(q='ALMACEN'), ['Almacén Central'])
+        self.assertEqual(self._nombres(q='macen'), [])
+
+    def test_ranking_por_usos_y_recencia(self):
+        Tienda.objects.create(usuario=self.usuario, nombre='Carrefour')
+        for _ in range(3):
+            resolver_tienda(self.usuario, 'Coto')
+        resolver_tienda(self.usuario, 'Cafetería')
+
+        self.assertEqual(self._nombres(q='c'), ['Coto', 'Cafetería', 'Carrefour'])
+        self.assertEqual(self._nombres(q='c', limit=1), ['Coto'])
+        # Sin texto devuelve las más usadas
+        self.assertEqual(self._nombres()[0], 'Coto')
+
+    def test_resolver_tienda_registra_uso(self):
+        antes = timezone.now()
+        resolver_tienda(self.usuario, 'Kiosco')
+        tienda = resolver_tienda(self.usuario, 'KIOSCO')
+
+        tienda.refresh_from_db()
+        self.assertEqual(tienda.usos, 2)
+        self.assertGreaterEqual(tienda.ultimo_uso, antes)
+        self.assertEqual(tienda.nombre_normalizado, 'kiosco')
+
+    def test_formularios_no_embeben_las_tiendas(self):
+        Tienda.objects.create(usuario=self.usuario, nombre='Tienda Embebida')
+
+        for nombre in ('gastos:crear_gasto', 'gastos:compra_global'):
+            response = self.client.get(reverse(nombre))
+            self.assertNotContains(response, 'Tienda Embebida')
+            self.assertContains(response, self.url)
+
+    def test_requiere_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
-from .api_views import GastoViewSet
+from .api_views import GastoViewSet, CompraViewSet
 
 # Router para las rutas de la API REST
+# 'compras' se registra antes que '' para que no lo capture el detalle de gasto
 router = DefaultRouter()
+router.register(r'compras', CompraViewSet, basename='compra')
 router.register(r'', GastoViewSet, basename='gasto')
 
 app_name = 'gastos'
@@ -18,6 +20,7 @@ urlpatterns = [
     path('', views.lista_gastos, name='lista_gastos'),
     path('crear/', views.crear_gasto, name='crear_gasto'),
     path('compra-global/', views.compra_global, name='compra_global'),
+    path('tiendas/autocompletar/', views.autocompletar_tiendas, name='autocompletar_tiendas'),
     path('compra/<int:pk>/detalle/', views.detalle_compra, name='detalle_compra'),
     path('compra/<int:pk>/editar/', views.editar_compra, name='editar_compra'),
     path('editar/<int:id>/', views.editar_gasto, name='editar_gasto'),
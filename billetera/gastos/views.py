@@ -1,15 +1,23 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from .models import Gasto, Compra, Tienda
+from .models import Gasto, Compra
 from .forms import GastoForm, CompraGlobalHeaderForm, CompraGlobalItemForm, CompraGlobalEditForm
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum
+from django.db.models import Prefetch, Sum
 from django.forms import formset_factory
 from django.db import transaction
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.template.loader import render_to_string
 from django.conf import settings
+from django.utils import timezone
 # import weasyprint  -- Moved inside the view to avoid dependency issues on dev
 from .filters import GastoFilter
+from . import services
+from sincronizacion.registro import registrar_cambios
+from billetera.condicional import condicional_libro
+from billetera.limites import limitar
+
+AUTOCOMPLETAR_LIMITE = 10
+AUTOCOMPLETAR_LIMITE_MAXIMO = 50
 
 
 # Función para obtener los gastos filtrados por usuario o superusuario
@@ -20,6 +28,8 @@ def obtener_gastos(request):
     else:
         # Los usuarios normales solo pueden ver sus propios gastos
         queryset = Gasto.objects.filter(usuario=request.user).order_by('-fecha')
+    # El listado y el PDF muestran categoría, cuenta y moneda de cada gasto
+    queryset = queryset.select_related('moneda', 'categoria', 'cuenta')
     
     # Aplicar filtros
     filter_set = GastoFilter(request.GET, queryset=queryset)
@@ -28,6 +38,7 @@ def obtener_gastos(request):
 
 # Lista de gastos
 @login_required  # Requiere que el usuario esté autenticado
+@condicional_libro()
 def lista_gastos(request):
     gastos_filter = obtener_gastos(request)  # Obtiene el objeto FilterSet
     gastos = gastos_filter.qs # Obtiene el queryset filtrado
@@ -37,7 +48,7 @@ def lista_gastos(request):
     totales_por_moneda = {}
     for gasto in gastos:
         # Excluir gastos que son transferencias
-        if hasattr(gasto, 'transferencias_generadas') and gasto.transferencias_generadas.exists():
+        if gasto.es_transferencia:
             continue
         codigo = gasto.moneda.codigo
         if codigo not in totales_por_moneda:
@@ -73,8 +84,7 @@ def crear_gasto(request):
     else:
         form = GastoForm(user=request.user)  # Crea un formulario de gasto vacío
     
-    tiendas = Tienda.objects.filter(usuario=request.user)
-    return render(request, 'gastos/crear_gasto.html', {'form': form, 'tiendas': tiendas})
+    return render(request, 'gastos/crear_gasto.html', {'form': form})
 
 
 # Editar gasto
@@ -93,8 +103,7 @@ def editar_gasto(request, id):
     else:
         form = GastoForm(instance=gasto, user=request.user)  # Crea un formulario con los datos del gasto para editar
     
-    tiendas = Tienda.objects.filter(usuario=request.user)
-    return render(request, 'gastos/editar_gasto.html', {'form': form, 'gasto': gasto, 'tiendas': tiendas})
+    return render(request, 'gastos/editar_gasto.html', {'form': form, 'gasto': gasto})
 
 
 # Eliminar gasto
@@ -118,18 +127,22 @@ def eliminar_gasto(request, id):
     return render(request, 'gastos/eliminar_gasto.html', {'gasto': gasto})
 
 
-@login_required
-def exportar_gastos_pdf(request):
-    import weasyprint
-    gastos_filter = obtener_gastos(request)
-    gastos = gastos_filter.qs
+def contexto_gastos_pdf(request):
+    """Contexto de ``gastos/reporte_pdf.html`` con los filtros del listado."""
+    gastos = obtener_gastos(request).qs
     total_general = gastos.aggregate(Sum('monto'))['monto__sum'] or 0
-    
-    html_string = render_to_string('gastos/reporte_pdf.html', {
+    return {
         'gastos': gastos,
         'total_general': total_general,
         'user': request.user,
-    })
+    }
+
+
+@login_required
+@limitar('pdf', pesado=True)
+def exportar_gastos_pdf(request):
+    import weasyprint
+    html_string = render_to_string('gastos/reporte_pdf.html', contexto_gastos_pdf(request))
 
     response = HttpResponse(content_type='application/pdf')
     response['Content-Disposition'] = 'inline; filename="reporte_gastos.pdf"'
@@ -148,74 +161,32 @@ def compra_global(request):
         item_formset = ItemFormSet(request.POST)
         
         if header_form.is_valid() and item_formset.is_valid():
-            try:
-                with transaction.atomic():
-                    header_data = header_form.cleaned_data
-
-                    # Resolver / crear Tienda (autocompletado de comercios)
-                    tienda = None
-                    lugar = (header_data.get('lugar') or '').strip()
-                    if lugar:
-                        tienda, _ = Tienda.objects.get_or_create(
-                            nombre__iexact=lugar,
-                            usuario=request.user,
-                            defaults={'nombre': lugar}
-                        )
-                        # Normalizar lugar con el nombre guardado
-                        lugar = tienda.nombre
-                    
-                    # Crear objeto Compra para agrupar los gastos
-                    compra = Compra.objects.create(
-                        usuario=request.user,
-                        fecha=header_data['fecha'],
-                        lugar=lugar or '',
-                        tienda=tienda,
-                        cuenta=header_data['cuenta'],
-                        moneda=header_data['moneda'],
-                    )
-                    
-                    items_created = 0
-                    for form in item_formset:
-                        if form.cleaned_data and not form.cleaned_data.get('DELETE', False):
-                            gasto = form.save(commit=False)
-                            gasto.usuario = request.user
-                            # Assign header fields
-                            gasto.fecha = header_data['fecha']
-                            gasto.lugar = lugar
-                            gasto.tienda = tienda
-                            gasto.cuenta = header_data['cuenta']
-                            gasto.moneda = header_data['moneda']
-                            # Asociar a la compra
-                            gasto.compra = compra
-
-                            # Calculate total amount (Unit Price * Quantity)
-                            unit_price = form.cleaned_data.get('monto')
-                            quantity = form.cleaned_data.get('cantidad', 1)
-                            if unit_price is not None and quantity:
-                                gasto.monto = unit_price * quantity
-
-                            gasto.save()
-                            items_created += 1
-                    
-                    # Si no se creó ningún item, eliminar la compra vacía
-                    if items_created == 0:
-                        compra.delete()
-                            
-                    return redirect('gastos:lista_gastos')
-            except Exception as e:
-                # Handle errors if needed
-                pass
+            header_data = header_form.cleaned_data
+            items = []
+            for form in item_formset:
+                if form.cleaned_data and not form.cleaned_data.get('DELETE', False):
+                    gasto = form.save(commit=False)
+                    # Monto total = precio unitario * cantidad
+                    unit_price = form.cleaned_data.get('monto')
+                    quantity = form.cleaned_data.get('cantidad', 1)
+                    if unit_price is not None and quantity:
+                        gasto.monto = unit_price * quantity
+                    items.append(gasto)
+
+            # Tienda, compra e ítems en una transacción y con un único INSERT para los ítems
+            services.crear_compra(
+                request.user, header_data['fecha'], header_data.get('lugar'),
+                header_data['cuenta'], header_data['moneda'], items,
+            )
+            return redirect('gastos:lista_gastos')
     else:
         header_form = CompraGlobalHeaderForm(user=request.user)
         ItemFormSet = formset_factory(CompraGlobalItemForm, extra=1)
         item_formset = ItemFormSet()
 
-    tiendas = Tienda.objects.filter(usuario=request.user)
-        
     return render(request, 'gastos/compra_global.html', {
         'header_form': header_form,
-        'item_formset': item_formset
-        , 'tiendas': tiendas
+        'item_formset': item_formset,
     })
 
 
@@ -233,18 +204,9 @@ def editar_compra(request, pk):
                 compra = form.save(commit=False)
 
                 # Resolver / crear Tienda desde lugar
-                tienda = None
-                lugar = (compra.lugar or '').strip()
-                if lugar:
-                    tienda, _ = Tienda.objects.get_or_create(
-                        nombre__iexact=lugar,
-                        usuario=compra.usuario,
-                        defaults={'nombre': lugar}
-                    )
-                    lugar = tienda.nombre
-
+                tienda = services.resolver_tienda(compra.usuario, compra.lugar)
                 compra.tienda = tienda
-                compra.lugar = lugar
+                compra.lugar = tienda.nombre if tienda else ''
                 compra.save()
 
                 # Propagar cambios a todos los ítems de la compra
@@ -254,20 +216,32 @@ def editar_compra(request, pk):
                     tienda=compra.tienda,
                     cuenta=compra.cuenta,
                     moneda=compra.moneda,
+                    updated_at=timezone.now(),
                 )
+                registrar_cambios(compra.usuario_id, 'gastos', compra.items.values_list('id', flat=True))
 
             return redirect('gastos:lista_gastos')
     else:
         form = CompraGlobalEditForm(instance=compra, user=request.user)
 
-    tiendas = Tienda.objects.filter(usuario=compra.usuario)
     return render(request, 'gastos/editar_compra.html', {
         'form': form,
         'compra': compra,
-        'tiendas': tiendas,
     })
 
 
+# Sugerencias de tiendas para los formularios (reemplaza el <datalist> con todas las tiendas)
+@login_required
+def autocompletar_tiendas(request):
+    try:
+        limite = int(request.GET.get('limit', AUTOCOMPLETAR_LIMITE))
+    except ValueError:
+        limite = AUTOCOMPLETAR_LIMITE
+    limite = max(1, min(limite, AUTOCOMPLETAR_LIMITE_MAXIMO))
+    resultados = services.autocompletar_tiendas(request.user, request.GET.get('q', ''), limite)
+    return JsonResponse({'resultados': resultados})
+
+
 # Detalle de compra (retorna HTML partial para modal)
 @login_required
 def detalle_compra(request, pk):
@@ -275,7 +249,12 @@ def detalle_compra(request, pk):
     Retorna un HTML partial con el detalle de una compra para ser
     cargado en un modal vía fetch.
     """
-    compra = get_object_or_404(Compra, pk=pk)
+    compra = get_object_or_404(
+        Compra.objects.select_related('cuenta', 'moneda').prefetch_related(
+            Prefetch('items', queryset=Gasto.objects.select_related('categoria'))
+        ),
+        pk=pk,
+    )
     
     # Verificar que el usuario sea el dueño o superusuario
     if not request.user.is_superuser and compra.usuario != request.user:
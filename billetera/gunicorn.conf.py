@@ -0,0 +1,156 @@
+"""
+Configuración de Gunicorn (se carga sola desde este directorio).
+
+Workers ``gthread``: cada proceso atiende varios requests en hilos, así que
+un PDF o un respaldo lento ocupa un hilo y no la instancia entera. La
+cantidad de procesos sale de las CPU disponibles, acotada por la memoria del
+contenedor (cgroup) para no disparar el OOM killer en instancias chicas.
+
+Los límites de tasa y de concurrencia (``billetera/limites.py``) y las
+versiones de la cache viven en ``CACHE_URL``. Con ``locmem://`` (el valor
+por defecto) cada proceso tendría los suyos: los límites se multiplicarían
+por la cantidad de workers y un worker seguiría sirviendo datos que otro ya
+invalidó. Por eso, sin una cache compartida se arranca un solo proceso (con
+sus hilos); si ``WEB_CONCURRENCY`` pide más, se avisa en el log.
+
+``preload_app`` importa Django una vez en el proceso maestro y los workers
+comparten esas páginas (copy-on-write). Las conexiones que el maestro haya
+abierto durante la importación se cierran antes de cada fork
+(``pre_fork``): un socket de base de datos no se puede compartir entre
+procesos.
+
+Con ``GUNICORN_MODO=asgi`` se sirve ``billetera.asgi`` con workers de
+uvicorn: las vistas async (webhook y pagos de Mercado Pago, backup) esperan
+a la red en el event loop en lugar de ocupar un hilo. Las vistas
+sincrónicas siguen funcionando; Django las corre en hilos.
+
+Todo se puede ajustar por variables de entorno:
+
+- ``PORT`` (8000), ``GUNICORN_BIND``
+- ``GUNICORN_MODO`` (``wsgi``): ``wsgi`` (``gthread``) o ``asgi`` (uvicorn).
+- ``WEB_CONCURRENCY``: procesos; si no está, se calcula (uno con
+  ``CACHE_URL=locmem://``).
+- ``GUNICORN_THREADS`` (4): hilos por proceso en modo ``wsgi``; con 1 se
+  usan workers ``sync``.
+- ``GUNICORN_MB_POR_WORKER`` (160): memoria estimada por proceso.
+- ``GUNICORN_PRELOAD`` (1)
+- ``GUNICORN_TIMEOUT`` (60), ``GUNICORN_GRACEFUL_TIMEOUT`` (30),
+  ``GUNICORN_KEEPALIVE`` (5)
+- ``GUNICORN_MAX_REQUESTS`` (1000), ``GUNICORN_MAX_REQUESTS_JITTER`` (100):
+  reciclan cada worker tras esa cantidad de requests (más un azar, para que
+  no se reinicien todos juntos) y acotan cualquier fuga de memoria.
+- ``GUNICORN_LOGLEVEL`` (info), ``GUNICORN_ACCESSLOG`` (``-``: stdout;
+  vacío lo desactiva)
+
+Con hilos, cada uno abre su propia conexión a la base (``CONN_MAX_AGE``):
+el total es procesos × hilos.
+"""
+import os
+
+
+def _entero(nombre, defecto):
+    valor = os.getenv(nombre, '')
+    return int(valor) if valor.strip() else defecto
+
+
+def _leer(ruta):
+    try:
+        with open(ruta) as archivo:
+            return archivo.read().strip()
+    except OSError:
+        return None
+
+
+def cpus_disponibles():
+    """CPU que puede usar el proceso: afinidad y cuota del cgroup, si la hay."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    # cgroup v2: "cuota periodo" o "max cuota"
+    cuota = (_leer('/sys/fs/cgroup/cpu.max') or '').split()
+    if len(cuota) == 2 and cuota[0] != 'max':
+        cpus = min(cpus, max(1, int(cuota[0]) // int(cuota[1])))
+    return max(1, cpus)
+
+
+def memoria_disponible_mb():
+    """Límite de memoria del cgroup (v2 o v1) o, sin límite, la memoria física."""
+    for ruta in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        valor = _leer(ruta)
+        # v1 informa "sin límite" con un número enorme
+        if valor and valor.isdigit() and int(valor) < 1 << 60:
+            return int(valor) // (1024 * 1024)
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def cache_compartida(url):
+    """Si la cache de ``CACHE_URL`` la ven todos los procesos (todo salvo ``locmem://``)."""
+    return (url or 'locmem://').split(':', 1)[0].lower() != 'locmem'
+
+
+def cantidad_workers(cpus, memoria_mb, mb_por_worker):
+    """``2 × CPU + 1`` procesos, sin pasar de los que entran en memoria (al menos uno)."""
+    workers = 2 * cpus + 1
+    if memoria_mb:
+        # El maestro precargado ocupa aproximadamente lo mismo que un worker
+        workers = min(workers, memoria_mb // mb_por_worker - 1)
+    return max(1, workers)
+
+
+bind = os.getenv('GUNICORN_BIND') or f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+compartida = cache_compartida(os.getenv('CACHE_URL'))
+workers = _entero('WEB_CONCURRENCY', 0) or (cantidad_workers(
+    cpus_disponibles(), memoria_disponible_mb(), _entero('GUNICORN_MB_POR_WORKER', 160),
+) if compartida else 1)
+threads = max(1, _entero('GUNICORN_THREADS', 4))
+
+modo = os.getenv('GUNICORN_MODO', 'wsgi').lower()
+if modo == 'asgi':
+    wsgi_app = 'billetera.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'billetera.wsgi:application'
+    worker_class = 'gthread' if threads > 1 else 'sync'
+
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1'
+
+timeout = _entero('GUNICORN_TIMEOUT', 60)
+graceful_timeout = _entero('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _entero('GUNICORN_KEEPALIVE', 5)
+
+max_requests = _entero('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _entero('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# El latido de los workers en disco puede trabarse en el overlay de Docker
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+loglevel = os.getenv('GUNICORN_LOGLEVEL', 'info')
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-') or None
+errorlog = '-'
+
+
+def when_ready(server):
+    server.log.info(
+        'Gunicorn (%s): %s workers %s × %s hilos, preload=%s, max_requests=%s±%s',
+        modo, workers, worker_class, threads, preload_app, max_requests, max_requests_jitter,
+    )
+    if workers > 1 and not compartida:
+        server.log.warning(
+            'CACHE_URL es locmem:// con %s workers: los límites de tasa y de concurrencia y las '
+            'versiones de la cache son por proceso. Configurá redis://, file:// o db://.', workers,
+        )
+
+
+def pre_fork(server, worker):
+    if not preload_app:
+        return
+    from django.db import connections
+
+    # Lo que haya abierto el maestro al importar no debe heredarse
+    connections.close_all()
@@ -0,0 +1,15 @@
+from rest_framework import viewsets
+
+from billetera.api import ListadoValoresMixin, PropietarioViewSetMixin
+from billetera.condicional import CondicionalViewSetMixin
+from .models import Ingreso
+from .serializers import IngresoSerializer
+
+
+# API REST para gestionar los ingresos
+class IngresoViewSet(CondicionalViewSetMixin, PropietarioViewSetMixin, ListadoValoresMixin, viewsets.ModelViewSet):
+    queryset = Ingreso.objects.select_related('moneda', 'categoria', 'cuenta')
+    serializer_class = IngresoSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(usuario=self.request.user)
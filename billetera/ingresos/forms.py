@@ -1,13 +1,15 @@
 from django import forms
 
-from .models import Ingreso, Moneda
+from billetera.referencias import ReferenciaChoiceField, ReferenciasFormMixin, moneda_por_defecto
+from .models import Ingreso
 from cuentas.models import Cuenta
 
 
-class IngresoForm(forms.ModelForm):
+class IngresoForm(ReferenciasFormMixin, forms.ModelForm):
     class Meta:
         model = Ingreso
         fields = ['descripcion', 'monto', 'moneda', 'categoria', 'fecha', 'cuenta']
+        field_classes = {'moneda': ReferenciaChoiceField, 'categoria': ReferenciaChoiceField}
         widgets = {
             'descripcion': forms.TextInput(attrs={
                 'class': 'form-control form-control-lg',
@@ -51,11 +53,11 @@ class IngresoForm(forms.ModelForm):
         self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         if self.user:
-            self.fields['cuenta'].queryset = Cuenta.objects.filter(usuario=self.user)
+            self.fields['cuenta'].queryset = Cuenta.objects.filter(usuario=self.user).select_related('moneda')
         
         # Prefill currency with ARS if not set
         if not self.instance.pk and not self.initial.get('moneda'):
-            ars = Moneda.objects.filter(codigo='ARS').first()
+            ars = moneda_por_defecto()
             if ars:
                 self.fields['moneda'].initial = ars.pk
 
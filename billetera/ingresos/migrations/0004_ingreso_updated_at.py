@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-19 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingresos', '0003_ingreso_cuenta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingreso',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.9 on 2026-10-19 12:11
+
+from django.db import migrations, models
+
+
+def marcar_transferencias(apps, schema_editor):
+    """Marca los movimientos que ya estaban vinculados a una ``TransferenciaCuenta``."""
+    Ingreso = apps.get_model('ingresos', 'Ingreso')
+    TransferenciaCuenta = apps.get_model('cuentas', 'TransferenciaCuenta')
+    vinculados = TransferenciaCuenta.objects.exclude(ingreso_id__isnull=True).values('ingreso_id')
+    Ingreso.objects.filter(pk__in=vinculados).update(es_transferencia=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingresos', '0004_ingreso_updated_at'),
+        ('cuentas', '0003_cuenta_updated_at_transferenciacuenta_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingreso',
+            name='es_transferencia',
+            field=models.BooleanField(default=False, help_text='Generado por una transferencia entre cuentas propias'),
+        ),
+        migrations.AddIndex(
+            model_name='ingreso',
+            index=models.Index(fields=['usuario', 'es_transferencia', 'fecha'], name='ingreso_usuario_transf_idx'),
+        ),
+        migrations.RunPython(marcar_transferencias, migrations.RunPython.noop),
+    ]
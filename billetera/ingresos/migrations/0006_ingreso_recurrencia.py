@@ -0,0 +1,29 @@
+# Generated by Django 4.2.9 on 2026-10-19 12:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recurrencias', '0001_initial'),
+        ('ingresos', '0005_es_transferencia'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingreso',
+            name='fecha_recurrencia',
+            field=models.DateField(blank=True, help_text='Ocurrencia de la recurrencia que generó este ingreso', null=True),
+        ),
+        migrations.AddField(
+            model_name='ingreso',
+            name='recurrencia',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ingresos', to='recurrencias.recurrencia'),
+        ),
+        migrations.AddConstraint(
+            model_name='ingreso',
+            constraint=models.UniqueConstraint(fields=('recurrencia', 'fecha_recurrencia'), name='ingreso_recurrencia_fecha_uniq'),
+        ),
+    ]
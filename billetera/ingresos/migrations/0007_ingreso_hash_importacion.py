@@ -0,0 +1,22 @@
+# Generated by Django 4.2.9 on 2026-10-19 12:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingresos', '0006_ingreso_recurrencia'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingreso',
+            name='hash_importacion',
+            field=models.CharField(blank=True, editable=False, help_text='Huella del movimiento importado de un extracto bancario', max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='ingreso',
+            constraint=models.UniqueConstraint(fields=('cuenta', 'hash_importacion'), name='ingreso_cuenta_hash_uniq'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 4.2.9 on 2026-10-19 12:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def unificar_monedas(apps, schema_editor):
+    """
+    Apunta cada ingreso a la moneda de gastos con el mismo código (creándola si
+    hace falta). Los ingresos cuyo ``moneda_id`` cambia quedan en el registro
+    de cambios para que los clientes sincronizados actualicen su copia.
+    """
+    MonedaIngreso = apps.get_model('ingresos', 'Moneda')
+    Moneda = apps.get_model('gastos', 'Moneda')
+    Ingreso = apps.get_model('ingresos', 'Ingreso')
+    Cambio = apps.get_model('sincronizacion', 'Cambio')
+
+    for anterior in MonedaIngreso.objects.all():
+        moneda, _ = Moneda.objects.get_or_create(
+            codigo=anterior.codigo, defaults={'nombre': anterior.nombre, 'simbolo': anterior.simbolo},
+        )
+        ingresos = Ingreso.objects.filter(moneda_id=anterior.pk)
+        if moneda.pk != anterior.pk:
+            filas = ingresos.exclude(usuario_id__isnull=True).order_by('pk').values_list('pk', 'usuario_id')
+            lote = []
+            for pk, usuario_id in filas.iterator(chunk_size=2000):
+                lote.append(Cambio(usuario_id=usuario_id, recurso='ingresos', objeto_id=pk, operacion='upsert'))
+                if len(lote) >= 2000:
+                    Cambio.objects.bulk_create(lote)
+                    lote = []
+            Cambio.objects.bulk_create(lote)
+        ingresos.update(moneda_unificada_id=moneda.pk)
+
+
+def separar_monedas(apps, schema_editor):
+    MonedaIngreso = apps.get_model('ingresos', 'Moneda')
+    Moneda = apps.get_model('gastos', 'Moneda')
+    Ingreso = apps.get_model('ingresos', 'Ingreso')
+
+    usadas = Ingreso.objects.exclude(moneda_unificada__isnull=True).values('moneda_unificada_id')
+    for moneda in Moneda.objects.filter(pk__in=usadas):
+        anterior, _ = MonedaIngreso.objects.get_or_create(
+            codigo=moneda.codigo, defaults={'nombre': moneda.nombre, 'simbolo': moneda.simbolo},
+        )
+        Ingreso.objects.filter(moneda_unificada_id=moneda.pk).update(moneda_id=anterior.pk)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gastos', '0016_gasto_hash_importacion'),
+        ('ingresos', '0007_ingreso_hash_importacion'),
+        ('sincronizacion', '0002_backfill_cambios'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingreso',
+            name='moneda_unificada',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ingresos', to='gastos.moneda'),
+        ),
+        migrations.RunPython(unificar_monedas, separar_monedas),
+        migrations.RemoveField(
+            model_name='ingreso',
+            name='moneda',
+        ),
+        migrations.RenameField(
+            model_name='ingreso',
+            old_name='moneda_unificada',
+            new_name='moneda',
+        ),
+        migrations.AddIndex(
+            model_name='ingreso',
+            index=models.Index(fields=['usuario', 'moneda', 'fecha'], name='ingreso_usuario_moneda_idx'),
+        ),
+        migrations.DeleteModel(
+            name='Moneda',
+        ),
+    ]
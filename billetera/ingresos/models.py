@@ -4,29 +4,16 @@ from django.db.models.signals import post_migrate
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 
-
-class Moneda(models.Model):
-    nombre = models.CharField(max_length=30)
-    codigo = models.CharField(max_length=3, unique=True)
-    simbolo = models.CharField(max_length=5)
-
-    def __str__(self):
-        return self.nombre
+# Gastos e ingresos comparten la tabla de monedas; el nombre se conserva por
+# compatibilidad con el código que importaba ``ingresos.models.Moneda``.
+from gastos.models import Moneda  # noqa: F401
 
 
 # Para crear información automática a la base de datos
 @receiver(post_migrate)
 def create_initial_data(sender, **kwargs):
     if sender.name == 'ingresos':
-        # Crea instancias de Moneda si no existen
-        if not Moneda.objects.filter(codigo='USD').exists():
-            Moneda.objects.create(codigo='USD', nombre='Dólar Estadounidense', simbolo='$')
-        if not Moneda.objects.filter(codigo='EUR').exists():
-            Moneda.objects.create(codigo='EUR', nombre='Euro', simbolo='€')
-        if not Moneda.objects.filter(codigo='ARS').exists():
-            Moneda.objects.create(codigo='ARS', nombre='Peso Argentino', simbolo='$')
-        if not Moneda.objects.filter(codigo='CLP').exists():
-            Moneda.objects.create(codigo='CLP', nombre='Peso Chileno', simbolo='$')
+        # Las monedas las crea gastos (gastos/signals.py)
         # Crea instancias de Categoría si no existen
         categorias = ['Salario',
                       'Regalos',
@@ -53,9 +40,27 @@ class Ingreso(models.Model):
     descripcion = models.CharField(max_length=255)
     monto = models.DecimalField(max_digits=10, decimal_places=2)
     fecha = models.DateTimeField(default=timezone.now)
-    moneda = models.ForeignKey(Moneda, on_delete=models.CASCADE, null=True, blank=True, related_name='ingresos')
+    moneda = models.ForeignKey('gastos.Moneda', on_delete=models.CASCADE, null=True, blank=True, related_name='ingresos')
     categoria = models.ForeignKey(CategoriaIngreso, on_delete=models.CASCADE, null=True, blank=True, related_name='ingresos')
     cuenta = models.ForeignKey('cuentas.Cuenta', on_delete=models.SET_NULL, null=True, blank=True, related_name='ingresos')
+    es_transferencia = models.BooleanField(default=False, help_text='Generado por una transferencia entre cuentas propias')
+    recurrencia = models.ForeignKey('recurrencias.Recurrencia', on_delete=models.SET_NULL, null=True, blank=True, related_name='ingresos')
+    fecha_recurrencia = models.DateField(null=True, blank=True, help_text='Ocurrencia de la recurrencia que generó este ingreso')
+    hash_importacion = models.CharField(max_length=64, null=True, blank=True, editable=False,
+                                        help_text='Huella del movimiento importado de un extracto bancario')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['usuario', 'es_transferencia', 'fecha'], name='ingreso_usuario_transf_idx'),
+            # Totales por moneda con el mismo id que los gastos (dashboard, saldos)
+            models.Index(fields=['usuario', 'moneda', 'fecha'], name='ingreso_usuario_moneda_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['recurrencia', 'fecha_recurrencia'], name='ingreso_recurrencia_fecha_uniq'),
+            # Deduplicación de extractos importados; también es el índice de la búsqueda
+            models.UniqueConstraint(fields=['cuenta', 'hash_importacion'], name='ingreso_cuenta_hash_uniq'),
+        ]
 
     def __str__(self):
         return f"{self.descripcion} - {self.monto} {self.moneda.simbolo}"
@@ -0,0 +1,25 @@
+from rest_framework import serializers
+
+from billetera.api import CamposDinamicosMixin, PropietarioPrimaryKeyField
+from cuentas.models import Cuenta
+from .models import Ingreso
+
+
+class IngresoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    cuenta = PropietarioPrimaryKeyField(queryset=Cuenta.objects.all(), required=False, allow_null=True)
+    moneda_codigo = serializers.CharField(source='moneda.codigo', read_only=True, default=None)
+    categoria_nombre = serializers.CharField(source='categoria.nombre', read_only=True, default=None)
+    cuenta_nombre = serializers.CharField(source='cuenta.nombre', read_only=True, default=None)
+
+    class Meta:
+        model = Ingreso
+        fields = [
+            'id', 'descripcion', 'monto', 'fecha', 'moneda', 'moneda_codigo',
+            'categoria', 'categoria_nombre', 'cuenta', 'cuenta_nombre', 'usuario', 'updated_at',
+        ]
+        read_only_fields = ['usuario', 'updated_at']
+
+    def validate_monto(self, monto):
+        if monto < 0:
+            raise serializers.ValidationError('El monto no puede ser negativo.')
+        return monto
@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import Ingreso, Moneda
+
+
+class IngresoApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='api-ingresos', password='pass-123')
+        self.otro = User.objects.create_user(username='api-otro', password='pass-123')
+        self.moneda = Moneda.objects.get(codigo='ARS')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_requiere_autenticacion(self):
+        response = APIClient().get('/ingresos/api/')
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_lista_solo_propios(self):
+        Ingreso.objects.create(usuario=self.user, descripcion='Sueldo', monto=Decimal('100'), moneda=self.moneda)
+        Ingreso.objects.create(usuario=self.otro, descripcion='Ajeno', monto=Decimal('100'), moneda=self.moneda)
+
+        results = self.client.get('/ingresos/api/').json()['results']
+
+        self.assertEqual([r['descripcion'] for r in results], ['Sueldo'])
+
+    def test_crear_y_rechazar_monto_negativo(self):
+        ok = self.client.post('/ingresos/api/', {'descripcion': 'Venta', 'monto': '10.00', 'moneda': self.moneda.id}, format='json')
+        mal = self.client.post('/ingresos/api/', {'descripcion': 'Venta', 'monto': '-1.00'}, format='json')
+
+        self.assertEqual(ok.status_code, 201)
+        self.assertEqual(mal.status_code, 400)
+        self.assertEqual(Ingreso.objects.get().usuario, self.user)
@@ -0,0 +1,83 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+
+class MonedaUnificadaMigracionTest(TransactionTestCase):
+    """``ingresos/0008_moneda_unificada``: remapeo de ids y registro de cambios."""
+
+    anterior = [
+        ('ingresos', '0007_ingreso_hash_importacion'),
+        ('gastos', '0016_gasto_hash_importacion'),
+        ('sincronizacion', '0002_backfill_cambios'),
+    ]
+    posterior = [('ingresos', '0008_moneda_unificada')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.anterior)
+        self.apps = executor.loader.project_state(self.anterior).apps
+
+    def tearDown(self):
+        # Deja la base en el último estado para los tests siguientes
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def _migrar(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.posterior)
+        return executor.loader.project_state(self.posterior).apps
+
+    def test_remapea_moneda_y_registra_cambios(self):
+        User = self.apps.get_model('auth', 'User')
+        MonedaGasto = self.apps.get_model('gastos', 'Moneda')
+        MonedaIngreso = self.apps.get_model('ingresos', 'Moneda')
+        Ingreso = self.apps.get_model('ingresos', 'Ingreso')
+
+        usuario = User.objects.create(username='migrado')
+        # Ids distintos para el mismo código en las dos tablas
+        MonedaGasto.objects.create(codigo='XAU', nombre='Oro', simbolo='Au')
+        destino = MonedaGasto.objects.create(codigo='CHF', nombre='Franco suizo', simbolo='Fr')
+        MonedaIngreso.objects.create(codigo='JPY', nombre='Yen', simbolo='¥')
+        anterior = MonedaIngreso.objects.create(codigo='CHF', nombre='Franco suizo', simbolo='Fr')
+        self.assertNotEqual(anterior.pk, destino.pk)
+        ingreso = Ingreso.objects.create(
+            usuario=usuario, descripcion='Cobro', monto=Decimal('10.00'),
+            fecha=timezone.now(), moneda_id=anterior.pk,
+        )
+
+        apps = self._migrar()
+
+        Ingreso = apps.get_model('ingresos', 'Ingreso')
+        Cambio = apps.get_model('sincronizacion', 'Cambio')
+        self.assertEqual(Ingreso.objects.get(pk=ingreso.pk).moneda_id, destino.pk)
+        self.assertTrue(Cambio.objects.filter(
+            usuario_id=usuario.pk, recurso='ingresos', objeto_id=ingreso.pk, operacion='upsert',
+        ).exists())
+        # Las monedas que sólo existían en ingresos se crean en la tabla compartida
+        self.assertTrue(apps.get_model('gastos', 'Moneda').objects.filter(codigo='JPY').exists())
+
+    def test_sin_remapeo_no_registra_cambios(self):
+        User = self.apps.get_model('auth', 'User')
+        MonedaGasto = self.apps.get_model('gastos', 'Moneda')
+        MonedaIngreso = self.apps.get_model('ingresos', 'Moneda')
+        Ingreso = self.apps.get_model('ingresos', 'Ingreso')
+        Cambio = self.apps.get_model('sincronizacion', 'Cambio')
+
+        usuario = User.objects.create(username='igual')
+        moneda = MonedaGasto.objects.create(pk=500, codigo='CHF', nombre='Franco suizo', simbolo='Fr')
+        MonedaIngreso.objects.create(pk=500, codigo='CHF', nombre='Franco suizo', simbolo='Fr')
+        ingreso = Ingreso.objects.create(
+            usuario=usuario, descripcion='Cobro', monto=Decimal('10.00'),
+            fecha=timezone.now(), moneda_id=500,
+        )
+        Cambio.objects.all().delete()
+
+        apps = self._migrar()
+
+        self.assertEqual(apps.get_model('ingresos', 'Ingreso').objects.get(pk=ingreso.pk).moneda_id, moneda.pk)
+        self.assertFalse(apps.get_model('sincronizacion', 'Cambio').objects.exists())
@@ -6,6 +6,7 @@ from django.db.models import Sum
 from .models import Ingreso
 from .forms import IngresoForm
 from .filters import IngresoFilter
+from billetera.condicional import condicional_libro
 
 
 # Vista para crear un nuevo ingreso
@@ -49,9 +50,10 @@ def eliminar_ingreso(request, ingreso_id):
 
 # Vista para listar los ingresos de un usuario
 @login_required
+@condicional_libro()
 def lista_ingresos(request):
     from decimal import Decimal
-    queryset = Ingreso.objects.filter(usuario=request.user).order_by('-fecha')
+    queryset = Ingreso.objects.filter(usuario=request.user).select_related('moneda', 'categoria', 'cuenta').order_by('-fecha')
     
     # Aplicar filtros
     ingresos_filter = IngresoFilter(request.GET, queryset=queryset)
@@ -61,7 +63,7 @@ def lista_ingresos(request):
     totales_por_moneda = {}
     for ingreso in ingresos:
         # Excluir ingresos que son transferencias
-        if hasattr(ingreso, 'transferencias_generadas') and ingreso.transferencias_generadas.exists():
+        if ingreso.es_transferencia:
             continue
         codigo = ingreso.moneda.codigo
         if codigo not in totales_por_moneda:
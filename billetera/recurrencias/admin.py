@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Recurrencia
+
+
+@admin.register(Recurrencia)
+class RecurrenciaAdmin(admin.ModelAdmin):
+    list_display = ('descripcion', 'usuario', 'tipo', 'monto', 'moneda', 'frecuencia', 'proxima', 'activa')
+    list_filter = ('tipo', 'frecuencia', 'activa')
+    search_fields = ('descripcion', 'usuario__username')
+    readonly_fields = ('proxima',)
@@ -0,0 +1,16 @@
+from rest_framework import viewsets
+
+from billetera.api import PropietarioViewSetMixin
+from billetera.condicional import CondicionalViewSetMixin
+from .models import Recurrencia
+from .serializers import RecurrenciaSerializer
+
+
+# Las ocurrencias se generan con el comando materializar_recurrencias
+class RecurrenciaViewSet(CondicionalViewSetMixin, PropietarioViewSetMixin, viewsets.ModelViewSet):
+    queryset = Recurrencia.objects.all()
+    serializer_class = RecurrenciaSerializer
+    cursor_ordering = ('id',)
+
+    def perform_create(self, serializer):
+        serializer.save(usuario=self.request.user)
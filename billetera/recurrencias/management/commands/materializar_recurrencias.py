@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from recurrencias.services import TAMANO_LOTE, materializar
+
+
+class Command(BaseCommand):
+    help = "Genera los gastos e ingresos vencidos de todas las recurrencias activas (pensado para un cron diario)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hasta', help='Fecha límite (YYYY-MM-DD); por defecto, hoy.')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help='Recurrencias por transacción.')
+
+    def handle(self, *args, **options):
+        hasta = None
+        if options['hasta']:
+            hasta = parse_date(options['hasta'])
+            if hasta is None:
+                raise CommandError(f"Fecha inválida: {options['hasta']}.")
+
+        totales = materializar(hasta=hasta, tamano_lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Recurrencias OK: {totales['recurrencias']} procesadas, "
+            f"{totales['gastos']} gastos y {totales['ingresos']} ingresos generados"
+        ))
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.9 on 2026-10-19 12:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('gastos', '0014_es_transferencia'),
+        ('ingresos', '0005_es_transferencia'),
+        ('cuentas', '0003_cuenta_updated_at_transferenciacuenta_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Recurrencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('GASTO', 'Gasto'), ('INGRESO', 'Ingreso')], max_length=10)),
+                ('descripcion', models.CharField(max_length=255)),
+                ('monto', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('frecuencia', models.CharField(choices=[('DIARIA', 'Diaria'), ('SEMANAL', 'Semanal'), ('MENSUAL', 'Mensual (mismo día que la fecha de inicio)'), ('DIA_DEL_MES', 'Día fijo del mes')], default='MENSUAL', max_length=12)),
+                ('intervalo', models.PositiveSmallIntegerField(default=1, help_text='Cada cuántos días, semanas o meses se repite')),
+                ('dia_del_mes', models.PositiveSmallIntegerField(blank=True, help_text='Para "Día fijo del mes"; 29-31 usan el último día en los meses más cortos', null=True)),
+                ('fecha_inicio', models.DateField(default=django.utils.timezone.localdate)),
+                ('fecha_fin', models.DateField(blank=True, null=True)),
+                ('proxima', models.DateField(blank=True, editable=False, null=True)),
+                ('activa', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('categoria', models.ForeignKey(blank=True, help_text='Categoría de los gastos generados', null=True, on_delete=django.db.models.deletion.SET_NULL, to='gastos.categoria')),
+                ('categoria_ingreso', models.ForeignKey(blank=True, help_text='Categoría de los ingresos generados', null=True, on_delete=django.db.models.deletion.SET_NULL, to='ingresos.categoriaingreso')),
+                ('cuenta', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recurrencias', to='cuentas.cuenta')),
+                ('moneda', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='gastos.moneda')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurrencias', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['proxima', 'id'],
+                'indexes': [models.Index(fields=['activa', 'proxima'], name='recurrencia_pendiente_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,140 @@
+import calendar
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils import timezone
+
+
+def _sumar_meses(fecha, meses, dia):
+    """Fecha ``meses`` después de ``fecha`` en el día ``dia`` (o el último del mes si no existe)."""
+    indice = fecha.year * 12 + fecha.month - 1 + meses
+    anio, mes = divmod(indice, 12)
+    mes += 1
+    return fecha.replace(year=anio, month=mes, day=min(dia, calendar.monthrange(anio, mes)[1]))
+
+
+class Recurrencia(models.Model):
+    """
+    Movimiento que se repite (alquiler, sueldo, suscripciones).
+
+    Los campos del movimiento (descripción, monto, moneda, categoría, cuenta)
+    son la plantilla con la que ``materializar_recurrencias`` genera cada
+    ocurrencia. ``proxima`` es la fecha de la siguiente ocurrencia pendiente
+    (``None`` cuando la regla ya terminó).
+    """
+    GASTO = 'GASTO'
+    INGRESO = 'INGRESO'
+    TIPO_CHOICES = [
+        (GASTO, 'Gasto'),
+        (INGRESO, 'Ingreso'),
+    ]
+
+    DIARIA = 'DIARIA'
+    SEMANAL = 'SEMANAL'
+    MENSUAL = 'MENSUAL'
+    DIA_DEL_MES = 'DIA_DEL_MES'
+    FRECUENCIA_CHOICES = [
+        (DIARIA, 'Diaria'),
+        (SEMANAL, 'Semanal'),
+        (MENSUAL, 'Mensual (mismo día que la fecha de inicio)'),
+        (DIA_DEL_MES, 'Día fijo del mes'),
+    ]
+
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='recurrencias')
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES)
+    descripcion = models.CharField(max_length=255)
+    monto = models.DecimalField(max_digits=10, decimal_places=2)
+    moneda = models.ForeignKey('gastos.Moneda', on_delete=models.PROTECT)
+    categoria = models.ForeignKey('gastos.Categoria', on_delete=models.SET_NULL, null=True, blank=True,
+                                  help_text='Categoría de los gastos generados')
+    categoria_ingreso = models.ForeignKey('ingresos.CategoriaIngreso', on_delete=models.SET_NULL, null=True, blank=True,
+                                          help_text='Categoría de los ingresos generados')
+    cuenta = models.ForeignKey('cuentas.Cuenta', on_delete=models.SET_NULL, null=True, blank=True, related_name='recurrencias')
+    frecuencia = models.CharField(max_length=12, choices=FRECUENCIA_CHOICES, default=MENSUAL)
+    intervalo = models.PositiveSmallIntegerField(default=1, help_text='Cada cuántos días, semanas o meses se repite')
+    dia_del_mes = models.PositiveSmallIntegerField(null=True, blank=True,
+                                                   help_text='Para "Día fijo del mes"; 29-31 usan el último día en los meses más cortos')
+    fecha_inicio = models.DateField(default=timezone.localdate)
+    fecha_fin = models.DateField(null=True, blank=True)
+    proxima = models.DateField(null=True, blank=True, editable=False)
+    activa = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['proxima', 'id']
+        indexes = [
+            # El scheduler busca las activas con una ocurrencia vencida
+            models.Index(fields=['activa', 'proxima'], name='recurrencia_pendiente_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.descripcion} ({self.get_frecuencia_display()})"
+
+    def clean(self):
+        errores = {}
+        if self.frecuencia == self.DIA_DEL_MES and not (self.dia_del_mes and 1 <= self.dia_del_mes <= 31):
+            errores['dia_del_mes'] = 'Indicá un día entre 1 y 31.'
+        if not self.intervalo:
+            errores['intervalo'] = 'El intervalo debe ser mayor a cero.'
+        if self.fecha_fin and self.fecha_inicio and self.fecha_fin < self.fecha_inicio:
+            errores['fecha_fin'] = 'La fecha de fin no puede ser anterior a la de inicio.'
+        if errores:
+            raise ValidationError(errores)
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.proxima is None:
+            self.proxima = self.primera_fecha()
+        super().save(*args, **kwargs)
+
+    def primera_fecha(self):
+        if self.frecuencia != self.DIA_DEL_MES:
+            return self.fecha_inicio
+        fecha = _sumar_meses(self.fecha_inicio, 0, self.dia_del_mes)
+        if fecha < self.fecha_inicio:
+            fecha = _sumar_meses(self.fecha_inicio, 1, self.dia_del_mes)
+        return fecha
+
+    def reprogramar(self):
+        """
+        Recalcula ``proxima`` después de cambiar la regla: la primera
+        ocurrencia de la nueva regla posterior a la última ya materializada.
+        """
+        ultimas = [
+            movimientos.aggregate(ultima=models.Max('fecha_recurrencia'))['ultima']
+            for movimientos in (self.gastos.all(), self.ingresos.all())
+        ] if self.pk else []
+        ultima = max((f for f in ultimas if f), default=None)
+        fecha = self.primera_fecha()
+        while ultima is not None and fecha <= ultima:
+            fecha = self.siguiente(fecha)
+        self.proxima = None if self.fecha_fin and fecha > self.fecha_fin else fecha
+
+    def siguiente(self, fecha):
+        """Ocurrencia que sigue a ``fecha``, sin tener en cuenta ``fecha_fin``."""
+        if self.frecuencia == self.DIARIA:
+            return fecha + timedelta(days=self.intervalo)
+        if self.frecuencia == self.SEMANAL:
+            return fecha + timedelta(weeks=self.intervalo)
+        # El día se toma siempre de la regla: después de un 28/02 vuelve al 31
+        dia = self.dia_del_mes if self.frecuencia == self.DIA_DEL_MES else self.fecha_inicio.day
+        return _sumar_meses(fecha, self.intervalo, dia)
+
+    def fechas_pendientes(self, hasta):
+        """
+        Ocurrencias desde ``proxima`` hasta ``hasta`` (inclusive) y la nueva
+        ``proxima`` (``None`` si la regla terminó).
+        """
+        fechas = []
+        fecha = self.proxima
+        while fecha is not None and fecha <= hasta:
+            if self.fecha_fin and fecha > self.fecha_fin:
+                fecha = None
+                break
+            fechas.append(fecha)
+            fecha = self.siguiente(fecha)
+        if fecha is not None and self.fecha_fin and fecha > self.fecha_fin:
+            fecha = None
+        return fechas, fecha
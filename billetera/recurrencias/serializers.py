@@ -0,0 +1,43 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+
+from billetera.api import CamposDinamicosMixin, PropietarioPrimaryKeyField
+from cuentas.models import Cuenta
+from .models import Recurrencia
+
+# Campos que definen cuándo ocurre la recurrencia
+CAMPOS_REGLA = ('frecuencia', 'intervalo', 'dia_del_mes', 'fecha_inicio', 'fecha_fin')
+
+
+class RecurrenciaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    cuenta = PropietarioPrimaryKeyField(queryset=Cuenta.objects.all(), required=False, allow_null=True)
+
+    class Meta:
+        model = Recurrencia
+        fields = [
+            'id', 'tipo', 'descripcion', 'monto', 'moneda', 'categoria', 'categoria_ingreso', 'cuenta',
+            'frecuencia', 'intervalo', 'dia_del_mes', 'fecha_inicio', 'fecha_fin', 'proxima', 'activa',
+            'usuario', 'updated_at',
+        ]
+        read_only_fields = ['proxima', 'usuario', 'updated_at']
+
+    def validate(self, attrs):
+        # Mismas reglas que Recurrencia.clean()
+        datos = {campo: getattr(self.instance, campo) for campo in CAMPOS_REGLA} if self.instance else {}
+        datos.update({campo: attrs[campo] for campo in CAMPOS_REGLA if campo in attrs})
+        try:
+            Recurrencia(**datos).clean()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.message_dict)
+        return attrs
+
+    def update(self, instance, validated_data):
+        cambio_regla = any(
+            campo in validated_data and validated_data[campo] != getattr(instance, campo) for campo in CAMPOS_REGLA
+        )
+        for campo, valor in validated_data.items():
+            setattr(instance, campo, valor)
+        if cambio_regla:
+            instance.reprogramar()
+        instance.save()
+        return instance
@@ -0,0 +1,138 @@
+"""
+Materialización de las recurrencias vencidas.
+
+``materializar`` recorre las recurrencias activas con ``proxima <= hasta`` en
+lotes (por ID, sin ``OFFSET``) y, por cada lote, en una transacción:
+
+- genera todos los gastos e ingresos pendientes con un ``bulk_create`` por
+  tabla, salteando las claves (recurrencia, fecha_recurrencia) que ya
+  existen: correr dos veces no duplica nada ni vuelve a contar o registrar
+  los movimientos existentes;
+- adelanta ``proxima`` (y desactiva las reglas terminadas) con un
+  ``bulk_update``;
+- registra movimientos y recurrencias en el registro de cambios con un único
+  INSERT, lo que también invalida los ETags y las estadísticas cacheadas.
+
+Los saldos de las cuentas se calculan en la consulta (``con_saldo``), así que
+no hay totales desnormalizados que actualizar aparte.
+"""
+from datetime import datetime, time
+
+from django.db import transaction
+from django.utils import timezone
+
+from gastos.models import Gasto
+from ingresos.models import Ingreso
+from sincronizacion.registro import registrar_filas
+
+from .models import Recurrencia
+
+TAMANO_LOTE = 500
+
+
+def _fecha_hora(fecha):
+    return timezone.make_aware(datetime.combine(fecha, time.min))
+
+
+def _gasto(recurrencia, fecha):
+    return Gasto(
+        usuario_id=recurrencia.usuario_id,
+        descripcion=recurrencia.descripcion,
+        monto=recurrencia.monto,
+        moneda_id=recurrencia.moneda_id,
+        categoria_id=recurrencia.categoria_id,
+        cuenta_id=recurrencia.cuenta_id,
+        fecha=_fecha_hora(fecha),
+        recurrencia=recurrencia,
+        fecha_recurrencia=fecha,
+    )
+
+
+def _ingreso(recurrencia, fecha):
+    return Ingreso(
+        usuario_id=recurrencia.usuario_id,
+        descripcion=recurrencia.descripcion,
+        monto=recurrencia.monto,
+        moneda_id=recurrencia.moneda_id,
+        categoria_id=recurrencia.categoria_ingreso_id,
+        cuenta_id=recurrencia.cuenta_id,
+        fecha=_fecha_hora(fecha),
+        recurrencia=recurrencia,
+        fecha_recurrencia=fecha,
+    )
+
+
+def _insertar(modelo, recurso, movimientos, tamano_lote):
+    """
+    Inserta los ``movimientos`` cuya clave (recurrencia, fecha_recurrencia)
+    todavía no existe; devuelve sólo las filas nuevas para el registro de
+    cambios.
+    """
+    if not movimientos:
+        return []
+    claves = {(m.recurrencia_id, m.fecha_recurrencia) for m in movimientos}
+    recurrencias = {r for r, _ in claves}
+    desde = min(f for _, f in claves)
+    existentes = set(
+        modelo.objects.filter(recurrencia_id__in=recurrencias, fecha_recurrencia__gte=desde)
+        .values_list('recurrencia_id', 'fecha_recurrencia')
+    )
+    nuevos = [m for m in movimientos if (m.recurrencia_id, m.fecha_recurrencia) not in existentes]
+    if not nuevos:
+        return []
+    # ignore_conflicts cubre una inserción concurrente entre la lectura y el INSERT
+    modelo.objects.bulk_create(nuevos, batch_size=tamano_lote, ignore_conflicts=True)
+    # Con ignore_conflicts no vuelven los IDs: se leen por la clave única
+    claves -= existentes
+    filas = modelo.objects.filter(
+        recurrencia_id__in=recurrencias, fecha_recurrencia__gte=desde,
+    ).values_list('usuario_id', 'id', 'recurrencia_id', 'fecha_recurrencia')
+    return [(usuario_id, recurso, pk) for usuario_id, pk, r, f in filas if (r, f) in claves]
+
+
+def materializar_lote(ids, hasta, tamano_lote=TAMANO_LOTE):
+    """Materializa las recurrencias ``ids`` hasta ``hasta``; devuelve (gastos, ingresos) generados."""
+    with transaction.atomic():
+        recurrencias = list(
+            Recurrencia.objects.select_for_update()
+            .filter(pk__in=ids, activa=True, proxima__lte=hasta)
+        )
+        gastos, ingresos = [], []
+        for recurrencia in recurrencias:
+            fechas, recurrencia.proxima = recurrencia.fechas_pendientes(hasta)
+            if recurrencia.proxima is None:
+                recurrencia.activa = False
+            for fecha in fechas:
+                if recurrencia.tipo == Recurrencia.GASTO:
+                    gastos.append(_gasto(recurrencia, fecha))
+                else:
+                    ingresos.append(_ingreso(recurrencia, fecha))
+
+        gastos = _insertar(Gasto, 'gastos', gastos, tamano_lote)
+        ingresos = _insertar(Ingreso, 'ingresos', ingresos, tamano_lote)
+        Recurrencia.objects.bulk_update(recurrencias, ['proxima', 'activa'], batch_size=tamano_lote)
+        registrar_filas(gastos + ingresos + [(r.usuario_id, 'recurrencias', r.pk) for r in recurrencias])
+    return len(gastos), len(ingresos)
+
+
+def materializar(hasta=None, tamano_lote=TAMANO_LOTE):
+    """
+    Genera las ocurrencias vencidas de todos los usuarios hasta ``hasta``
+    (hoy, en la zona horaria local, por defecto).
+
+    Retorna un dict con la cantidad de recurrencias procesadas y de gastos e
+    ingresos generados.
+    """
+    hasta = hasta or timezone.localdate()
+    totales = {'recurrencias': 0, 'gastos': 0, 'ingresos': 0}
+    pendientes = Recurrencia.objects.filter(activa=True, proxima__lte=hasta).order_by('id')
+    ultimo = 0
+    while True:
+        ids = list(pendientes.filter(id__gt=ultimo).values_list('id', flat=True)[:tamano_lote])
+        if not ids:
+            return totales
+        gastos, ingresos = materializar_lote(ids, hasta, tamano_lote)
+        totales['recurrencias'] += len(ids)
+        totales['gastos'] += gastos
+        totales['ingresos'] += ingresos
+        ultimo = ids[-1]
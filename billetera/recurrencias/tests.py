@@ -0,0 +1,177 @@
+import io
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from billetera import referencias
+from cuentas.models import Cuenta
+from gastos.models import Categoria, Gasto, Moneda
+from ingresos.models import Ingreso
+from sincronizacion.models import Cambio
+from .models import Recurrencia
+from .services import materializar
+
+
+class ReglaRecurrenciaTests(TestCase):
+    def _regla(self, **kwargs):
+        return Recurrencia(tipo=Recurrencia.GASTO, descripcion='Regla', monto=Decimal('1'), **kwargs)
+
+    def _fechas(self, regla, hasta):
+        regla.proxima = regla.primera_fecha()
+        return regla.fechas_pendientes(hasta)
+
+    def test_mensual_conserva_el_dia_despues_de_un_mes_corto(self):
+        regla = self._regla(frecuencia=Recurrencia.MENSUAL, fecha_inicio=date(2026, 1, 31))
+
+        fechas, proxima = self._fechas(regla, date(2026, 4, 1))
+
+        self.assertEqual(fechas, [date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31)])
+        self.assertEqual(proxima, date(2026, 4, 30))
+
+    def test_dia_del_mes_empieza_en_el_primer_dia_valido(self):
+        regla = self._regla(frecuencia=Recurrencia.DIA_DEL_MES, dia_del_mes=10, fecha_inicio=date(2026, 1, 15))
+
+        fechas, _ = self._fechas(regla, date(2026, 3, 31))
+
+        self.assertEqual(fechas, [date(2026, 2, 10), date(2026, 3, 10)])
+
+    def test_semanal_con_intervalo_y_fecha_fin(self):
+        regla = self._regla(frecuencia=Recurrencia.SEMANAL, intervalo=2,
+                            fecha_inicio=date(2026, 1, 1), fecha_fin=date(2026, 1, 31))
+
+        fechas, proxima = self._fechas(regla, date(2026, 12, 31))
+
+        self.assertEqual(fechas, [date(2026, 1, 1), date(2026, 1, 15), date(2026, 1, 29)])
+        self.assertIsNone(proxima)
+
+
+class MaterializarTests(TestCase):
+    def setUp(self):
+        referencias.reiniciar()
+        self.addCleanup(referencias.reiniciar)
+        self.ars = Moneda.objects.get(codigo='ARS')
+        self.categoria = Categoria.objects.create(nombre='Vivienda')
+        self.usuarios = [User.objects.create_user(username=f'rec{i}', password='pass-123') for i in range(3)]
+        self.cuentas = [Cuenta.objects.create(usuario=u, nombre='Banco', moneda=self.ars) for u in self.usuarios]
+        for usuario, cuenta in zip(self.usuarios, self.cuentas):
+            Recurrencia.objects.create(
+                usuario=usuario, tipo=Recurrencia.GASTO, descripcion='Alquiler', monto=Decimal('300.00'),
+                moneda=self.ars, categoria=self.categoria, cuenta=cuenta,
+                frecuencia=Recurrencia.DIA_DEL_MES, dia_del_mes=5, fecha_inicio=date(2026, 1, 1),
+            )
+            Recurrencia.objects.create(
+                usuario=usuario, tipo=Recurrencia.INGRESO, descripcion='Sueldo', monto=Decimal('1000.00'),
+                moneda=self.ars, cuenta=cuenta, frecuencia=Recurrencia.MENSUAL, fecha_inicio=date(2026, 1, 1),
+            )
+
+    def test_genera_las_ocurrencias_vencidas_de_todos_los_usuarios(self):
+        totales = materializar(hasta=date(2026, 3, 20))
+
+        self.assertEqual(totales, {'recurrencias': 6, 'gastos': 9, 'ingresos': 9})
+        gastos = Gasto.objects.filter(usuario=self.usuarios[0]).order_by('fecha')
+        self.assertEqual([g.fecha_recurrencia for g in gastos], [date(2026, 1, 5), date(2026, 2, 5), date(2026, 3, 5)])
+        self.assertEqual(gastos[0].cuenta, self.cuentas[0])
+        self.assertEqual(gastos[0].categoria, self.categoria)
+        self.assertEqual(Ingreso.objects.get(usuario=self.usuarios[0], fecha_recurrencia=date(2026, 2, 1)).moneda.codigo, 'ARS')
+        self.assertEqual(self.cuentas[0].saldo_actual(), Decimal('2100.00'))
+        self.assertEqual(
+            set(Recurrencia.objects.values_list('proxima', flat=True)),
+            {date(2026, 4, 5), date(2026, 4, 1)},
+        )
+        self.assertEqual(Cambio.objects.filter(usuario=self.usuarios[0], recurso='gastos').count(), 3)
+
+    def test_es_idempotente(self):
+        materializar(hasta=date(2026, 2, 10))
+        # Simula una corrida anterior que insertó pero no llegó a adelantar proxima
+        Recurrencia.objects.update(proxima=date(2026, 1, 1))
+        Recurrencia.objects.filter(frecuencia=Recurrencia.DIA_DEL_MES).update(proxima=date(2026, 1, 5))
+
+        materializar(hasta=date(2026, 2, 10))
+        materializar(hasta=date(2026, 2, 10))
+
+        self.assertEqual(Gasto.objects.count(), 6)
+        self.assertEqual(Ingreso.objects.count(), 6)
+
+    def test_segunda_corrida_no_cuenta_ni_registra_existentes(self):
+        materializar(hasta=date(2026, 2, 10))
+        cambios = Cambio.objects.count()
+
+        self.assertEqual(materializar(hasta=date(2026, 2, 10)), {'recurrencias': 0, 'gastos': 0, 'ingresos': 0})
+        self.assertEqual(Cambio.objects.count(), cambios)
+
+        # Con proxima reiniciada las ocurrencias ya existen: sólo cambian las recurrencias
+        Recurrencia.objects.update(proxima=date(2026, 1, 1))
+        Recurrencia.objects.filter(frecuencia=Recurrencia.DIA_DEL_MES).update(proxima=date(2026, 1, 5))
+        totales = materializar(hasta=date(2026, 2, 10))
+
+        self.assertEqual((totales['gastos'], totales['ingresos']), (0, 0))
+        self.assertEqual(Cambio.objects.filter(recurso__in=['gastos', 'ingresos']).count(), 12)
+
+    def test_consultas_no_dependen_de_la_cantidad_de_recurrencias(self):
+        materializar(hasta=date(2026, 1, 31))
+
+        # ids + lote (SAVEPOINT, SELECT, 2 x (SELECT existentes, INSERT, SELECT ids), UPDATE,
+        # INSERT cambios, RELEASE) + ids vacío
+        with self.assertNumQueries(13):
+            materializar(hasta=date(2026, 12, 31))
+
+        self.assertEqual(Gasto.objects.count(), 36)
+
+    def test_fecha_fin_desactiva_la_regla(self):
+        Recurrencia.objects.update(fecha_fin=date(2026, 2, 15))
+
+        materializar(hasta=date(2026, 6, 30))
+
+        self.assertFalse(Recurrencia.objects.filter(activa=True).exists())
+        self.assertEqual(Gasto.objects.filter(usuario=self.usuarios[0]).count(), 2)
+
+    def test_comando(self):
+        salida = io.StringIO()
+        call_command('materializar_recurrencias', '--hasta', '2026-01-31', stdout=salida)
+
+        self.assertIn('3 gastos y 3 ingresos', salida.getvalue())
+
+
+class RecurrenciaApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='api-rec', password='pass-123')
+        self.otro = User.objects.create_user(username='api-rec-otro', password='pass-123')
+        self.ars = Moneda.objects.get(codigo='ARS')
+        self.ajena = Cuenta.objects.create(usuario=self.otro, nombre='Ajena', moneda=self.ars)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _crear(self, **datos):
+        return self.client.post('/recurrencias/api/', {
+            'tipo': 'GASTO', 'descripcion': 'Netflix', 'monto': '10.00', 'moneda': self.ars.id,
+            'frecuencia': 'DIA_DEL_MES', 'dia_del_mes': 20, 'fecha_inicio': '2026-01-01', **datos,
+        }, format='json')
+
+    def test_alta_calcula_proxima(self):
+        response = self._crear()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['proxima'], '2026-01-20')
+        self.assertEqual(Recurrencia.objects.get().usuario, self.user)
+
+    def test_valida_la_regla_y_la_cuenta(self):
+        self.assertIn('dia_del_mes', self._crear(dia_del_mes=None).json())
+        self.assertIn('cuenta', self._crear(cuenta=self.ajena.id).json())
+
+    def test_cambiar_la_regla_no_repite_ocurrencias(self):
+        recurrencia_id = self._crear().json()['id']
+        materializar(hasta=date(2026, 2, 25))
+
+        response = self.client.patch(f'/recurrencias/api/{recurrencia_id}/', {'dia_del_mes': 25}, format='json')
+
+        # Las del 20/01 y 20/02 ya existen: sigue el 25/02
+        self.assertEqual(response.json()['proxima'], '2026-02-25')
+        materializar(hasta=date(2026, 2, 28))
+        self.assertEqual(
+            list(Gasto.objects.order_by('fecha').values_list('fecha_recurrencia', flat=True)),
+            [date(2026, 1, 20), date(2026, 2, 20), date(2026, 2, 25)],
+        )
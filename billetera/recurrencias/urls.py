@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .api_views import RecurrenciaViewSet
+
+router = DefaultRouter()
+router.register(r'', RecurrenciaViewSet, basename='recurrencia')
+
+app_name = 'recurrencias'
+
+urlpatterns = [
+    path('api/', include(router.urls)),
+]
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class SincronizacionConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'sincronizacion'
+
+    def ready(self):
+        # Conecta las señales que alimentan el registro de cambios
+        from sincronizacion.signals import conectar_senales
+        conectar_senales()
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from sincronizacion.models import Cambio
+
+
+class Command(BaseCommand):
+    help = "Elimina del registro de cambios las filas superadas por un cambio posterior del mismo objeto."
+
+    def handle(self, *args, **options):
+        # El último cambio de cada objeto basta para que cualquier cliente converja
+        vigentes = (
+            Cambio.objects.values('usuario', 'recurso', 'objeto_id')
+            .annotate(ultimo=Max('id'))
+            .values('ultimo')
+        )
+        eliminados, _ = Cambio.objects.exclude(id__in=vigentes).delete()
+        self.stdout.write(self.style.SUCCESS(f"Compactación OK: {eliminados} cambios eliminados"))
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.9 on 2026-10-19 11:28
+
+from django.db import migrations
+
+# (app_label, modelo, recurso, lookup del dueño)
+RECURSOS = [
+    ('cuentas', 'Cuenta', 'cuentas', 'usuario_id'),
+    ('gastos', 'Compra', 'compras', 'usuario_id'),
+    ('gastos', 'Gasto', 'gastos', 'usuario_id'),
+    ('ingresos', 'Ingreso', 'ingresos', 'usuario_id'),
+    ('cuentas', 'TransferenciaCuenta', 'transferencias', 'usuario_id'),
+    ('deudas', 'Deuda', 'deudas', 'usuario_id'),
+    ('deudas', 'PagoDeuda', 'pagos', 'deuda__usuario_id'),
+]
+
+
+def registrar_existentes(apps, schema_editor):
+    """Un cambio ``upsert`` por objeto existente para que ``since=0`` devuelva todo."""
+    Cambio = apps.get_model('sincronizacion', 'Cambio')
+    for app_label, nombre, recurso, dueno in RECURSOS:
+        modelo = apps.get_model(app_label, nombre)
+        filas = modelo.objects.exclude(**{f'{dueno}__isnull': True}).order_by('pk').values_list('pk', dueno)
+        lote = []
+        for pk, usuario_id in filas.iterator(chunk_size=2000):
+            lote.append(Cambio(usuario_id=usuario_id, recurso=recurso, objeto_id=pk, operacion='upsert'))
+            if len(lote) >= 2000:
+                Cambio.objects.bulk_create(lote)
+                lote = []
+        Cambio.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sincronizacion', '0001_initial'),
+        ('cuentas', '0003_cuenta_updated_at_transferenciacuenta_updated_at'),
+        ('deudas', '0003_pagodeuda_updated_at'),
+        ('gastos', '0010_compra_updated_at_gasto_updated_at'),
+        ('ingresos', '0004_ingreso_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(registrar_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-19 13:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sincronizacion', '0002_backfill_cambios'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cambio',
+            index=models.Index(fields=['usuario', 'fecha'], name='cambio_usuario_fecha_idx'),
+        ),
+    ]
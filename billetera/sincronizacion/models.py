@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Cambio(models.Model):
+    """
+    Registro de cambios del libro contable de un usuario.
+
+    El ID autoincremental es la secuencia monótona que usan los clientes como
+    token de sincronización (con el margen de ``SincronizacionView`` para los
+    IDs de transacciones que se confirman fuera de orden). Las bajas quedan como filas ``delete`` (tombstones)
+    para que los clientes puedan borrar sus copias locales.
+    """
+    UPSERT = 'upsert'
+    ELIMINADO = 'delete'
+    OPERACION_CHOICES = [
+        (UPSERT, 'Alta o modificación'),
+        (ELIMINADO, 'Baja'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='cambios', db_index=False)
+    recurso = models.CharField(max_length=20)
+    objeto_id = models.PositiveBigIntegerField()
+    operacion = models.CharField(max_length=6, choices=OPERACION_CHOICES)
+    fecha = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['usuario', 'id'], name='cambio_usuario_seq_idx'),
+            # Cambios recientes que /api/sync/ todavía no entrega
+            models.Index(fields=['usuario', 'fecha'], name='cambio_usuario_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.operacion} {self.recurso}:{self.objeto_id}"
@@ -0,0 +1,101 @@
+"""
+Alta de filas en el registro de cambios (``Cambio``).
+
+Los ``save()``/``delete()`` individuales se registran solos mediante señales
+(``sincronizacion.signals``), igual que las filas que una baja deja en
+``NULL`` por un ``on_delete=SET_NULL``. Las operaciones masivas
+(``bulk_create``, ``bulk_update``, ``QuerySet.update``) no disparan señales:
+quien las use debe llamar a :func:`registrar_cambios` con los IDs afectados
+(y a :func:`filas_set_null` si borran filas referenciadas con ``SET_NULL``).
+"""
+from django.db import models
+
+from .models import Cambio
+
+# Modelo (app_label.model) -> nombre del recurso expuesto en /api/sync/
+RECURSOS = {
+    'gastos.gasto': 'gastos',
+    'gastos.compra': 'compras',
+    'ingresos.ingreso': 'ingresos',
+    'cuentas.cuenta': 'cuentas',
+    'cuentas.transferenciacuenta': 'transferencias',
+    'deudas.deuda': 'deudas',
+    'deudas.pagodeuda': 'pagos',
+    'recurrencias.recurrencia': 'recurrencias',
+}
+
+
+# Camino al dueño para los modelos que no tienen ``usuario``
+CAMPO_USUARIO = {
+    'deudas.pagodeuda': 'deuda__usuario_id',
+}
+
+
+def campo_usuario(modelo):
+    return CAMPO_USUARIO.get(modelo._meta.label_lower, 'usuario_id')
+
+
+def referencias_set_null(modelo):
+    """Relaciones ``SET_NULL`` desde modelos del registro hacia ``modelo``."""
+    return [
+        relacion for relacion in modelo._meta.related_objects
+        if relacion.on_delete is models.SET_NULL and relacion.related_model._meta.label_lower in RECURSOS
+    ]
+
+
+def filas_set_null(modelo, pks):
+    """
+    ``(usuario_id, recurso, objeto_id)`` de las filas del registro que la baja
+    de ``pks`` deja en ``NULL``. Hay que leerlas antes de borrar: después ya
+    no se encuentran.
+    """
+    filas = []
+    for relacion in referencias_set_null(modelo):
+        relacionado = relacion.related_model
+        recurso = RECURSOS[relacionado._meta.label_lower]
+        afectadas = relacionado._base_manager.filter(**{f'{relacion.field.name}__in': pks}).order_by()
+        filas.extend(
+            (usuario_id, recurso, pk)
+            for pk, usuario_id in afectadas.values_list('pk', campo_usuario(relacionado))
+        )
+    return filas
+
+
+def usuario_id_de(instancia):
+    """Dueño de un objeto del libro; los pagos pertenecen al dueño de la deuda."""
+    if instancia._meta.label_lower == 'deudas.pagodeuda':
+        return instancia.deuda.usuario_id
+    return instancia.usuario_id
+
+
+def registrar_cambio(instancia, operacion=Cambio.UPSERT):
+    recurso = RECURSOS.get(instancia._meta.label_lower)
+    if recurso is None:
+        return None
+    usuario_id = usuario_id_de(instancia)
+    if usuario_id is None:
+        return None
+    return Cambio.objects.create(usuario_id=usuario_id, recurso=recurso, objeto_id=instancia.pk, operacion=operacion)
+
+
+def registrar_cambios(usuario_id, recurso, ids, operacion=Cambio.UPSERT):
+    """Registra varios cambios del mismo recurso con un único INSERT."""
+    return registrar_cambios_por_recurso(usuario_id, {recurso: ids}, operacion)
+
+
+def registrar_cambios_por_recurso(usuario_id, ids_por_recurso, operacion=Cambio.UPSERT):
+    """Como :func:`registrar_cambios` para varios recursos (``{recurso: ids}``), también con un único INSERT."""
+    return registrar_filas(
+        ((usuario_id, recurso, pk) for recurso, ids in ids_por_recurso.items() for pk in ids), operacion,
+    )
+
+
+def registrar_filas(filas, operacion=Cambio.UPSERT):
+    """Registra ``(usuario_id, recurso, objeto_id)`` de cualquier usuario con un único INSERT."""
+    cambios = [
+        Cambio(usuario_id=usuario_id, recurso=recurso, objeto_id=pk, operacion=operacion)
+        for usuario_id, recurso, pk in filas
+    ]
+    if cambios:
+        Cambio.objects.bulk_create(cambios)
+    return cambios
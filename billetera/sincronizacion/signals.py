@@ -0,0 +1,46 @@
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+from .models import Cambio
+from .registro import RECURSOS, filas_set_null, referencias_set_null, registrar_cambio, registrar_filas
+
+
+def _baja_de_usuario(origin):
+    User = get_user_model()
+    return isinstance(origin, User) or getattr(origin, 'model', None) is User
+
+
+def _al_guardar(sender, instance, raw=False, **kwargs):
+    # loaddata (raw) no representa un cambio del usuario
+    if raw:
+        return
+    registrar_cambio(instance, Cambio.UPSERT)
+
+
+def _al_eliminar(sender, instance, origin=None, **kwargs):
+    # Si se elimina el usuario, su registro de cambios se borra en cascada
+    if _baja_de_usuario(origin):
+        return
+    registrar_cambio(instance, Cambio.ELIMINADO)
+
+
+def _al_eliminar_referenciado(sender, instance, origin=None, **kwargs):
+    # SET_NULL deja en NULL las filas que apuntaban a ``instance`` con un
+    # UPDATE, sin señales: se registran antes, mientras todavía se encuentran
+    if _baja_de_usuario(origin):
+        return
+    registrar_filas(filas_set_null(sender, [instance.pk]))
+
+
+def conectar_senales():
+    for etiqueta in RECURSOS:
+        modelo = apps.get_model(etiqueta)
+        post_save.connect(_al_guardar, sender=modelo, dispatch_uid=f'sincronizacion-save-{etiqueta}')
+        post_delete.connect(_al_eliminar, sender=modelo, dispatch_uid=f'sincronizacion-delete-{etiqueta}')
+    for modelo in apps.get_models():
+        if referencias_set_null(modelo):
+            pre_delete.connect(
+                _al_eliminar_referenciado, sender=modelo,
+                dispatch_uid=f'sincronizacion-set-null-{modelo._meta.label_lower}',
+            )
@@ -0,0 +1,149 @@
+import io
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cuentas.models import Cuenta, TransferenciaCuenta
+from cuentas.services import registrar_transferencia
+from deudas.models import Deuda, PagoDeuda
+from gastos.models import Gasto, Moneda
+from .models import Cambio
+
+
+@override_settings(SINCRONIZACION_MARGEN_SEGUNDOS=0)
+class SincronizacionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='sync', password='pass-123')
+        self.otro = User.objects.create_user(username='sync-otro', password='pass-123')
+        self.ars = Moneda.objects.get(codigo='ARS')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _sync(self, since=0, **params):
+        response = self.client.get('/api/sync/', {'since': since, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_sync_inicial_devuelve_objetos_propios(self):
+        cuenta = Cuenta.objects.create(usuario=self.user, nombre='Banco', moneda=self.ars)
+        Gasto.objects.create(usuario=self.user, descripcion='Café', monto=Decimal('3'), moneda=self.ars, cuenta=cuenta)
+        Gasto.objects.create(usuario=self.otro, descripcion='Ajeno', monto=Decimal('3'), moneda=self.ars)
+
+        data = self._sync()
+
+        recursos = [(c['recurso'], c['operacion']) for c in data['cambios']]
+        self.assertEqual(recursos, [('cuentas', 'upsert'), ('gastos', 'upsert')])
+        self.assertEqual(data['cambios'][1]['datos']['descripcion'], 'Café')
+        self.assertFalse(data['hay_mas'])
+
+    def test_delta_con_modificaciones_y_tombstones(self):
+        gasto = Gasto.objects.create(usuario=self.user, descripcion='A', monto=Decimal('1'), moneda=self.ars)
+        borrado = Gasto.objects.create(usuario=self.user, descripcion='B', monto=Decimal('1'), moneda=self.ars)
+        token = self._sync()['token']
+
+        gasto.monto = Decimal('9')
+        gasto.save()
+        borrado_id = borrado.id
+        borrado.delete()
+
+        data = self._sync(token)
+        por_id = {c['id']: c for c in data['cambios']}
+        self.assertEqual(Decimal(por_id[gasto.id]['datos']['monto']), Decimal('9.00'))
+        self.assertEqual(por_id[borrado_id]['operacion'], 'delete')
+        self.assertNotIn('datos', por_id[borrado_id])
+
+        # Sin cambios nuevos el token no avanza
+        self.assertEqual(self._sync(data['token']), {'cambios': [], 'token': data['token'], 'hay_mas': False})
+
+    def test_paginacion_por_secuencia(self):
+        for i in range(5):
+            Gasto.objects.create(usuario=self.user, descripcion=f'G{i}', monto=Decimal('1'), moneda=self.ars)
+
+        primera = self._sync(limit=3)
+        segunda = self._sync(primera['token'], limit=3)
+
+        self.assertTrue(primera['hay_mas'])
+        self.assertFalse(segunda['hay_mas'])
+        descripciones = [c['datos']['descripcion'] for c in primera['cambios'] + segunda['cambios']]
+        self.assertEqual(descripciones, ['G0', 'G1', 'G2', 'G3', 'G4'])
+
+    def test_pagos_y_estado_de_deuda(self):
+        deuda = Deuda.objects.create(usuario=self.user, persona='Ana', tipo='POR_COBRAR', monto=Decimal('10'), moneda=self.ars)
+        token = self._sync()['token']
+
+        PagoDeuda.objects.create(deuda=deuda, monto=Decimal('10'))
+
+        cambios = {c['recurso']: c for c in self._sync(token)['cambios']}
+        self.assertEqual(cambios['deudas']['datos']['estado'], 'PAGADA')
+        self.assertIn('pagos', cambios)
+
+    def test_operaciones_masivas_se_registran(self):
+        response = self.client.post('/gastos/api/bulk/', [{'descripcion': 'x', 'monto': '1'}] * 3, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(Cambio.objects.filter(usuario=self.user, recurso='gastos').count(), 3)
+
+    @override_settings(SINCRONIZACION_MARGEN_SEGUNDOS=60)
+    def test_el_token_no_pasa_cambios_recientes(self):
+        viejo = Gasto.objects.create(usuario=self.user, descripcion='Viejo', monto=Decimal('1'), moneda=self.ars)
+        reciente = Gasto.objects.create(usuario=self.user, descripcion='Reciente', monto=Decimal('1'), moneda=self.ars)
+        posterior = Gasto.objects.create(usuario=self.user, descripcion='Posterior', monto=Decimal('1'), moneda=self.ars)
+        hace_un_rato = timezone.now() - timedelta(minutes=5)
+        Cambio.objects.filter(objeto_id__in=[viejo.id, posterior.id]).update(fecha=hace_un_rato)
+
+        # El cambio de "Posterior" ya es viejo pero está detrás de uno reciente:
+        # entregarlo movería el token más allá de IDs que pueden seguir en vuelo
+        data = self._sync()
+        self.assertEqual([c['id'] for c in data['cambios']], [viejo.id])
+
+        Cambio.objects.filter(objeto_id=reciente.id).update(fecha=hace_un_rato)
+        data = self._sync(data['token'])
+        self.assertEqual([c['id'] for c in data['cambios']], [reciente.id, posterior.id])
+
+    def test_set_null_registra_las_filas_afectadas(self):
+        cuenta = Cuenta.objects.create(usuario=self.user, nombre='Banco', moneda=self.ars)
+        gasto = Gasto.objects.create(usuario=self.user, descripcion='Café', monto=Decimal('3'), moneda=self.ars, cuenta=cuenta)
+        token = self._sync()['token']
+        cuenta_id = cuenta.id
+
+        cuenta.delete()
+
+        cambios = {(c['recurso'], c['id']): c for c in self._sync(token)['cambios']}
+        self.assertEqual(cambios[('cuentas', cuenta_id)]['operacion'], 'delete')
+        self.assertIsNone(cambios[('gastos', gasto.id)]['datos']['cuenta'])
+
+    def test_marcas_de_transferencia_se_registran(self):
+        origen = Cuenta.objects.create(usuario=self.user, nombre='Origen', moneda=self.ars)
+        destino = Cuenta.objects.create(usuario=self.user, nombre='Destino', moneda=self.ars)
+        transferencia = registrar_transferencia(self.user, origen, destino, Decimal('5'), Decimal('5'))
+        token = self._sync()['token']
+
+        TransferenciaCuenta.objects.filter(pk=transferencia.pk).get().delete()
+
+        # Los movimientos vuelven a contar en los totales: el cliente tiene que releerlos
+        cambios = {(c['recurso'], c['id'], c['operacion']) for c in self._sync(token)['cambios']}
+        self.assertIn(('gastos', transferencia.gasto_id, 'upsert'), cambios)
+        self.assertIn(('ingresos', transferencia.ingreso_id, 'upsert'), cambios)
+
+    def test_token_invalido(self):
+        response = self.client.get('/api/sync/', {'since': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_eliminar_usuario_no_registra_cambios(self):
+        Gasto.objects.create(usuario=self.otro, descripcion='Ajeno', monto=Decimal('3'), moneda=self.ars)
+        self.otro.delete()
+        self.assertFalse(Cambio.objects.filter(usuario_id=self.otro.id).exists())
+
+    def test_compactar_conserva_el_ultimo_cambio(self):
+        gasto = Gasto.objects.create(usuario=self.user, descripcion='A', monto=Decimal('1'), moneda=self.ars)
+        gasto.save()
+        gasto.delete()
+
+        call_command('compactar_cambios', stdout=io.StringIO())
+
+        self.assertEqual(list(Cambio.objects.values_list('operacion', flat=True)), ['delete'])
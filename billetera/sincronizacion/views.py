@@ -0,0 +1,108 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Min
+from django.utils import timezone
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from cuentas.api_views import CuentaViewSet, TransferenciaCuentaViewSet
+from deudas.api_views import DeudaViewSet, PagoDeudaViewSet
+from gastos.api_views import CompraViewSet, GastoViewSet
+from ingresos.api_views import IngresoViewSet
+from recurrencias.api_views import RecurrenciaViewSet
+from usuarios.authentication import JWTLigeroAuthentication
+from .models import Cambio
+
+# Cada recurso se serializa igual que en su endpoint de la API REST
+VISTAS = {
+    'gastos': GastoViewSet,
+    'compras': CompraViewSet,
+    'ingresos': IngresoViewSet,
+    'cuentas': CuentaViewSet,
+    'transferencias': TransferenciaCuentaViewSet,
+    'deudas': DeudaViewSet,
+    'pagos': PagoDeudaViewSet,
+    'recurrencias': RecurrenciaViewSet,
+}
+
+LIMITE_POR_DEFECTO = 500
+LIMITE_MAXIMO = 2000
+
+
+class SincronizacionView(APIView):
+    """
+    Sincronización incremental: ``GET /api/sync/?since=<token>&limit=<n>``.
+
+    Devuelve los cambios posteriores a ``since`` en orden de secuencia, con el
+    estado actual de cada objeto modificado y un tombstone por cada baja. El
+    ``token`` de la respuesta se envía como ``since`` en la siguiente llamada;
+    mientras ``hay_mas`` sea verdadero conviene seguir pidiendo páginas.
+
+    Los IDs se asignan al insertar, no al confirmar: una transacción que tomó
+    el ID N puede confirmarse después de que otra con N+1 ya se entregó. Por
+    eso la respuesta se corta antes del primer cambio registrado hace menos
+    de ``SINCRONIZACION_MARGEN_SEGUNDOS``; para entonces las transacciones
+    que tomaron IDs anteriores ya terminaron y el token no los saltea.
+    """
+    authentication_classes = [JWTLigeroAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            since = int(request.query_params.get('since') or 0)
+            limite = int(request.query_params.get('limit') or LIMITE_POR_DEFECTO)
+        except ValueError:
+            return Response({'detail': 'Parámetros since/limit inválidos.'}, status=status.HTTP_400_BAD_REQUEST)
+        if since < 0:
+            return Response({'detail': 'Parámetros since/limit inválidos.'}, status=status.HTTP_400_BAD_REQUEST)
+        limite = max(1, min(limite, LIMITE_MAXIMO))
+
+        pendientes = Cambio.objects.filter(usuario=request.user, id__gt=since)
+        margen = timezone.now() - timedelta(seconds=settings.SINCRONIZACION_MARGEN_SEGUNDOS)
+        reciente = pendientes.filter(fecha__gt=margen).aggregate(primero=Min('id'))['primero']
+        if reciente is not None:
+            pendientes = pendientes.filter(id__lt=reciente)
+        cambios = list(pendientes.order_by('id')[:limite + 1])
+        hay_mas = len(cambios) > limite
+        cambios = cambios[:limite]
+
+        # Dentro de la página sólo importa el último cambio de cada objeto
+        ultimos = {}
+        for cambio in cambios:
+            ultimos.pop((cambio.recurso, cambio.objeto_id), None)
+            ultimos[(cambio.recurso, cambio.objeto_id)] = cambio
+
+        vigentes = self._objetos_vigentes(request, ultimos.values())
+
+        resultado = []
+        for (recurso, objeto_id), cambio in ultimos.items():
+            item = {'seq': cambio.id, 'recurso': recurso, 'id': objeto_id, 'operacion': cambio.operacion}
+            if cambio.operacion == Cambio.UPSERT:
+                datos = vigentes.get((recurso, objeto_id))
+                if datos is None:
+                    # Se eliminó después; su tombstone llega en una página posterior
+                    continue
+                item['datos'] = datos
+            resultado.append(item)
+
+        token = cambios[-1].id if cambios else since
+        return Response({'cambios': resultado, 'token': str(token), 'hay_mas': hay_mas})
+
+    def _objetos_vigentes(self, request, cambios):
+        """Carga y serializa los objetos con una consulta por recurso."""
+        ids_por_recurso = defaultdict(list)
+        for cambio in cambios:
+            if cambio.operacion == Cambio.UPSERT and cambio.recurso in VISTAS:
+                ids_por_recurso[cambio.recurso].append(cambio.objeto_id)
+
+        vigentes = {}
+        for recurso, ids in ids_por_recurso.items():
+            vista = VISTAS[recurso]
+            queryset = vista.queryset.filter(**{vista.campo_usuario: request.user, 'pk__in': ids})
+            serializados = vista.serializer_class(queryset, many=True, context={'request': request}).data
+            for datos in serializados:
+                vigentes[(recurso, datos['id'])] = datos
+        return vigentes
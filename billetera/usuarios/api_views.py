@@ -0,0 +1,75 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from usuarios.authentication import JWTLigeroAuthentication
+from .estadisticas import ErrorEstadisticas, estadisticas
+from .patrimonio import flujo_consolidado, patrimonio_consolidado
+
+
+class EstadisticasView(APIView):
+    """
+    ``GET /api/stats/<gastos|ingresos>/?periodo=mes&por=categoria&desde=&hasta=``
+
+    Sumas y cantidades agrupadas por período (``dia``, ``semana``, ``mes``,
+    ``anio``) y/o por ``categoria``, ``moneda``, ``cuenta`` o ``tienda``,
+    siempre separadas por moneda y sin contar transferencias entre cuentas.
+    """
+    authentication_classes = [JWTLigeroAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, recurso):
+        params = request.query_params
+        try:
+            desde = self._fecha(params.get('desde'))
+            hasta = self._fecha(params.get('hasta'))
+            resultados = estadisticas(
+                request, recurso,
+                periodo=params.get('periodo') or None, por=params.get('por') or None,
+                desde=desde, hasta=hasta,
+            )
+        except ErrorEstadisticas as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'recurso': recurso, 'resultados': resultados})
+
+    @staticmethod
+    def _fecha(valor):
+        if not valor:
+            return None
+        fecha = parse_date(valor)
+        if fecha is None:
+            raise ErrorEstadisticas(f'Fecha inválida: {valor}.')
+        return fecha
+
+
+def _inicio_del_dia(fecha):
+    return timezone.make_aware(datetime.combine(fecha, time.min))
+
+
+class PatrimonioView(APIView):
+    """
+    ``GET /api/patrimonio/?desde=&hasta=``
+
+    Saldo de todas las cuentas y flujo de fondos (ingresos, gastos y neto, sin
+    transferencias) convertidos a la moneda base con los tipos de cambio
+    cargados. ``desde``/``hasta`` son fechas inclusivas y sólo afectan al flujo.
+    """
+    authentication_classes = [JWTLigeroAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            desde = EstadisticasView._fecha(request.query_params.get('desde'))
+            hasta = EstadisticasView._fecha(request.query_params.get('hasta'))
+        except ErrorEstadisticas as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        flujo = flujo_consolidado(
+            request.user,
+            desde=_inicio_del_dia(desde) if desde else None,
+            hasta=_inicio_del_dia(hasta + timedelta(days=1)) if hasta else None,
+        )
+        return Response({'patrimonio': patrimonio_consolidado(request.user), 'flujo': flujo})
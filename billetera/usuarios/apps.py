@@ -7,3 +7,9 @@ class UsuariosConfig(AppConfig):
 
     def ready(self):
         import usuarios.signals
+        from django.db.backends.signals import connection_created
+
+        from billetera.basedatos import aplicar_pragmas
+
+        # PRAGMAS de SQLite en cada conexión nueva (ver billetera/basedatos.py)
+        connection_created.connect(aplicar_pragmas, dispatch_uid='billetera-pragmas-sqlite')
@@ -0,0 +1,134 @@
+"""
+Autenticación JWT sin consultar la base en cada request.
+
+``JWTLigeroAuthentication`` reconstruye el usuario a partir de los claims que
+ya embebe ``WalletTokenObtainPairSerializer`` (``user_id``, ``username``,
+``email``, ``role``). Para tokens sin esos claims (emitidos antes o por otros
+flujos) carga el ``User`` completo, cacheado en memoria del proceso durante
+``JWT_CACHE_USUARIOS_TTL`` segundos. Si la app ``token_blacklist`` está
+instalada, la consulta de tokens revocados también se cachea.
+
+Como en ``JWTStatelessUserAuthentication`` de SimpleJWT, desactivar a un
+usuario surte efecto cuando vence su access token. El usuario ligero es de
+sólo lectura: sirve para filtrar y asignar dueños, no para ``save()``.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+CLAIMS_USUARIO = ('username', 'email', 'role')
+
+
+class CacheTTL:
+    """Cache en memoria con vencimiento por entrada y tamaño máximo (LRU)."""
+
+    def __init__(self, ttl, max_entradas=10000):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave, por_defecto=None):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return por_defecto
+            valor, vence = entrada
+            if vence < time.monotonic():
+                del self._datos[clave]
+                return por_defecto
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave, valor, ttl=None):
+        with self._lock:
+            self._datos[clave] = (valor, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def descartar(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+
+usuarios_cache = CacheTTL(getattr(settings, 'JWT_CACHE_USUARIOS_TTL', 60))
+tokens_cache = CacheTTL(getattr(settings, 'JWT_CACHE_TOKENS_TTL', 30))
+
+_SIN_USUARIO = object()
+
+
+def usuario_completo(user_id):
+    """``User`` activo con ese ID, desde la cache TTL del proceso; ``None`` si no existe."""
+    usuario = usuarios_cache.obtener(user_id)
+    if usuario is None:
+        User = get_user_model()
+        usuario = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first() or _SIN_USUARIO
+        usuarios_cache.guardar(user_id, usuario)
+    return None if usuario is _SIN_USUARIO else usuario
+
+
+def usuario_desde_claims(token):
+    """``User`` no persistido armado con los claims del token, sin tocar la base."""
+    User = get_user_model()
+    rol = token['role']
+    usuario = User(
+        **{api_settings.USER_ID_FIELD: token[api_settings.USER_ID_CLAIM]},
+        username=token['username'],
+        email=token['email'],
+        is_superuser=rol == 'admin',
+        is_staff=rol in ('admin', 'staff'),
+        is_active=True,
+    )
+    # Se comporta como una instancia cargada (filtros y FKs por pk)
+    usuario._state.adding = False
+    usuario._state.db = 'default'
+    return usuario
+
+
+def token_revocado(token):
+    """Consulta (cacheada) a la lista negra de SimpleJWT, si la app está instalada."""
+    if not (api_settings.BLACKLIST_AFTER_ROTATION and apps.is_installed('rest_framework_simplejwt.token_blacklist')):
+        return False
+    jti = token.get(api_settings.JTI_CLAIM)
+    revocado = tokens_cache.obtener(jti)
+    if revocado is None:
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        revocado = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        # Un token revocado no vuelve a ser válido: se recuerda hasta su vencimiento
+        ttl = max(token['exp'] - time.time(), 0) if revocado else None
+        tokens_cache.guardar(jti, revocado, ttl=ttl)
+    return revocado
+
+
+class JWTLigeroAuthentication(JWTAuthentication):
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if token_revocado(token):
+            raise InvalidToken('El token fue revocado.')
+        return token
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken('El token no identifica a un usuario.')
+        if all(claim in validated_token for claim in CLAIMS_USUARIO):
+            return usuario_desde_claims(validated_token)
+
+        usuario = usuario_completo(validated_token[api_settings.USER_ID_CLAIM])
+        if usuario is None:
+            raise AuthenticationFailed('Usuario no encontrado.', code='user_not_found')
+        if not usuario.is_active:
+            raise AuthenticationFailed('Usuario inactivo.', code='user_inactive')
+        return usuario
@@ -1,7 +1,9 @@
 import os
 import shutil
+import sqlite3
 import tempfile
 import subprocess
+from contextlib import closing
 from datetime import datetime, timezone
 
 import boto3
@@ -71,6 +73,19 @@ def _apply_retention(prefix: str, keep: int) -> None:
     )
 
 
+def _copiar_sqlite(origen: str, destino: str) -> None:
+    """
+    Copia consistente con la API de backup de SQLite. Copiar el archivo con
+    WAL activo perdería lo que todavía no pasó del ``-wal`` al archivo
+    principal; la API lee una instantánea sin bloquear a los escritores.
+    """
+    with closing(sqlite3.connect(f'file:{origen}?mode=ro', uri=True)) as fuente, \
+            closing(sqlite3.connect(destino)) as copia:
+        fuente.backup(copia)
+        # El respaldo queda en un único archivo, sin -wal
+        copia.execute('PRAGMA journal_mode = DELETE')
+
+
 def run_database_backup() -> dict:
     """
     Crea un respaldo cifrado de la base de datos y lo sube a R2 (Cloudflare).
@@ -103,7 +118,7 @@ def run_database_backup() -> dict:
             if not os.path.exists(src):
                 raise RuntimeError(f'Archivo SQLite no encontrado: {src}')
             copy_path = os.path.join(tmp, f'sqlite-{ts}.sqlite3')
-            shutil.copy2(src, copy_path)
+            _copiar_sqlite(str(src), copy_path)
             to_encrypt_path = copy_path
             remote_name = f'{prefix}sqlite-{ts}.sqlite3.enc'
         else:
@@ -0,0 +1,119 @@
+"""
+Agregaciones de gastos e ingresos calculadas en la base.
+
+``agregar`` agrupa con ``Trunc*`` y ``values().annotate()`` por período y/o
+por categoría, moneda, cuenta o tienda, excluyendo los movimientos generados
+por transferencias entre cuentas (como el dashboard). Los montos de monedas
+distintas no se suman entre sí: la moneda siempre forma parte del grupo.
+
+``estadisticas`` cachea el resultado en la cache compartida por versión del
+libro del usuario (ver ``billetera.condicional.version_libro``), así que
+cualquier alta, edición o baja invalida las entradas sin tener que borrarlas.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import Trunc
+
+from billetera import cache
+from billetera.basedatos import alias_lectura
+from billetera.condicional import version_libro
+from gastos.models import Gasto
+from ingresos.models import Ingreso
+
+RECURSOS = {
+    'gastos': Gasto,
+    'ingresos': Ingreso,
+}
+
+# Aliases en inglés para los clientes que ya usaban day/week/month/year
+PERIODOS = {
+    'dia': 'day', 'day': 'day',
+    'semana': 'week', 'week': 'week',
+    'mes': 'month', 'month': 'month',
+    'anio': 'year', 'year': 'year',
+}
+
+# Dimensión -> (campo FK, campo con el nombre a mostrar)
+DIMENSIONES = {
+    'categoria': ('categoria', 'categoria__nombre'),
+    'moneda': ('moneda', 'moneda__codigo'),
+    'cuenta': ('cuenta', 'cuenta__nombre'),
+    'tienda': ('tienda', 'tienda__nombre'),
+}
+
+
+class ErrorEstadisticas(ValueError):
+    pass
+
+
+def agregar(usuario, recurso, periodo=None, por=None, desde=None, hasta=None):
+    """
+    Totales y cantidades de ``recurso`` agrupados por ``periodo`` y/o ``por``.
+
+    ``desde``/``hasta`` son fechas inclusivas en la zona horaria local.
+    Devuelve una lista de dicts ordenada por período y total descendente.
+    """
+    modelo = RECURSOS.get(recurso)
+    if modelo is None:
+        raise ErrorEstadisticas(f'Recurso desconocido: {recurso}.')
+    if periodo is not None and periodo not in PERIODOS:
+        raise ErrorEstadisticas(f'Período inválido: {periodo}.')
+    if por is not None and (por not in DIMENSIONES or not _tiene_campo(modelo, DIMENSIONES[por][0])):
+        raise ErrorEstadisticas(f'No se puede agrupar {recurso} por {por}.')
+
+    queryset = modelo.objects.using(alias_lectura()).filter(usuario=usuario, es_transferencia=False)
+    if desde:
+        queryset = queryset.filter(fecha__date__gte=desde)
+    if hasta:
+        queryset = queryset.filter(fecha__date__lte=hasta)
+
+    grupos = ['moneda_id', 'moneda__codigo']
+    orden = []
+    if periodo is not None:
+        queryset = queryset.annotate(periodo=Trunc('fecha', PERIODOS[periodo], output_field=DateField()))
+        grupos.append('periodo')
+        orden.append('periodo')
+    if por is not None and por != 'moneda':
+        campo, nombre = DIMENSIONES[por]
+        grupos += [f'{campo}_id', nombre]
+
+    filas = (
+        queryset.values(*grupos)
+        .annotate(total=Sum('monto'), cantidad=Count('id'))
+        .order_by(*orden, '-total', 'moneda__codigo')
+    )
+    # SQLite no conserva la escala del DecimalField en SUM
+    escala = Decimal(1).scaleb(-modelo._meta.get_field('monto').decimal_places)
+    return [_fila(fila, por, escala) for fila in filas]
+
+
+def _tiene_campo(modelo, campo):
+    return any(f.name == campo for f in modelo._meta.get_fields())
+
+
+def _fila(fila, por, escala):
+    resultado = {'moneda': fila['moneda__codigo']}
+    if 'periodo' in fila:
+        resultado['periodo'] = fila['periodo'].isoformat()
+    if por is not None and por != 'moneda':
+        campo, nombre = DIMENSIONES[por]
+        resultado[f'{campo}_id'] = fila[f'{campo}_id']
+        resultado[campo] = fila[nombre]
+    resultado['total'] = str(fila['total'].quantize(escala))
+    resultado['cantidad'] = fila['cantidad']
+    return resultado
+
+
+def estadisticas(request, recurso, **parametros):
+    """:func:`agregar` para ``request.user``, cacheado por versión del libro."""
+    # La fecha del último cambio evita reusar entradas si la secuencia
+    # retrocede (p.ej. al restaurar un backup)
+    secuencia, fecha = version_libro(request)
+    firma = '|'.join(f'{k}={parametros[k]}' for k in sorted(parametros))
+    return cache.obtener_o_calcular(
+        'stats', [secuencia, fecha.timestamp() if fecha else 0, recurso, firma],
+        lambda: agregar(request.user, recurso, **parametros),
+        timeout=settings.ESTADISTICAS_CACHE_TTL, usuario_id=request.user.pk,
+    )
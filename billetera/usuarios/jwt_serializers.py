@@ -5,7 +5,9 @@ class WalletTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
+        token['username'] = user.get_username()
         token['email'] = getattr(user, 'email', '')
-        token['role'] = getattr(user, 'role', 'user') if hasattr(user, 'role') else 'user'
+        # usuarios.authentication reconstruye is_superuser/is_staff a partir del rol
+        token['role'] = getattr(user, 'role', None) or ('admin' if user.is_superuser else 'staff' if user.is_staff else 'user')
         token['kyc_level'] = getattr(user, 'kyc_level', 0) if hasattr(user, 'kyc_level') else 0
         return token
@@ -0,0 +1,22 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from usuarios.portabilidad import exportar_a_archivo
+
+
+class Command(BaseCommand):
+    help = "Exporta todos los datos de un usuario a un zip portable (NDJSON por tabla)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('usuario', help='Username del usuario a exportar.')
+        parser.add_argument('salida', help='Ruta del archivo zip a generar.')
+
+    def handle(self, *args, **options):
+        try:
+            usuario = User.objects.get(username=options['usuario'])
+        except User.DoesNotExist:
+            raise CommandError(f"No existe el usuario {options['usuario']}.")
+
+        with open(options['salida'], 'wb') as destino:
+            exportar_a_archivo(usuario, destino)
+        self.stdout.write(self.style.SUCCESS(f"Export OK: {options['salida']}"))
@@ -0,0 +1,28 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from usuarios.portabilidad import TAMANO_LOTE, ErrorImportacion, importar_archivo
+
+
+class Command(BaseCommand):
+    help = "Importa un zip generado por exportar_datos en la cuenta de un usuario existente."
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del zip a importar.')
+        parser.add_argument('usuario', help='Username del usuario destino.')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help='Registros por transacción.')
+
+    def handle(self, *args, **options):
+        try:
+            usuario = User.objects.get(username=options['usuario'])
+        except User.DoesNotExist:
+            raise CommandError(f"No existe el usuario {options['usuario']}.")
+
+        try:
+            with open(options['archivo'], 'rb') as origen:
+                conteos = importar_archivo(origen, usuario, tamano_lote=options['lote'])
+        except ErrorImportacion as exc:
+            raise CommandError(str(exc))
+
+        resumen = ', '.join(f'{seccion}={cantidad}' for seccion, cantidad in conteos.items())
+        self.stdout.write(self.style.SUCCESS(f"Import OK: {resumen}"))
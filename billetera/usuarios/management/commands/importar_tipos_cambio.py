@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from usuarios.patrimonio import ErrorTiposCambio, importar_tipos_cambio
+
+
+class Command(BaseCommand):
+    help = "Carga tipos de cambio desde un CSV con columnas fecha, moneda y tasa (en la moneda base)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del CSV a importar.')
+        parser.add_argument(
+            '--separador-decimal', choices=[',', '.'],
+            help='Separador decimal de las tasas; sin indicarlo, 1.050 se lee como mil cincuenta.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['archivo'], encoding='utf-8-sig', newline='') as origen:
+                cantidad = importar_tipos_cambio(origen, options['separador_decimal'])
+        except (OSError, ErrorTiposCambio) as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(f"Tipos de cambio cargados: {cantidad}"))
@@ -0,0 +1,165 @@
+"""
+Patrimonio y flujo de fondos consolidados en la moneda base.
+
+Las cotizaciones (``gastos.TipoCambio``) expresan cuánto vale una unidad de
+cada moneda en ``settings.MONEDA_BASE`` a partir de una fecha.
+
+- ``flujo_consolidado`` convierte cada gasto e ingreso con la cotización
+  vigente a su fecha. La conversión es una subconsulta correlacionada que usa
+  el índice único (moneda, fecha), y el resultado vuelve ya sumado por moneda
+  (una fila por moneda y tabla).
+- ``patrimonio_consolidado`` suma los saldos de las cuentas por moneda en la
+  base y los convierte con la última cotización, que sale del registro en
+  memoria (``referencias.TIPOS_CAMBIO``).
+
+Lo que no tiene cotización no se convierte ni se suma: su código vuelve en
+``sin_cotizacion`` para que se pueda avisar.
+"""
+import csv
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum, Value, When
+
+from billetera import cache
+from billetera.referencias import MONEDAS, TIPOS_CAMBIO, moneda_base
+from cuentas.importacion import ErrorExtracto, parsear_fecha, parsear_monto
+from cuentas.models import Cuenta
+from gastos.models import Gasto, TipoCambio
+from ingresos.models import Ingreso
+
+CENTAVOS = Decimal('0.01')
+_DECIMAL = DecimalField(max_digits=24, decimal_places=6)
+
+
+class ErrorTiposCambio(ValueError):
+    pass
+
+
+def tasa_vigente(campo_moneda='moneda', campo_fecha=None):
+    """
+    Expresión con la cotización de ``campo_moneda`` vigente a ``campo_fecha``
+    (la última si no se indica). La moneda base vale 1.
+    """
+    tasas = TipoCambio.objects.filter(moneda=OuterRef(campo_moneda))
+    if campo_fecha is not None:
+        tasas = tasas.filter(fecha__lte=OuterRef(campo_fecha))
+    tasa = Subquery(tasas.order_by('-fecha').values('tasa')[:1], output_field=_DECIMAL)
+    base = moneda_base()
+    if base is None:
+        return tasa
+    return Case(When(**{campo_moneda: base.pk}, then=Value(Decimal(1))), default=tasa, output_field=_DECIMAL)
+
+
+def _codigos(ids):
+    return sorted(MONEDAS.obtener(pk).codigo for pk in ids if MONEDAS.obtener(pk) is not None)
+
+
+def _total_convertido(modelo, usuario, desde, hasta):
+    queryset = modelo.objects.filter(usuario=usuario, es_transferencia=False, moneda__isnull=False)
+    if desde:
+        queryset = queryset.filter(fecha__gte=desde)
+    if hasta:
+        queryset = queryset.filter(fecha__lt=hasta)
+    filas = (
+        queryset.annotate(tasa=tasa_vigente('moneda', 'fecha__date'))
+        .values('moneda_id')
+        .annotate(
+            convertido=Sum(ExpressionWrapper(F('monto') * F('tasa'), output_field=_DECIMAL)),
+            sin_tasa=Count('id', filter=Q(tasa__isnull=True)),
+        )
+        .order_by()
+    )
+    total, sin_cotizacion = Decimal('0'), set()
+    for fila in filas:
+        if fila['sin_tasa']:
+            sin_cotizacion.add(fila['moneda_id'])
+        total += fila['convertido'] or 0
+    return Decimal(total).quantize(CENTAVOS), sin_cotizacion
+
+
+def flujo_consolidado(usuario, desde=None, hasta=None):
+    """
+    Ingresos, gastos y neto de ``usuario`` en la moneda base, sin
+    transferencias entre cuentas. ``desde`` es inclusivo y ``hasta`` exclusivo
+    (datetimes).
+    """
+    ingresos, sin_ingresos = _total_convertido(Ingreso, usuario, desde, hasta)
+    gastos, sin_gastos = _total_convertido(Gasto, usuario, desde, hasta)
+    base = moneda_base()
+    return {
+        'moneda': base.codigo if base else None,
+        'ingresos': ingresos,
+        'gastos': gastos,
+        'neto': ingresos - gastos,
+        'sin_cotizacion': _codigos(sin_ingresos | sin_gastos),
+    }
+
+
+def patrimonio_consolidado(usuario):
+    """Suma de los saldos de las cuentas de ``usuario`` en la moneda base, con la última cotización."""
+    base = moneda_base()
+    saldos = (
+        Cuenta.objects.filter(usuario=usuario).con_saldo()
+        .values('moneda_id').annotate(total=Sum('saldo')).order_by()
+    )
+    total, por_moneda, sin_cotizacion = Decimal('0'), [], set()
+    for fila in saldos:
+        moneda_id, saldo = fila['moneda_id'], Decimal(fila['total'] or 0)
+        if base is not None and moneda_id == base.pk:
+            tasa = Decimal(1)
+        else:
+            cotizacion = TIPOS_CAMBIO.por_clave(moneda_id)
+            tasa = cotizacion.tasa if cotizacion is not None else None
+        moneda = MONEDAS.obtener(moneda_id)
+        por_moneda.append({
+            'moneda': moneda.codigo if moneda else None,
+            'saldo': saldo.quantize(CENTAVOS),
+            'tasa': tasa,
+            'convertido': (saldo * tasa).quantize(CENTAVOS) if tasa is not None else None,
+        })
+        if tasa is None:
+            sin_cotizacion.add(moneda_id)
+        else:
+            total += saldo * tasa
+    return {
+        'moneda': base.codigo if base else None,
+        'total': total.quantize(CENTAVOS),
+        'por_moneda': sorted(por_moneda, key=lambda item: item['moneda'] or ''),
+        'sin_cotizacion': _codigos(sin_cotizacion),
+    }
+
+
+def importar_tipos_cambio(archivo, separador_decimal=None):
+    """
+    Carga cotizaciones desde un CSV de texto con columnas ``fecha``,
+    ``moneda`` (código) y ``tasa``. Si ya hay una cotización de esa moneda en
+    esa fecha se reemplaza. Retorna la cantidad de filas cargadas.
+
+    Las tasas se leen con ``parsear_monto``: sin ``separador_decimal``,
+    ``1.050`` es mil cincuenta.
+    """
+    filas = {}
+    for numero, registro in enumerate(csv.DictReader(archivo), start=2):
+        registro = {(k or '').strip().lower(): (v or '').strip() for k, v in registro.items()}
+        try:
+            moneda = MONEDAS.por_clave(registro.get('moneda', '').upper())
+            if moneda is None:
+                raise ErrorExtracto(f"Moneda desconocida: {registro.get('moneda')}.")
+            fecha = parsear_fecha(registro.get('fecha'))
+            tasa = parsear_monto(registro.get('tasa'), separador_decimal)
+            if not tasa or tasa <= 0:
+                raise ErrorExtracto('La tasa debe ser mayor a cero.')
+        except ErrorExtracto as exc:
+            raise ErrorTiposCambio(f'Línea {numero}: {exc}')
+        filas[moneda.pk, fecha] = TipoCambio(moneda=moneda, fecha=fecha, tasa=tasa)
+
+    with transaction.atomic():
+        TipoCambio.objects.bulk_create(
+            filas.values(), batch_size=500,
+            update_conflicts=True, unique_fields=['moneda', 'fecha'], update_fields=['tasa', 'updated_at'],
+        )
+    # bulk_create no emite señales
+    TIPOS_CAMBIO.invalidar()
+    cache.invalidar('inicio')
+    return len(filas)
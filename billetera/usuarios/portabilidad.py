@@ -0,0 +1,467 @@
+"""
+Exportación e importación portable de los datos de un usuario.
+
+El archivo generado es un zip con un NDJSON (un objeto JSON por línea) por
+cada tabla del ledger del usuario, más un ``manifest.json`` con la versión del
+formato y la cantidad de registros por sección. Los datos de referencia
+(monedas, categorías, tipos de cuenta) se exportan por clave natural para que
+el archivo pueda importarse en cualquier entorno; las relaciones entre objetos
+del usuario viajan con sus IDs originales y se remapean al importar.
+"""
+import io
+import json
+import zipfile
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from cuentas.models import Cuenta, TipoCuenta, TransferenciaCuenta
+from deudas.models import Deuda, PagoDeuda
+from gastos.models import Categoria, Compra, Gasto, Moneda, Tienda, normalizar_nombre
+from ingresos.models import CategoriaIngreso, Ingreso
+from sincronizacion.registro import registrar_cambios
+
+FORMATO_VERSION = 1
+TAMANO_LOTE = 500
+CHUNK_LECTURA = 2000
+
+# Orden de las secciones: cada una sólo referencia secciones anteriores.
+SECCIONES = (
+    'tiendas',
+    'cuentas',
+    'compras',
+    'gastos',
+    'ingresos',
+    'transferencias',
+    'deudas',
+    'pagos',
+)
+
+
+class ErrorImportacion(Exception):
+    """El archivo no es un export válido o referencia datos inexistentes."""
+
+
+# --- Exportación ---
+
+def _registros_tiendas(usuario):
+    return Tienda.objects.filter(usuario=usuario).order_by('id').values(
+        'id', 'nombre', 'created_at',
+    )
+
+
+def _registros_cuentas(usuario):
+    return Cuenta.objects.filter(usuario=usuario).order_by('id').values(
+        'id', 'nombre', 'saldo_inicial', tipo_nombre=F('tipo__nombre'), moneda_codigo=F('moneda__codigo'),
+    )
+
+
+def _registros_compras(usuario):
+    return Compra.objects.filter(usuario=usuario).order_by('id').values(
+        'id', 'fecha', 'lugar', 'tienda_id', 'cuenta_id', 'created_at', moneda_codigo=F('moneda__codigo'),
+    )
+
+
+def _registros_gastos(usuario):
+    return Gasto.objects.filter(usuario=usuario).order_by('id').values(
+        'id', 'descripcion', 'lugar', 'tienda_id', 'cantidad', 'monto', 'descuento', 'fecha',
+        'cuenta_id', 'compra_id',
+        moneda_codigo=F('moneda__codigo'), categoria_nombre=F('categoria__nombre'),
+    )
+
+
+def _registros_ingresos(usuario):
+    return Ingreso.objects.filter(usuario=usuario).order_by('id').values(
+        'id', 'descripcion', 'monto', 'fecha', 'cuenta_id',
+        moneda_codigo=F('moneda__codigo'), categoria_nombre=F('categoria__nombre'),
+    )
+
+
+def _registros_transferencias(usuario):
+    return TransferenciaCuenta.objects.filter(usuario=usuario).order_by('id').values(
+        'id', 'cuenta_origen_id', 'cuenta_destino_id', 'monto_origen', 'monto_destino', 'tasa_manual',
+        'nota', 'fecha', 'gasto_id', 'ingreso_id',
+    )
+
+
+def _registros_deudas(usuario):
+    return Deuda.objects.filter(usuario=usuario).order_by('id').values(
+        'id', 'persona', 'tipo', 'monto', 'fecha', 'fecha_vencimiento', 'estado', 'descripcion',
+        'created_at', moneda_codigo=F('moneda__codigo'),
+    )
+
+
+def _registros_pagos(usuario):
+    return PagoDeuda.objects.filter(deuda__usuario=usuario).order_by('id').values(
+        'id', 'deuda_id', 'monto', 'fecha', 'nota', 'gasto_relacionado_id', 'ingreso_relacionado_id', 'created_at',
+    )
+
+
+_EXPORTADORES = {
+    'tiendas': _registros_tiendas,
+    'cuentas': _registros_cuentas,
+    'compras': _registros_compras,
+    'gastos': _registros_gastos,
+    'ingresos': _registros_ingresos,
+    'transferencias': _registros_transferencias,
+    'deudas': _registros_deudas,
+    'pagos': _registros_pagos,
+}
+
+
+class _BufferSalida(io.RawIOBase):
+    """Destino no posicionable para ZipFile: acumula bytes hasta que se vacían."""
+
+    def __init__(self):
+        super().__init__()
+        self._partes = []
+        self._tamano = 0
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        datos = bytes(datos)
+        self._partes.append(datos)
+        self._tamano += len(datos)
+        return len(datos)
+
+    @property
+    def tamano(self):
+        return self._tamano
+
+    def vaciar(self):
+        datos = b''.join(self._partes)
+        self._partes.clear()
+        self._tamano = 0
+        return datos
+
+
+def _linea(registro):
+    return (json.dumps(registro, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+@contextmanager
+def _instantanea():
+    """
+    Transacción de sólo lectura para que todas las secciones vean el mismo
+    estado. En PostgreSQL el nivel por defecto (READ COMMITTED) toma una
+    instantánea por consulta: se pide REPEATABLE READ antes de la primera.
+    SQLite ya lee de una única instantánea dentro de la transacción.
+    """
+    externa = connection.in_atomic_block
+    with transaction.atomic():
+        if connection.vendor == 'postgresql' and not externa:
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY')
+        yield
+
+
+def iterar_exportacion(usuario, umbral_bytes=64 * 1024):
+    """
+    Genera el zip de exportación del usuario como una secuencia de bloques de bytes.
+
+    Cada sección se lee con ``.iterator()`` y se comprime a medida que se
+    recorre, de modo que la memoria usada no depende del volumen del ledger.
+    Todas las secciones se leen en una misma transacción (``_instantanea``):
+    un gasto del archivo nunca apunta a una compra o tienda que no está en él.
+    """
+    salida = _BufferSalida()
+    conteos = {}
+    with _instantanea(), zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_DEFLATED) as archivo:
+        for seccion in SECCIONES:
+            cantidad = 0
+            with archivo.open(f'{seccion}.ndjson', 'w') as destino:
+                for registro in _EXPORTADORES[seccion](usuario).iterator(chunk_size=CHUNK_LECTURA):
+                    destino.write(_linea(registro))
+                    cantidad += 1
+                    if salida.tamano >= umbral_bytes:
+                        yield salida.vaciar()
+            conteos[seccion] = cantidad
+            if salida.tamano:
+                yield salida.vaciar()
+
+        manifiesto = {
+            'formato': FORMATO_VERSION,
+            'usuario': usuario.get_username(),
+            'generado': timezone.now(),
+            'conteos': conteos,
+        }
+        archivo.writestr('manifest.json', json.dumps(manifiesto, cls=DjangoJSONEncoder, indent=2))
+    yield salida.vaciar()
+
+
+def exportar_a_archivo(usuario, destino):
+    """Escribe la exportación completa en ``destino`` (objeto archivo binario)."""
+    for bloque in iterar_exportacion(usuario):
+        destino.write(bloque)
+
+
+# --- Importación ---
+
+def _leer_seccion(archivo, seccion):
+    nombre = f'{seccion}.ndjson'
+    if nombre not in archivo.namelist():
+        return
+    with archivo.open(nombre) as origen:
+        for numero, linea in enumerate(io.TextIOWrapper(origen, encoding='utf-8'), start=1):
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                yield json.loads(linea)
+            except json.JSONDecodeError as exc:
+                raise ErrorImportacion(f'{nombre}:{numero}: JSON inválido ({exc.msg}).') from exc
+
+
+def _lotes(registros, tamano):
+    registros = iter(registros)
+    while True:
+        lote = list(islice(registros, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+def _fecha_hora(valor):
+    return parse_datetime(valor) if valor else None
+
+
+def _fecha(valor):
+    return parse_date(valor) if valor else None
+
+
+class _Importador:
+    def __init__(self, usuario, tamano_lote):
+        self.usuario = usuario
+        self.tamano_lote = tamano_lote
+        # Remapeo id original -> id nuevo, por sección
+        self.ids = {seccion: {} for seccion in SECCIONES}
+        self.monedas = dict(Moneda.objects.values_list('codigo', 'id'))
+        self.tipos_cuenta = {}
+        for pk, nombre in TipoCuenta.objects.order_by('-id').values_list('id', 'nombre'):
+            self.tipos_cuenta[nombre] = pk
+        self.categorias = {}
+        for pk, nombre in Categoria.objects.order_by('-id').values_list('id', 'nombre'):
+            self.categorias[nombre] = pk
+        self.categorias_ingreso = {}
+        for pk, nombre in CategoriaIngreso.objects.order_by('-id').values_list('id', 'nombre'):
+            self.categorias_ingreso[nombre] = pk
+
+    # Resolución de referencias
+
+    def _ref(self, seccion, id_original):
+        if id_original is None:
+            return None
+        try:
+            return self.ids[seccion][id_original]
+        except KeyError:
+            # También en las opcionales: guardar NULL perdería el vínculo sin avisar
+            raise ErrorImportacion(f'Referencia a {seccion} #{id_original} inexistente en el archivo.')
+
+    def _moneda(self, codigo):
+        if codigo is None:
+            return None
+        try:
+            return self.monedas[codigo]
+        except KeyError:
+            raise ErrorImportacion(f'Moneda desconocida en este entorno: {codigo}.')
+
+    def _por_nombre(self, cache, modelo, nombre):
+        if not nombre:
+            return None
+        if nombre not in cache:
+            cache[nombre] = modelo.objects.create(nombre=nombre).pk
+        return cache[nombre]
+
+    # Constructores por sección
+
+    def _tiendas(self, lote):
+        # Mismo criterio que el índice único (usuario, lower(nombre))
+        existentes = {
+            nombre.lower(): pk
+            for nombre, pk in Tienda.objects.filter(usuario=self.usuario).values_list('nombre', 'id')
+        }
+        nuevas, pendientes, primeras = [], [], {}
+        self.tiendas_repetidas = []
+        for r in lote:
+            clave = r['nombre'].lower()
+            if clave in existentes:
+                self.ids['tiendas'][r['id']] = existentes[clave]
+            elif clave in primeras:
+                # Exportaciones anteriores podían traer la misma tienda con otra capitalización
+                self.tiendas_repetidas.append((r['id'], primeras[clave]))
+            else:
+                primeras[clave] = r['id']
+                nuevas.append(Tienda(usuario=self.usuario, nombre=r['nombre'], nombre_normalizado=normalizar_nombre(r['nombre'])))
+                pendientes.append(r['id'])
+        return nuevas, pendientes
+
+    def _cuentas(self, lote):
+        return [
+            Cuenta(
+                usuario=self.usuario,
+                nombre=r['nombre'],
+                tipo_id=self._por_nombre(self.tipos_cuenta, TipoCuenta, r.get('tipo_nombre')),
+                saldo_inicial=r['saldo_inicial'],
+                moneda_id=self._moneda(r['moneda_codigo']),
+            )
+            for r in lote
+        ]
+
+    def _compras(self, lote):
+        return [
+            Compra(
+                usuario=self.usuario,
+                fecha=_fecha_hora(r['fecha']),
+                lugar=r.get('lugar') or '',
+                tienda_id=self._ref('tiendas', r.get('tienda_id')),
+                cuenta_id=self._ref('cuentas', r.get('cuenta_id')),
+                moneda_id=self._moneda(r['moneda_codigo']),
+            )
+            for r in lote
+        ]
+
+    def _gastos(self, lote):
+        return [
+            Gasto(
+                usuario=self.usuario,
+                descripcion=r['descripcion'],
+                lugar=r.get('lugar'),
+                tienda_id=self._ref('tiendas', r.get('tienda_id')),
+                cantidad=r.get('cantidad') or 1,
+                monto=r['monto'],
+                descuento=r.get('descuento') or 0,
+                fecha=_fecha_hora(r['fecha']),
+                moneda_id=self._moneda(r.get('moneda_codigo')),
+                categoria_id=self._por_nombre(self.categorias, Categoria, r.get('categoria_nombre')),
+                cuenta_id=self._ref('cuentas', r.get('cuenta_id')),
+                compra_id=self._ref('compras', r.get('compra_id')),
+            )
+            for r in lote
+        ]
+
+    def _ingresos(self, lote):
+        return [
+            Ingreso(
+                usuario=self.usuario,
+                descripcion=r['descripcion'],
+                monto=r['monto'],
+                fecha=_fecha_hora(r['fecha']),
+                moneda_id=self._moneda(r.get('moneda_codigo')),
+                categoria_id=self._por_nombre(self.categorias_ingreso, CategoriaIngreso, r.get('categoria_nombre')),
+                cuenta_id=self._ref('cuentas', r.get('cuenta_id')),
+            )
+            for r in lote
+        ]
+
+    def _transferencias(self, lote):
+        return [
+            TransferenciaCuenta(
+                usuario=self.usuario,
+                cuenta_origen_id=self._ref('cuentas', r['cuenta_origen_id']),
+                cuenta_destino_id=self._ref('cuentas', r['cuenta_destino_id']),
+                monto_origen=r['monto_origen'],
+                monto_destino=r['monto_destino'],
+                tasa_manual=r['tasa_manual'],
+                nota=r.get('nota') or '',
+                fecha=_fecha_hora(r['fecha']),
+                gasto_id=self._ref('gastos', r.get('gasto_id')),
+                ingreso_id=self._ref('ingresos', r.get('ingreso_id')),
+            )
+            for r in lote
+        ]
+
+    def _deudas(self, lote):
+        return [
+            Deuda(
+                usuario=self.usuario,
+                persona=r['persona'],
+                tipo=r['tipo'],
+                monto=r['monto'],
+                moneda_id=self._moneda(r['moneda_codigo']),
+                fecha=_fecha_hora(r['fecha']),
+                fecha_vencimiento=_fecha(r.get('fecha_vencimiento')),
+                estado=r.get('estado') or 'PENDIENTE',
+                descripcion=r.get('descripcion') or '',
+            )
+            for r in lote
+        ]
+
+    def _pagos(self, lote):
+        return [
+            PagoDeuda(
+                deuda_id=self._ref('deudas', r['deuda_id']),
+                monto=r['monto'],
+                fecha=_fecha_hora(r['fecha']),
+                nota=r.get('nota') or '',
+                gasto_relacionado_id=self._ref('gastos', r.get('gasto_relacionado_id')),
+                ingreso_relacionado_id=self._ref('ingresos', r.get('ingreso_relacionado_id')),
+            )
+            for r in lote
+        ]
+
+    def _marcar_transferencias(self, transferencias):
+        # bulk_create no dispara la señal que marca los movimientos generados
+        gastos = [t.gasto_id for t in transferencias if t.gasto_id]
+        ingresos = [t.ingreso_id for t in transferencias if t.ingreso_id]
+        if gastos:
+            Gasto.objects.filter(pk__in=gastos).update(es_transferencia=True)
+        if ingresos:
+            Ingreso.objects.filter(pk__in=ingresos).update(es_transferencia=True)
+
+    def importar_seccion(self, archivo, seccion):
+        constructor = getattr(self, f'_{seccion}')
+        total = 0
+        for lote in _lotes(_leer_seccion(archivo, seccion), self.tamano_lote):
+            with transaction.atomic():
+                if seccion == 'tiendas':
+                    objetos, ids_originales = constructor(lote)
+                else:
+                    objetos, ids_originales = constructor(lote), [r['id'] for r in lote]
+                modelo = type(objetos[0]) if objetos else None
+                if modelo is not None:
+                    creados = modelo.objects.bulk_create(objetos, batch_size=self.tamano_lote)
+                    for id_original, objeto in zip(ids_originales, creados):
+                        self.ids[seccion][id_original] = objeto.pk
+                    if seccion != 'tiendas':
+                        registrar_cambios(self.usuario.pk, seccion, [objeto.pk for objeto in creados])
+                if seccion == 'tiendas':
+                    for id_original, id_primera in self.tiendas_repetidas:
+                        self.ids['tiendas'][id_original] = self.ids['tiendas'][id_primera]
+                elif seccion == 'transferencias' and objetos:
+                    self._marcar_transferencias(objetos)
+            total += len(lote)
+        return total
+
+
+def importar_archivo(archivo, usuario, tamano_lote=TAMANO_LOTE):
+    """
+    Importa un zip generado por :func:`iterar_exportacion` en la cuenta de ``usuario``.
+
+    Los registros se insertan con ``bulk_create`` en lotes de ``tamano_lote``,
+    cada uno en su propia transacción. Una referencia a un objeto que no está
+    en el archivo (un export parcial o editado a mano) es un
+    :class:`ErrorImportacion`. Retorna la cantidad de registros leídos por
+    sección.
+    """
+    try:
+        zip_entrada = zipfile.ZipFile(archivo)
+    except zipfile.BadZipFile as exc:
+        raise ErrorImportacion('El archivo no es un zip válido.') from exc
+
+    with zip_entrada:
+        try:
+            manifiesto = json.loads(zip_entrada.read('manifest.json'))
+        except KeyError as exc:
+            raise ErrorImportacion('Falta manifest.json en el archivo.') from exc
+        if manifiesto.get('formato') != FORMATO_VERSION:
+            raise ErrorImportacion(f"Versión de formato no soportada: {manifiesto.get('formato')}.")
+
+        importador = _Importador(usuario, tamano_lote)
+        return {seccion: importador.importar_seccion(zip_entrada, seccion) for seccion in SECCIONES}
@@ -1,9 +1,12 @@
 import os
-from django.db.models.signals import post_save, post_migrate
+from django.db.models.signals import post_delete, post_save, post_migrate
 from django.contrib.auth.models import User
 from django.dispatch import receiver
 from django.conf import settings
-from .models import PerfilUsuario
+from billetera import cache
+from gastos.models import TipoCambio
+from .authentication import usuarios_cache
+from .models import PerfilUsuario, Plan
 
 
 @receiver(post_save, sender=User)
@@ -12,6 +15,26 @@ def crear_perfil_usuario(sender, instance, created, **kwargs):
         PerfilUsuario.objects.create(usuario=instance)
 
 
+@receiver([post_save, post_delete], sender=User)
+def descartar_usuario_cacheado(sender, instance, **kwargs):
+    # La cache de usuarios.authentication es por proceso; el resto vence por TTL
+    usuarios_cache.descartar(instance.pk)
+    # El dashboard depende del usuario (p.ej. is_superuser), no sólo de su libro
+    cache.invalidar('inicio', instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Plan)
+def invalidar_planes(sender, **kwargs):
+    cache.invalidar('planes')
+
+
+@receiver([post_save, post_delete], sender=TipoCambio)
+def invalidar_patrimonio(sender, **kwargs):
+    # Las cotizaciones no están en el registro de cambios: el patrimonio de
+    # todos los dashboards se recalcula
+    cache.invalidar('inicio')
+
+
 @receiver(post_save, sender=User)
 def guardar_perfil_usuario(sender, instance, **kwargs):
     # Evitar AttributeError si el perfil aún no existe (caso raro en condiciones de carrera)
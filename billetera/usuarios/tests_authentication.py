@@ -0,0 +1,84 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from usuarios.authentication import CacheTTL, tokens_cache, usuarios_cache
+
+
+def consultas_a_usuarios(contexto):
+    return [q['sql'] for q in contexto.captured_queries if '"auth_user"' in q['sql']]
+
+
+class JWTLigeroAuthenticationTests(TestCase):
+    def setUp(self):
+        usuarios_cache.limpiar()
+        tokens_cache.limpiar()
+        self.user = User.objects.create_user(username='jwt-user', email='jwt@example.com', password='s3cure-pass-123')
+
+    def _token(self, username='jwt-user'):
+        response = self.client.post(
+            reverse('token_obtain_pair'),
+            {'username': username, 'password': 's3cure-pass-123'},
+            content_type='application/json',
+        )
+        return response.json()['access']
+
+    def _get(self, url, token):
+        return self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_token_incluye_claims_de_usuario(self):
+        token = AccessToken(self._token())
+
+        self.assertEqual(token['username'], 'jwt-user')
+        self.assertEqual(token['email'], 'jwt@example.com')
+        self.assertEqual(token['role'], 'user')
+
+    def test_request_autenticado_sin_consultar_usuarios(self):
+        token = self._token()
+
+        with CaptureQueriesContext(connection) as contexto:
+            response = self._get('/gastos/api/', token)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(consultas_a_usuarios(contexto), [])
+
+    def test_rol_admin_conserva_permisos_de_superusuario(self):
+        User.objects.create_superuser(username='jwt-admin', email='a@example.com', password='s3cure-pass-123')
+        token = self._token('jwt-admin')
+
+        self.assertEqual(AccessToken(token)['role'], 'admin')
+        self.assertEqual(self._get('/api/sync/', token).status_code, 200)
+
+    def test_token_sin_claims_usa_usuario_cacheado(self):
+        token = str(AccessToken.for_user(self.user))
+
+        with CaptureQueriesContext(connection) as contexto:
+            self.assertEqual(self._get('/gastos/api/', token).status_code, 200)
+            self.assertEqual(self._get('/gastos/api/', token).status_code, 200)
+
+        self.assertEqual(len(consultas_a_usuarios(contexto)), 1)
+
+    def test_token_sin_claims_rechaza_usuario_inactivo(self):
+        token = str(AccessToken.for_user(self.user))
+        self.assertEqual(self._get('/gastos/api/', token).status_code, 200)
+
+        # Guardar el usuario descarta la entrada cacheada
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self._get('/gastos/api/', token).status_code, 401)
+
+
+class CacheTTLTests(TestCase):
+    def test_vencimiento_y_tamano_maximo(self):
+        cache = CacheTTL(ttl=60, max_entradas=2)
+        cache.guardar('a', 1)
+        cache.guardar('b', 2, ttl=-1)
+        cache.guardar('c', 3)
+
+        self.assertIsNone(cache.obtener('a'))
+        self.assertIsNone(cache.obtener('b'))
+        self.assertEqual(cache.obtener('c'), 3)
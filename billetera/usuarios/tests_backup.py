@@ -1,9 +1,15 @@
 import os
+import sqlite3
+import tempfile
+from contextlib import closing
+
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
 from unittest.mock import patch
 
+from usuarios.backup import _copiar_sqlite
+
 
 class BackupEndpointTests(TestCase):
     def setUp(self):
@@ -40,3 +46,22 @@ class BackupEndpointTests(TestCase):
         resp = self.client.get(self.url)
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.json().get('status'), 'ok')
+
+
+class CopiaSqliteTests(TestCase):
+    def test_incluye_lo_que_sigue_en_el_wal(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            origen = os.path.join(directorio, 'origen.sqlite3')
+            destino = os.path.join(directorio, 'copia.sqlite3')
+            with closing(sqlite3.connect(origen)) as conexion:
+                conexion.execute('PRAGMA journal_mode = WAL')
+                conexion.execute('CREATE TABLE prueba (n integer)')
+                conexion.execute('INSERT INTO prueba VALUES (1)')
+                conexion.commit()
+
+                # Sin checkpoint: los datos todavía están sólo en el -wal
+                _copiar_sqlite(origen, destino)
+
+            with closing(sqlite3.connect(destino)) as copia:
+                self.assertEqual(copia.execute('SELECT n FROM prueba').fetchall(), [(1,)])
+                self.assertEqual(copia.execute('PRAGMA journal_mode').fetchone()[0], 'delete')
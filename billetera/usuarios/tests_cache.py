@@ -0,0 +1,134 @@
+import subprocess
+import sys
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache as cache_django
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from billetera import cache, configuracion_cache
+from gastos.models import Gasto, Moneda
+from .models import Plan
+
+
+class ConfiguracionCacheTests(TestCase):
+    def test_backends_por_url(self):
+        self.assertEqual(configuracion_cache.configuracion('locmem://')['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+
+        archivo = configuracion_cache.configuracion('file:///tmp/billetera-cache?max_entries=500', timeout=60, prefijo='bt')
+        self.assertEqual(archivo['LOCATION'], '/tmp/billetera-cache')
+        self.assertEqual((archivo['TIMEOUT'], archivo['KEY_PREFIX']), (60, 'bt'))
+        self.assertEqual(archivo['OPTIONS'], {'MAX_ENTRIES': 500})
+
+        self.assertEqual(configuracion_cache.configuracion('db://')['LOCATION'], 'billetera_cache')
+        self.assertEqual(configuracion_cache.configuracion('db://mi_cache')['LOCATION'], 'mi_cache')
+
+    def test_esquema_desconocido(self):
+        with self.assertRaises(ImproperlyConfigured):
+            configuracion_cache.configuracion('memcache://localhost:11211')
+
+    def test_settings_no_importan_django(self):
+        # Los settings se cargan antes que Django: ni la cache ni la base ni las plantillas
+        codigo = 'import sys, billetera.settings; print(sorted(m for m in sys.modules if m.startswith("django")))'
+        salida = subprocess.run(
+            [sys.executable, '-c', codigo], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            env={'PATH': '', 'CACHE_URL': 'locmem://'},
+        )
+        self.assertEqual(salida.stdout.strip(), '[]')
+
+    def test_claves(self):
+        self.assertEqual(cache.clave('stats', 3, 'gastos'), 'stats:3:gastos')
+        larga = cache.clave('stats', 'x' * 100, 'con espacios')
+        self.assertNotIn(' ', larga)
+        self.assertLess(len(larga), 100)
+
+
+class VersionesCacheTests(TestCase):
+    def setUp(self):
+        cache_django.clear()
+        cache.reiniciar_metricas()
+
+    def test_obtener_o_calcular_y_metricas(self):
+        llamadas = []
+
+        def calcular():
+            llamadas.append(1)
+            return {'total': 10}
+
+        for _ in range(3):
+            self.assertEqual(cache.obtener_o_calcular('prueba', ['a'], calcular), {'total': 10})
+
+        self.assertEqual(len(llamadas), 1)
+        metricas = cache.metricas()['prueba']
+        self.assertEqual((metricas['aciertos'], metricas['fallos']), (2, 1))
+        self.assertEqual(metricas['tasa_aciertos'], 0.667)
+
+    def test_los_valores_vacios_tambien_se_cachean(self):
+        llamadas = []
+        for _ in range(2):
+            cache.obtener_o_calcular('prueba', ['vacio'], lambda: llamadas.append(1))
+        self.assertEqual(len(llamadas), 1)
+
+    def test_invalidar_por_usuario_y_global(self):
+        def leer(usuario_id, valor):
+            return cache.obtener_o_calcular('prueba', ['x'], lambda: valor, usuario_id=usuario_id, versionado=True)
+
+        leer(1, 'uno')
+        leer(2, 'dos')
+
+        cache.invalidar('prueba', 1)
+        self.assertEqual(leer(1, 'uno nuevo'), 'uno nuevo')
+        self.assertEqual(leer(2, 'otro'), 'dos')
+
+        cache.invalidar('prueba')
+        self.assertEqual(leer(2, 'dos nuevo'), 'dos nuevo')
+
+    def test_version_perdida_no_reutiliza_entradas_viejas(self):
+        with mock.patch('billetera.cache.time.time', return_value=1000):
+            anterior = cache.version('prueba', 1)
+        cache_django.delete(cache.clave('version', 'prueba', 1))
+        with mock.patch('billetera.cache.time.time', return_value=2000):
+            self.assertNotEqual(cache.version('prueba', 1), anterior)
+
+
+class CacheVistasTests(TestCase):
+    def setUp(self):
+        cache_django.clear()
+        self.user = User.objects.create_user(username='cacheado', password='pass-123')
+        self.ars = Moneda.objects.get(codigo='ARS')
+        self.client.login(username='cacheado', password='pass-123')
+
+    def _consultas(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(consultas)
+
+    def test_dashboard_desde_cache_hasta_que_cambia_el_libro(self):
+        Gasto.objects.create(usuario=self.user, descripcion='Café', monto=Decimal('100'), moneda=self.ars)
+
+        primera, consultas_primera = self._consultas('/?rango=todo')
+        segunda, consultas_segunda = self._consultas('/?rango=todo')
+
+        self.assertLess(consultas_segunda, consultas_primera)
+        self.assertEqual(segunda.context['total_gastos'], primera.context['total_gastos'])
+
+        Gasto.objects.create(usuario=self.user, descripcion='Cena', monto=Decimal('50'), moneda=self.ars)
+        tercera, _ = self._consultas('/?rango=todo')
+        self.assertEqual(tercera.context['total_gastos'], primera.context['total_gastos'] + Decimal('50'))
+
+    def test_lista_de_planes_se_invalida_al_editar_un_plan(self):
+        Plan.objects.create(nombre=Plan.PRO, precio='9.99')
+        self._consultas('/usuarios/planes/')
+        _, consultas = self._consultas('/usuarios/planes/')
+
+        Plan.objects.create(nombre=Plan.PREMIUM, precio='19.99')
+        response, consultas_tras_cambio = self._consultas('/usuarios/planes/')
+
+        self.assertEqual([p.nombre for p in response.context['planes']], [Plan.PRO, Plan.PREMIUM])
+        self.assertGreater(consultas_tras_cambio, consultas)
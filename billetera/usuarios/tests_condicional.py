@@ -0,0 +1,69 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.contrib import messages
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from billetera.condicional import etag_libro
+from gastos.models import Gasto, Moneda
+
+
+class GetCondicionalTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='etag', password='pass-123')
+        self.ars = Moneda.objects.get(codigo='ARS')
+        Gasto.objects.create(usuario=self.user, descripcion='Café', monto=Decimal('3'), moneda=self.ars)
+        self.client.login(username='etag', password='pass-123')
+
+    def test_lista_gastos_responde_304_sin_cambios(self):
+        url = reverse('gastos:lista_gastos')
+        primera = self.client.get(url)
+        self.assertEqual(primera.status_code, 200)
+        self.assertIn('private', primera['Cache-Control'])
+
+        with self.assertNumQueries(3):  # sesión, usuario y versión del libro
+            segunda = self.client.get(url, HTTP_IF_NONE_MATCH=primera['ETag'])
+        self.assertEqual(segunda.status_code, 304)
+
+    def test_cambio_en_el_libro_invalida_el_etag(self):
+        url = reverse('gastos:lista_gastos')
+        etag = self.client.get(url)['ETag']
+
+        Gasto.objects.create(usuario=self.user, descripcion='Pan', monto=Decimal('2'), moneda=self.ars)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depende_de_la_ruta_y_del_usuario(self):
+        etag = self.client.get(reverse('inicio_usuarios'))['ETag']
+        self.assertEqual(self.client.get(reverse('inicio_usuarios'), {'rango': '7d'}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        User.objects.create_user(username='etag-otro', password='pass-123')
+        self.client.login(username='etag-otro', password='pass-123')
+        self.assertEqual(self.client.get(reverse('inicio_usuarios'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_mensajes_pendientes_evitan_el_304(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        request._messages = CookieStorage(request)
+        self.assertIsNotNone(etag_libro(request))
+
+        messages.success(request, 'Cuenta creada exitosamente.')
+
+        self.assertIsNone(etag_libro(request))
+
+    def test_api_responde_304_sin_cambios(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        primera = client.get('/gastos/api/')
+        self.assertEqual(primera.status_code, 200)
+
+        segunda = client.get('/gastos/api/', HTTP_IF_NONE_MATCH=primera['ETag'])
+        self.assertEqual(segunda.status_code, 304)
+
+        client.post('/gastos/api/', {'descripcion': 'Taxi', 'monto': '5.00'}, format='json')
+        self.assertEqual(client.get('/gastos/api/', HTTP_IF_NONE_MATCH=primera['ETag']).status_code, 200)
@@ -1,3 +1,6 @@
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.contrib.auth.models import User
 from cuentas.models import Cuenta, TipoCuenta, TransferenciaCuenta
@@ -120,6 +123,24 @@ class DashboardCuentasTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.context['total_ingresos'], Decimal('200.00'))
 
+    def test_totales_sin_moneda_por_defecto(self):
+        """Sin ARS en el registro no se suman los movimientos sin moneda."""
+        for moneda, monto in ((self.moneda_ingreso, '300.00'), (None, '70.00')):
+            Ingreso.objects.create(
+                usuario=self.user,
+                monto=Decimal(monto),
+                fecha=timezone.now(),
+                descripcion='Ingreso',
+                moneda=moneda,
+                cuenta=self.cuenta
+            )
+
+        cache.clear()
+        with mock.patch('usuarios.views.moneda_por_defecto', return_value=None):
+            response = self.client.get(reverse('inicio_usuarios'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_ingresos'], Decimal('300.00'))
+
     def test_dashboard_totals_ignore_transfers(self):
         moneda_usd_gasto, _ = MonedaGasto.objects.get_or_create(
             codigo='USD', defaults={'nombre': 'Dólar', 'simbolo': 'U$S'}
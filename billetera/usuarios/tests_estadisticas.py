@@ -0,0 +1,94 @@
+from datetime import datetime
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cuentas.models import Cuenta, TransferenciaCuenta
+from gastos.models import Categoria, Gasto, Moneda, Tienda
+from ingresos.models import Ingreso, Moneda as MonedaIngreso
+
+
+def fecha(dia, mes=10):
+    return timezone.make_aware(datetime(2026, mes, dia, 12, 0))
+
+
+class EstadisticasApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='stats', password='pass-123')
+        otro = User.objects.create_user(username='otro-stats', password='pass-123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.ars = Moneda.objects.get(codigo='ARS')
+        self.usd = Moneda.objects.get(codigo='USD')
+        super_ = Categoria.objects.create(nombre='Súper')
+        ocio = Categoria.objects.create(nombre='Ocio')
+        self.tienda = Tienda.objects.create(usuario=self.user, nombre='Día')
+        banco = Cuenta.objects.create(usuario=self.user, nombre='Banco', moneda=self.ars)
+        efectivo = Cuenta.objects.create(usuario=self.user, nombre='Efectivo', moneda=self.ars)
+
+        for dia, monto, categoria, moneda in (
+            (1, '100', super_, self.ars), (2, '50', super_, self.ars),
+            (3, '30', ocio, self.ars), (3, '5', ocio, self.usd),
+        ):
+            Gasto.objects.create(usuario=self.user, descripcion='g', monto=Decimal(monto), moneda=moneda,
+                                 categoria=categoria, tienda=self.tienda, fecha=fecha(dia))
+        Gasto.objects.create(usuario=self.user, descripcion='nov', monto=Decimal('7'), moneda=self.ars, fecha=fecha(2, mes=11))
+        # Ni las transferencias ni los datos de otro usuario cuentan
+        transferido = Gasto.objects.create(usuario=self.user, descripcion='t', monto=Decimal('999'), moneda=self.ars, fecha=fecha(1))
+        TransferenciaCuenta.objects.create(usuario=self.user, cuenta_origen=banco, cuenta_destino=efectivo,
+                                           monto_origen=Decimal('999'), monto_destino=Decimal('999'), gasto=transferido)
+        Gasto.objects.create(usuario=otro, descripcion='ajeno', monto=Decimal('1000'), moneda=self.ars, fecha=fecha(1))
+
+    def test_agrupa_por_mes_y_categoria(self):
+        response = self.client.get('/api/stats/gastos/', {'periodo': 'mes', 'por': 'categoria'})
+
+        self.assertEqual(response.status_code, 200)
+        filas = {(f['periodo'], f['categoria'], f['moneda']): (f['total'], f['cantidad']) for f in response.json()['resultados']}
+        self.assertEqual(filas, {
+            ('2026-10-01', 'Súper', 'ARS'): ('150.00', 2),
+            ('2026-10-01', 'Ocio', 'ARS'): ('30.00', 1),
+            ('2026-10-01', 'Ocio', 'USD'): ('5.00', 1),
+            ('2026-11-01', None, 'ARS'): ('7.00', 1),
+        })
+
+    def test_por_dia_con_rango_de_fechas(self):
+        response = self.client.get('/api/stats/gastos/', {'periodo': 'day', 'desde': '2026-10-02', 'hasta': '2026-10-03'})
+
+        filas = [(f['periodo'], f['moneda'], f['total']) for f in response.json()['resultados']]
+        self.assertEqual(filas, [('2026-10-02', 'ARS', '50.00'), ('2026-10-03', 'ARS', '30.00'), ('2026-10-03', 'USD', '5.00')])
+
+    def test_ingresos_por_moneda(self):
+        Ingreso.objects.create(usuario=self.user, descripcion='Sueldo', monto=Decimal('500'),
+                               moneda=MonedaIngreso.objects.get(codigo='ARS'), fecha=fecha(5))
+
+        response = self.client.get('/api/stats/ingresos/', {'por': 'moneda'})
+
+        self.assertEqual(response.json()['resultados'], [{'moneda': 'ARS', 'total': '500.00', 'cantidad': 1}])
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.client.get('/api/stats/ingresos/', {'por': 'tienda'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/stats/gastos/', {'periodo': 'hora'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/stats/gastos/', {'desde': 'ayer'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/stats/deudas/').status_code, 400)
+
+    def test_cache_por_version_del_libro(self):
+        url = '/api/stats/gastos/'
+        self.client.get(url, {'por': 'tienda'})
+
+        # Sólo se consulta la versión del libro
+        with self.assertNumQueries(1):
+            cacheada = self.client.get(url, {'por': 'tienda'})
+        self.assertEqual(cacheada.json()['resultados'][0]['total'], '180.00')
+
+        Gasto.objects.create(usuario=self.user, descripcion='nuevo', monto=Decimal('20'), moneda=self.ars,
+                             tienda=self.tienda, fecha=fecha(4))
+        self.assertEqual(self.client.get(url, {'por': 'tienda'}).json()['resultados'][0]['total'], '200.00')
+
+    def test_requiere_autenticacion(self):
+        self.assertIn(APIClient().get('/api/stats/gastos/').status_code, (401, 403))
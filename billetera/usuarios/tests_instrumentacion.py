@@ -0,0 +1,86 @@
+import json
+import re
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.cache import cache as cache_django
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from billetera import instrumentacion
+
+
+def _metricas(cabecera):
+    """``{nombre: {dur, desc}}`` de una cabecera Server-Timing."""
+    resultado = {}
+    for metrica in cabecera.split(', '):
+        nombre, *parametros = metrica.split(';')
+        resultado[nombre] = dict(parametro.split('=', 1) for parametro in parametros)
+    return resultado
+
+
+@override_settings(MEDICION_SERVER_TIMING=True)
+class MedicionMiddlewareTests(TestCase):
+    def setUp(self):
+        cache_django.clear()
+        self.user = User.objects.create_user(username='medido', password='x')
+        self.client.force_login(self.user)
+
+    def test_server_timing_del_dashboard(self):
+        with self.assertLogs('billetera.rendimiento', 'INFO') as logs:
+            primera = self.client.get(reverse('inicio_usuarios'))
+            segunda = self.client.get(reverse('inicio_usuarios'))
+
+        metricas = _metricas(primera['Server-Timing'])
+        self.assertEqual(set(metricas), {'total', 'sql', 'plantillas', 'cache'})
+        self.assertGreater(float(metricas['total']['dur']), 0)
+        self.assertGreater(float(metricas['plantillas']['dur']), 0)
+        consultas = int(re.match(r'"(\d+) consultas"', metricas['sql']['desc']).group(1))
+        self.assertGreater(consultas, 0)
+        self.assertEqual(metricas['cache']['desc'], '"0 aciertos / 1 fallos"')
+        # El resumen quedó en la cache
+        self.assertEqual(_metricas(segunda['Server-Timing'])['cache']['desc'], '"1 aciertos / 0 fallos"')
+
+        linea = json.loads(logs.records[0].getMessage())
+        self.assertEqual(linea['vista'], 'inicio_usuarios')
+        self.assertEqual((linea['metodo'], linea['estado']), ('GET', 200))
+        self.assertEqual(linea['consultas'], consultas)
+        self.assertNotIn('top_sql', linea)
+
+    @override_settings(MEDICION_UMBRAL_LENTO_MS=0, MEDICION_TOP_SQL=2)
+    def test_request_lento_registra_consultas(self):
+        with self.assertLogs('billetera.rendimiento', 'WARNING') as logs:
+            self.client.get(reverse('inicio_usuarios'))
+
+        linea = json.loads(logs.records[0].getMessage())
+        self.assertEqual(len(linea['top_sql']), 2)
+        self.assertGreaterEqual(linea['top_sql'][0]['ms'], linea['top_sql'][1]['ms'])
+        self.assertTrue(all(fila['veces'] >= 1 for fila in linea['top_sql']))
+
+    @override_settings(MEDICION_SERVER_TIMING=False)
+    def test_cabecera_desactivada(self):
+        with self.assertLogs('billetera.rendimiento', 'INFO'):
+            respuesta = self.client.get(reverse('inicio_usuarios'))
+        self.assertNotIn('Server-Timing', respuesta)
+
+    async def test_middleware_async_bajo_asgi(self):
+        async def vista(request):
+            return HttpResponse('ok')
+
+        middleware = instrumentacion.MedicionMiddleware(vista)
+        # Django lo encadena sin adaptarlo a sync: no agrega un salto a un hilo
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        respuesta = await middleware(RequestFactory().get('/'))
+        self.assertEqual(set(_metricas(respuesta['Server-Timing'])), {'total', 'sql', 'plantillas', 'cache'})
+
+    def test_consultas_agrupadas_por_sentencia(self):
+        medicion = instrumentacion.Medicion()
+        with connection.execute_wrapper(medicion):
+            for numero in range(3):
+                User.objects.filter(pk=numero).exists()
+
+        self.assertEqual(medicion.consultas, 3)
+        self.assertEqual(medicion.top_sql(5)[0]['veces'], 3)
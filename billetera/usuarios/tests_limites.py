@@ -0,0 +1,134 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from billetera.limites import LimiteExcedido, consumir, identidad, parsear_tasa, turno_pesado
+from gastos.models import Moneda
+
+LIMITES = {'pdf': '', 'backup': '', 'webhook': '2/min', 'bulk': '1/min', 'prueba': '2/min'}
+
+
+@override_settings(LIMITES_TASA=LIMITES, LIMITE_CONCURRENTES_POR_USUARIO=1)
+class LimitesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='limitado', password='pass-123')
+
+    def test_parsear_tasa(self):
+        self.assertEqual(parsear_tasa('10/min'), (10, 60))
+        self.assertEqual(parsear_tasa('3/hour'), (3, 3600))
+
+    def test_ventana_deslizante_admite_la_tasa(self):
+        self.assertEqual(consumir('prueba', 'u1', ahora=0), 0)
+        self.assertEqual(consumir('prueba', 'u1', ahora=15), 0)
+        self.assertAlmostEqual(consumir('prueba', 'u1', ahora=20), 70)
+
+        # Otra identidad tiene su propio contador
+        self.assertEqual(consumir('prueba', 'u2', ahora=20), 0)
+        # Al empezar la ventana siguiente la anterior todavía pesa entera
+        self.assertAlmostEqual(consumir('prueba', 'u1', ahora=60), 30)
+        self.assertEqual(consumir('prueba', 'u1', ahora=90), 0)
+
+    def test_borde_de_ventana_no_admite_el_doble(self):
+        # Dos al final de una ventana y dos al principio de la siguiente:
+        # con ventanas fijas pasarían los cuatro en dos segundos
+        resultados = [consumir('prueba', 'u1', ahora=ahora) for ahora in (59, 59, 60, 60)]
+
+        self.assertEqual(resultados[:2], [0, 0])
+        self.assertTrue(all(resultados[2:]))
+
+    def test_espera_con_la_ventana_anterior_llena(self):
+        consumir('prueba', 'u1', ahora=50)
+        consumir('prueba', 'u1', ahora=55)
+
+        # A los 30 s de la ventana siguiente la anterior pesa la mitad: 2 * 0.5 + 1 = 2
+        espera = consumir('prueba', 'u1', ahora=70)
+        self.assertAlmostEqual(espera, 20)
+        self.assertEqual(consumir('prueba', 'u1', ahora=70 + espera), 0)
+
+    def test_requests_simultaneos_no_leen_el_mismo_contador(self):
+        # Entre la lectura y la escritura de otro request el contador ya avanzó:
+        # con get/set ambos verían 0 y pasarían los dos
+        incr = cache.incr
+
+        def incr_con_otro_request(llave, delta=1):
+            incr(llave, delta)
+            return incr(llave, delta)
+
+        with patch.object(cache, 'incr', side_effect=incr_con_otro_request):
+            self.assertEqual(consumir('prueba', 'u1', ahora=0), 0)
+        self.assertAlmostEqual(consumir('prueba', 'u1', ahora=0), 90)
+
+    @override_settings(PROXIES_CONFIABLES=1)
+    def test_ip_del_cliente_detras_del_proxy(self):
+        fabrica = RequestFactory()
+        request = fabrica.get('/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='6.6.6.6, 200.1.2.3')
+        otro = fabrica.get('/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='200.9.9.9')
+        for r in (request, otro):
+            r.user = AnonymousUser()
+
+        # La primera entrada la puede inventar el cliente; vale la que agregó el proxy
+        self.assertEqual(identidad(request), 'ip200.1.2.3')
+        self.assertEqual(identidad(otro), 'ip200.9.9.9')
+        sin_cabecera = fabrica.get('/', REMOTE_ADDR='10.0.0.1')
+        sin_cabecera.user = AnonymousUser()
+        self.assertEqual(identidad(sin_cabecera), 'ip10.0.0.1')
+
+    def test_clase_sin_tasa_no_se_limita(self):
+        for _ in range(50):
+            self.assertEqual(consumir('pdf', 'u1'), 0)
+
+    def test_tope_de_concurrencia_por_usuario(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+
+        with turno_pesado(request):
+            with self.assertRaises(LimiteExcedido):
+                with turno_pesado(request):
+                    pass
+        # Al terminar se libera el turno
+        with turno_pesado(request):
+            pass
+
+    # A mitad de una ventana: los tres requests caen en la misma
+    @patch('billetera.limites.time')
+    def test_decorador_responde_429_con_retry_after(self, mock_time):
+        mock_time.time.return_value = 30.0
+        url = reverse('usuarios:webhook_mercadopago')
+
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url).status_code, 400)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+
+    @patch.dict('os.environ', {'BACKUP_WEBHOOK_TOKEN': 'secreto'})
+    @patch('usuarios.views.run_database_backup', return_value={})
+    def test_vista_async_libera_el_turno_pesado(self, mock_backup):
+        url = reverse('admin_backup')
+
+        for _ in range(2):
+            self.assertEqual(self.client.get(url, {'token': 'secreto'}).status_code, 200)
+
+        self.assertEqual(mock_backup.call_count, 2)
+
+    @patch('billetera.limites.time')
+    def test_throttle_de_la_api_bulk(self, mock_time):
+        mock_time.time.return_value = 30.0
+        client = APIClient()
+        client.force_authenticate(self.user)
+        moneda = Moneda.objects.get(codigo='ARS')
+        items = [{'descripcion': 'Café', 'monto': '10.00', 'moneda': moneda.id}]
+
+        self.assertEqual(client.post('/gastos/api/bulk/', items, format='json').status_code, 201)
+        response = client.post('/gastos/api/bulk/', items, format='json')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        # El resto de la API no comparte el contador
+        self.assertEqual(client.get('/gastos/api/').status_code, 200)
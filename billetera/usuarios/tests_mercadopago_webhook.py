@@ -111,4 +111,58 @@ class MercadoPagoWebhookTests(TestCase):
         subscription = Suscripcion.objects.get(usuario=self.user)
         self.assertEqual(subscription.fecha_inicio, first_now)
         self.assertEqual(subscription.fecha_fin, first_now + timedelta(days=30))
-        self.assertEqual(Suscripcion.objects.count(), 1)
\ No newline at end of file
+        self.assertEqual(Suscripcion.objects.count(), 1)
+
+    @patch.dict('os.environ', {'MERCADOPAGO_WEBHOOK_SECRET': 'webhook-secret', 'MERCADOPAGO_ACCESS_TOKEN': 'token'}, clear=False)
+    @patch('usuarios.views.mercadopago')
+    async def test_webhook_async_bajo_asgi(self, mock_mercadopago):
+        payment_client = Mock()
+        payment_client.get.return_value = {
+            'response': {
+                'status': 'approved',
+                'external_reference': f'{self.user.id}_{self.plan.id}',
+            }
+        }
+        mock_mercadopago.SDK.return_value.payment.return_value = payment_client
+
+        response = await self.async_client.post(
+            f'{self.url}?topic=payment&data.id={self.payment_id}',
+            data=json.dumps({'type': 'payment', 'data': {'id': self.payment_id}}),
+            content_type='application/json',
+            headers={'x-signature': self._signature(), 'x-request-id': self.request_id},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payment_client.get.assert_called_once_with(self.payment_id)
+        self.assertTrue(await Suscripcion.objects.filter(usuario=self.user, external_id=self.payment_id).aexists())
+
+
+class ProcesarPagoTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='mp-pago', email='pago@example.com', password='safe-pass-123')
+        self.plan = Plan.objects.create(nombre=Plan.PRO, precio='9.99')
+        self.url = reverse('usuarios:procesar_pago', args=[self.plan.id])
+
+    def test_requiere_login(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/login/', response['Location'])
+
+    @patch('usuarios.views.mercadopago')
+    def test_redirige_al_checkout(self, mock_mercadopago):
+        preference_client = Mock()
+        preference_client.create.return_value = {'response': {'init_point': 'https://mp.example/checkout/1'}}
+        mock_mercadopago.SDK.return_value.preference.return_value = preference_client
+        self.client.login(username='mp-pago', password='safe-pass-123')
+
+        response = self.client.get(self.url)
+
+        self.assertRedirects(response, 'https://mp.example/checkout/1', fetch_redirect_response=False)
+        datos = preference_client.create.call_args.args[0]
+        self.assertEqual(datos['payer']['email'], 'pago@example.com')
+        self.assertEqual(datos['external_reference'], f'{self.user.id}_{self.plan.id}')
+
+    def test_plan_inexistente(self):
+        self.client.login(username='mp-pago', password='safe-pass-123')
+        self.assertEqual(self.client.get(reverse('usuarios:procesar_pago', args=[999])).status_code, 404)
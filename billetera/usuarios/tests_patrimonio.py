@@ -0,0 +1,162 @@
+import io
+import os
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from billetera import referencias
+from cuentas.models import Cuenta
+from gastos.models import Gasto, Moneda, TipoCambio
+from ingresos.models import Ingreso
+from .patrimonio import ErrorTiposCambio, flujo_consolidado, importar_tipos_cambio, patrimonio_consolidado
+
+
+def fecha(dia, mes=3):
+    return timezone.make_aware(datetime(2026, mes, dia, 12, 0))
+
+
+class PatrimonioTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='patrimonio', password='pass-123')
+        self.ars = Moneda.objects.get(codigo='ARS')
+        self.usd = Moneda.objects.get(codigo='USD')
+        self.eur = Moneda.objects.get(codigo='EUR')
+        TipoCambio.objects.create(moneda=self.usd, fecha=date(2026, 3, 1), tasa=Decimal('1000'))
+        TipoCambio.objects.create(moneda=self.usd, fecha=date(2026, 3, 10), tasa=Decimal('1100'))
+        referencias.reiniciar()
+        self.addCleanup(referencias.reiniciar)
+
+        self.banco = Cuenta.objects.create(usuario=self.user, nombre='Banco', moneda=self.ars, saldo_inicial=Decimal('5000'))
+        self.dolares = Cuenta.objects.create(usuario=self.user, nombre='Dólares', moneda=self.usd, saldo_inicial=Decimal('100'))
+        Ingreso.objects.create(usuario=self.user, descripcion='Sueldo', monto=Decimal('20000'), moneda=self.ars,
+                               cuenta=self.banco, fecha=fecha(2))
+        Gasto.objects.create(usuario=self.user, descripcion='Hotel', monto=Decimal('10'), moneda=self.usd,
+                             cuenta=self.dolares, fecha=fecha(5))
+        Gasto.objects.create(usuario=self.user, descripcion='Cena', monto=Decimal('20'), moneda=self.usd,
+                             cuenta=self.dolares, fecha=fecha(12))
+
+    def test_flujo_usa_la_cotizacion_vigente_a_cada_fecha(self):
+        flujo = flujo_consolidado(self.user)
+
+        # 10 USD a 1000 + 20 USD a 1100
+        self.assertEqual(flujo['gastos'], Decimal('32000.00'))
+        self.assertEqual(flujo['ingresos'], Decimal('20000.00'))
+        self.assertEqual(flujo['neto'], Decimal('-12000.00'))
+        self.assertEqual(flujo['moneda'], 'ARS')
+        self.assertEqual(flujo['sin_cotizacion'], [])
+
+    def test_flujo_en_dos_consultas_y_con_rango(self):
+        referencias.MONEDAS.todos()
+
+        # Una agregación por tabla, con la conversión dentro de la consulta
+        with self.assertNumQueries(2):
+            flujo = flujo_consolidado(self.user, desde=fecha(10), hasta=fecha(20))
+
+        self.assertEqual(flujo['gastos'], Decimal('22000.00'))
+        self.assertEqual(flujo['ingresos'], Decimal('0.00'))
+
+    def test_patrimonio_con_la_ultima_cotizacion(self):
+        patrimonio = patrimonio_consolidado(self.user)
+
+        # ARS: 5000 + 20000; USD: (100 - 30) * 1100
+        self.assertEqual(patrimonio['total'], Decimal('102000.00'))
+        self.assertEqual(
+            [(m['moneda'], m['saldo'], m['convertido']) for m in patrimonio['por_moneda']],
+            [('ARS', Decimal('25000.00'), Decimal('25000.00')), ('USD', Decimal('70.00'), Decimal('77000.00'))],
+        )
+
+    def test_cotizacion_desde_memoria(self):
+        patrimonio_consolidado(self.user)
+
+        # Sólo los saldos por moneda: las cotizaciones no se vuelven a leer
+        with self.assertNumQueries(1):
+            patrimonio_consolidado(self.user)
+
+    def test_monedas_sin_cotizacion_no_se_suman(self):
+        Cuenta.objects.create(usuario=self.user, nombre='Euros', moneda=self.eur, saldo_inicial=Decimal('50'))
+        Gasto.objects.create(usuario=self.user, descripcion='Museo', monto=Decimal('5'), moneda=self.eur, fecha=fecha(6))
+        # Anterior a la primera cotización del dólar
+        Gasto.objects.create(usuario=self.user, descripcion='Libro', monto=Decimal('1'), moneda=self.usd, fecha=fecha(20, mes=2))
+
+        self.assertEqual(patrimonio_consolidado(self.user)['sin_cotizacion'], ['EUR'])
+        self.assertEqual(patrimonio_consolidado(self.user)['total'], Decimal('102000.00'))
+        flujo = flujo_consolidado(self.user)
+        self.assertEqual(flujo['sin_cotizacion'], ['EUR', 'USD'])
+        self.assertEqual(flujo['gastos'], Decimal('32000.00'))
+
+    def test_api(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get('/api/patrimonio/', {'desde': '2026-03-10', 'hasta': '2026-03-12'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.json()['patrimonio']['total']), Decimal('102000.00'))
+        self.assertEqual(Decimal(response.json()['flujo']['gastos']), Decimal('22000.00'))
+        self.assertEqual(client.get('/api/patrimonio/', {'desde': 'ayer'}).status_code, 400)
+
+    def test_dashboard(self):
+        self.client.login(username='patrimonio', password='pass-123')
+
+        response = self.client.get('/?rango=todo')
+
+        self.assertEqual(response.context['patrimonio']['total'], Decimal('102000.00'))
+        self.assertContains(response, 'Patrimonio consolidado')
+
+
+class ImportarTiposCambioTests(TestCase):
+    def setUp(self):
+        referencias.reiniciar()
+        self.addCleanup(referencias.reiniciar)
+        self.usd = Moneda.objects.get(codigo='USD')
+
+    def test_carga_y_reemplaza_por_fecha(self):
+        TipoCambio.objects.create(moneda=self.usd, fecha=date(2026, 3, 1), tasa=Decimal('900'))
+        referencias.reiniciar()
+        self.assertEqual(referencias.TIPOS_CAMBIO.por_clave(self.usd.pk).tasa, Decimal('900'))
+
+        cantidad = importar_tipos_cambio(io.StringIO(
+            'fecha,moneda,tasa\n2026-03-01,usd,"1.000,50"\n02/03/2026,EUR,1200\n2026-03-03,USD,1010\n'
+        ))
+
+        self.assertEqual(cantidad, 3)
+        self.assertEqual(TipoCambio.objects.get(moneda=self.usd, fecha=date(2026, 3, 1)).tasa, Decimal('1000.50'))
+        self.assertEqual(TipoCambio.objects.count(), 3)
+        self.assertEqual(referencias.TIPOS_CAMBIO.por_clave(self.usd.pk).tasa, Decimal('1010'))
+
+    def test_tasa_con_separador_de_miles(self):
+        importar_tipos_cambio(io.StringIO('fecha,moneda,tasa\n2026-03-01,USD,1.050\n2026-03-02,USD,"1.234,5"\n'))
+
+        tasas = dict(TipoCambio.objects.values_list('fecha', 'tasa'))
+        self.assertEqual(tasas, {date(2026, 3, 1): Decimal('1050'), date(2026, 3, 2): Decimal('1234.5')})
+
+        importar_tipos_cambio(io.StringIO('fecha,moneda,tasa\n2026-03-01,USD,1.050\n'), separador_decimal='.')
+        self.assertEqual(TipoCambio.objects.get(fecha=date(2026, 3, 1)).tasa, Decimal('1.05'))
+
+    def test_errores(self):
+        with self.assertRaisesMessage(ErrorTiposCambio, 'Línea 2: Moneda desconocida'):
+            importar_tipos_cambio(io.StringIO('fecha,moneda,tasa\n2026-03-01,XXX,1\n'))
+        with self.assertRaisesMessage(ErrorTiposCambio, 'Línea 3: La tasa debe ser mayor a cero'):
+            importar_tipos_cambio(io.StringIO('fecha,moneda,tasa\n2026-03-01,USD,1\n2026-03-02,USD,0\n'))
+        self.assertFalse(TipoCambio.objects.exists())
+
+    def test_comando(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as archivo:
+            archivo.write('fecha,moneda,tasa\n2026-03-01,USD,1000\n')
+        self.addCleanup(os.remove, archivo.name)
+        salida = io.StringIO()
+
+        call_command('importar_tipos_cambio', archivo.name, stdout=salida)
+
+        self.assertIn('Tipos de cambio cargados: 1', salida.getvalue())
+        call_command('importar_tipos_cambio', archivo.name, '--separador-decimal', ',', stdout=salida)
+        self.assertEqual(TipoCambio.objects.get().tasa, Decimal('1000'))
+        with self.assertRaises(CommandError):
+            call_command('importar_tipos_cambio', archivo.name + '.no-existe')
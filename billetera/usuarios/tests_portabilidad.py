@@ -0,0 +1,140 @@
+import io
+import json
+import zipfile
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from cuentas.models import Cuenta, TipoCuenta, TransferenciaCuenta
+from deudas.models import Deuda, PagoDeuda
+from gastos.models import Categoria, Compra, Gasto, Moneda, Tienda
+from ingresos.models import CategoriaIngreso, Ingreso, Moneda as MonedaIngreso
+from usuarios.portabilidad import ErrorImportacion, exportar_a_archivo, importar_archivo
+
+
+class PortabilidadTests(TestCase):
+    def setUp(self):
+        self.origen = User.objects.create_user(username='origen', password='pass-123')
+        self.destino = User.objects.create_user(username='destino', password='pass-123')
+        self.otro = User.objects.create_user(username='otro', password='pass-123')
+
+        self.ars = Moneda.objects.get(codigo='ARS')
+        self.ars_ingreso = MonedaIngreso.objects.get(codigo='ARS')
+        self.categoria = Categoria.objects.create(nombre='Supermercado')
+        self.categoria_ingreso = CategoriaIngreso.objects.create(nombre='Sueldo')
+        tipo = TipoCuenta.objects.create(nombre='Banco')
+
+        self.banco = Cuenta.objects.create(usuario=self.origen, nombre='Banco', tipo=tipo, moneda=self.ars, saldo_inicial=Decimal('100.00'))
+        self.efectivo = Cuenta.objects.create(usuario=self.origen, nombre='Efectivo', moneda=self.ars)
+        tienda = Tienda.objects.create(usuario=self.origen, nombre='Carrefour')
+        compra = Compra.objects.create(usuario=self.origen, tienda=tienda, lugar='Carrefour', cuenta=self.banco, moneda=self.ars)
+        for descripcion, monto in (('Leche', '10.50'), ('Pan', '4.25')):
+            Gasto.objects.create(
+                usuario=self.origen, descripcion=descripcion, monto=Decimal(monto), moneda=self.ars,
+                categoria=self.categoria, cuenta=self.banco, compra=compra, tienda=tienda, lugar='Carrefour',
+            )
+        gasto_transferencia = Gasto.objects.create(usuario=self.origen, descripcion='Transferencia', monto=Decimal('20'), moneda=self.ars, cuenta=self.banco)
+        ingreso_transferencia = Ingreso.objects.create(usuario=self.origen, descripcion='Transferencia', monto=Decimal('20'), moneda=self.ars_ingreso, cuenta=self.efectivo)
+        Ingreso.objects.create(usuario=self.origen, descripcion='Sueldo', monto=Decimal('1000'), moneda=self.ars_ingreso, categoria=self.categoria_ingreso, cuenta=self.banco)
+        TransferenciaCuenta.objects.create(
+            usuario=self.origen, cuenta_origen=self.banco, cuenta_destino=self.efectivo,
+            monto_origen=Decimal('20'), monto_destino=Decimal('20'), gasto=gasto_transferencia, ingreso=ingreso_transferencia,
+        )
+        deuda = Deuda.objects.create(usuario=self.origen, persona='Ana', tipo='POR_COBRAR', monto=Decimal('50'), moneda=self.ars)
+        PagoDeuda.objects.create(deuda=deuda, monto=Decimal('50'))
+
+        # Datos de otro usuario que nunca deben aparecer en el export
+        Gasto.objects.create(usuario=self.otro, descripcion='Ajeno', monto=Decimal('1'), moneda=self.ars)
+
+    def _exportar(self, usuario):
+        buffer = io.BytesIO()
+        exportar_a_archivo(usuario, buffer)
+        buffer.seek(0)
+        return buffer
+
+    def test_export_contiene_solo_datos_del_usuario(self):
+        with zipfile.ZipFile(self._exportar(self.origen)) as archivo:
+            manifiesto = json.loads(archivo.read('manifest.json'))
+            gastos = [json.loads(l) for l in archivo.read('gastos.ndjson').decode().splitlines()]
+
+        self.assertEqual(manifiesto['conteos']['gastos'], 3)
+        self.assertEqual(manifiesto['conteos']['pagos'], 1)
+        self.assertNotIn('Ajeno', [g['descripcion'] for g in gastos])
+        self.assertEqual({g['moneda_codigo'] for g in gastos}, {'ARS'})
+
+    def test_import_remapea_relaciones(self):
+        conteos = importar_archivo(self._exportar(self.origen), self.destino, tamano_lote=2)
+
+        self.assertEqual(conteos['gastos'], 3)
+        self.assertEqual(Gasto.objects.filter(usuario=self.destino).count(), 3)
+        self.assertEqual(Cuenta.objects.filter(usuario=self.destino).count(), 2)
+
+        compra = Compra.objects.get(usuario=self.destino)
+        self.assertEqual(compra.items.count(), 2)
+        self.assertEqual(compra.total, Decimal('14.75'))
+        self.assertEqual(compra.tienda.usuario, self.destino)
+        self.assertEqual(compra.cuenta.usuario, self.destino)
+
+        transferencia = TransferenciaCuenta.objects.get(usuario=self.destino)
+        self.assertEqual(transferencia.gasto.usuario, self.destino)
+        self.assertEqual(transferencia.ingreso.cuenta.nombre, 'Efectivo')
+        self.assertTrue(transferencia.gasto.es_transferencia)
+        self.assertTrue(transferencia.ingreso.es_transferencia)
+        self.assertEqual(Gasto.objects.filter(usuario=self.destino, es_transferencia=True).count(), 1)
+
+        pago = PagoDeuda.objects.get(deuda__usuario=self.destino)
+        self.assertEqual(pago.deuda.estado, 'PAGADA')
+
+        # Los datos originales no se tocan
+        self.assertEqual(Gasto.objects.filter(usuario=self.origen).count(), 3)
+
+    def test_import_rechaza_archivo_invalido(self):
+        with self.assertRaises(ErrorImportacion):
+            importar_archivo(io.BytesIO(b'no es un zip'), self.destino)
+
+    def test_import_rechaza_referencia_opcional_inexistente(self):
+        with zipfile.ZipFile(self._exportar(self.origen)) as original:
+            contenidos = {nombre: original.read(nombre) for nombre in original.namelist()}
+        gastos = [json.loads(l) for l in contenidos['gastos.ndjson'].decode().splitlines()]
+        gastos[0]['compra_id'] = 999999
+        contenidos['gastos.ndjson'] = ''.join(json.dumps(g) + '\n' for g in gastos).encode()
+        editado = io.BytesIO()
+        with zipfile.ZipFile(editado, 'w') as archivo:
+            for nombre, datos in contenidos.items():
+                archivo.writestr(nombre, datos)
+        editado.seek(0)
+
+        with self.assertRaisesMessage(ErrorImportacion, 'compras #999999'):
+            importar_archivo(editado, self.destino)
+        self.assertFalse(Gasto.objects.filter(usuario=self.destino).exists())
+
+    def test_vista_exporta_en_streaming(self):
+        self.client.login(username='origen', password='pass-123')
+        response = self.client.get(reverse('usuarios:exportar_datos'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        contenido = io.BytesIO(b''.join(response.streaming_content))
+        with zipfile.ZipFile(contenido) as archivo:
+            self.assertIn('deudas.ndjson', archivo.namelist())
+
+    def test_vista_requiere_login(self):
+        response = self.client.get(reverse('usuarios:exportar_datos'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_comandos_exportar_e_importar(self):
+        import os
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as tmp:
+            ruta = os.path.join(tmp, 'export.zip')
+            call_command('exportar_datos', 'origen', ruta, stdout=io.StringIO())
+            call_command('importar_datos', ruta, 'destino', stdout=io.StringIO())
+
+        self.assertEqual(Ingreso.objects.filter(usuario=self.destino).count(), 2)
+        self.assertEqual(Deuda.objects.filter(usuario=self.destino).count(), 1)
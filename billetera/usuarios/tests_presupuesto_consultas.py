@@ -0,0 +1,301 @@
+"""
+Presupuesto de consultas SQL por vista.
+
+Cada ruta se mide con pocos datos y con varias veces más filas: la cantidad
+de consultas tiene que ser la misma (no depende de las filas, no hay N+1) y
+no superar su presupuesto. Las caches se vacían antes de medir para contar
+el camino sin cache.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import User
+from django.core.cache import cache as cache_django
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cuentas.models import Cuenta, ReglaCategoria, TipoCuenta
+from cuentas.services import registrar_transferencia
+from deudas.models import Deuda, PagoDeuda
+from gastos import views as gastos_views
+from gastos.models import Categoria, Compra, Gasto, Moneda, Tienda
+from ingresos.models import CategoriaIngreso, Ingreso
+from recurrencias.models import Recurrencia
+from usuarios import views as usuarios_views
+
+POCOS = 2
+MUCHOS = 8
+
+# Rutas que se miden en otro lado o no se pueden pedir con GET
+SIN_PRESUPUESTO = {
+    'exportar_reporte_pdf': 'WeasyPrint: se mide contexto_reporte_pdf',
+    'usuarios:exportar_reporte_pdf': 'WeasyPrint: se mide contexto_reporte_pdf',
+    'gastos:exportar_gastos_pdf': 'WeasyPrint: se mide contexto_gastos_pdf',
+    'gastos:gasto-bulk': 'sólo POST/PATCH/DELETE; consultas en gastos/tests_api.py',
+    'usuarios:procesar_pago': 'llama a la API de Mercado Pago',
+    'usuarios:webhook_mercadopago': 'sólo POST firmado; ver tests_mercadopago_webhook.py',
+    'admin_backup': 'vuelca la base y sube a R2',
+    'google_login': 'intercambio de código con Google',
+    'token_obtain_pair': 'sólo POST; consultas en tests_authentication.py',
+    'token_refresh': 'sólo POST',
+    'token_verify': 'sólo POST',
+}
+APPS_PROPIAS = ('usuarios', 'gastos', 'ingresos', 'cuentas', 'deudas', 'recurrencias', 'sincronizacion')
+
+
+def _rutas_propias(patrones=None, espacio=()):
+    """``(nombre con namespace, vista)`` de las rutas cuyas vistas son de este proyecto."""
+    for patron in get_resolver().url_patterns if patrones is None else patrones:
+        if isinstance(patron, URLResolver):
+            yield from _rutas_propias(patron.url_patterns, espacio + ((patron.namespace,) if patron.namespace else ()))
+        elif patron.name and getattr(patron.callback, '__module__', '').split('.')[0] in APPS_PROPIAS:
+            yield ':'.join(espacio + (patron.name,)), patron.callback
+
+
+def _sembrar(usuario, cantidad):
+    """Agrega ``cantidad`` filas de cada tipo a los datos de ``usuario``."""
+    ahora = timezone.now()
+    monedas = [Moneda.objects.get(codigo='ARS'), Moneda.objects.get(codigo='USD')]
+    tipos = list(TipoCuenta.objects.all())
+    categorias = list(Categoria.objects.all())
+    categorias_ingreso = list(CategoriaIngreso.objects.all())
+    base = Cuenta.objects.filter(usuario=usuario).count()
+
+    for i in range(base, base + cantidad):
+        moneda = monedas[i % 2]
+        fecha = ahora - timedelta(hours=i)
+        cuenta = Cuenta.objects.create(
+            usuario=usuario, nombre=f'Cuenta {i}', tipo=tipos[i % len(tipos)],
+            saldo_inicial=Decimal('1000.00'), moneda=moneda,
+        )
+        tienda = Tienda.objects.create(usuario=usuario, nombre=f'Tienda {i}')
+        Gasto.objects.create(
+            usuario=usuario, descripcion=f'Gasto {i}', monto=Decimal('10.00'), moneda=moneda,
+            categoria=categorias[i % len(categorias)], cuenta=cuenta, tienda=tienda, lugar=tienda.nombre, fecha=fecha,
+        )
+        compra = Compra.objects.create(usuario=usuario, lugar=tienda.nombre, tienda=tienda, cuenta=cuenta, moneda=moneda, fecha=fecha)
+        for item in range(2):
+            Gasto.objects.create(
+                usuario=usuario, descripcion=f'Ítem {i}.{item}', monto=Decimal('5.00'), cantidad=item + 1, moneda=moneda,
+                categoria=categorias[item % len(categorias)], cuenta=cuenta, tienda=tienda, compra=compra, fecha=fecha,
+            )
+        Ingreso.objects.create(
+            usuario=usuario, descripcion=f'Ingreso {i}', monto=Decimal('50.00'), moneda=moneda,
+            categoria=categorias_ingreso[i % len(categorias_ingreso)], cuenta=cuenta, fecha=fecha,
+        )
+        if i:
+            anterior = Cuenta.objects.filter(usuario=usuario).exclude(pk=cuenta.pk).first()
+            registrar_transferencia(usuario, anterior, cuenta, Decimal('3.00'), Decimal('3.00'), fecha=fecha)
+        deuda = Deuda.objects.create(
+            usuario=usuario, persona=f'Persona {i}', tipo='POR_COBRAR' if i % 2 else 'POR_PAGAR',
+            monto=Decimal('100.00'), moneda=moneda,
+        )
+        PagoDeuda.objects.create(deuda=deuda, monto=Decimal('10.00'))
+        Recurrencia.objects.create(
+            usuario=usuario, tipo=Recurrencia.GASTO, descripcion=f'Recurrencia {i}', monto=Decimal('7.00'),
+            moneda=moneda, categoria=categorias[i % len(categorias)], cuenta=cuenta,
+        )
+        ReglaCategoria.objects.create(usuario=usuario, texto=f'regla {i}', categoria=categorias[i % len(categorias)])
+
+
+@override_settings(SINCRONIZACION_MARGEN_SEGUNDOS=0)
+class PresupuestoConsultasTests(TestCase):
+    # Consultas máximas por ruta, sin cache; además la cantidad no puede crecer con las filas
+    PRESUPUESTOS = {
+        **{f'inicio?rango={rango}': 32 for rango in ['24h', '3d', '7d', '30d', '365d', 'todo']},
+        'perfil': 8,
+        'editar_perfil': 5,
+        'registro': 3,
+        'exportar_datos': 30,
+        'planes': 5,
+        'pago_exitoso': 3,
+        'pago_fallido': 3,
+        'lista_gastos': 6,
+        'crear_gasto': 8,
+        'editar_gasto': 10,
+        'eliminar_gasto': 7,
+        'compra_global': 6,
+        'detalle_compra': 6,
+        'editar_compra': 8,
+        'autocompletar_tiendas': 3,
+        'lista_ingresos': 6,
+        'crear_ingreso': 8,
+        'editar_ingreso': 8,
+        'eliminar_ingreso': 4,
+        'lista_cuentas': 5,
+        'crear_cuenta': 5,
+        'editar_cuenta': 6,
+        'eliminar_cuenta': 4,
+        'ajustar_saldo': 8,
+        'transferir_cuentas': 5,
+        'importar_movimientos': 4,
+        'lista_deudas': 4,
+        'crear_deuda': 4,
+        'detalle_deuda': 5,
+        'editar_deuda': 5,
+        'crear_pago': 5,
+        'editar_pago': 6,
+        'api_me': 0,
+        'api_sync': 11,
+        'api_stats_gastos': 2,
+        'api_stats_ingresos': 2,
+        'api_patrimonio': 3,
+        **{f'api_{recurso}': 2 for recurso in [
+            'gastos', 'ingresos', 'cuentas', 'transferencias', 'deudas', 'pagos', 'recurrencias',
+        ]},
+        **{f'api_{recurso}': 3 for recurso in [
+            'gasto', 'compras', 'ingreso', 'cuenta', 'transferencia', 'deuda', 'recurrencia',
+        ]},
+        'api_compra': 4,
+        'api_pago': 4,
+        'api_reglas': 1,
+        'api_regla': 2,
+        'reporte_pdf?rango=30d': 6,
+        'reporte_pdf?rango=todo': 6,
+        'gastos_pdf': 2,
+    }
+
+    def setUp(self):
+        self.usuario = User.objects.create_user(username='presupuesto', password='x')
+        self.client.force_login(self.usuario)
+        self.api = APIClient()
+        self.api.force_authenticate(self.usuario)
+
+    def _rutas(self):
+        """``{nombre: (cliente, url)}`` de las rutas GET del usuario, con ids de sus propias filas."""
+        gasto = Gasto.objects.filter(usuario=self.usuario, compra__isnull=True, es_transferencia=False).first()
+        compra = Compra.objects.filter(usuario=self.usuario).first()
+        ingreso = Ingreso.objects.filter(usuario=self.usuario, es_transferencia=False).first()
+        cuenta = Cuenta.objects.filter(usuario=self.usuario).first()
+        deuda = Deuda.objects.filter(usuario=self.usuario).first()
+        pago = PagoDeuda.objects.filter(deuda__usuario=self.usuario).first()
+        transferencia = self.usuario.transferencias_cuentas.first()
+        recurrencia = Recurrencia.objects.filter(usuario=self.usuario).first()
+        regla = ReglaCategoria.objects.filter(usuario=self.usuario).first()
+
+        web, api = self.client, self.api
+        rutas = {
+            f'inicio?rango={rango}': (web, reverse('inicio_usuarios') + f'?rango={rango}')
+            for rango in ['24h', '3d', '7d', '30d', '365d', 'todo']
+        }
+        rutas.update({
+            'perfil': (web, reverse('perfil_usuario')),
+            'editar_perfil': (web, reverse('editar_perfil')),
+            'registro': (web, reverse('registro')),
+            'exportar_datos': (web, reverse('usuarios:exportar_datos')),
+            'planes': (web, reverse('usuarios:lista_planes')),
+            'pago_exitoso': (web, reverse('usuarios:pago_exitoso')),
+            'pago_fallido': (web, reverse('usuarios:pago_fallido')),
+            'lista_gastos': (web, reverse('gastos:lista_gastos')),
+            'crear_gasto': (web, reverse('gastos:crear_gasto')),
+            'editar_gasto': (web, reverse('gastos:editar_gasto', args=[gasto.pk])),
+            'eliminar_gasto': (web, reverse('gastos:eliminar_gasto', args=[gasto.pk])),
+            'compra_global': (web, reverse('gastos:compra_global')),
+            'detalle_compra': (web, reverse('gastos:detalle_compra', args=[compra.pk])),
+            'editar_compra': (web, reverse('gastos:editar_compra', args=[compra.pk])),
+            'autocompletar_tiendas': (web, reverse('gastos:autocompletar_tiendas') + '?q=tie'),
+            'lista_ingresos': (web, reverse('ingresos:lista_ingresos')),
+            'crear_ingreso': (web, reverse('ingresos:crear_ingreso')),
+            'editar_ingreso': (web, reverse('ingresos:editar_ingreso', args=[ingreso.pk])),
+            'eliminar_ingreso': (web, reverse('ingresos:eliminar_ingreso', args=[ingreso.pk])),
+            'lista_cuentas': (web, reverse('cuentas:lista_cuentas')),
+            'crear_cuenta': (web, reverse('cuentas:crear_cuenta')),
+            'editar_cuenta': (web, reverse('cuentas:editar_cuenta', args=[cuenta.pk])),
+            'eliminar_cuenta': (web, reverse('cuentas:eliminar_cuenta', args=[cuenta.pk])),
+            'ajustar_saldo': (web, reverse('cuentas:ajustar_saldo', args=[cuenta.pk])),
+            'transferir_cuentas': (web, reverse('cuentas:transferir_cuentas')),
+            'importar_movimientos': (web, reverse('cuentas:importar_movimientos')),
+            'lista_deudas': (web, reverse('deudas:lista_deudas')),
+            'crear_deuda': (web, reverse('deudas:crear_deuda')),
+            'detalle_deuda': (web, reverse('deudas:detalle_deuda', args=[deuda.pk])),
+            'editar_deuda': (web, reverse('deudas:editar_deuda', args=[deuda.pk])),
+            'crear_pago': (web, reverse('deudas:crear_pago', args=[deuda.pk])),
+            'editar_pago': (web, reverse('deudas:editar_pago', args=[pago.pk])),
+            'api_me': (api, reverse('me')),
+            'api_sync': (api, reverse('sync')),
+            'api_stats_gastos': (api, reverse('estadisticas', args=['gastos']) + '?periodo=mes&por=categoria'),
+            'api_stats_ingresos': (api, reverse('estadisticas', args=['ingresos']) + '?por=cuenta'),
+            'api_patrimonio': (api, reverse('patrimonio')),
+            'api_gastos': (api, reverse('gastos:gasto-list')),
+            'api_gasto': (api, reverse('gastos:gasto-detail', args=[gasto.pk])),
+            'api_compras': (api, reverse('gastos:compra-list')),
+            'api_compra': (api, reverse('gastos:compra-detail', args=[compra.pk])),
+            'api_ingresos': (api, reverse('ingresos:ingreso-list')),
+            'api_ingreso': (api, reverse('ingresos:ingreso-detail', args=[ingreso.pk])),
+            'api_cuentas': (api, reverse('cuentas:cuenta-list')),
+            'api_cuenta': (api, reverse('cuentas:cuenta-detail', args=[cuenta.pk])),
+            'api_transferencias': (api, reverse('cuentas:transferencia-list')),
+            'api_transferencia': (api, reverse('cuentas:transferencia-detail', args=[transferencia.pk])),
+            'api_reglas': (api, reverse('cuentas:regla-list')),
+            'api_regla': (api, reverse('cuentas:regla-detail', args=[regla.pk])),
+            'api_deudas': (api, reverse('deudas:deuda-list')),
+            'api_deuda': (api, reverse('deudas:deuda-detail', args=[deuda.pk])),
+            'api_pagos': (api, reverse('deudas:pago-list')),
+            'api_pago': (api, reverse('deudas:pago-detail', args=[pago.pk])),
+            'api_recurrencias': (api, reverse('recurrencias:recurrencia-list')),
+            'api_recurrencia': (api, reverse('recurrencias:recurrencia-detail', args=[recurrencia.pk])),
+        })
+        return rutas
+
+    def _contar(self, medir):
+        # Primera pasada: referencias y sesión en memoria, igual que un worker ya en marcha
+        medir()
+        cache_django.clear()
+        with CaptureQueriesContext(connection) as consultas:
+            medir()
+        return len(consultas.captured_queries)
+
+    def _get(self, cliente, url):
+        def medir():
+            respuesta = cliente.get(url)
+            self.assertEqual(respuesta.status_code, 200, url)
+            if respuesta.streaming:
+                b''.join(respuesta.streaming_content)
+        return medir
+
+    def _reportes_pdf(self):
+        """``{nombre: medir}``: contexto y HTML de los reportes PDF (sin WeasyPrint)."""
+        def reporte(rango):
+            return lambda: render_to_string('usuarios/reporte_pdf.html', usuarios_views.contexto_reporte_pdf(self.usuario, rango))
+
+        def gastos():
+            request = RequestFactory().get(reverse('gastos:exportar_gastos_pdf'))
+            request.user = self.usuario
+            render_to_string('gastos/reporte_pdf.html', gastos_views.contexto_gastos_pdf(request))
+
+        return {
+            'reporte_pdf?rango=30d': reporte('30d'),
+            'reporte_pdf?rango=todo': reporte('todo'),
+            'gastos_pdf': gastos,
+        }
+
+    def _medir_todo(self):
+        conteos = {nombre: self._contar(self._get(cliente, url)) for nombre, (cliente, url) in self._rutas().items()}
+        conteos.update({nombre: self._contar(medir) for nombre, medir in self._reportes_pdf().items()})
+        return conteos
+
+    def test_todas_las_rutas_tienen_presupuesto(self):
+        _sembrar(self.usuario, POCOS)
+        # Por vista: una ruta repetida con y sin namespace se mide una vez
+        medidas = {resolve(urlsplit(url).path).func for _, url in self._rutas().values()}
+        faltantes = sorted(
+            nombre for nombre, vista in _rutas_propias() if vista not in medidas and nombre not in SIN_PRESUPUESTO
+        )
+        self.assertEqual(faltantes, [], 'Rutas sin presupuesto de consultas: agregarlas a _rutas o a SIN_PRESUPUESTO')
+
+    def test_consultas_no_dependen_de_las_filas(self):
+        _sembrar(self.usuario, POCOS)
+        pocos = self._medir_todo()
+        _sembrar(self.usuario, MUCHOS - POCOS)
+        muchos = self._medir_todo()
+
+        for nombre, cantidad in muchos.items():
+            with self.subTest(ruta=nombre):
+                self.assertEqual(cantidad, pocos[nombre], f'{nombre}: {pocos[nombre]} consultas con {POCOS} filas y {cantidad} con {MUCHOS}')
+                self.assertLessEqual(cantidad, self.PRESUPUESTOS[nombre])
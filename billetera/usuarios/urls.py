@@ -16,6 +16,7 @@ urlpatterns = [
     path('logout/', auth_views.LogoutView.as_view(), name='logout'),
     path('registro/', usuarios.views.registro,  name='registro'),
     path('reporte/pdf/', usuarios.views.exportar_reporte_pdf, name='exportar_reporte_pdf'),
+    path('datos/exportar/', views.exportar_datos, name='exportar_datos'),
     path('planes/', views.lista_planes, name='lista_planes'),
     path('procesar_pago/<int:plan_id>/', views.procesar_pago, name='procesar_pago'),
     path('pago_exitoso/', views.pago_exitoso, name='pago_exitoso'),
@@ -3,6 +3,7 @@ import hashlib
 import hmac
 import json
 
+from django.conf import settings
 from django.db.models import Sum
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.models import User
@@ -18,8 +19,7 @@ from django.contrib.auth import login
 from gastos.models import Gasto, Compra
 from ingresos.models import Ingreso
 from deudas.models import Deuda
-from django.http import JsonResponse, HttpResponseForbidden, HttpResponseNotAllowed, HttpResponse
-from django.views.decorators.csrf import csrf_exempt
+from django.http import JsonResponse, HttpResponseForbidden, HttpResponseNotAllowed, HttpResponse, StreamingHttpResponse
 import os
 from django.utils import timezone
 from datetime import timedelta
@@ -29,9 +29,180 @@ from django.template.loader import render_to_string
 from django.db.models.functions import TruncDate
 
 from usuarios.backup import run_database_backup
+from usuarios.patrimonio import flujo_consolidado, patrimonio_consolidado
+from usuarios.portabilidad import iterar_exportacion
 from cuentas.models import Cuenta
+from asgiref.sync import sync_to_async
+from billetera import cache
+from billetera.basedatos import alias_lectura
+from billetera.asincronia import en_hilo_externo, exento_csrf, login_requerido
+from billetera.condicional import condicional_libro, version_libro
+from billetera.referencias import moneda_por_defecto
+from billetera.limites import limitar
 
 
+def _resumen_inicio(usuario, rango, ahora, fecha_inicio):
+    """
+    Totales, gráficos y patrimonio del dashboard: sólo agregaciones, sin
+    instancias, para poder guardarlo en la cache compartida.
+    """
+    # Filtros base para totales (Usuario + Moneda ARS). Gastos e ingresos
+    # comparten la tabla de monedas: se filtra por id, sin join. Si el
+    # registro no tiene ARS se filtra por código (moneda=None sería IS NULL)
+    moneda_ars = moneda_por_defecto()
+    filtro_moneda = {'moneda': moneda_ars} if moneda_ars is not None else {'moneda__codigo': 'ARS'}
+    filtros_ingresos = {
+        'usuario': usuario,
+        **filtro_moneda,
+        'es_transferencia': False,
+    }
+    filtros_gastos = {
+        'usuario': usuario,
+        **filtro_moneda,
+        'es_transferencia': False,
+    }
+
+    # Aplicar filtro de fecha si corresponde
+    if fecha_inicio:
+        filtros_ingresos['fecha__gte'] = fecha_inicio
+        filtros_gastos['fecha__gte'] = fecha_inicio
+
+    # Calcular Totales Filtrados
+    total_ingresos = Ingreso.objects.filter(**filtros_ingresos).aggregate(Sum('monto'))['monto__sum'] or 0
+    total_gastos = Gasto.objects.filter(**filtros_gastos).aggregate(Sum('monto'))['monto__sum'] or 0
+    balance_neto = total_ingresos - total_gastos
+
+    # --- Datos para el Gráfico (Últimos 6 meses) ---
+    chart_labels = []
+    chart_ingresos = []
+    chart_gastos = []
+    
+    # Iterar sobre los últimos 6 meses
+    for i in range(5, -1, -1):
+        mes_inicio = (ahora.replace(day=1) - timedelta(days=i*30)).replace(day=1)
+        # Calcular fin de mes (inicio del siguiente mes - 1 segundo)
+        if mes_inicio.month == 12:
+            mes_fin = mes_inicio.replace(year=mes_inicio.year + 1, month=1)
+        else:
+            mes_fin = mes_inicio.replace(month=mes_inicio.month + 1)
+        
+        # Nombre del mes para el label
+        chart_labels.append(mes_inicio.strftime('%b'))
+        
+        # Filtros para el mes
+        filtros_mes_ingresos = {
+            'usuario': usuario,
+            **filtro_moneda,
+            'es_transferencia': False,
+            'fecha__gte': mes_inicio,
+            'fecha__lt': mes_fin,
+        }
+        filtros_mes_gastos = {
+            'usuario': usuario,
+            **filtro_moneda,
+            'es_transferencia': False,
+            'fecha__gte': mes_inicio,
+            'fecha__lt': mes_fin,
+        }
+        
+        ingresos_mes = Ingreso.objects.filter(**filtros_mes_ingresos).aggregate(Sum('monto'))['monto__sum'] or 0
+        gastos_mes = Gasto.objects.filter(**filtros_mes_gastos).aggregate(Sum('monto'))['monto__sum'] or 0
+        
+        chart_ingresos.append(float(ingresos_mes))
+        chart_gastos.append(float(gastos_mes))
+
+    # --- Fin Lógica de Filtrado ---
+
+    # --- Suite de gráficos (rango variable) ---
+    # Nota: mantenemos coherencia con el dashboard: ARS + sin transferencias.
+    chart_start = fecha_inicio
+    if chart_start is None:
+        # Evitar rangos enormes en "todo" para gráficos diarios.
+        chart_start = ahora - timedelta(days=365)
+    start_date = timezone.localtime(chart_start).date()
+    end_date = timezone.localtime(ahora).date()
+    if (end_date - start_date).days > 365:
+        start_date = end_date - timedelta(days=365)
+
+    ingresos_qs = Ingreso.objects.filter(**filtros_ingresos)
+    gastos_qs = Gasto.objects.filter(**filtros_gastos)
+
+    ingresos_diarios = (
+        ingresos_qs
+        .annotate(dia=TruncDate('fecha'))
+        .values('dia')
+        .annotate(total=Sum('monto'))
+        .order_by('dia')
+    )
+    gastos_diarios = (
+        gastos_qs
+        .annotate(dia=TruncDate('fecha'))
+        .values('dia')
+        .annotate(total=Sum('monto'))
+        .order_by('dia')
+    )
+
+    ingresos_map = {row['dia']: float(row['total'] or 0) for row in ingresos_diarios}
+    gastos_map = {row['dia']: float(row['total'] or 0) for row in gastos_diarios}
+
+    daily_labels = []
+    daily_ingresos = []
+    daily_gastos = []
+    for i in range((end_date - start_date).days + 1):
+        d = start_date + timedelta(days=i)
+        daily_labels.append(d.strftime('%d/%m'))
+        daily_ingresos.append(ingresos_map.get(d, 0))
+        daily_gastos.append(gastos_map.get(d, 0))
+
+    categorias_qs = (
+        gastos_qs
+        .values('categoria__nombre')
+        .annotate(total=Sum('monto'))
+        .order_by('-total')
+    )
+    pie_labels = []
+    pie_values = []
+    otros_total = 0.0
+    max_slices = 8
+    for idx, row in enumerate(categorias_qs):
+        label = row['categoria__nombre'] or 'Sin categoría'
+        value = float(row['total'] or 0)
+        if idx < max_slices:
+            pie_labels.append(label)
+            pie_values.append(value)
+        else:
+            otros_total += value
+    if otros_total > 0:
+        pie_labels.append('Otros')
+        pie_values.append(otros_total)
+
+    daily_flow_chart = {
+        'labels': daily_labels,
+        'ingresos': daily_ingresos,
+        'gastos': daily_gastos,
+        'range': rango,
+    }
+    category_pie_chart = {
+        'labels': pie_labels,
+        'values': pie_values,
+        'range': rango,
+    }
+    return {
+        'total_ingresos': total_ingresos,
+        'total_gastos': total_gastos,
+        'balance_neto': balance_neto,
+        'chart_labels': chart_labels,
+        'chart_ingresos': chart_ingresos,
+        'chart_gastos': chart_gastos,
+        'daily_flow_chart': daily_flow_chart,
+        'category_pie_chart': category_pie_chart,
+        'patrimonio': patrimonio_consolidado(usuario),
+        'flujo_consolidado': flujo_consolidado(usuario, desde=fecha_inicio),
+    }
+
+
+# Los rangos móviles ("últimas 24 h") dependen del reloj: se revalida cada 5 minutos
+@condicional_libro(ventana=300)
 def inicio(request):
     context = {}
 
@@ -57,156 +228,26 @@ def inicio(request):
             # Fallback para parámetros legacy o inválidos
             fecha_inicio = ahora - timedelta(days=30)
 
-        # Filtros base para totales (Usuario + Moneda ARS)
-        filtros_ingresos = {
-            'usuario': request.user,
-            'moneda__codigo': 'ARS',
-            'transferencias_generadas__isnull': True,
-        }
-        filtros_gastos = {
-            'usuario': request.user,
-            'moneda__codigo': 'ARS',
-            'transferencias_generadas__isnull': True,
-        }
-
-        # Aplicar filtro de fecha si corresponde
-        if fecha_inicio:
-            filtros_ingresos['fecha__gte'] = fecha_inicio
-            filtros_gastos['fecha__gte'] = fecha_inicio
-
-        # Calcular Totales Filtrados
-        total_ingresos = Ingreso.objects.filter(**filtros_ingresos).aggregate(Sum('monto'))['monto__sum'] or 0
-        total_gastos = Gasto.objects.filter(**filtros_gastos).aggregate(Sum('monto'))['monto__sum'] or 0
-        balance_neto = total_ingresos - total_gastos
-
-        # --- Datos para el Gráfico (Últimos 6 meses) ---
-        chart_labels = []
-        chart_ingresos = []
-        chart_gastos = []
-        
-        # Iterar sobre los últimos 6 meses
-        for i in range(5, -1, -1):
-            mes_inicio = (ahora.replace(day=1) - timedelta(days=i*30)).replace(day=1)
-            # Calcular fin de mes (inicio del siguiente mes - 1 segundo)
-            if mes_inicio.month == 12:
-                mes_fin = mes_inicio.replace(year=mes_inicio.year + 1, month=1)
-            else:
-                mes_fin = mes_inicio.replace(month=mes_inicio.month + 1)
-            
-            # Nombre del mes para el label
-            chart_labels.append(mes_inicio.strftime('%b'))
-            
-            # Filtros para el mes
-            filtros_mes_ingresos = {
-                'usuario': request.user,
-                'moneda__codigo': 'ARS',
-                'transferencias_generadas__isnull': True,
-                'fecha__gte': mes_inicio,
-                'fecha__lt': mes_fin,
-            }
-            filtros_mes_gastos = {
-                'usuario': request.user,
-                'moneda__codigo': 'ARS',
-                'transferencias_generadas__isnull': True,
-                'fecha__gte': mes_inicio,
-                'fecha__lt': mes_fin,
-            }
-            
-            ingresos_mes = Ingreso.objects.filter(**filtros_mes_ingresos).aggregate(Sum('monto'))['monto__sum'] or 0
-            gastos_mes = Gasto.objects.filter(**filtros_mes_gastos).aggregate(Sum('monto'))['monto__sum'] or 0
-            
-            chart_ingresos.append(float(ingresos_mes))
-            chart_gastos.append(float(gastos_mes))
-
-        # --- Fin Lógica de Filtrado ---
-
-        # --- Suite de gráficos (rango variable) ---
-        # Nota: mantenemos coherencia con el dashboard: ARS + sin transferencias.
-        chart_start = fecha_inicio
-        if chart_start is None:
-            # Evitar rangos enormes en "todo" para gráficos diarios.
-            chart_start = ahora - timedelta(days=365)
-        start_date = timezone.localtime(chart_start).date()
-        end_date = timezone.localtime(ahora).date()
-        if (end_date - start_date).days > 365:
-            start_date = end_date - timedelta(days=365)
-
-        ingresos_qs = Ingreso.objects.filter(**filtros_ingresos)
-        gastos_qs = Gasto.objects.filter(**filtros_gastos)
-
-        ingresos_diarios = (
-            ingresos_qs
-            .annotate(dia=TruncDate('fecha'))
-            .values('dia')
-            .annotate(total=Sum('monto'))
-            .order_by('dia')
-        )
-        gastos_diarios = (
-            gastos_qs
-            .annotate(dia=TruncDate('fecha'))
-            .values('dia')
-            .annotate(total=Sum('monto'))
-            .order_by('dia')
+        # El resumen (agregaciones) se comparte entre workers por versión del
+        # libro; el rango móvil se acepta desactualizado hasta INICIO_CACHE_TTL
+        secuencia, fecha = version_libro(request)
+        resumen = cache.obtener_o_calcular(
+            'inicio', [secuencia, fecha.timestamp() if fecha else 0, rango],
+            lambda: _resumen_inicio(request.user, rango, ahora, fecha_inicio),
+            timeout=settings.INICIO_CACHE_TTL, usuario_id=request.user.pk, versionado=True,
         )
 
-        ingresos_map = {row['dia']: float(row['total'] or 0) for row in ingresos_diarios}
-        gastos_map = {row['dia']: float(row['total'] or 0) for row in gastos_diarios}
-
-        daily_labels = []
-        daily_ingresos = []
-        daily_gastos = []
-        for i in range((end_date - start_date).days + 1):
-            d = start_date + timedelta(days=i)
-            daily_labels.append(d.strftime('%d/%m'))
-            daily_ingresos.append(ingresos_map.get(d, 0))
-            daily_gastos.append(gastos_map.get(d, 0))
-
-        categorias_qs = (
-            gastos_qs
-            .values('categoria__nombre')
-            .annotate(total=Sum('monto'))
-            .order_by('-total')
-        )
-        pie_labels = []
-        pie_values = []
-        otros_total = 0.0
-        max_slices = 8
-        for idx, row in enumerate(categorias_qs):
-            label = row['categoria__nombre'] or 'Sin categoría'
-            value = float(row['total'] or 0)
-            if idx < max_slices:
-                pie_labels.append(label)
-                pie_values.append(value)
-            else:
-                otros_total += value
-        if otros_total > 0:
-            pie_labels.append('Otros')
-            pie_values.append(otros_total)
-
-        daily_flow_chart = {
-            'labels': daily_labels,
-            'ingresos': daily_ingresos,
-            'gastos': daily_gastos,
-            'range': rango,
-        }
-        category_pie_chart = {
-            'labels': pie_labels,
-            'values': pie_values,
-            'range': rango,
-        }
 
         # Últimos 5 registros para la lista del inicio (Legacy, se puede mantener o quitar si no se usa)
         ultimos_ingresos = Ingreso.objects.filter(usuario=request.user).order_by('-fecha')[:5]
         ultimos_gastos = Gasto.objects.filter(usuario=request.user).order_by('-fecha')[:5]
 
-        # Calcular saldos por cuenta
-        cuentas = Cuenta.objects.filter(usuario=request.user)
+        # Calcular saldos por cuenta (anotados en la misma consulta)
+        cuentas = Cuenta.objects.filter(usuario=request.user).select_related('moneda', 'tipo').con_saldo()
         cuentas_con_saldo = []
         totales_por_moneda = {}
         for cuenta in cuentas:
-            ingresos_cuenta = Ingreso.objects.filter(cuenta=cuenta).aggregate(Sum('monto'))['monto__sum'] or Decimal('0.00')
-            gastos_cuenta = Gasto.objects.filter(cuenta=cuenta).aggregate(Sum('monto'))['monto__sum'] or Decimal('0.00')
-            saldo_actual = cuenta.saldo_inicial + Decimal(ingresos_cuenta) - Decimal(gastos_cuenta)
+            saldo_actual = cuenta.saldo
             cuentas_con_saldo.append({
                 'id': cuenta.id,
                 'nombre': cuenta.nombre,
@@ -230,11 +271,12 @@ def inicio(request):
 
         # Construir lista combinada de últimos movimientos (ingresos, gastos individuales y compras agrupadas)
         # Tomamos más elementos de cada lado para que al mezclarlos haya suficiente para los 10 finales
-        ingresos_para_mezcla = Ingreso.objects.filter(usuario=request.user).order_by('-fecha')[:10]
+        relacionadas = ('moneda', 'categoria', 'cuenta')
+        ingresos_para_mezcla = Ingreso.objects.filter(usuario=request.user).select_related(*relacionadas).order_by('-fecha')[:10]
         # Gastos individuales (sin compra asociada)
-        gastos_individuales = Gasto.objects.filter(usuario=request.user, compra__isnull=True).order_by('-fecha')[:10]
+        gastos_individuales = Gasto.objects.filter(usuario=request.user, compra__isnull=True).select_related(*relacionadas).order_by('-fecha')[:10]
         # Compras (agrupan gastos)
-        compras_para_mezcla = Compra.objects.filter(usuario=request.user).prefetch_related('items').order_by('-fecha')[:10]
+        compras_para_mezcla = Compra.objects.filter(usuario=request.user).select_related('moneda', 'cuenta').prefetch_related('items').order_by('-fecha')[:10]
 
         movimientos = []
         for ing in ingresos_para_mezcla:
@@ -301,7 +343,7 @@ def inicio(request):
         movimientos = sorted(movimientos, key=lambda x: x['fecha'], reverse=True)[:10]
 
         # Calcular totales de deudas
-        deudas = Deuda.objects.filter(usuario=request.user)
+        deudas = Deuda.objects.filter(usuario=request.user).select_related('moneda').con_saldo()
         totales_deudas = {
             'POR_COBRAR': {},
             'POR_PAGAR': {}
@@ -326,21 +368,14 @@ def inicio(request):
         context = {
             'ingresos': ultimos_ingresos,  # Para mantener compatibilidad con el template
             'gastos': ultimos_gastos,  # Para mantener compatibilidad con el template
-            'total_ingresos': total_ingresos,
-            'total_gastos': total_gastos,
-            'balance_neto': balance_neto,
             'movimientos': movimientos,
             'cuentas_saldo': cuentas_con_saldo,
             'rango_actual': rango, # Pasar el rango al template para resaltar el botón activo
             'totales_cuentas': totals_list,
             'totales_cuentas_default': moneda_default,
-            'chart_labels': chart_labels,
-            'chart_ingresos': chart_ingresos,
-            'chart_gastos': chart_gastos,
-            'daily_flow_chart': daily_flow_chart,
-            'category_pie_chart': category_pie_chart,
             'deudas_por_cobrar': deudas_por_cobrar_list,
             'deudas_por_pagar': deudas_por_pagar_list,
+            **resumen,
         }
 
     return render(request, 'usuarios/inicio.html', context)
@@ -406,6 +441,15 @@ def editar_perfil(request):
     return render(request, 'usuarios/editar_perfil.html', {'form': form, 'perfil': perfil})
 
 
+@login_required
+def exportar_datos(request):
+    """Descarga un zip con todos los datos del usuario (NDJSON por tabla), generado en streaming."""
+    marca = timezone.localtime(timezone.now()).strftime('%Y%m%d-%H%M%S')
+    response = StreamingHttpResponse(iterar_exportacion(request.user), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="billetera-{request.user.pk}-{marca}.zip"'
+    return response
+
+
 # API: perfil /me protegido por JWT
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
@@ -425,14 +469,22 @@ class ProfileMe(APIView):
         })
 
 
-@csrf_exempt
-def trigger_backup(request):
+def _es_staff(request):
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_authenticated and user.is_staff)
+
+
+@exento_csrf
+@limitar('backup', pesado=True)
+async def trigger_backup(request):
     """
     Endpoint protegido para disparar el backup.
     Seguridad:
       - Acepta GET/POST.
       - Si el header X-Backup-Token o ?token= coincide con BACKUP_WEBHOOK_TOKEN => permitido.
       - En caso contrario, requiere usuario autenticado STAFF.
+    El volcado y la subida a R2 corren en el pool de E/S externa: bajo ASGI
+    no ocupan el worker mientras tanto.
     """
     if request.method not in ("GET", "POST"):
         return HttpResponseNotAllowed(["GET", "POST"])
@@ -442,17 +494,15 @@ def trigger_backup(request):
 
     if not (token_env and token_req and token_req == token_env):
         # Fallback a staff
-        user = getattr(request, 'user', None)
-        if not (user and user.is_authenticated and user.is_staff):
+        if not await sync_to_async(_es_staff)(request):
             return HttpResponseForbidden('No autorizado')
 
-    result = run_database_backup()
+    result = await en_hilo_externo(run_database_backup)
     return JsonResponse({'status': 'ok', **result})
 
 
-@login_required
-def exportar_reporte_pdf(request):
-    rango = request.GET.get('rango', '30d')
+def contexto_reporte_pdf(usuario, rango):
+    """Contexto de ``usuarios/reporte_pdf.html`` para el ``rango`` pedido."""
     ahora = timezone.localtime(timezone.now())
     fecha_inicio = None
     rango_label = "Últimos 30 días"
@@ -478,24 +528,33 @@ def exportar_reporte_pdf(request):
     else:
         fecha_inicio = ahora - timedelta(days=30)
 
-    filtros_ingresos = {'usuario': request.user}
-    filtros_gastos = {'usuario': request.user}
-    filtros_compras = {'usuario': request.user}
+    filtros_ingresos = {'usuario': usuario}
+    filtros_gastos = {'usuario': usuario}
+    filtros_compras = {'usuario': usuario}
 
     if fecha_inicio:
         filtros_ingresos['fecha__gte'] = fecha_inicio
         filtros_gastos['fecha__gte'] = fecha_inicio
         filtros_compras['fecha__gte'] = fecha_inicio
 
+    # Sólo lectura: con SQLITE_ALIAS_LECTURA no compite con las escrituras
+    alias = alias_lectura()
+
     # Totales
-    total_ingresos = Ingreso.objects.filter(**filtros_ingresos).aggregate(Sum('monto'))['monto__sum'] or 0
-    total_gastos = Gasto.objects.filter(**filtros_gastos).aggregate(Sum('monto'))['monto__sum'] or 0
+    total_ingresos = Ingreso.objects.using(alias).filter(**filtros_ingresos).aggregate(Sum('monto'))['monto__sum'] or 0
+    total_gastos = Gasto.objects.using(alias).filter(**filtros_gastos).aggregate(Sum('monto'))['monto__sum'] or 0
     balance_neto = total_ingresos - total_gastos
 
     # Movimientos
-    ingresos = Ingreso.objects.filter(**filtros_ingresos).order_by('-fecha')
-    gastos_individuales = Gasto.objects.filter(**filtros_gastos, compra__isnull=True).order_by('-fecha')
-    compras = Compra.objects.filter(**filtros_compras).prefetch_related('items').order_by('-fecha')
+    relacionadas = ('moneda', 'categoria', 'cuenta')
+    ingresos = Ingreso.objects.using(alias).filter(**filtros_ingresos).select_related(*relacionadas).order_by('-fecha')
+    gastos_individuales = (
+        Gasto.objects.using(alias).filter(**filtros_gastos, compra__isnull=True).select_related(*relacionadas).order_by('-fecha')
+    )
+    compras = (
+        Compra.objects.using(alias).filter(**filtros_compras).select_related('moneda', 'cuenta')
+        .prefetch_related('items').order_by('-fecha')
+    )
 
     movimientos = []
     for ing in ingresos:
@@ -555,8 +614,8 @@ def exportar_reporte_pdf(request):
     if len(movimientos) > 100:
         movimientos = movimientos[:100]
 
-    context = {
-        'user': request.user,
+    return {
+        'user': usuario,
         'rango_label': rango_label,
         'total_ingresos': total_ingresos,
         'total_gastos': total_gastos,
@@ -564,6 +623,13 @@ def exportar_reporte_pdf(request):
         'movimientos': movimientos,
     }
 
+
+@login_required
+@limitar('pdf', pesado=True)
+def exportar_reporte_pdf(request):
+    rango = request.GET.get('rango', '30d')
+    context = contexto_reporte_pdf(request.user, rango)
+
     import weasyprint
     html_string = render_to_string('usuarios/reporte_pdf.html', context)
     html = weasyprint.HTML(string=html_string, base_url=request.build_absolute_uri())
@@ -577,7 +643,10 @@ def exportar_reporte_pdf(request):
 
 @login_required
 def lista_planes(request):
-    planes = Plan.objects.all().order_by('precio')
+    # Tabla global que casi no cambia: se comparte entre workers hasta que se edite un plan
+    planes = cache.obtener_o_calcular(
+        'planes', ['lista'], lambda: list(Plan.objects.all().order_by('precio')), versionado=True,
+    )
     suscripcion_actual = getattr(request.user, 'suscripcion', None)
     return render(request, 'usuarios/lista_planes.html', {
         'planes': planes,
@@ -585,15 +654,35 @@ def lista_planes(request):
     })
 
 
-@login_required
-def procesar_pago(request, plan_id):
+def _mercadopago_sdk():
+    opciones = {}
+    api_url = os.getenv('MERCADOPAGO_API_URL')
+    if api_url:
+        # Sandbox o un doble local (pruebas de carga)
+        opciones['http_client'] = _cliente_mercadopago(api_url)
+    return mercadopago.SDK(os.getenv("MERCADOPAGO_ACCESS_TOKEN"), **opciones)
+
+
+def _cliente_mercadopago(api_url):
+    from mercadopago.http.http_client import HttpClient
+
+    class ClienteMercadoPago(HttpClient):
+        def request(self, method, url, *args, **kwargs):
+            url = url.replace('https://api.mercadopago.com', api_url.rstrip('/'), 1)
+            return super().request(method, url, *args, **kwargs)
+
+    return ClienteMercadoPago()
+
+
+@login_requerido
+async def procesar_pago(request, plan_id):
     if not mercadopago:
         return HttpResponse("MercadoPago library not installed", status=500)
 
-    plan = get_object_or_404(Plan, id=plan_id)
+    plan = await sync_to_async(get_object_or_404)(Plan, id=plan_id)
     
     # Configurar SDK de Mercado Pago
-    sdk = mercadopago.SDK(os.getenv("MERCADOPAGO_ACCESS_TOKEN"))
+    sdk = _mercadopago_sdk()
     
     preference_data = {
         "items": [
@@ -615,7 +704,8 @@ def procesar_pago(request, plan_id):
         "external_reference": f"{request.user.id}_{plan.id}"
     }
     
-    preference_response = sdk.preference().create(preference_data)
+    # El SDK es bloqueante (requests): la espera no ocupa el event loop
+    preference_response = await en_hilo_externo(sdk.preference().create, preference_data)
     preference = preference_response["response"]
     
     return redirect(preference["init_point"])
@@ -691,8 +781,9 @@ def _mercadopago_signature_is_valid(request, payload):
     return hmac.compare_digest(expected, signature)
 
 
-@csrf_exempt
-def webhook_mercadopago(request):
+@exento_csrf
+@limitar('webhook')
+async def webhook_mercadopago(request):
     if request.method != 'POST':
         return HttpResponse(status=400)
 
@@ -711,20 +802,25 @@ def webhook_mercadopago(request):
     if not mercadopago:
         return HttpResponse("MercadoPago library not installed", status=500)
 
-    sdk = mercadopago.SDK(os.getenv("MERCADOPAGO_ACCESS_TOKEN"))
-    payment_info = sdk.payment().get(payment_id)
+    sdk = _mercadopago_sdk()
+    payment_info = await en_hilo_externo(sdk.payment().get, payment_id)
     payment = payment_info.get('response') or {}
 
     if payment.get('status') != 'approved':
         return HttpResponse(status=200)
 
+    await sync_to_async(_activar_suscripcion)(payment_id, payment)
+    return HttpResponse(status=200)
+
+
+def _activar_suscripcion(payment_id, payment):
     external_ref = payment.get('external_reference', '')
     try:
         user_id, plan_id = external_ref.split('_')
         user = User.objects.get(id=user_id)
         plan = Plan.objects.get(id=plan_id)
     except (ValueError, User.DoesNotExist, Plan.DoesNotExist):
-        return HttpResponse(status=200)
+        return
 
     payment_id = str(payment_id)
     existing_subscription = Suscripcion.objects.filter(
@@ -734,7 +830,7 @@ def webhook_mercadopago(request):
         activo=True,
     ).first()
     if existing_subscription:
-        return HttpResponse(status=200)
+        return
 
     now = timezone.now()
     Suscripcion.objects.update_or_create(
@@ -747,5 +843,3 @@ def webhook_mercadopago(request):
             'external_id': payment_id,
         }
     )
-
-    return HttpResponse(status=200)
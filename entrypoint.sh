@@ -9,13 +9,18 @@ python manage.py check
 echo "Checking migration consistency..."
 python manage.py makemigrations --check --dry-run
 
-# Esperar a que la base de datos esté disponible (retry)
+# Esperar a que la base de datos esté disponible (retry). Las migraciones
+# pueden tardar más que el statement_timeout de los requests
 echo "Waiting for database..."
-until python manage.py migrate --noinput; do
+until DB_STATEMENT_TIMEOUT_MS=0 python manage.py migrate --noinput; do
   echo "Database not ready yet. Retrying in 5 seconds..."
   sleep 5
 done
 
+# Sólo crea algo si CACHE_URL usa db://; con otros backends no hace nada
+echo "Creating cache table..."
+python manage.py createcachetable
+
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
@@ -23,4 +28,5 @@ echo "Bootstrapping Site and Google SocialApp (idempotent)..."
 python manage.py bootstrap_google_socialapp || echo "Bootstrap command skipped (missing envs)."
 
 echo "Starting Gunicorn..."
-exec gunicorn billetera.wsgi --bind 0.0.0.0:${PORT:-8000}
+# Workers, hilos, preload, timeouts y modo WSGI/ASGI: gunicorn.conf.py (ajustables por entorno)
+exec gunicorn --config gunicorn.conf.py